@@ -18,6 +18,7 @@ import functools
 from keystoneauth1 import adapter
 from six.moves import urllib
 
+from shade import _coalesce
 from shade import _log
 from shade import exc
 from shade import task_manager
@@ -84,6 +85,7 @@ def extract_name(url):
 class ShadeAdapter(adapter.Adapter):
 
     def __init__(self, shade_logger, manager, *args, **kwargs):
+        self.coalescer = kwargs.pop('coalescer', None)
         super(ShadeAdapter, self).__init__(*args, **kwargs)
         self.shade_logger = shade_logger
         self.manager = manager
@@ -131,8 +133,28 @@ class ShadeAdapter(adapter.Adapter):
     def request(
             self, url, method, run_async=False, error_message=None,
             *args, **kwargs):
+        # Identical GETs issued concurrently, typically by worker threads
+        # that all missed a cache at the same time, share one request.
+        # Streamed and async requests hand back objects that can't be
+        # shared, so they always go out on their own, as do requests with
+        # extra positional arguments the key can't account for.
+        if (self.coalescer is not None and method.upper() == 'GET'
+                and not run_async and not args
+                and not kwargs.get('stream')):
+            key = _coalesce.make_request_key(
+                self.service_type, method, url, adapter=id(self), **kwargs)
+            return self.coalescer.do(
+                key, self._shade_request, url, method,
+                error_message=error_message, **kwargs)
+        return self._shade_request(
+            url, method, run_async, error_message, *args, **kwargs)
+
+    def _shade_request(
+            self, url, method, run_async=False, error_message=None,
+            *args, **kwargs):
         name_parts = extract_name(url)
         name = '.'.join([self.service_type, method] + name_parts)
+        service_type = self.service_type
         class_name = "".join([
             part.lower().capitalize() for part in name.split('.')])
 
@@ -146,6 +168,11 @@ class ShadeAdapter(adapter.Adapter):
                 self.name = name
                 self.__class__.__name__ = str(class_name)
                 self.run_async = run_async
+                # For metrics
+                self.service_type = service_type
+                self.method = method.upper()
+                self.resource = '.'.join(name_parts)
+                self.url = url
 
             def main(self, client):
                 self.args.setdefault('raise_exc', False)
@@ -0,0 +1,202 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Track the REST calls made inside a block of code '''
+
+import collections
+import json
+import os
+import sys
+import threading
+
+import munch
+
+from shade import exc
+from shade import metrics
+
+_SHADE_DIR = os.path.dirname(os.path.abspath(__file__))
+_SHADE_TESTS_DIR = os.path.join(_SHADE_DIR, 'tests')
+
+# Number of CallTrackers recording right now. Walking the stack for every
+# request is only worth it while something looks at the result.
+_active = 0
+_active_lock = threading.Lock()
+
+
+def tracking():
+    """Whether any CallTracker is recording calls."""
+    return _active > 0
+
+
+def _is_shade_frame(frame):
+    filename = os.path.abspath(frame.f_code.co_filename)
+    return (filename.startswith(_SHADE_DIR + os.sep)
+            and not filename.startswith(_SHADE_TESTS_DIR + os.sep))
+
+
+def _find_caller():
+    """Find the shade call being made and the code that called it.
+
+    :returns: A tuple of the outermost shade function on the stack and a
+              ``file:line in function`` description of its caller.
+    """
+    outermost = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        if _is_shade_frame(frame):
+            outermost = frame
+        frame = frame.f_back
+    if outermost is None:
+        return None, None
+    caller = outermost.f_back
+    if caller is None:
+        return outermost.f_code.co_name, None
+    return outermost.f_code.co_name, '{file}:{line} in {func}'.format(
+        file=caller.f_code.co_filename, line=caller.f_lineno,
+        func=caller.f_code.co_name)
+
+
+class CallTracker(metrics.MetricsEmitter):
+    """Record the REST calls made while it is active.
+
+    Obtained from ``OpenStackCloud.call_tracker``. Each call is kept as a
+    ``munch.Munch`` with its task name (such as ``compute.GET.servers``),
+    method, url, query params, duration, HTTP status class, the shade
+    operation it was made from and the caller of that operation.
+
+    Identical calls are calls with the same method, url and params.
+    Templated calls are calls with the same task name, such as fetching the
+    extra specs of every flavor one by one. Both are the usual sign of an
+    N+1 pattern or of a missing cache.
+
+    :param int budget: Most calls allowed in total.
+    :param int max_repeats: Most calls allowed with the same task name.
+    """
+
+    def __init__(self, budget=None, max_repeats=None):
+        self.budget = budget
+        self.max_repeats = max_repeats
+        self._lock = threading.Lock()
+        self._calls = []
+
+    def start(self):
+        """Mark the tracker as recording, so callers get looked up."""
+        global _active
+        with _active_lock:
+            _active += 1
+
+    def stop(self):
+        global _active
+        with _active_lock:
+            _active -= 1
+
+    def record(self, request_metrics):
+        operation, caller = request_metrics.origin or _find_caller()
+        call = munch.Munch(
+            name=request_metrics.name,
+            method=request_metrics.labels.get('method'),
+            url=request_metrics.url,
+            params=request_metrics.params,
+            duration=request_metrics.duration,
+            status=request_metrics.status,
+            operation=operation,
+            caller=caller)
+        with self._lock:
+            self._calls.append(call)
+
+    @property
+    def calls(self):
+        with self._lock:
+            return list(self._calls)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._calls)
+
+    @property
+    def duration(self):
+        """Total seconds spent in the recorded calls."""
+        return sum(call.duration for call in self.calls)
+
+    def identical_calls(self, threshold=2):
+        """Get the calls that were made at least threshold times.
+
+        :returns: A list of ``(method, url, params, count)`` tuples, most
+                  repeated first.
+        """
+        counts = collections.Counter(
+            (call.method, call.url,
+             json.dumps(call.params, sort_keys=True, default=str))
+            for call in self.calls)
+        return [
+            (method, url, json.loads(params), count)
+            for (method, url, params), count in counts.most_common()
+            if count >= threshold]
+
+    def repeated_calls(self, threshold=2):
+        """Get the task names that were called at least threshold times.
+
+        :returns: A list of ``(name, count)`` tuples, most repeated first.
+        """
+        counts = collections.Counter(call.name for call in self.calls)
+        return [
+            (name, count) for name, count in counts.most_common()
+            if count >= threshold]
+
+    def report(self):
+        """Describe the recorded calls in a human readable form."""
+        calls = self.calls
+        lines = ['{count} calls in {secs:.3f} seconds'.format(
+            count=len(calls), secs=sum(c.duration for c in calls))]
+        by_caller = collections.Counter(
+            (call.operation, call.caller) for call in calls)
+        for (operation, caller), count in by_caller.most_common():
+            lines.append(
+                '  {count} from {operation} called at {caller}'.format(
+                    count=count, operation=operation, caller=caller))
+        repeated = self.repeated_calls()
+        if repeated:
+            lines.append('Repeated calls:')
+            for name, count in repeated:
+                lines.append('  {count} x {name}'.format(
+                    count=count, name=name))
+        identical = self.identical_calls()
+        if identical:
+            lines.append('Identical calls:')
+            for method, url, params, count in identical:
+                lines.append('  {count} x {method} {url} {params}'.format(
+                    count=count, method=method, url=url,
+                    params=params or ''))
+        return '\n'.join(lines)
+
+    def check(self):
+        """Raise if the recorded calls went over budget.
+
+        :raises: OpenStackCloudCallBudgetExceeded
+        """
+        count = len(self)
+        if self.budget is not None and count > self.budget:
+            raise exc.OpenStackCloudCallBudgetExceeded(
+                "{count} calls were made, but the budget was {budget}\n"
+                "{report}".format(
+                    count=count, budget=self.budget, report=self.report()))
+        if self.max_repeats is not None:
+            over = [
+                (name, count) for name, count in self.repeated_calls()
+                if count > self.max_repeats]
+            if over:
+                raise exc.OpenStackCloudCallBudgetExceeded(
+                    "{name} was called {count} times, but at most"
+                    " {max_repeats} repeats are allowed\n{report}".format(
+                        name=over[0][0], count=over[0][1],
+                        max_repeats=self.max_repeats,
+                        report=self.report()))
@@ -0,0 +1,121 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Coalesce identical concurrent calls into a single in-flight call '''
+
+import copy
+import json
+import sys
+import threading
+
+import six
+
+from shade import _log
+
+
+class _InFlightCall(object):
+
+    def __init__(self):
+        self.finished = threading.Event()
+        self.result = None
+        # Private copy of result for the waiters. The leader hands result
+        # itself back to its caller, which is free to modify it.
+        self.snapshot = None
+        self.exc_info = None
+        self.waiters = 0
+
+
+class RequestCoalescer(object):
+    """Share the result of an in-flight call with identical callers.
+
+    When several threads ask for the same thing at the same time - such as
+    a set of worker threads that all miss a cache together - only the first
+    one actually performs the call. The others block until it is done and
+    then get their own copy of its result, or the exception it raised.
+
+    Nothing is remembered once the call finishes, so this does not replace
+    caching. It just stops a thundering herd of identical requests.
+    """
+
+    log = _log.setup_logging('shade.coalesce')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Run func, or wait for an identical in-flight call to finish.
+
+        :param key: Hashable key identifying the call. Calls with equal keys
+                    running at the same time share a single execution.
+        :param func: The callable to run.
+
+        :returns: The result of func. Callers that did not run func get a
+                  deep copy of any dict or list result, so that they can
+                  safely modify it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            self.log.debug("Waiting on in-flight call for %s", key)
+            call.finished.wait()
+            if call.exc_info:
+                six.reraise(*call.exc_info)
+            if isinstance(call.snapshot, (dict, list)):
+                return copy.deepcopy(call.snapshot)
+            return call.snapshot
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except Exception:
+            call.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                waiters = call.waiters
+            # Snapshot the result before anyone is woken up, and before the
+            # leader's caller gets the chance to modify it.
+            if waiters and isinstance(call.result, (dict, list)):
+                call.snapshot = copy.deepcopy(call.result)
+            else:
+                call.snapshot = call.result
+            call.finished.set()
+
+    def in_flight(self):
+        """Return the number of distinct calls currently running."""
+        with self._lock:
+            return len(self._calls)
+
+
+def make_request_key(service_type, method, url, **kwargs):
+    """Build a coalescing key for an HTTP request.
+
+    :param service_type: The service the request is going to.
+    :param method: The HTTP method.
+    :param url: The URL, as passed to the adapter.
+    :param kwargs: Any other arguments to the request, such as params or
+                   headers. They are part of the key so that requests which
+                   differ only in query string are not merged.
+    """
+    return (
+        service_type, method.upper(), url,
+        json.dumps(kwargs, sort_keys=True, default=str))
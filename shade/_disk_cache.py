@@ -0,0 +1,261 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Keep discovery documents and tokens on disk between processes '''
+
+import datetime
+import errno
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from keystoneauth1 import discover
+
+from shade import _log
+
+# Version documents hardly ever change, but do when a cloud is upgraded.
+DEFAULT_DISCOVERY_MAX_AGE = 86400
+# Don't hand out a cached token that is about to expire. keystoneauth would
+# only replace it on first use anyway.
+TOKEN_MIN_LIFE = 120
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _file_key(*parts):
+    return hashlib.sha256(
+        json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+
+
+def _rebuild_discover(url, data):
+    # Rebuild the Discover object keystoneauth would have made, without
+    # fetching the document again
+    disc = discover.Discover.__new__(discover.Discover)
+    disc._url = url
+    disc._data = data
+    return disc
+
+
+def _discovery_cache_supported(session):
+    """Whether session has the keystoneauth internals the cache relies on.
+
+    keystoneauth has no public way to share discovery documents, so the
+    cache swaps out the session's private discovery cache and rebuilds
+    Discover objects from their private url and data attributes.
+    """
+    if not isinstance(getattr(session, '_discovery_cache', None), dict):
+        return False
+    data = [{'id': 'v1.0', 'status': 'CURRENT', 'links': []}]
+    try:
+        disc = _rebuild_discover('https://example.com', data)
+        return (disc.raw_version_data() == data
+                and getattr(disc, '_url', None) == 'https://example.com')
+    except Exception:
+        return False
+
+
+class _DiscoveryDocuments(dict):
+    """A keystoneauth discovery cache backed by a DiskCache file.
+
+    keystoneauth looks version documents up in the session's discovery
+    cache by URL and stores the ones it fetches in it. Documents missing
+    from memory are looked for on disk, and fetched ones are written there.
+    """
+
+    def __init__(self, disk_cache, key, max_age):
+        super(_DiscoveryDocuments, self).__init__()
+        self._disk_cache = disk_cache
+        self._key = key
+        self._max_age = max_age
+
+    def get(self, url, default=None):
+        disc = super(_DiscoveryDocuments, self).get(url)
+        if disc is not None:
+            return disc
+        documents = self._disk_cache.read('discovery', self._key) or {}
+        document = documents.get(url)
+        if not document or time.time() - document['time'] > self._max_age:
+            return default
+        disc = _rebuild_discover(url, document['data'])
+        super(_DiscoveryDocuments, self).__setitem__(url, disc)
+        return disc
+
+    def __setitem__(self, url, disc):
+        known = super(_DiscoveryDocuments, self).get(url) is disc
+        super(_DiscoveryDocuments, self).__setitem__(url, disc)
+        data = getattr(disc, '_data', None)
+        if known or data is None:
+            return
+        self._disk_cache.update(
+            'discovery', self._key,
+            {url: {'time': time.time(), 'data': data}})
+
+
+class DiskCache(object):
+    """Cache keystoneauth state in files shared between processes.
+
+    Version discovery documents, and optionally the token and service
+    catalog, are written to files under path so that short lived processes
+    don't have to fetch them again. Files are keyed by a hash of the auth
+    URL and project. The directory is created private to the user, files
+    are only ever readable by the user, and a directory that other users
+    can write to is refused.
+
+    :param string path: Directory to keep the files in.
+    :param bool discovery: Whether to cache version discovery documents.
+    :param bool auth: Whether to cache the token and service catalog.
+    :param discovery_max_age: Seconds a discovery document is reused for.
+    """
+
+    log = _log.setup_logging('shade.disk_cache')
+
+    def __init__(
+            self, path, discovery=True, auth=False,
+            discovery_max_age=DEFAULT_DISCOVERY_MAX_AGE):
+        self.path = os.path.expanduser(path)
+        self.discovery = discovery
+        self.auth = auth
+        self.discovery_max_age = discovery_max_age
+        self._lock = threading.Lock()
+        self._usable = None
+
+    def _check_path(self):
+        if self._usable is None:
+            try:
+                os.makedirs(self.path, 0o700)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    self.log.debug(
+                        "Could not create disk cache %s", self.path,
+                        exc_info=True)
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._usable = False
+            else:
+                self._usable = stat.S_ISDIR(st.st_mode)
+                if (self._usable and hasattr(os, 'getuid')
+                        and (st.st_uid != os.getuid()
+                             or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH))):
+                    self.log.warning(
+                        "Not using disk cache %s, it is not a directory only"
+                        " its owner can write to", self.path)
+                    self._usable = False
+        return self._usable
+
+    def _file(self, kind, key):
+        return os.path.join(
+            self.path, '{kind}-{key}.json'.format(kind=kind, key=key))
+
+    def read(self, kind, key):
+        """Return the contents of a cache file, or None."""
+        if not self._check_path():
+            return None
+        try:
+            with open(self._file(kind, key), 'r') as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def write(self, kind, key, data):
+        """Atomically replace the contents of a cache file."""
+        if not self._check_path():
+            return
+        fd, temp = tempfile.mkstemp(dir=self.path, prefix='.tmp-')
+        try:
+            # mkstemp already creates the file readable by its owner only
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.rename(temp, self._file(kind, key))
+        except (IOError, OSError, TypeError, ValueError):
+            self.log.debug(
+                "Could not write disk cache file", exc_info=True)
+            try:
+                os.unlink(temp)
+            except OSError:
+                pass
+
+    def update(self, kind, key, data):
+        """Merge data into the dict in a cache file."""
+        with self._lock:
+            current = self.read(kind, key) or {}
+            current.update(data)
+            self.write(kind, key, current)
+
+    def attach(self, session, auth_url, project):
+        """Hook the cache into a keystoneauth session.
+
+        :param session: The ``keystoneauth1.session.Session`` to cache for.
+        :param string auth_url: The auth URL the session authenticates with.
+        :param string project: The project name or id it is scoped to.
+        """
+        if not self._check_path():
+            return
+        if self.discovery and not _discovery_cache_supported(session):
+            self.log.warning(
+                "Not caching discovery documents on disk, this version of"
+                " keystoneauth does not keep them where shade expects")
+        elif self.discovery:
+            documents = _DiscoveryDocuments(
+                self, _file_key(auth_url, project), self.discovery_max_age)
+            documents.update(session._discovery_cache)
+            session._discovery_cache = documents
+        plugin = session.auth
+        if self.auth and hasattr(plugin, 'get_auth_state'):
+            cache_id = plugin.get_cache_id()
+            if cache_id:
+                self._attach_auth(
+                    plugin, _file_key(auth_url, project, cache_id))
+
+    def _attach_auth(self, plugin, key):
+        state = self.read('auth', key)
+        min_expiry = time.time() + TOKEN_MIN_LIFE
+        if state and state.get('expires_at', 0) > min_expiry:
+            try:
+                plugin.set_auth_state(state['state'])
+            except Exception:
+                self.log.debug(
+                    "Ignoring unusable cached token", exc_info=True)
+                plugin.set_auth_state(None)
+
+        get_access = plugin.get_access
+        saved = [plugin.auth_ref]
+
+        # Save every new token as soon as the plugin has fetched it
+        def _get_access(session, **kwargs):
+            access = get_access(session, **kwargs)
+            if access is not saved[0]:
+                saved[0] = access
+                self._save_auth(plugin, key, access)
+            return access
+        plugin.get_access = _get_access
+
+    def _save_auth(self, plugin, key, access):
+        expires = getattr(access, 'expires', None)
+        if expires is None:
+            return
+        state = plugin.get_auth_state()
+        if state:
+            self.write('auth', key, {
+                'expires_at': _timestamp(expires), 'state': state})
+
+
+def _timestamp(value):
+    """Unix timestamp of a timezone aware datetime."""
+    offset = value.utcoffset()
+    value = value.replace(tzinfo=None)
+    if offset is not None:
+        value = value - offset
+    return (value - _EPOCH).total_seconds()
@@ -0,0 +1,164 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Keep floating IPs allocated ahead of the servers that need them '''
+
+import collections
+import threading
+
+from shade import _log
+
+# Seconds to wait before allocating again after an allocation failed
+RETRY_DELAY = 10
+
+
+class FloatingIPPool(object):
+    """A warm pool of unattached floating IPs on one network.
+
+    Finding a floating IP for a server used to mean listing every floating
+    IP and, if none was free, allocating one while the server waited.
+    Threads doing that at the same time could also pick the same free IP.
+    A pool keeps size unattached IPs allocated on its network instead, and
+    hands each of them out to a single caller. A daemon thread allocates
+    new ones as IPs are handed out.
+
+    Once started, the unattached IPs that already exist on the network
+    belong to the pool too. The pool only ever allocates IPs; the ones it
+    holds when the process ends stay allocated to the project, and are
+    picked up by the next pool to start.
+
+    :param string network_id: The network the IPs are on.
+    :param int size: How many unattached IPs to keep ready.
+    :param create: Callable allocating a new unattached floating IP.
+    :param available: (optional) Callable returning the unattached floating
+                      IPs that already exist on the network.
+    :param check: (optional) Callable given a list of pooled IPs and
+                  returning the ones that still exist and are unattached.
+                  IPs can be deleted or attached behind the pool's back, so
+                  the ones handed out are checked first.
+    """
+
+    log = _log.setup_logging('shade.floating_ip_pool')
+
+    def __init__(
+            self, network_id, size, create, available=None, check=None):
+        self.network_id = network_id
+        self.size = size
+        self._create = create
+        self._available = available
+        self._check = check
+        self._ips = collections.deque()
+        self._lock = threading.Lock()
+        # Set whenever an IP is handed out, to wake the allocating thread
+        self._wanted = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._ips)
+
+    def start(self):
+        """Adopt the existing unattached IPs and start allocating."""
+        if self._thread is not None:
+            return
+        if self._available is not None:
+            ips = self._available()
+            with self._lock:
+                self._ips.extend(ips)
+        self._thread = threading.Thread(
+            target=self._run,
+            name='shade-floating-ip-pool-{0}'.format(self.network_id))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def take(self):
+        """Hand out an unattached floating IP that no other caller gets.
+
+        Only allocates an IP while the caller waits if the pool is empty.
+        """
+        ips = self.take_many(1)
+        if ips:
+            return ips[0]
+        return self._create()
+
+    def take_many(self, count):
+        """Hand out up to count of the IPs that are ready, without waiting.
+
+        IPs that no longer exist or got attached are dropped from the pool.
+        """
+        ips = []
+        while len(ips) < count:
+            with self._lock:
+                taken = [
+                    self._ips.popleft()
+                    for _ in range(min(count - len(ips), len(self._ips)))]
+            if not taken:
+                break
+            self._wanted.set()
+            if self._check is None:
+                ips.extend(taken)
+                continue
+            try:
+                usable = self._check(taken)
+            except Exception:
+                # Nobody got them, so they are still the pool's
+                with self._lock:
+                    self._ips.extendleft(reversed(taken))
+                raise
+            usable_ids = set(ip['id'] for ip in usable)
+            for ip in taken:
+                if ip['id'] not in usable_ids:
+                    self.log.debug(
+                        "Dropping floating IP %s from the pool of %s, it"
+                        " is gone or attached", ip['id'], self.network_id)
+            ips.extend(usable)
+        self._wanted.set()
+        return ips
+
+    def ids(self):
+        """Return the ids of the IPs the pool holds."""
+        with self._lock:
+            return set(ip['id'] for ip in self._ips)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Cleared before looking, so that a take() from now on wakes us
+            self._wanted.clear()
+            if len(self._ips) >= self.size:
+                self._wanted.wait()
+                continue
+            try:
+                ip = self._create()
+            except Exception:
+                self.log.debug(
+                    "Allocating a floating IP on %s for the pool failed",
+                    self.network_id, exc_info=True)
+                # Don't spin on a failing cloud
+                self._stop.wait(RETRY_DELAY)
+                continue
+            with self._lock:
+                self._ips.append(ip)
+
+    def stop(self):
+        """Stop allocating IPs.
+
+        :returns: The IPs the pool held, which are no longer handed out.
+        """
+        self._stop.set()
+        self._wanted.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            ips = list(self._ips)
+            self._ips.clear()
+        return ips
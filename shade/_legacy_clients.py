@@ -13,7 +13,6 @@ import importlib
 import warnings
 
 from keystoneauth1 import plugin
-from os_client_config import constructors
 
 from shade import _utils
 from shade import exc
@@ -34,6 +33,7 @@ class LegacyClientFactoryMixin(object):
             if deprecated:
                 self._deprecated_import_check(client)
             if module_name:
+                from os_client_config import constructors
                 constructors.get_constructor_mapping()[service] = module_name
             self._legacy_clients[client] = self._get_client(service, **kwargs)
         return self._legacy_clients[client]
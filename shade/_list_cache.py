@@ -0,0 +1,370 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Snapshot caches for list calls, with optional background refresh '''
+
+import collections
+import itertools
+import threading
+import time
+
+import munch
+
+from shade import _log
+
+# Refresh in the background once a snapshot has used up this fraction of
+# its max age, so that readers never see an expired list.
+DEFAULT_REFRESH_FRACTION = 0.8
+DEFAULT_MAX_AGE = 5
+# How often a delta synced table throws its contents away and does a full
+# listing, to catch anything changes-since can't tell us about.
+DEFAULT_FULL_SYNC_INTERVAL = 300
+# Slack subtracted from the changes-since timestamp to cover clock skew
+# between us and the cloud. The since timestamp comes from the local clock
+# but nova compares it to its own, so this assumes the two are within this
+# many seconds of each other. Re-processing a few records is harmless.
+DEFAULT_SYNC_SKEW = 5
+
+
+class ListCache(object):
+    """Keep the last good result of a list call.
+
+    This is the batched caching that list_servers, list_ports and
+    list_floating_ips have always done, pulled out so that it can be used
+    for any list call. Readers are served the last snapshot while it is
+    younger than max_age. Once it is older, the first reader to notice
+    refreshes it while holding a lock and everyone else keeps using the old
+    snapshot instead of piling in with the same request. Only the very first
+    fetch, when there is nothing to serve yet, makes callers wait.
+
+    With background=True a daemon thread refreshes the snapshot before it
+    expires, so readers never pay for the list call after the first one.
+    A failed refresh keeps the previous snapshot and is counted in stats().
+
+    :param string name: Name of the cached resource, for logging.
+    :param max_age: Seconds a snapshot is considered fresh. 0 disables the
+                    cache and every get() calls fetch.
+    :param fetch: Default callable returning the list.
+    :param bool background: Whether to refresh from a background thread.
+    :param float refresh_fraction: Fraction of max_age after which the
+                                   background thread refreshes.
+    """
+
+    log = _log.setup_logging('shade.list_cache')
+
+    def __init__(
+            self, name, max_age, fetch=None, background=False,
+            refresh_fraction=DEFAULT_REFRESH_FRACTION):
+        self.name = name
+        self.max_age = max_age
+        self.background = background
+        self.refresh_fraction = refresh_fraction
+        self._fetch = fetch
+        self._data = None
+        self._time = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._retry_at = 0
+        self._stop = threading.Event()
+        self._refresh_count = 0
+        self._refresh_errors = 0
+        self._last_error = None
+        self._last_duration = None
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def age(self):
+        """Seconds since the last successful refresh, None if never."""
+        if self._data is None:
+            return None
+        return time.time() - self._time
+
+    def is_expired(self):
+        return (time.time() - self._time) >= self.max_age
+
+    def invalidate(self):
+        """Mark the snapshot as expired so the next get() refreshes it.
+
+        The old snapshot is kept so that it can still be served to readers
+        that lose the race for the refresh lock. This holds for background
+        caches too: the next reader refreshes rather than waiting for the
+        refresher to wake up.
+        """
+        self._time = 0
+
+    def clear(self):
+        """Drop the snapshot entirely."""
+        with self._lock:
+            self._data = None
+            self._time = 0
+
+    def update(self, data):
+        """Replace the snapshot with data fetched by someone else."""
+        self._data = data
+        self._time = time.time()
+
+    def patch(self, func):
+        """Apply a write to the snapshot without refreshing it.
+
+        func takes the current list and returns the new one. The snapshot
+        keeps its age, so the rest of it expires on schedule. If there is
+        no snapshot yet there is nothing to patch.
+        """
+        with self._lock:
+            if self._data is not None:
+                self._data = func(self._data)
+
+    def get(self, fetch=None):
+        """Return the cached list, refreshing it if needed.
+
+        :param fetch: Callable to use for this refresh instead of the default
+                      one. It also becomes the default for background
+                      refreshes.
+        """
+        if fetch is not None:
+            self._fetch = fetch
+        if self.background and self.max_age:
+            self._start_refresher()
+            if self._data is not None and self._time:
+                # The refresher keeps this current. If it is failing,
+                # keep serving the last good list rather than failing reads.
+                return self._data
+        if self.is_expired():
+            # Since we're using cached data anyway, we don't need to
+            # have more than one thread actually submit the list
+            # task.  Let the first one submit it while holding
+            # a lock, and the non-blocking acquire method will cause
+            # subsequent threads to just skip this and use the old
+            # data until it succeeds.
+            # Initially when we never got data, block to retrieve some data.
+            first_run = self._data is None
+            if self._lock.acquire(first_run):
+                try:
+                    if not (first_run and self._data is not None):
+                        self._refresh()
+                finally:
+                    self._lock.release()
+        return self._data
+
+    def _refresh(self):
+        start = time.time()
+        try:
+            data = self._fetch()
+        except Exception as e:
+            self._refresh_errors += 1
+            self._last_error = str(e)
+            raise
+        self._last_duration = time.time() - start
+        self._refresh_count += 1
+        self._last_error = None
+        self.update(data)
+
+    def _start_refresher(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run_refresher,
+                name='shade-list-cache-{name}'.format(name=self.name))
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run_refresher(self):
+        while not self._stop.is_set():
+            if self._data is None or self._fetch is None:
+                # Nothing to refresh until a reader has done the first fetch
+                delay = self.max_age * self.refresh_fraction
+            else:
+                delay = max(
+                    self._time + self.max_age * self.refresh_fraction,
+                    self._retry_at) - time.time()
+            if delay > 0:
+                self._stop.wait(delay)
+                continue
+            with self._lock:
+                try:
+                    self._refresh()
+                except Exception:
+                    self.log.debug(
+                        "Background refresh of %s failed, keeping the"
+                        " previous list", self.name, exc_info=True)
+                    # Don't spin on a failing cloud
+                    self._retry_at = (
+                        time.time() + self.max_age * self.refresh_fraction)
+
+    def stop(self):
+        """Stop the background refresh thread, if there is one."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
+
+    def stats(self):
+        """Return age and refresh metrics for this cache."""
+        return munch.Munch(
+            name=self.name,
+            max_age=self.max_age,
+            background=self.background,
+            age=self.age,
+            size=len(self._data) if self._data is not None else None,
+            refresh_count=self._refresh_count,
+            refresh_errors=self._refresh_errors,
+            last_error=self._last_error,
+            last_refresh_duration=self._last_duration,
+        )
+
+
+class DeltaSyncTable(object):
+    """Keyed table of records kept current with incremental syncs.
+
+    The first sync, and every sync after full_sync_interval, does a full
+    listing. In between, only the records that changed since the previous
+    sync are fetched, processed and merged in, and deleted records are
+    evicted. A change in the listing arguments (the context) forces a full
+    listing, since the table only describes one of them.
+
+    :param string name: Name of the resource, for logging.
+    :param string key: Key holding each record's unique id.
+    :param float full_sync_interval: Seconds between full listings.
+    :param float skew: Seconds subtracted from the since timestamp.
+    """
+
+    log = _log.setup_logging('shade.list_cache')
+
+    def __init__(
+            self, name, key='id',
+            full_sync_interval=DEFAULT_FULL_SYNC_INTERVAL,
+            skew=DEFAULT_SYNC_SKEW):
+        self.name = name
+        self.key = key
+        self.full_sync_interval = full_sync_interval
+        self.skew = skew
+        self._records = collections.OrderedDict()
+        self._context = None
+        self._since = None
+        self._last_full = 0
+        self._lock = threading.Lock()
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.last_delta_size = None
+
+    def reset(self):
+        """Force the next sync to do a full listing."""
+        with self._lock:
+            self._since = None
+
+    def upsert(self, record):
+        """Add or replace a processed record."""
+        with self._lock:
+            self._records[record[self.key]] = record
+
+    def evict(self, record_id):
+        """Remove a record, if it is in the table."""
+        with self._lock:
+            self._records.pop(record_id, None)
+
+    def sync(self, context, fetch_all, fetch_changes, is_deleted, process):
+        """Bring the table up to date and return its records.
+
+        :param context: Hashable description of the listing arguments.
+        :param fetch_all: Callable returning the full, processed list.
+        :param fetch_changes: Callable taking a unix timestamp and returning
+                              the raw records changed since then, including
+                              deleted ones.
+        :param is_deleted: Callable telling whether a raw record is deleted.
+        :param process: Callable turning a raw record into a table record.
+
+        :returns: A list of the current records.
+        """
+        with self._lock:
+            start = time.time()
+            if (self._since is None or context != self._context
+                    or start - self._last_full >= self.full_sync_interval):
+                records = fetch_all()
+                self._records = collections.OrderedDict(
+                    (record[self.key], record) for record in records)
+                self._last_full = start
+                self.full_syncs += 1
+            else:
+                changed = 0
+                for record in fetch_changes(self._since):
+                    changed += 1
+                    if is_deleted(record):
+                        self._records.pop(record[self.key], None)
+                    else:
+                        self._records[record[self.key]] = process(record)
+                self.delta_syncs += 1
+                self.last_delta_size = changed
+                self.log.debug(
+                    "Delta sync of %(name)s found %(count)s changes",
+                    {'name': self.name, 'count': changed})
+            self._context = context
+            self._since = start - self.skew
+            return list(self._records.values())
+
+
+def upsert_record(records, record, key='id'):
+    """Return a copy of records with record added or replaced.
+
+    Replaced records keep their position, new ones are appended.
+    """
+    result = []
+    found = False
+    for existing in records:
+        if existing.get(key) == record[key]:
+            result.append(record)
+            found = True
+        else:
+            result.append(existing)
+    if not found:
+        result.append(record)
+    return result
+
+
+def remove_record(records, record_id, key='id'):
+    """Return a copy of records without the one whose key is record_id."""
+    return [r for r in records if r.get(key) != record_id]
+
+
+def remove_records(records, record_ids, key='id'):
+    """Return a copy of records without the ones whose key is in record_ids.
+    """
+    return [r for r in records if r.get(key) not in record_ids]
+
+
+def cached_list_call(cache, method):
+    """Wrap a list call so that its argument-less form uses cache.
+
+    Calls with arguments, such as pushdown filters, bypass the snapshot
+    since it only holds the unfiltered list.
+    """
+    def _cached_list_call(*args, **kwargs):
+        if any(v is not None
+               for v in itertools.chain(args, kwargs.values())):
+            return method(*args, **kwargs)
+        return cache.get()
+
+    def invalidate(unused=None):
+        cache.invalidate()
+        if hasattr(method, 'invalidate'):
+            method.invalidate(unused)
+
+    _cached_list_call.invalidate = invalidate
+    _cached_list_call.func = method
+    _cached_list_call.cache = cache
+    return _cached_list_call
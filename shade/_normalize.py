@@ -15,6 +15,9 @@
 import datetime
 import munch
 import six
+import uuid
+
+from shade import _records
 
 _IMAGE_FIELDS = (
     'checksum',
@@ -45,6 +48,120 @@ _SERVER_FIELDS = (
     'user_id',
 )
 
+_NOVACLIENT_ARTIFACTS = frozenset((
+    'HUMAN_ID',
+    'NAME_ATTR',
+    'human_id',
+    'links',
+    'request_ids',
+    'x_openstack_request_ids',
+))
+
+# The keys normalization turns into fields, which are left out of the
+# properties. The _STRICT variants add the keys strict mode also leaves out
+# of the properties.
+_FLAVOR_CONSUMED = _NOVACLIENT_ARTIFACTS | frozenset((
+    'disk',
+    'ephemeral',
+    'extra_specs',
+    'id',
+    'is_public',
+    'name',
+    'ram',
+    'rxtx_factor',
+    'swap',
+    'vcpus',
+))
+_FLAVOR_CONSUMED_STRICT = _FLAVOR_CONSUMED | frozenset((
+    'OS-FLV-DISABLED:disabled',
+    'OS-FLV-EXT-DATA:ephemeral',
+    'OS-FLV-WITH-EXT-SPECS:extra_specs',
+    'os-flavor-access:is_public',
+))
+
+_IMAGE_CONSUMED = (
+    _NOVACLIENT_ARTIFACTS | frozenset(_IMAGE_FIELDS) | frozenset((
+        'OS-EXT-IMG-SIZE:size',
+        'created',
+        'created_at',
+        'locations',
+        'metadata',
+        'minDisk',
+        'minRam',
+        'min_disk',
+        'min_ram',
+        'properties',
+        'protected',
+        'size',
+        'status',
+        'tags',
+        'updated',
+        'updated_at',
+        'visibility',
+    )))
+# is_public is only consumed when there is no visibility to go by
+_IMAGE_CONSUMED_NO_VISIBILITY = _IMAGE_CONSUMED | frozenset(('is_public',))
+
+_SERVER_STATUS_FIELDS = (
+    ('OS-EXT-STS:power_state', 'power_state'),
+    ('OS-EXT-STS:task_state', 'task_state'),
+    ('OS-EXT-STS:vm_state', 'vm_state'),
+    ('OS-SRV-USG:launched_at', 'launched_at'),
+    ('OS-SRV-USG:terminated_at', 'terminated_at'),
+)
+
+_SERVER_CONSUMED = (
+    _NOVACLIENT_ARTIFACTS | frozenset(_SERVER_FIELDS) | frozenset((
+        'config_drive',
+        'flavor',
+        'hostId',
+        'id',
+        'image',
+        'name',
+        'progress',
+        'project_id',
+        'security_groups',
+        'tenant_id',
+    )))
+_SERVER_CONSUMED_STRICT = _SERVER_CONSUMED | frozenset(
+    key for key, short_key in _SERVER_STATUS_FIELDS) | frozenset((
+        'OS-DCF:diskConfig',
+        'OS-EXT-AZ:availability_zone',
+        'os-extended-volumes:volumes_attached',
+    ))
+
+_VOLUME_CONSUMED = _NOVACLIENT_ARTIFACTS | frozenset((
+    'attachments',
+    'availability_zone',
+    'bootable',
+    'consistencygroup_id',
+    'created_at',
+    'description',
+    'display_description',
+    'display_name',
+    'encrypted',
+    'id',
+    'metadata',
+    'migration_status',
+    'multiattach',
+    'name',
+    'replication_status',
+    'size',
+    'snapshot_id',
+    'status',
+    'updated_at',
+    'volume_type',
+))
+_VOLUME_CONSUMED_STRICT = _VOLUME_CONSUMED | frozenset((
+    'os-vol-host-attr:host',
+    'os-vol-mig-status-attr:migstat',
+    'os-vol-tenant-attr:tenant_id',
+    'os-volume-replication:driver_data',
+    'os-volume-replication:extended_status',
+    'source_volid',
+    'user_id',
+))
+
 _KEYPAIR_FIELDS = (
     'fingerprint',
     'name',
@@ -77,12 +194,50 @@ _COMPUTE_LIMITS_FIELDS = (
 )
 
 
+# Neutron filters listings on any top level attribute of a resource
+_ALL_FIELDS = object()
+
+# The filter keys the server filters on, per resource. Where the query
+# parameter differs from the key of the normalized resource, or from one
+# API version to the other, the entry maps keys to query parameters, per
+# major version.
 _pushdown_fields = {
     'project': [
         'domain_id'
-    ]
+    ],
+    'network': _ALL_FIELDS,
+    'subnet': _ALL_FIELDS,
+    'router': _ALL_FIELDS,
+    'port': _ALL_FIELDS,
+    'security_group': _ALL_FIELDS,
+    'floating_ip': [
+        'id', 'router_id', 'status', 'tenant_id', 'project_id',
+        'revision_number', 'description', 'floating_network_id',
+        'fixed_ip_address', 'floating_ip_address', 'port_id', 'sort_dir',
+        'sort_key', 'tags', 'tags-any', 'not-tags', 'not-tags-any', 'fields',
+    ],
+    'volume': {
+        1: {'name': 'display_name', 'status': 'status',
+            'availability_zone': 'availability_zone'},
+        2: {'name': 'name', 'status': 'status',
+            'availability_zone': 'availability_zone'},
+    },
+    'image': {
+        1: {'name': 'name', 'container_format': 'container_format',
+            'disk_format': 'disk_format'},
+        2: {'id': 'id', 'name': 'name',
+            'container_format': 'container_format',
+            'disk_format': 'disk_format', 'owner': 'owner',
+            'visibility': 'visibility'},
+    },
+    'stack': [
+        'id', 'name',
+    ],
 }
 
+# Characters that make name_or_id a pattern only shade can match
+_PATTERN_CHARS = frozenset('*?[')
+
 
 def _split_filters(obj_name='', filters=None, **kwargs):
     # Handle jmsepath filters
@@ -99,13 +254,118 @@ def _split_filters(obj_name='', filters=None, **kwargs):
     pushdown = {}
     client = {}
     for (key, value) in filters.items():
-        if key in _pushdown_fields.get(obj_name, {}):
-            pushdown[key] = value
+        param = _pushdown_param(obj_name, key)
+        if param:
+            pushdown[param] = value
         else:
             client[key] = value
     return pushdown, client
 
 
+def _pushdown_param(obj_name, key, version=None):
+    """Return the query parameter filtering obj_name on key, or None."""
+    supported = _pushdown_fields.get(obj_name)
+    if supported is _ALL_FIELDS:
+        return key
+    if isinstance(supported, dict):
+        supported = supported.get(version, supported[max(supported)])
+    if isinstance(supported, dict):
+        return supported.get(key)
+    if supported and key in supported:
+        return key
+    return None
+
+
+def _is_pushdown_value(obj_name, value):
+    if isinstance(value, (list, tuple)):
+        # Neutron takes a repeated parameter as a list of allowed values
+        return (_pushdown_fields.get(obj_name) is _ALL_FIELDS
+                and all(_is_pushdown_value(obj_name, v) for v in value))
+    return isinstance(value, six.string_types + six.integer_types + (bool,))
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except (TypeError, ValueError, AttributeError):
+        return False
+    return True
+
+
+def _with_fields(filters, fields):
+    """Add the neutron fields selection to a dict of query parameters.
+
+    :param dict filters: The query parameters, or None.
+    :param list fields: The attributes to return, or None for all of them.
+    """
+    if not fields:
+        return filters
+    params = dict(filters or {})
+    # The id is needed to tell the resources apart
+    params['fields'] = sorted(set(fields) | set(['id']))
+    return params
+
+
+def _plan_search(obj_name, name_or_id=None, filters=None, version=None,
+                 fields=None):
+    """Split a search into what the server filters and what shade does.
+
+    :param string obj_name: The resource, e.g. 'network'.
+    :param string name_or_id: The name, id or pattern searched for.
+    :param filters: The dict of filters, or a jmespath expression.
+    :param int version: The major API version of the service.
+    :param list fields: (optional) The attributes the caller needs, for
+                        services that can return only some attributes.
+
+    :returns: A tuple of the query parameters, a list of alternative query
+              parameters for name_or_id to try in order until one finds
+              something, and the filters left to apply locally.
+    """
+    params = {}
+    client = {}
+    if isinstance(filters, dict):
+        for (key, value) in filters.items():
+            param = _pushdown_param(obj_name, key, version)
+            if param and _is_pushdown_value(obj_name, value):
+                params[param] = value
+            else:
+                client[key] = value
+    elif filters:
+        client = filters
+
+    alternatives = [{}]
+    if (name_or_id and isinstance(name_or_id, six.string_types)
+            and not _PATTERN_CHARS.intersection(name_or_id)):
+        name_param = _pushdown_param(obj_name, 'name', version)
+        id_param = _pushdown_param(obj_name, 'id', version)
+        if not name_param and id_param:
+            # Resources without names, such as floating IPs, are only ever
+            # looked up by id
+            alternatives = [{id_param: name_or_id}]
+        elif name_param:
+            # Try what name_or_id looks like first, then the other one, or
+            # everything if the id can't be filtered on
+            by_name = {name_param: name_or_id}
+            if not id_param:
+                alternatives = [{}] if _is_uuid(name_or_id) else [by_name, {}]
+            elif _is_uuid(name_or_id):
+                alternatives = [{id_param: name_or_id}, by_name]
+            else:
+                alternatives = [by_name, {id_param: name_or_id}]
+
+    # No telling what a jmespath expression looks at, so those get all the
+    # attributes
+    if (fields and _pushdown_param(obj_name, 'fields', version)
+            and isinstance(client, dict)):
+        wanted = set(fields)
+        if name_or_id:
+            wanted.add('name')
+        # The results are filtered again locally, on every filter
+        wanted.update(filters or {})
+        params = _with_fields(params, wanted)
+    return params, alternatives, client
+
+
 def _to_bool(value):
     if isinstance(value, six.string_types):
         if not value:
@@ -130,6 +390,69 @@ def _pop_or_get(resource, key, default, strict):
         return resource.get(key, default)
 
 
+def _munchify_json(value):
+    """munch.munchify for decoded JSON.
+
+    JSON has no cycles, so unlike munchify this doesn't keep track of the
+    objects it has seen.
+    """
+    if isinstance(value, dict):
+        ret = munch.Munch()
+        dict.update(ret, ((k, _munchify_json(v)) for k, v in value.items()))
+        return ret
+    if isinstance(value, list):
+        return [_munchify_json(v) for v in value]
+    return value
+
+
+def _to_munch(value):
+    """munch.Munch(value), without Munch.update's per key loop."""
+    ret = munch.Munch()
+    dict.update(ret, value)
+    return ret
+
+
+def _copy_resource(resource):
+    """Return a resource to normalize from, and the type of its properties.
+
+    Normalizing a Munch has always deep copied it with Munch.copy(), which
+    munchifies the nested dicts as well. Do that once, into a plain dict
+    that is cheap to look keys up in. A plain dict is read as is, and its
+    values end up shared with the normalized resource, as dict.copy() had
+    them.
+    """
+    if isinstance(resource, munch.Munch):
+        return (
+            dict((k, _munchify_json(v)) for k, v in resource.items()),
+            munch.Munch)
+    return resource, dict
+
+
+def _without(value, key, container):
+    """Return value without key, copying it unless it is a private copy."""
+    if container is not munch.Munch:
+        value = value.copy()
+    value.pop(key, None)
+    return value
+
+
+def _leftovers(resource, consumed, container):
+    """Return the keys of resource that are not in consumed."""
+    ret = container()
+    dict.update(
+        ret, ((k, v) for k, v in resource.items() if k not in consumed))
+    return ret
+
+
+def _merge(fields, properties=None):
+    """Return a Munch of fields, plus the properties not in fields."""
+    ret = munch.Munch()
+    if properties:
+        dict.update(ret, properties)
+    dict.update(ret, fields)
+    return ret
+
+
 class Normalizer(object):
     '''Mix-in class to provide the normalization functions.
 
@@ -157,6 +480,29 @@ class Normalizer(object):
 
         return new_limits
 
+    def _get_list_location(self, locations, project_id=None, zone=None):
+        """Return the location of a resource in a list being normalized.
+
+        Resources of a list that are in the same project and zone share a
+        single location, which is kept in the locations dict.
+        """
+        if locations is None:
+            return self._get_current_location(
+                project_id=project_id, zone=zone)
+        key = (project_id, zone)
+        location = locations.get(key)
+        if location is None:
+            location = self._get_current_location(
+                project_id=project_id, zone=zone)
+            locations[key] = location
+        return location
+
+    def _make_resource(self, record_type, fields):
+        """Return the fields of a strict resource as a Munch or a record."""
+        if self._compact_records:
+            return record_type(fields)
+        return _merge(fields)
+
     def _remove_novaclient_artifacts(self, item):
         # Remove novaclient artifacts
         item.pop('links', None)
@@ -168,56 +514,46 @@ class Normalizer(object):
 
     def _normalize_flavors(self, flavors):
         """ Normalize a list of flavor objects """
-        ret = []
-        for flavor in flavors:
-            ret.append(self._normalize_flavor(flavor))
-        return ret
+        locations = {}
+        return [
+            self._normalize_flavor(flavor, locations) for flavor in flavors]
 
-    def _normalize_flavor(self, flavor):
+    def _normalize_flavor(self, flavor, locations=None):
         """ Normalize a flavor object """
-        new_flavor = munch.Munch()
-
-        # Copy incoming group because of shared dicts in unittests
-        flavor = flavor.copy()
-
-        # Discard noise
-        self._remove_novaclient_artifacts(flavor)
-        flavor.pop('links', None)
-
-        ephemeral = int(_pop_or_get(
-            flavor, 'OS-FLV-EXT-DATA:ephemeral', 0, self.strict_mode))
-        ephemeral = flavor.pop('ephemeral', ephemeral)
-        is_public = _to_bool(_pop_or_get(
-            flavor, 'os-flavor-access:is_public', True, self.strict_mode))
-        is_public = _to_bool(flavor.pop('is_public', is_public))
-        is_disabled = _to_bool(_pop_or_get(
-            flavor, 'OS-FLV-DISABLED:disabled', False, self.strict_mode))
-        extra_specs = _pop_or_get(
-            flavor, 'OS-FLV-WITH-EXT-SPECS:extra_specs', {}, self.strict_mode)
-        extra_specs = flavor.pop('extra_specs', extra_specs)
-        extra_specs = munch.Munch(extra_specs)
-
-        new_flavor['location'] = self.current_location
-        new_flavor['id'] = flavor.pop('id')
-        new_flavor['name'] = flavor.pop('name')
-        new_flavor['is_public'] = is_public
-        new_flavor['is_disabled'] = is_disabled
-        new_flavor['ram'] = _pop_int(flavor, 'ram')
-        new_flavor['vcpus'] = _pop_int(flavor, 'vcpus')
-        new_flavor['disk'] = _pop_int(flavor, 'disk')
-        new_flavor['ephemeral'] = ephemeral
-        new_flavor['swap'] = _pop_int(flavor, 'swap')
-        new_flavor['rxtx_factor'] = _pop_float(flavor, 'rxtx_factor')
-
-        new_flavor['properties'] = flavor.copy()
-        new_flavor['extra_specs'] = extra_specs
+        flavor, container = _copy_resource(flavor)
+        strict = self.strict_mode
+
+        ephemeral = int(flavor.get('OS-FLV-EXT-DATA:ephemeral', 0))
+        ephemeral = flavor.get('ephemeral', ephemeral)
+        is_public = _to_bool(flavor.get('os-flavor-access:is_public', True))
+        is_public = _to_bool(flavor.get('is_public', is_public))
+        extra_specs = flavor.get('OS-FLV-WITH-EXT-SPECS:extra_specs', {})
+        extra_specs = flavor.get('extra_specs', extra_specs)
+
+        new_flavor = dict(
+            location=self._get_list_location(locations),
+            id=flavor['id'],
+            name=flavor['name'],
+            is_public=is_public,
+            is_disabled=_to_bool(
+                flavor.get('OS-FLV-DISABLED:disabled', False)),
+            ram=int(flavor.get('ram', 0) or 0),
+            vcpus=int(flavor.get('vcpus', 0) or 0),
+            disk=int(flavor.get('disk', 0) or 0),
+            ephemeral=ephemeral,
+            swap=int(flavor.get('swap', 0) or 0),
+            rxtx_factor=float(flavor.get('rxtx_factor', 0) or 0),
+            extra_specs=_to_munch(extra_specs),
+        )
+        properties = _leftovers(
+            flavor, _FLAVOR_CONSUMED_STRICT if strict else _FLAVOR_CONSUMED,
+            container)
+        new_flavor['properties'] = properties
 
+        if strict:
+            return self._make_resource(_records.Flavor, new_flavor)
         # Backwards compat with nova - passthrough values
-        if not self.strict_mode:
-            for (k, v) in new_flavor['properties'].items():
-                new_flavor.setdefault(k, v)
-
-        return new_flavor
+        return _merge(new_flavor, properties)
 
     def _normalize_keypairs(self, keypairs):
         """Normalize Nova Keypairs"""
@@ -253,86 +589,77 @@ class Normalizer(object):
         return new_keypair
 
     def _normalize_images(self, images):
-        ret = []
-        for image in images:
-            ret.append(self._normalize_image(image))
-        return ret
+        locations = {}
+        return [self._normalize_image(image, locations) for image in images]
 
-    def _normalize_image(self, image):
-        new_image = munch.Munch(
-            location=self._get_current_location(project_id=image.get('owner')))
+    def _normalize_image(self, image, locations=None):
+        location = self._get_list_location(
+            locations, project_id=image.get('owner'))
 
         # This copy is to keep things from getting epically weird in tests
-        image = image.copy()
-
-        # Discard noise
-        self._remove_novaclient_artifacts(image)
+        image, container = _copy_resource(image)
 
         # If someone made a property called "properties" that contains a
         # string (this has happened at least one time in the wild), the
         # the rest of the normalization here goes belly up.
-        properties = image.pop('properties', {})
+        properties = image.get('properties', {})
         if not isinstance(properties, dict):
             properties = {'properties': properties}
+        elif container is dict:
+            # Only a copy gets extended with the other properties
+            properties = properties.copy()
 
-        visibility = image.pop('visibility', None)
-        protected = _to_bool(image.pop('protected', False))
+        visibility = image.get('visibility')
+        protected = _to_bool(image.get('protected', False))
 
         if visibility:
             is_public = (visibility == 'public')
+            consumed = _IMAGE_CONSUMED
         else:
-            is_public = image.pop('is_public', False)
+            is_public = image.get('is_public', False)
             visibility = 'public' if is_public else 'private'
+            consumed = _IMAGE_CONSUMED_NO_VISIBILITY
 
-        new_image['size'] = image.pop('OS-EXT-IMG-SIZE:size', 0)
-        new_image['size'] = image.pop('size', new_image['size'])
-
-        new_image['min_ram'] = image.pop('minRam', 0)
-        new_image['min_ram'] = image.pop('min_ram', new_image['min_ram'])
-
-        new_image['min_disk'] = image.pop('minDisk', 0)
-        new_image['min_disk'] = image.pop('min_disk', new_image['min_disk'])
-
-        new_image['created_at'] = image.pop('created', '')
-        new_image['created_at'] = image.pop(
-            'created_at', new_image['created_at'])
-
-        new_image['updated_at'] = image.pop('updated', '')
-        new_image['updated_at'] = image.pop(
-            'updated_at', new_image['updated_at'])
-
-        for field in _IMAGE_FIELDS:
-            new_image[field] = image.pop(field, None)
-
-        new_image['tags'] = image.pop('tags', [])
-        new_image['status'] = image.pop('status').lower()
-        for field in ('min_ram', 'min_disk', 'size', 'virtual_size'):
-            new_image[field] = _pop_int(new_image, field)
-        new_image['is_protected'] = protected
-        new_image['locations'] = image.pop('locations', [])
+        new_image = dict((field, image.get(field)) for field in _IMAGE_FIELDS)
+        new_image.update(
+            location=location,
+            size=int(image.get(
+                'size', image.get('OS-EXT-IMG-SIZE:size', 0)) or 0),
+            min_ram=int(image.get('min_ram', image.get('minRam', 0)) or 0),
+            min_disk=int(image.get('min_disk', image.get('minDisk', 0)) or 0),
+            created_at=image.get('created_at', image.get('created', '')),
+            updated_at=image.get('updated_at', image.get('updated', '')),
+            virtual_size=int(new_image['virtual_size'] or 0),
+            tags=image.get('tags', []),
+            status=image['status'].lower(),
+            is_protected=protected,
+            locations=image.get('locations', []),
+        )
 
-        metadata = image.pop('metadata', {})
+        metadata = image.get('metadata', {})
         for key, val in metadata.items():
             properties.setdefault(key, val)
 
         for key, val in image.items():
-            properties.setdefault(key, val)
+            if key not in consumed:
+                properties.setdefault(key, val)
         new_image['properties'] = properties
         new_image['is_public'] = is_public
         new_image['visibility'] = visibility
 
+        if self.strict_mode:
+            return self._make_resource(_records.Image, new_image)
         # Backwards compat with glance
-        if not self.strict_mode:
-            for key, val in properties.items():
-                if key != 'properties':
-                    new_image[key] = val
-            new_image['protected'] = protected
-            new_image['metadata'] = properties
-            new_image['created'] = new_image['created_at']
-            new_image['updated'] = new_image['updated_at']
-            new_image['minDisk'] = new_image['min_disk']
-            new_image['minRam'] = new_image['min_ram']
-        return new_image
+        for key, val in properties.items():
+            if key != 'properties':
+                new_image[key] = val
+        new_image['protected'] = protected
+        new_image['metadata'] = properties
+        new_image['created'] = new_image['created_at']
+        new_image['updated'] = new_image['updated_at']
+        new_image['minDisk'] = new_image['min_disk']
+        new_image['minRam'] = new_image['min_ram']
+        return _merge(new_image)
 
     def _normalize_secgroups(self, groups):
         """Normalize the structure of security groups
@@ -439,92 +766,77 @@ class Normalizer(object):
     def _normalize_servers(self, servers):
         # Here instead of _utils because we need access to region and cloud
         # name from the cloud object
-        ret = []
-        for server in servers:
-            ret.append(self._normalize_server(server))
-        return ret
+        locations = {}
+        return [
+            self._normalize_server(server, locations) for server in servers]
 
-    def _normalize_server(self, server):
-        ret = munch.Munch()
+    def _normalize_server(self, server, locations=None):
         # Copy incoming server because of shared dicts in unittests
-        server = server.copy()
-
-        self._remove_novaclient_artifacts(server)
+        server, container = _copy_resource(server)
+        strict = self.strict_mode
 
-        ret['id'] = server.pop('id')
-        ret['name'] = server.pop('name')
-
-        server['flavor'].pop('links', None)
-        ret['flavor'] = server.pop('flavor')
+        # Listings without details only have the id, name and links
+        flavor = server.get('flavor', {})
+        if 'links' in flavor:
+            flavor = _without(flavor, 'links', container)
 
         # OpenStack can return image as a string when you've booted
         # from volume
-        if str(server['image']) != server['image']:
-            server['image'].pop('links', None)
-        ret['image'] = server.pop('image')
-
-        project_id = server.pop('tenant_id', '')
-        project_id = server.pop('project_id', project_id)
-
-        az = _pop_or_get(
-            server, 'OS-EXT-AZ:availability_zone', None, self.strict_mode)
-        ret['location'] = self._get_current_location(
-            project_id=project_id, zone=az)
-
-        # Ensure volumes is always in the server dict, even if empty
-        ret['volumes'] = _pop_or_get(
-            server, 'os-extended-volumes:volumes_attached',
-            [], self.strict_mode)
-
-        config_drive = server.pop('config_drive', False)
-        ret['has_config_drive'] = _to_bool(config_drive)
-
-        host_id = server.pop('hostId', None)
-        ret['host_id'] = host_id
-
-        ret['progress'] = _pop_int(server, 'progress')
-
-        # Leave these in so that the general properties handling works
-        ret['disk_config'] = _pop_or_get(
-            server, 'OS-DCF:diskConfig', None, self.strict_mode)
-        for key in (
-                'OS-EXT-STS:power_state',
-                'OS-EXT-STS:task_state',
-                'OS-EXT-STS:vm_state',
-                'OS-SRV-USG:launched_at',
-                'OS-SRV-USG:terminated_at'):
-            short_key = key.split(':')[1]
-            ret[short_key] = _pop_or_get(server, key, None, self.strict_mode)
-
-        # Protect against security_groups being None
-        ret['security_groups'] = server.pop('security_groups', None) or []
-
-        # NOTE(mnaser): The Nova API returns the creation date in `created`
-        #               however the Shade contract returns `created_at` for
-        #               all resources.
-        ret['created_at'] = server.get('created')
-
+        image = server.get('image')
+        if isinstance(image, dict) and 'links' in image:
+            image = _without(image, 'links', container)
+
+        project_id = server.get('project_id', server.get('tenant_id', ''))
+        az = server.get('OS-EXT-AZ:availability_zone')
+        config_drive = server.get('config_drive', False)
+        host_id = server.get('hostId')
+
+        ret = dict(
+            id=server['id'],
+            name=server['name'],
+            flavor=flavor,
+            image=image,
+            location=self._get_list_location(
+                locations, project_id=project_id, zone=az),
+            # Ensure volumes is always in the server dict, even if empty
+            volumes=server.get('os-extended-volumes:volumes_attached', []),
+            has_config_drive=_to_bool(config_drive),
+            host_id=host_id,
+            progress=int(server.get('progress', 0) or 0),
+            disk_config=server.get('OS-DCF:diskConfig'),
+            # Protect against security_groups being None
+            security_groups=server.get('security_groups') or [],
+            # NOTE(mnaser): The Nova API returns the creation date in
+            #               `created` however the Shade contract returns
+            #               `created_at` for all resources.
+            created_at=server.get('created'),
+            interface_ip='',
+        )
+        for key, short_key in _SERVER_STATUS_FIELDS:
+            ret[short_key] = server.get(key)
         for field in _SERVER_FIELDS:
-            ret[field] = server.pop(field, None)
+            ret[field] = server.get(field)
         if not ret['networks']:
             ret['networks'] = {}
 
-        ret['interface_ip'] = ''
-
-        ret['properties'] = server.copy()
+        properties = _leftovers(
+            server, _SERVER_CONSUMED_STRICT if strict else _SERVER_CONSUMED,
+            container)
+        ret['properties'] = properties
 
+        if strict:
+            return self._make_resource(_records.Server, ret)
         # Backwards compat
-        if not self.strict_mode:
-            ret['hostId'] = host_id
-            ret['config_drive'] = config_drive
-            ret['project_id'] = project_id
-            ret['tenant_id'] = project_id
-            ret['region'] = self.region_name
-            ret['cloud'] = self.name
-            ret['az'] = az
-            for key, val in ret['properties'].items():
-                ret.setdefault(key, val)
-        return ret
+        ret.update(
+            hostId=host_id,
+            config_drive=config_drive,
+            project_id=project_id,
+            tenant_id=project_id,
+            region=self.region_name,
+            cloud=self.name,
+            az=az,
+        )
+        return _merge(ret, properties)
 
     def _normalize_floating_ips(self, ips):
         """Normalize the structure of floating IPs
@@ -574,7 +886,7 @@ class Normalizer(object):
 
         instance_id = ip.pop('instance_id', None)
         router_id = ip.pop('router_id', None)
-        id = ip.pop('id')
+        id = ip.pop('id', None)
         port_id = ip.pop('port_id', None)
         created_at = ip.pop('created_at', None)
         updated_at = ip.pop('updated_at', None)
@@ -737,89 +1049,74 @@ class Normalizer(object):
 
         :returns: A list of normalized dicts.
         """
-        ret = []
-        for volume in volumes:
-            ret.append(self._normalize_volume(volume))
-        return ret
-
-    def _normalize_volume(self, volume):
-
-        volume = volume.copy()
-
-        # Discard noise
-        self._remove_novaclient_artifacts(volume)
-
-        volume_id = volume.pop('id')
-
-        name = volume.pop('display_name', None)
-        name = volume.pop('name', name)
+        locations = {}
+        return [
+            self._normalize_volume(volume, locations) for volume in volumes]
 
-        description = volume.pop('display_description', None)
-        description = volume.pop('description', description)
+    def _normalize_volume(self, volume, locations=None):
 
-        is_bootable = _to_bool(volume.pop('bootable', True))
-        is_encrypted = _to_bool(volume.pop('encrypted', False))
-        can_multiattach = _to_bool(volume.pop('multiattach', False))
+        volume, container = _copy_resource(volume)
+        strict = self.strict_mode
 
-        project_id = _pop_or_get(
-            volume, 'os-vol-tenant-attr:tenant_id', None, self.strict_mode)
-        az = volume.pop('availability_zone', None)
+        name = volume.get('name', volume.get('display_name'))
+        description = volume.get(
+            'description', volume.get('display_description'))
 
-        location = self._get_current_location(project_id=project_id, zone=az)
+        is_bootable = _to_bool(volume.get('bootable', True))
+        is_encrypted = _to_bool(volume.get('encrypted', False))
+        can_multiattach = _to_bool(volume.get('multiattach', False))
 
-        host = _pop_or_get(
-            volume, 'os-vol-host-attr:host', None, self.strict_mode)
-        replication_extended_status = _pop_or_get(
-            volume, 'os-volume-replication:extended_status',
-            None, self.strict_mode)
+        az = volume.get('availability_zone')
+        location = self._get_list_location(
+            locations, project_id=volume.get('os-vol-tenant-attr:tenant_id'),
+            zone=az)
 
-        migration_status = _pop_or_get(
-            volume, 'os-vol-mig-status-attr:migstat', None, self.strict_mode)
-        migration_status = volume.pop('migration_status', migration_status)
-        _pop_or_get(volume, 'user_id', None, self.strict_mode)
-        source_volume_id = _pop_or_get(
-            volume, 'source_volid', None, self.strict_mode)
-        replication_driver = _pop_or_get(
-            volume, 'os-volume-replication:driver_data',
-            None, self.strict_mode)
+        migration_status = volume.get(
+            'migration_status', volume.get('os-vol-mig-status-attr:migstat'))
 
-        ret = munch.Munch(
+        ret = dict(
             location=location,
-            id=volume_id,
+            id=volume['id'],
             name=name,
             description=description,
-            size=_pop_int(volume, 'size'),
-            attachments=volume.pop('attachments', []),
-            status=volume.pop('status'),
+            size=int(volume.get('size', 0) or 0),
+            attachments=volume.get('attachments', []),
+            status=volume['status'],
             migration_status=migration_status,
-            host=host,
-            replication_driver=replication_driver,
-            replication_status=volume.pop('replication_status', None),
-            replication_extended_status=replication_extended_status,
-            snapshot_id=volume.pop('snapshot_id', None),
-            created_at=volume.pop('created_at'),
-            updated_at=volume.pop('updated_at', None),
-            source_volume_id=source_volume_id,
-            consistencygroup_id=volume.pop('consistencygroup_id', None),
-            volume_type=volume.pop('volume_type', None),
-            metadata=volume.pop('metadata', {}),
+            host=volume.get('os-vol-host-attr:host'),
+            replication_driver=volume.get(
+                'os-volume-replication:driver_data'),
+            replication_status=volume.get('replication_status'),
+            replication_extended_status=volume.get(
+                'os-volume-replication:extended_status'),
+            snapshot_id=volume.get('snapshot_id'),
+            created_at=volume['created_at'],
+            updated_at=volume.get('updated_at'),
+            source_volume_id=volume.get('source_volid'),
+            consistencygroup_id=volume.get('consistencygroup_id'),
+            volume_type=volume.get('volume_type'),
+            metadata=volume.get('metadata', {}),
             is_bootable=is_bootable,
             is_encrypted=is_encrypted,
             can_multiattach=can_multiattach,
-            properties=volume.copy(),
         )
+        properties = _leftovers(
+            volume, _VOLUME_CONSUMED_STRICT if strict else _VOLUME_CONSUMED,
+            container)
+        ret['properties'] = properties
 
+        if strict:
+            return self._make_resource(_records.Volume, ret)
         # Backwards compat
-        if not self.strict_mode:
-            ret['display_name'] = name
-            ret['display_description'] = description
-            ret['bootable'] = is_bootable
-            ret['encrypted'] = is_encrypted
-            ret['multiattach'] = can_multiattach
-            ret['availability_zone'] = az
-            for key, val in ret['properties'].items():
-                ret.setdefault(key, val)
-        return ret
+        ret.update(
+            display_name=name,
+            display_description=description,
+            bootable=is_bootable,
+            encrypted=is_encrypted,
+            multiattach=can_multiattach,
+            availability_zone=az,
+        )
+        return _merge(ret, properties)
 
     def _normalize_volume_attachment(self, attachment):
         """ Normalize a volume attachment object"""
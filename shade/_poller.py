@@ -0,0 +1,142 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Share status polling between everything waiting on a resource type '''
+
+import sys
+import threading
+import time
+
+import six
+
+from shade import _log
+from shade import _utils
+from shade import exc
+
+
+class PollRound(object):
+    """The resources fetched by one round of polling."""
+
+    def __init__(self, number, resources=None, exc_info=None):
+        self.number = number
+        self.resources = resources
+        self.exc_info = exc_info
+
+    def get(self, resource_id):
+        """Return the resource with resource_id, or None if it is gone.
+
+        :raises: Whatever fetching the resources raised.
+        """
+        if self.exc_info is not None:
+            six.reraise(*self.exc_info)
+        return self.resources.get(resource_id)
+
+
+class StatusPoller(object):
+    """Poll the status of every resource of a type with a single call.
+
+    Waiting for a resource used to mean fetching it over and over, once per
+    waiter, so hundreds of servers booting at once meant hundreds of
+    callers polling. Waiters of a resource type now iterate the poller of
+    that type instead. Each round of polling fetches all of the resources
+    with one call of fetch, by whichever waiter needs the round first, and
+    every waiter gets the same round. The calls made to poll don't grow
+    with the number of waiters.
+
+    Rounds are at least the wait of the waiter fetching them apart, and a
+    waiter only ever gets rounds that started after it began waiting.
+
+    :param string name: What is polled, for logging.
+    :param fetch: Callable returning a dict of the resources by id.
+    """
+
+    def __init__(self, name, fetch):
+        self.name = name
+        self._fetch = fetch
+        self.log = _log.setup_logging('shade.poller')
+        self._cond = threading.Condition()
+        self._round = None
+        self._waiters = 0
+        self._last_number = 0
+        self._last_start = 0
+        # A waiter has taken on fetching the next round
+        self._claimed = False
+        # The claimed round is being fetched
+        self._fetching = False
+
+    def iterate(self, timeout, message, wait=2):
+        """Yield a PollRound every round until timeout.
+
+        Like ``_utils._iterate_timeout``, this raises OpenStackCloudTimeout
+        with message once timeout seconds have passed.
+        """
+        wait = _utils._get_wait(wait, timeout)
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            self._waiters += 1
+            # The round being fetched may have started before we got here
+            need = self._last_number + (2 if self._fetching else 1)
+        try:
+            while True:
+                poll = self._next_round(need, wait, deadline)
+                if poll is None:
+                    raise exc.OpenStackCloudTimeout(message)
+                need = poll.number + 1
+                yield poll
+        finally:
+            with self._cond:
+                self._waiters -= 1
+                if not self._waiters:
+                    # Nobody needs the resources anymore
+                    self._round = None
+
+    def _next_round(self, need, wait, deadline):
+        with self._cond:
+            while True:
+                if deadline is not None and time.time() >= deadline:
+                    return None
+                if self._round is not None and self._round.number >= need:
+                    return self._round
+                if not self._claimed:
+                    self._claimed = True
+                    break
+                self._cond.wait(
+                    None if deadline is None else deadline - time.time())
+        return self._lead_round(wait, deadline)
+
+    def _lead_round(self, wait, deadline):
+        poll = None
+        try:
+            delay = self._last_start + wait - time.time()
+            if delay > 0:
+                self.log.debug(
+                    'Waiting %s seconds to poll %s', delay, self.name)
+                time.sleep(delay)
+            if deadline is not None and time.time() >= deadline:
+                return None
+            with self._cond:
+                self._fetching = True
+                self._last_start = time.time()
+                number = self._last_number + 1
+            try:
+                poll = PollRound(number, resources=self._fetch())
+            except Exception:
+                poll = PollRound(number, exc_info=sys.exc_info())
+            return poll
+        finally:
+            with self._cond:
+                if poll is not None:
+                    self._round = poll
+                    self._last_number = poll.number
+                self._claimed = False
+                self._fetching = False
+                self._cond.notify_all()
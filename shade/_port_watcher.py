@@ -0,0 +1,142 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Wait for the ports of devices with shared, filtered queries '''
+
+import sys
+import threading
+import time
+
+import six
+
+from shade import _log
+from shade import exc
+
+# Seconds between the first rounds of queries, doubled every round
+DEFAULT_INITIAL_WAIT = 0.5
+DEFAULT_MAX_WAIT = 5
+
+
+class PortWatcher(object):
+    """Wait for ports to show up on devices.
+
+    With port caching, waiting for the port of a new server used to mean
+    searching the cached listing of every port of the project over and
+    over, once per server. Callers of wait now register the device they
+    are waiting for instead. Each round, whichever of them needs the round
+    first queries for the ports of every registered device with one call
+    of fetch, which neutron filters server side, and every waiter gets its
+    ports from the same round.
+
+    Rounds start initial_wait seconds apart for a waiter, and back off by
+    doubling up to max_wait.
+
+    :param fetch: Callable taking a list of device ids and returning the
+                  ports on those devices.
+    :param float initial_wait: Seconds between the first rounds.
+    :param float max_wait: Most seconds between two rounds.
+    """
+
+    log = _log.setup_logging('shade.port_watcher')
+
+    def __init__(
+            self, fetch, initial_wait=DEFAULT_INITIAL_WAIT,
+            max_wait=DEFAULT_MAX_WAIT):
+        self._fetch = fetch
+        self.initial_wait = initial_wait
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        # How many callers wait for each device
+        self._wanted = {}
+        self._number = 0
+        self._ports = {}
+        self._exc_info = None
+        self._last_start = 0
+        self._claimed = False
+        self._fetching = False
+
+    def wait(self, device_id, timeout):
+        """Return the ports of device_id once it has some.
+
+        :raises: OpenStackCloudTimeout if the device has no ports after
+                 timeout seconds, or whatever fetch raised.
+        """
+        deadline = time.time() + timeout
+        wait = next_wait = self.initial_wait
+        with self._cond:
+            self._wanted[device_id] = self._wanted.get(device_id, 0) + 1
+            # The round being fetched may have started before we got here
+            need = self._number + (2 if self._fetching else 1)
+        try:
+            while True:
+                number, ports = self._next_round(device_id, need, wait,
+                                                 deadline)
+                if ports:
+                    return ports
+                need = number + 1
+                wait, next_wait = next_wait, min(next_wait * 2, self.max_wait)
+        finally:
+            with self._cond:
+                self._wanted[device_id] -= 1
+                if not self._wanted[device_id]:
+                    del self._wanted[device_id]
+                    self._ports.pop(device_id, None)
+
+    def _next_round(self, device_id, need, wait, deadline):
+        while True:
+            with self._cond:
+                while True:
+                    if self._number >= need:
+                        if self._exc_info is not None:
+                            six.reraise(*self._exc_info)
+                        return (
+                            self._number, self._ports.get(device_id, []))
+                    if time.time() >= deadline:
+                        raise exc.OpenStackCloudTimeout(
+                            "Timeout waiting for the ports of {device}"
+                            " to show up".format(device=device_id))
+                    if not self._claimed:
+                        self._claimed = True
+                        break
+                    self._cond.wait(deadline - time.time())
+            self._lead_round(wait, deadline)
+
+    def _lead_round(self, wait, deadline):
+        ports = {}
+        exc_info = None
+        fetched = False
+        try:
+            delay = min(
+                self._last_start + wait, deadline) - time.time()
+            if delay > 0:
+                self.log.debug(
+                    'Waiting %s seconds to query for ports', delay)
+                time.sleep(delay)
+            with self._cond:
+                self._fetching = True
+                self._last_start = time.time()
+                device_ids = sorted(self._wanted)
+            try:
+                for port in self._fetch(device_ids):
+                    ports.setdefault(port.get('device_id'), []).append(port)
+            except Exception:
+                exc_info = sys.exc_info()
+            fetched = True
+        finally:
+            with self._cond:
+                if fetched:
+                    self._number += 1
+                    self._ports = ports
+                    self._exc_info = exc_info
+                self._claimed = False
+                self._fetching = False
+                self._cond.notify_all()
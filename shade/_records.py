@@ -0,0 +1,192 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Compact records for the resources of strict clouds '''
+
+try:
+    from collections import abc as collections_abc
+except ImportError:
+    import collections as collections_abc
+
+import munch
+
+
+class Record(collections_abc.MutableMapping):
+    """A resource with its fields in slots instead of a dict.
+
+    Records hold the fields of the shade Data Model in slots, which takes a
+    fraction of the memory a Munch with the same keys does. Like a Munch,
+    they can be used both as a mapping and through attributes. Keys that
+    are not fields of the resource are kept in a dict of their own.
+
+    Records are not dicts, so json can't serialize them directly. Use
+    ``toDict()`` for that.
+    """
+
+    __slots__ = ('_extra',)
+    _fields = ()
+    _field_set = frozenset()
+
+    def __init__(self, fields=(), **kwargs):
+        set_slot = object.__setattr__
+        set_slot(self, '_extra', None)
+        if kwargs:
+            fields = dict(fields, **kwargs)
+        elif not isinstance(fields, collections_abc.Mapping):
+            fields = dict(fields)
+        field_set = self._field_set
+        for key, value in fields.items():
+            if key in field_set:
+                set_slot(self, key, value)
+            else:
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                object.__setattr__(self, '_extra', {})
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            try:
+                object.__delattr__(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self):
+        for key in self._fields:
+            try:
+                object.__getattribute__(self, key)
+            except AttributeError:
+                continue
+            yield key
+        if self._extra:
+            for key in self._extra:
+                yield key
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def __contains__(self, key):
+        if key in self._field_set:
+            return hasattr(self, key)
+        return bool(self._extra) and key in self._extra
+
+    def __getattr__(self, name):
+        # Only called for names that are not set slots
+        if name != '_extra' and name not in self._field_set:
+            extra = self._extra
+            if extra and name in extra:
+                return extra[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __eq__(self, other):
+        if not isinstance(other, collections_abc.Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{name}({items!r})'.format(
+            name=type(self).__name__, items=dict(self.items()))
+
+    def __getstate__(self):
+        return dict(self.items())
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_extra', None)
+        self.update(state)
+
+    def __reduce__(self):
+        return (type(self), (), self.__getstate__())
+
+    def copy(self):
+        return type(self)(self)
+
+    def toDict(self):
+        """Return the record as plain dicts, like ``Munch.toDict()``."""
+        return munch.unmunchify(dict(self.items()))
+
+
+def _record_type(name, fields, doc):
+    fields = tuple(fields)
+    return type(name, (Record,), {
+        '__module__': __name__,
+        '__slots__': fields,
+        '__doc__': doc,
+        '_fields': fields,
+        '_field_set': frozenset(fields),
+    })
+
+
+Flavor = _record_type('Flavor', (
+    'location', 'id', 'name', 'is_public', 'is_disabled', 'ram', 'vcpus',
+    'disk', 'ephemeral', 'swap', 'rxtx_factor', 'extra_specs', 'properties',
+), "A flavor of a strict cloud.")
+
+Image = _record_type('Image', (
+    'location', 'checksum', 'container_format', 'direct_url', 'disk_format',
+    'file', 'id', 'name', 'owner', 'virtual_size', 'size', 'min_ram',
+    'min_disk', 'created_at', 'updated_at', 'tags', 'status', 'is_protected',
+    'locations', 'properties', 'is_public', 'visibility',
+), "An image of a strict cloud.")
+
+Server = _record_type('Server', (
+    'id', 'name', 'flavor', 'image', 'location', 'volumes',
+    'has_config_drive', 'host_id', 'progress', 'disk_config', 'power_state',
+    'task_state', 'vm_state', 'launched_at', 'terminated_at',
+    'security_groups', 'created_at', 'accessIPv4', 'accessIPv6', 'addresses',
+    'adminPass', 'created', 'key_name', 'metadata', 'networks', 'private_v4',
+    'public_v4', 'public_v6', 'status', 'updated', 'user_id', 'interface_ip',
+    'properties',
+), "A server of a strict cloud.")
+
+Volume = _record_type('Volume', (
+    'location', 'id', 'name', 'description', 'size', 'attachments', 'status',
+    'migration_status', 'host', 'replication_driver', 'replication_status',
+    'replication_extended_status', 'snapshot_id', 'created_at', 'updated_at',
+    'source_volume_id', 'consistencygroup_id', 'volume_type', 'metadata',
+    'is_bootable', 'is_encrypted', 'can_multiattach', 'properties',
+), "A volume of a strict cloud.")
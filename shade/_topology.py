@@ -0,0 +1,124 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' An indexed model of the networks of a cloud '''
+
+
+class NetworkTopology(object):
+    """The networks of a cloud, indexed for the network selection code.
+
+    Picking the networks of a server used to mean scanning every network,
+    and every subnet for every network, and then every interesting network
+    again for every server. On clouds with thousands of tenant networks
+    that made assigning IPs to servers quadratic. A topology is built from
+    a single listing of the networks, and the subnets if they are needed,
+    and indexes them so that every lookup afterwards is a dict access.
+
+    The topology is thrown away and rebuilt as a whole, so the networks and
+    the selections made from them never disagree.
+
+    :param networks: The list of network dicts of the cloud.
+    """
+
+    def __init__(self, networks=()):
+        self.networks = list(networks)
+        self.networks_by_id = {}
+        self.networks_by_name = {}
+        self._positions = {}
+        for i, network in enumerate(self.networks):
+            self._positions[network['id']] = i
+            self.networks_by_id[network['id']] = network
+            self.networks_by_name.setdefault(
+                network['name'], []).append(network)
+        # None until set_subnets is called, as listing them isn't free
+        self.subnets_by_network = None
+        self.nat_destination = None
+        self.default_network = None
+        self._selections = {}
+        # Per selection, the position of the first network with each name
+        self._ranks = {}
+        self._selection_ids = {}
+        # The port listing the device index was built from, and the index
+        self._ports = (None, {})
+
+    def find(self, name_or_id, kind=None):
+        """Return the networks with name_or_id as their id or name.
+
+        :param string kind: (optional) Only return networks in the
+                            selection of that kind.
+        """
+        found = list(self.networks_by_name.get(name_or_id, []))
+        network = self.networks_by_id.get(name_or_id)
+        if network is not None and network not in found:
+            found.append(network)
+        if kind is not None:
+            ids = self._selection_ids.get(kind, set())
+            found = [net for net in found if net['id'] in ids]
+        # Keep the order of the network listing
+        return sorted(found, key=lambda net: self._positions[net['id']])
+
+    def set_subnets(self, subnets):
+        self.subnets_by_network = {}
+        for subnet in subnets:
+            self.subnets_by_network.setdefault(
+                subnet.get('network_id'), []).append(subnet)
+
+    def has_gateway(self, network_id):
+        """Whether the network has a subnet with a gateway."""
+        for subnet in (self.subnets_by_network or {}).get(network_id, []):
+            if subnet.get('gateway_ip'):
+                return True
+        return False
+
+    def select(self, kind, networks):
+        """Record the networks picked for kind, e.g. 'internal_ipv4'."""
+        self._selections[kind] = networks
+        self._selection_ids[kind] = set(net['id'] for net in networks)
+        ranks = {}
+        for i, network in enumerate(networks):
+            ranks.setdefault(network['name'], i)
+        self._ranks[kind] = ranks
+
+    def get(self, kind):
+        """Return the networks picked for kind."""
+        return self._selections.get(kind, [])
+
+    def on_server(self, kind, addresses):
+        """Return the networks of kind a server has addresses on.
+
+        This only looks at the networks in the addresses dict of the server,
+        not at every network of kind, and returns one network per name in
+        the order they were picked in.
+
+        :param dict addresses: The Nova addresses dict of the server.
+        """
+        ranks = self._ranks.get(kind, {})
+        networks = self._selections.get(kind, [])
+        return [
+            networks[rank]
+            for rank in sorted(ranks[name] for name in addresses
+                               if name in ranks)]
+
+    def ports_on_device(self, ports, device_id):
+        """Return the ports in the ports listing that belong to device_id.
+
+        The index is built once per port listing, so looking up the ports
+        of many servers in the same cached listing doesn't scan it every
+        time.
+        """
+        listing, by_device = self._ports
+        if listing is not ports:
+            by_device = {}
+            for port in ports:
+                by_device.setdefault(port.get('device_id'), []).append(port)
+            self._ports = (ports, by_device)
+        return list(by_device.get(device_id, []))
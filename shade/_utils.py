@@ -12,17 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import concurrent.futures
 import contextlib
+import datetime
 import fnmatch
 import functools
+import hashlib
 import inspect
-import jmespath
+import json
 import munch
-import netifaces
 import re
 import six
 import sre_constants
 import sys
+import threading
 import time
 import uuid
 
@@ -33,6 +36,11 @@ from shade import exc
 from shade import meta
 
 _decorated_methods = []
+_cache_key_specs = {}
+# Memcached keys can't hold whitespace or control characters, and ':'
+# separates the parts of our keys.
+_CACHE_KEY_UNSAFE = re.compile(r'[^\x21-\x39\x3b-\x7e]')
+CACHE_KEY_PART_LENGTH = 32
 
 
 def _exc_clear():
@@ -41,16 +49,8 @@ def _exc_clear():
         sys.exc_clear()
 
 
-def _iterate_timeout(timeout, message, wait=2):
-    """Iterate and raise an exception on timeout.
-
-    This is a generator that will continually yield and sleep for
-    wait seconds, and if the timeout is reached, will raise an exception
-    with <message>.
-
-    """
-    log = _log.setup_logging('shade.iterate_timeout')
-
+def _get_wait(wait, timeout):
+    """Return the seconds to wait between polls as a float."""
     try:
         # None as a wait winds up flowing well in the per-resource cache
         # flow. We could spread this logic around to all of the calling
@@ -61,12 +61,25 @@ def _iterate_timeout(timeout, message, wait=2):
         elif wait == 0:
             # wait should be < timeout, unless timeout is None
             wait = 0.1 if timeout is None else min(0.1, timeout)
-        wait = float(wait)
+        return float(wait)
     except ValueError:
         raise exc.OpenStackCloudException(
             "Wait value must be an int or float value. {wait} given"
             " instead".format(wait=wait))
 
+
+def _iterate_timeout(timeout, message, wait=2):
+    """Iterate and raise an exception on timeout.
+
+    This is a generator that will continually yield and sleep for
+    wait seconds, and if the timeout is reached, will raise an exception
+    with <message>.
+
+    """
+    log = _log.setup_logging('shade.iterate_timeout')
+
+    wait = _get_wait(wait, timeout)
+
     start = time.time()
     count = 0
     while (timeout is None) or (time.time() < start + timeout):
@@ -77,6 +90,41 @@ def _iterate_timeout(timeout, message, wait=2):
     raise exc.OpenStackCloudTimeout(message)
 
 
+def _map_concurrently(func, args_list, concurrency=10):
+    """Call func with each tuple of arguments in args_list, in threads.
+
+    Every call is made even if some of them fail, so that callers acting
+    on many resources know which of them were acted on.
+
+    :param func: The callable to call.
+    :param args_list: A list of tuples of positional arguments.
+    :param int concurrency: How many calls to make at once.
+
+    :returns: A list of (result, exc_info) tuples in the order of args_list,
+              exc_info being None for the calls that succeeded.
+    """
+    def _call(args):
+        try:
+            return func(*args), None
+        except Exception:
+            return None, sys.exc_info()
+
+    if len(args_list) < 2 or concurrency < 2:
+        return [_call(args) for args in args_list]
+    workers = min(concurrency, len(args_list))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_call, args_list))
+
+
+def format_timestamp(timestamp):
+    """Format a unix timestamp as an ISO 8601 UTC string for query params.
+
+    :param float timestamp: Seconds since the epoch.
+    """
+    return datetime.datetime.utcfromtimestamp(
+        int(timestamp)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
 def _make_unicode(input):
     """Turn an input into unicode unconditionally
 
@@ -171,6 +219,9 @@ def _filter_list(data, name_or_id, filters):
         return data
 
     if isinstance(filters, six.string_types):
+        # Imported on first use, since it is slow to import and only
+        # string filters need it
+        import jmespath
         return jmespath.search(filters, data)
 
     def _dict_filter(f, d):
@@ -272,6 +323,30 @@ def normalize_keystone_services(services):
     return meta.obj_list_to_munch(ret)
 
 
+def host_probe(func):
+    """Run a probe of the local host once per process.
+
+    The result is shared by every cloud object. Call ``reset`` on the
+    decorated function to probe again.
+    """
+    lock = threading.Lock()
+    results = []
+
+    @functools.wraps(func)
+    def wrapper():
+        with lock:
+            if not results:
+                results.append(func())
+            return results[0]
+
+    def reset():
+        with lock:
+            del results[:]
+    wrapper.reset = reset
+    return wrapper
+
+
+@host_probe
 def localhost_supports_ipv6():
     """Determine whether the local host supports IPv6
 
@@ -280,6 +355,7 @@ def localhost_supports_ipv6():
     IPv6 connectivity.
     """
 
+    import netifaces
     try:
         return netifaces.AF_INET6 in netifaces.gateways()['default']
     except AttributeError:
@@ -405,7 +481,10 @@ def valid_kwargs(*valid_args):
     #
     @decorator
     def func_wrapper(func, *args, **kwargs):
-        argspec = inspect.getargspec(func)
+        getargspec = getattr(inspect, 'getfullargspec', None)
+        if getargspec is None:
+            getargspec = inspect.getargspec
+        argspec = getargspec(func)
         for k in kwargs:
             if k not in argspec.args[1:] and k not in valid_args:
                 raise TypeError(
@@ -424,26 +503,121 @@ def _func_wrap(f):
     @functools.wraps(f)
     def inner(*args, **kwargs):
         return f(*args, **kwargs)
+    # python2 functools.wraps doesn't set this, and cache keys need it to
+    # find the real argument names.
+    inner.__wrapped__ = f
     return inner
 
 
+def _get_cache_key_spec(fn):
+    """Get the argument names and defaults that go into a cache key.
+
+    The result is remembered per function, since it is needed for every
+    key. self is left out, since keys are already namespaced per cloud.
+    """
+    fn = getattr(fn, '__wrapped__', fn)
+    fn = getattr(fn, '__func__', fn)
+    spec = _cache_key_specs.get(fn)
+    if spec is None:
+        getargspec = getattr(inspect, 'getfullargspec', None)
+        if getargspec is None:
+            getargspec = inspect.getargspec
+        argspec = getargspec(fn)
+        names = list(argspec.args)
+        defaults = dict(zip(
+            reversed(names), reversed(argspec.defaults or ())))
+        if names and names[0] == 'self':
+            names = names[1:]
+        spec = (names, defaults)
+        _cache_key_specs[fn] = spec
+    return spec
+
+
+def _cache_key_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def cache_key_part(value, max_length=CACHE_KEY_PART_LENGTH):
+    """Make a value, such as a cloud or project name, safe for a cache key.
+
+    Anything but printable ASCII, and ':', is replaced with '_'. Values that
+    had to be changed, or are longer than max_length, are cut short and get
+    a hash of the original appended, so that different values still give
+    different key parts.
+    """
+    value = six.text_type(value)
+    safe = _CACHE_KEY_UNSAFE.sub('_', value)
+    if safe == value and len(safe) <= max_length:
+        return safe
+    digest = hashlib.sha1(value.encode('utf-8')).hexdigest()[:8]
+    return '{value}-{digest}'.format(
+        value=safe[:max_length - len(digest) - 1], digest=digest)
+
+
+def make_cache_key(prefix, fn, args, kwargs, ignore=('cache',)):
+    """Make a compact cache key for a call to fn.
+
+    Arguments are matched up with fn's argument names and defaults, so that
+    passing a value positionally, by keyword or not at all gives the same
+    key. They can be anything JSON can represent, such as filter dicts,
+    and are hashed so that the key stays short whatever they are.
+
+    :param string prefix: Readable namespace for the key.
+    :param fn: The function being cached.
+    :param args: Positional arguments of the call.
+    :param kwargs: Keyword arguments of the call.
+    :param ignore: Names of arguments that don't affect the result.
+
+    :returns: A string of the form ``<prefix>:<function name>:<sha1>``.
+    """
+    names, defaults = _get_cache_key_spec(fn)
+    call = dict(defaults)
+    call.update(zip(names, args))
+    call.update(kwargs)
+    for name in ignore:
+        call.pop(name, None)
+    extra = args[len(names):]
+    try:
+        payload = json.dumps(
+            [call, extra], sort_keys=True, default=_cache_key_default)
+    except TypeError:
+        # Dicts with keys json can't sort, such as mixed types
+        payload = repr((sorted(call.items(), key=repr), extra))
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return '{prefix}:{name}:{digest}'.format(
+        prefix=prefix, name=fn.__name__, digest=digest)
+
+
 def cache_on_arguments(*cache_on_args, **cache_on_kwargs):
     _cache_name = cache_on_kwargs.pop('resource', None)
 
     def _inner_cache_on_arguments(func):
+        def _get_method(obj):
+            # Decorating is expensive, so only do it once per object and
+            # cache region rather than on every call.
+            region = obj._get_cache(_cache_name)
+            methods = obj.__dict__.setdefault('_cache_decorated_methods', {})
+            cached = methods.get(func.__name__)
+            if cached is None or cached[0] is not region:
+                cached = (region, region.cache_on_arguments(
+                    *cache_on_args, **cache_on_kwargs)(
+                        _func_wrap(func.__get__(obj, type(obj)))))
+                methods[func.__name__] = cached
+            return cached[1]
+
         def _cache_decorator(obj, *args, **kwargs):
-            the_method = obj._get_cache(_cache_name).cache_on_arguments(
-                *cache_on_args, **cache_on_kwargs)(
-                    _func_wrap(func.__get__(obj, type(obj))))
-            return the_method(*args, **kwargs)
+            return _get_method(obj)(*args, **kwargs)
 
         def invalidate(obj, *args, **kwargs):
-            return obj._get_cache(
-                _cache_name).cache_on_arguments()(func).invalidate(
-                    *args, **kwargs)
+            return _get_method(obj).invalidate(*args, **kwargs)
 
         _cache_decorator.invalidate = invalidate
         _cache_decorator.func = func
+        _cache_decorator.resource = _cache_name
+        _cache_decorator.should_cache_fn = cache_on_kwargs.get(
+            'should_cache_fn')
         _decorated_methods.append(func.__name__)
 
         return _cache_decorator
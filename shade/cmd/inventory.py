@@ -16,7 +16,6 @@
 import argparse
 import json
 import sys
-import yaml
 
 import shade
 import shade.inventory
@@ -24,6 +23,7 @@ import shade.inventory
 
 def output_format_dict(data, use_yaml):
     if use_yaml:
+        import yaml
         return yaml.safe_dump(data, default_flow_style=False)
     else:
         return json.dumps(data, sort_keys=True, indent=2)
@@ -66,6 +66,10 @@ class OpenStackCloudUnavailableFeature(OpenStackCloudException):
     pass
 
 
+class OpenStackCloudCallBudgetExceeded(OpenStackCloudException):
+    """More REST calls were made than a call tracker allowed."""
+
+
 class OpenStackCloudHTTPError(OpenStackCloudException, _rex.HTTPError):
 
     def __init__(self, *args, **kwargs):
@@ -19,6 +19,8 @@ import six
 import socket
 
 from shade import _log
+from shade import _normalize
+from shade import _records
 from shade import exc
 
 
@@ -125,7 +127,7 @@ def get_server_private_ip(server, cloud=None):
     # Short circuit the ports/networks search below with a heavily cached
     # and possibly pre-configured network name
     if cloud:
-        int_nets = cloud.get_internal_ipv4_networks()
+        int_nets = cloud._get_server_networks(server, 'internal_ipv4')
         for int_net in int_nets:
             int_ip = get_server_ip(
                 server, key_name=int_net['name'],
@@ -182,7 +184,7 @@ def get_server_external_ipv4(cloud, server):
 
     # Short circuit the ports/networks search below with a heavily cached
     # and possibly pre-configured network name
-    ext_nets = cloud.get_external_ipv4_networks()
+    ext_nets = cloud._get_server_networks(server, 'external_ipv4')
     for ext_net in ext_nets:
         ext_ip = get_server_ip(
             server, key_name=ext_net['name'], public=True,
@@ -393,10 +395,12 @@ def _get_supplemental_addresses(cloud, server):
         # of an API call while polling for a server to come up
         if (cloud.has_service('network') and cloud._has_floating_ips() and
                 server['status'] == 'ACTIVE'):
-            for port in cloud.search_ports(
-                    filters=dict(device_id=server['id'])):
+            # Only ask for what goes into the address dicts
+            for port in cloud._get_device_ports(
+                    server['id'], fields=['mac_address']):
                 for fip in cloud.search_floating_ips(
-                        filters=dict(port_id=port['id'])):
+                        filters=dict(port_id=port['id']),
+                        fields=['fixed_ip_address', 'floating_ip_address']):
                         # This SHOULD return one and only one FIP - but doing
                         # it as a search/list lets the logic work regardless
                     if fip['fixed_ip_address'] not in fixed_ip_mapping:
@@ -535,9 +539,15 @@ def obj_to_munch(obj):
     """
     if obj is None:
         return None
-    elif isinstance(obj, munch.Munch) or hasattr(obj, 'mock_add_spec'):
+    elif type(obj) is dict:
+        # Decoded JSON. A plain dict has no attributes worth looking for,
+        # so skip the introspection below.
+        return _normalize._to_munch(obj)
+    elif (isinstance(obj, (munch.Munch, _records.Record))
+            or hasattr(obj, 'mock_add_spec')):
         # If we obj_to_munch twice, don't fail, just return the munch
         # Also, don't try to modify Mock objects - that way lies madness
+        # Records of strict clouds are already as munched as they get
         return obj
     elif isinstance(obj, dict):
         # The new request-id tracking spec:
@@ -574,7 +584,10 @@ def obj_list_to_munch(obj_list):
     and in order to expose the data structures as JSON, we need to facilitate
     the conversion to lists of dictonaries.
     """
-    return [obj_to_munch(obj) for obj in obj_list]
+    to_munch = _normalize._to_munch
+    return [
+        to_munch(obj) if type(obj) is dict else obj_to_munch(obj)
+        for obj in obj_list]
 
 
 obj_list_to_dict = obj_list_to_munch
@@ -0,0 +1,344 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+''' Per API call metrics '''
+
+import bisect
+import collections
+import re
+import socket
+import threading
+
+from shade import _log
+
+# Labels every metric is broken down by
+LABELS = ('cloud', 'region', 'service', 'method', 'resource')
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_STATSD_UNSAFE = re.compile(r'[^a-zA-Z0-9_-]')
+
+
+class RequestMetrics(object):
+    """What we know about one finished REST call.
+
+    :param dict labels: cloud, region, service, method and resource names.
+    :param float duration: Seconds the call took, including retries.
+    :param string status: HTTP status class of the response, such as 2xx,
+                          or ``error`` if there was no response at all.
+    :param int retries: How many times the call was retried.
+    :param int bytes_sent: Size of the request body.
+    :param int bytes_received: Size of the response body.
+    :param string name: Task name of the call, such as
+                        ``compute.GET.servers``.
+    :param string url: URL of the call, as given to the adapter.
+    :param dict params: Query parameters of the call.
+    :param tuple origin: The shade operation that made the call and the
+                         code that called it, when the call ran on another
+                         thread and they can't be found from its stack.
+    """
+
+    def __init__(
+            self, labels, duration, status, retries=0,
+            bytes_sent=0, bytes_received=0, name=None, url=None,
+            params=None, origin=None):
+        self.labels = labels
+        self.duration = duration
+        self.status = status
+        self.retries = retries
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.name = name
+        self.url = url
+        self.params = params
+        self.origin = origin
+
+
+class MetricsEmitter(object):
+    """Receives a RequestMetrics for every REST call shade makes.
+
+    Subclass this and pass an instance to
+    ``OpenStackCloud.add_metrics_emitter`` to send shade's metrics to a
+    system that isn't supported out of the box.
+    """
+
+    def record(self, metrics):
+        """Record the metrics of one call.
+
+        :param RequestMetrics metrics: The metrics of the call.
+        """
+        pass
+
+
+class MultiEmitter(MetricsEmitter):
+    """Send metrics to several emitters.
+
+    A failing emitter is logged and skipped, since metrics must never break
+    the calls they describe.
+    """
+
+    log = _log.setup_logging('shade.metrics')
+
+    def __init__(self, emitters=None):
+        self.emitters = list(emitters or [])
+
+    def __len__(self):
+        return len(self.emitters)
+
+    def add(self, emitter):
+        self.emitters.append(emitter)
+
+    def remove(self, emitter):
+        self.emitters.remove(emitter)
+
+    def record(self, metrics):
+        # Copy, since emitters can come and go from other threads
+        for emitter in list(self.emitters):
+            try:
+                emitter.record(metrics)
+            except Exception:
+                self.log.debug(
+                    "Metrics emitter %s failed", emitter, exc_info=True)
+
+
+class StatsdEmitter(MetricsEmitter):
+    """Send metrics to statsd over UDP.
+
+    Each call produces counters and a timer under
+    ``<prefix>.<cloud>.<region>.<service>.<method>.<resource>``.
+
+    :param string host: statsd host.
+    :param int port: statsd port.
+    :param string prefix: Prefix of every metric name.
+    """
+
+    def __init__(self, host='localhost', port=8125, prefix='shade'):
+        self.address = (host, int(port))
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _name(self, labels):
+        parts = [self.prefix] if self.prefix else []
+        for label in LABELS:
+            parts.append(
+                _STATSD_UNSAFE.sub('_', str(labels.get(label) or 'none')))
+        return '.'.join(parts)
+
+    def format(self, metrics):
+        """Return the statsd lines for a call."""
+        name = self._name(metrics.labels)
+        lines = [
+            '{name}.count:1|c'.format(name=name),
+            '{name}.time:{ms:.3f}|ms'.format(
+                name=name, ms=metrics.duration * 1000),
+            '{name}.status.{status}:1|c'.format(
+                name=name, status=metrics.status),
+        ]
+        if metrics.retries:
+            lines.append('{name}.retries:{count}|c'.format(
+                name=name, count=metrics.retries))
+        if metrics.bytes_sent:
+            lines.append('{name}.bytes_sent:{count}|c'.format(
+                name=name, count=metrics.bytes_sent))
+        if metrics.bytes_received:
+            lines.append('{name}.bytes_received:{count}|c'.format(
+                name=name, count=metrics.bytes_received))
+        return lines
+
+    def record(self, metrics):
+        payload = '\n'.join(self.format(metrics)).encode('utf-8')
+        self._socket.sendto(payload, self.address)
+
+
+class _Histogram(object):
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry(MetricsEmitter):
+    """Keep metrics in process, in the style of a Prometheus registry.
+
+    Counters are kept per label set. Request latency is kept as a
+    histogram. ``render`` produces the Prometheus text exposition format,
+    so the registry can be served as-is from a metrics endpoint.
+
+    :param buckets: Upper bounds, in seconds, of the latency buckets.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._requests = collections.defaultdict(int)
+        self._retries = collections.defaultdict(int)
+        self._bytes_sent = collections.defaultdict(int)
+        self._bytes_received = collections.defaultdict(int)
+        self._latency = {}
+
+    def record(self, metrics):
+        key = tuple(metrics.labels.get(label) for label in LABELS)
+        with self._lock:
+            self._requests[key + (metrics.status,)] += 1
+            self._retries[key] += metrics.retries
+            self._bytes_sent[key] += metrics.bytes_sent
+            self._bytes_received[key] += metrics.bytes_received
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = _Histogram(self.buckets)
+                self._latency[key] = histogram
+            histogram.observe(metrics.duration)
+
+    def get_request_count(self, status=None, **labels):
+        """Count the requests matching the given labels and status class."""
+        with self._lock:
+            return sum(
+                count for key, count in self._requests.items()
+                if _matches(key, labels)
+                and (status is None or key[-1] == status))
+
+    def get_latency(self, **labels):
+        """Get the number and total seconds of the matching requests.
+
+        :returns: A tuple of (count, sum).
+        """
+        with self._lock:
+            histograms = [
+                h for key, h in self._latency.items()
+                if _matches(key, labels)]
+            return (
+                sum(h.count for h in histograms),
+                sum(h.sum for h in histograms))
+
+    def clear(self):
+        with self._lock:
+            self._requests.clear()
+            self._retries.clear()
+            self._bytes_sent.clear()
+            self._bytes_received.clear()
+            self._latency.clear()
+
+    def render(self):
+        """Render the registry in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            lines.append('# TYPE shade_requests_total counter')
+            for key, count in sorted(self._requests.items(), key=str):
+                lines.append('shade_requests_total{{{labels}}} {count}'.format(
+                    labels=_format_labels(
+                        key[:-1], status=key[-1]), count=count))
+            for name, values in (
+                    ('shade_retries_total', self._retries),
+                    ('shade_bytes_sent_total', self._bytes_sent),
+                    ('shade_bytes_received_total', self._bytes_received)):
+                lines.append('# TYPE {name} counter'.format(name=name))
+                for key, count in sorted(values.items(), key=str):
+                    lines.append('{name}{{{labels}}} {count}'.format(
+                        name=name, labels=_format_labels(key), count=count))
+            name = 'shade_request_duration_seconds'
+            lines.append('# TYPE {name} histogram'.format(name=name))
+            for key, histogram in sorted(self._latency.items(), key=str):
+                cumulative = 0
+                bounds = [repr(b) for b in histogram.buckets] + ['+Inf']
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append('{name}_bucket{{{labels}}} {count}'.format(
+                        name=name, labels=_format_labels(key, le=bound),
+                        count=cumulative))
+                lines.append('{name}_sum{{{labels}}} {value}'.format(
+                    name=name, labels=_format_labels(key),
+                    value=histogram.sum))
+                lines.append('{name}_count{{{labels}}} {value}'.format(
+                    name=name, labels=_format_labels(key),
+                    value=histogram.count))
+        return '\n'.join(lines) + '\n'
+
+
+def _matches(key, labels):
+    for idx, label in enumerate(LABELS):
+        if label in labels and key[idx] != labels[label]:
+            return False
+    return True
+
+
+def _format_labels(key, **extra):
+    pairs = list(zip(LABELS, key)) + sorted(extra.items())
+    return ','.join(
+        '{name}="{value}"'.format(
+            name=name,
+            value=str(value if value is not None else '').replace(
+                '\\', '\\\\').replace('"', '\\"'))
+        for name, value in pairs)
+
+
+def _status_class(status_code):
+    if not status_code:
+        return 'error'
+    return '{0}xx'.format(int(status_code) // 100)
+
+
+def _content_length(headers, body):
+    length = headers.get('Content-Length') if headers is not None else None
+    if length is not None:
+        try:
+            return int(length)
+        except ValueError:
+            pass
+    if body is None:
+        return 0
+    return len(body)
+
+
+def task_metrics(client, elapsed_time, task):
+    """Build the RequestMetrics for a finished REST call task.
+
+    :returns: A RequestMetrics, or None if task was not a REST call.
+    """
+    service_type = getattr(task, 'service_type', None)
+    if service_type is None:
+        return None
+    response = task._result
+    status_code = getattr(response, 'status_code', None)
+    bytes_sent = 0
+    bytes_received = 0
+    if status_code is not None:
+        request = getattr(response, 'request', None)
+        if request is not None:
+            bytes_sent = _content_length(
+                request.headers, getattr(request, 'body', None))
+        # Reading the body of a streamed response would consume it
+        if task.args.get('stream'):
+            bytes_received = _content_length(response.headers, b'')
+        else:
+            bytes_received = _content_length(
+                response.headers, response.content)
+    labels = dict(
+        cloud=getattr(client, 'name', None),
+        region=getattr(client, 'region_name', None),
+        service=service_type,
+        method=task.method,
+        resource=task.resource)
+    return RequestMetrics(
+        labels, elapsed_time, _status_class(status_code),
+        retries=task.retries, bytes_sent=bytes_sent,
+        bytes_received=bytes_received, name=task.name,
+        url=getattr(task, 'url', None), params=task.args.get('params'),
+        origin=getattr(task, 'origin', None))
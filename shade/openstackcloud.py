@@ -12,6 +12,7 @@
 
 import base64
 import collections
+import contextlib
 import copy
 import datetime
 import functools
@@ -19,7 +20,6 @@ import hashlib
 import ipaddress
 import iso8601
 import json
-import jsonpatch
 import operator
 import os_client_config.defaults
 import six
@@ -39,13 +39,20 @@ import os_client_config
 
 import shade
 from shade import _adapter
+from shade import _call_tracker
+from shade import _coalesce
+from shade import _disk_cache
+from shade import _floating_ip_pool
 from shade import exc
-from shade._heat import event_utils
-from shade._heat import template_utils
 from shade import _log
 from shade import _legacy_clients
+from shade import _list_cache
 from shade import _normalize
+from shade import _poller
+from shade import _port_watcher
+from shade import _topology
 from shade import meta
+from shade import metrics
 from shade import task_manager
 from shade import _utils
 
@@ -63,6 +70,12 @@ DEFAULT_OBJECT_SEGMENT_SIZE = 1073741824  # 1GB
 DEFAULT_MAX_FILE_SIZE = (5 * 1024 * 1024 * 1024 + 2) / 2
 DEFAULT_SERVER_AGE = 5
 DEFAULT_PORT_AGE = 5
+# How many devices to ask neutron for the ports of in one query
+DEVICE_PORTS_CHUNK = 50
+# What nova returns for servers listed without details
+SERVER_SUMMARY_FIELDS = frozenset(('id', 'name', 'links'))
+# How many resources to create with one neutron bulk request
+DEFAULT_BULK_BATCH_SIZE = 100
 DEFAULT_FLOAT_AGE = 5
 _OCC_DOC_URL = "https://docs.openstack.org/os-client-config/latest/"
 
@@ -160,7 +173,17 @@ class OpenStackCloud(
         self._extra_config = cloud_config._openstack_config.get_extra_config(
             'shade', {
                 'get_flavor_extra_specs': True,
+                'coalesce_requests': True,
+                'list_caches': {},
+                'metrics': {},
+                'disk_cache': {},
+                'compact_records': False,
+                'floating_ip_pool': {},
             })
+        # Strict clouds can hand resources out as compact records, which
+        # take a fraction of the memory of Munches
+        self._compact_records = bool(
+            strict and self._extra_config['compact_records'])
 
         if manager is not None:
             self.manager = manager
@@ -192,6 +215,8 @@ class OpenStackCloud(
         if not hasattr(self.manager, 'submit_task'):
             self.manager.submit_task = self.manager.submitTask
 
+        self._configure_metrics(self._extra_config['metrics'] or {})
+
         (self.verify, self.cert) = cloud_config.get_requests_verify_args()
         # Turn off urllib3 warnings about insecure certs if we have
         # explicitly configured requests to tell it we do not want
@@ -207,22 +232,43 @@ class OpenStackCloud(
         self._disable_warnings = {}
         self.use_direct_get = use_direct_get
 
-        self._servers = None
-        self._servers_time = 0
-        self._servers_lock = threading.Lock()
-
-        self._ports = None
-        self._ports_time = 0
-        self._ports_lock = threading.Lock()
+        # Concurrent identical GET requests share a single in-flight call.
+        # This sits below dogpile, so it works whether caching is on or not.
+        if self._extra_config['coalesce_requests']:
+            self._request_coalescer = _coalesce.RequestCoalescer()
+        else:
+            self._request_coalescer = None
+
+        # Snapshot caches for the list calls that get hammered by polling.
+        # Their ages are filled in below once we know whether caching is on.
+        self._list_caches = {
+            'servers': _list_cache.ListCache('servers', 0),
+            'ports': _list_cache.ListCache('ports', 0),
+            'floating_ips': _list_cache.ListCache('floating_ips', 0),
+        }
+        self._server_table = None
+
+        # Everything waiting on a server, image or volume shares a single
+        # list call per round of polling
+        self._pollers = {
+            'servers': _poller.StatusPoller('servers', self._poll_servers),
+            'images': _poller.StatusPoller('images', self._poll_images),
+            'volumes': _poller.StatusPoller('volumes', self._poll_volumes),
+        }
+        # The neutron collections bulk creation was rejected for
+        self._neutron_no_bulk = set()
 
-        self._floating_ips = None
-        self._floating_ips_time = 0
-        self._floating_ips_lock = threading.Lock()
+        # Everything waiting on the port of a device shares the queries
+        self._port_watcher = _port_watcher.PortWatcher(
+            self._list_device_ports)
 
         self._floating_network_by_router = None
         self._floating_network_by_router_run = False
         self._floating_network_by_router_lock = threading.Lock()
 
+        self._configure_floating_ip_pools(
+            self._extra_config['floating_ip_pool'] or {})
+
         self._networks_lock = threading.Lock()
         self._reset_network_caches()
 
@@ -230,7 +276,13 @@ class OpenStackCloud(
         cache_class = cloud_config.get_cache_class()
         cache_arguments = cloud_config.get_cache_arguments()
 
+        # Per resource cache regions are built the first time they are used,
+        # see _get_cache.
         self._resource_caches = {}
+        self._resource_cache_expirations = {}
+        self._resource_caches_lock = threading.Lock()
+        self._cache_class = cache_class
+        self._cache_arguments = cache_arguments
 
         if cache_class != 'dogpile.cache.null':
             self.cache_enabled = True
@@ -241,8 +293,8 @@ class OpenStackCloud(
                 # Only build caches for things we have list operations for
                 if getattr(
                         self, 'list_{0}'.format(expire_key), None):
-                    self._resource_caches[expire_key] = self._make_cache(
-                        cache_class, expirations[expire_key], cache_arguments)
+                    self._resource_cache_expirations[expire_key] = (
+                        expirations[expire_key])
 
             self._SERVER_AGE = DEFAULT_SERVER_AGE
             self._PORT_AGE = DEFAULT_PORT_AGE
@@ -285,19 +337,447 @@ class OpenStackCloud(
         self._FLOAT_AGE = cloud_config.get_cache_resource_expiration(
             'floating_ip', self._FLOAT_AGE)
 
+        self._configure_list_caches(
+            cloud_config, self._extra_config['list_caches'])
+
         self._container_cache = dict()
         self._file_hash_cache = dict()
 
         self._keystone_session = None
+        self._disk_cache = self._make_disk_cache(
+            cloud_config, self._extra_config['disk_cache'] or {})
 
         self._legacy_clients = {}
         self._raw_clients = {}
 
-        self._local_ipv6 = (
-            _utils.localhost_supports_ipv6() if not self.force_ipv4 else False)
+        # Probed the first time it is needed, see _local_ipv6
+        self._local_ipv6_override = None
 
         self.cloud_config = cloud_config
 
+    @property
+    def _local_ipv6(self):
+        if self._local_ipv6_override is not None:
+            return self._local_ipv6_override
+        if self.force_ipv4:
+            return False
+        return _utils.localhost_supports_ipv6()
+
+    @_local_ipv6.setter
+    def _local_ipv6(self, value):
+        self._local_ipv6_override = value
+
+    @property
+    def _SERVER_AGE(self):
+        return self._list_caches['servers'].max_age
+
+    @_SERVER_AGE.setter
+    def _SERVER_AGE(self, value):
+        self._list_caches['servers'].max_age = value
+
+    @property
+    def _PORT_AGE(self):
+        return self._list_caches['ports'].max_age
+
+    @_PORT_AGE.setter
+    def _PORT_AGE(self, value):
+        self._list_caches['ports'].max_age = value
+
+    @property
+    def _FLOAT_AGE(self):
+        return self._list_caches['floating_ips'].max_age
+
+    @_FLOAT_AGE.setter
+    def _FLOAT_AGE(self, value):
+        self._list_caches['floating_ips'].max_age = value
+
+    def _configure_list_caches(self, cloud_config, list_caches):
+        """Apply the shade.list_caches settings from clouds.yaml.
+
+        Each key names a list call, without the ``list_`` prefix, and maps to
+        a dict that may contain ``max_age`` (seconds) and ``background``
+        (refresh in a background thread ahead of expiry). servers, ports and
+        floating_ips are always snapshot cached. Any other list call named
+        here gets a snapshot cache for its argument-less form.
+
+        servers also accepts ``delta_sync``, which refreshes the server list
+        with changes-since queries instead of full listings, and
+        ``full_sync_interval``, the seconds between full listings in that
+        mode.
+        """
+        for name, settings in list_caches.items():
+            settings = settings or {}
+            cache = self._list_caches.get(name)
+            if cache is None:
+                method = getattr(self, 'list_{0}'.format(name), None)
+                if not method:
+                    self.log.debug(
+                        "Ignoring list cache config for %(name)s since"
+                        " there is no list_%(name)s call",
+                        {'name': name})
+                    continue
+                max_age = cloud_config.get_cache_resource_expiration(
+                    name, _list_cache.DEFAULT_MAX_AGE)
+                cache = _list_cache.ListCache(name, max_age, fetch=method)
+                self._list_caches[name] = cache
+                setattr(
+                    self, 'list_{0}'.format(name),
+                    _list_cache.cached_list_call(cache, method))
+            if 'max_age' in settings:
+                cache.max_age = float(settings['max_age'])
+            cache.background = bool(settings.get('background', False))
+            if name == 'servers' and settings.get('delta_sync'):
+                self._server_table = _list_cache.DeltaSyncTable(
+                    'servers',
+                    full_sync_interval=float(settings.get(
+                        'full_sync_interval',
+                        _list_cache.DEFAULT_FULL_SYNC_INTERVAL)))
+
+    def get_list_cache_stats(self):
+        """Get age and refresh metrics for the list snapshot caches.
+
+        :returns: A dict mapping each cached list name to a ``munch.Munch``
+                  with its max_age, age, size, refresh_count,
+                  refresh_errors, last_error and last_refresh_duration.
+        """
+        return dict(
+            (name, cache.stats()) for name, cache in self._list_caches.items())
+
+    def stop_list_cache_refresh(self):
+        """Stop any background list cache refresh threads."""
+        for cache in self._list_caches.values():
+            cache.stop()
+
+    def _configure_floating_ip_pools(self, pool_config):
+        """Apply the shade.floating_ip_pool settings from clouds.yaml.
+
+        ``size`` is how many unattached floating IPs to keep allocated on
+        each external network servers get floating IPs from, 0 (the
+        default) meaning none. ``networks`` limits that to a list of network
+        names or ids.
+        """
+        self._floating_ip_pool_size = int(pool_config.get('size', 0))
+        self._floating_ip_pool_networks = pool_config.get('networks')
+        self._floating_ip_pools = {}
+        self._floating_ip_pools_lock = threading.Lock()
+
+    def _get_floating_ip_pool(self, network_id):
+        """Return the warm floating IP pool of a network, or None.
+
+        Pools are started the first time a floating IP is needed from their
+        network.
+        """
+        if not self._floating_ip_pool_size:
+            return None
+        pool = self._floating_ip_pools.get(network_id)
+        if pool is not None:
+            return pool
+        if self._floating_ip_pool_networks is not None:
+            names = set(
+                net['name']
+                for net in self.get_external_ipv4_floating_networks()
+                if net['id'] == network_id)
+            names.add(network_id)
+            if not names.intersection(self._floating_ip_pool_networks):
+                return None
+        with self._floating_ip_pools_lock:
+            pool = self._floating_ip_pools.get(network_id)
+            if pool is None:
+                pool = _floating_ip_pool.FloatingIPPool(
+                    network_id, self._floating_ip_pool_size,
+                    create=functools.partial(
+                        self._create_pooled_floating_ip, network_id),
+                    available=functools.partial(
+                        self._unattached_floating_ips, network_id),
+                    check=self._check_pooled_floating_ips)
+                pool.start()
+                self._floating_ip_pools[network_id] = pool
+        return pool
+
+    def _find_floating_ip_pool(self, network=None):
+        """Return the warm floating IP pool of a network name or id.
+
+        Without a network, this is the pool of the network auto_ip gets
+        floating IPs from. None if there is no pool for it.
+        """
+        if not self._floating_ip_pool_size:
+            return None
+        if not self._use_neutron_floating():
+            return None
+        if network is None:
+            return self._get_floating_ip_pool(self._get_floating_network_id())
+        ext_nets = self._find_floating_networks(network)
+        if ext_nets:
+            return self._get_floating_ip_pool(ext_nets[0]['id'])
+        return None
+
+    def _create_pooled_floating_ip(self, network_id):
+        f_ip = self._neutron_create_floating_ip(network_id=network_id)
+        self._cache_upsert('floating_ips', f_ip)
+        return f_ip
+
+    def _unattached_floating_ips(self, network_id, project_id=None):
+        if project_id is None:
+            project_id = self.current_project_id
+        return _utils._filter_list(
+            self._list_floating_ips(), name_or_id=None, filters={
+                'port': None,
+                'network': network_id,
+                'location': {'project': {'id': project_id}},
+            })
+
+    def _check_pooled_floating_ips(self, floating_ips):
+        """Return the pooled IPs that still exist and are unattached."""
+        current = dict(
+            (f_ip['id'], f_ip) for f_ip in self._list_floating_ips(
+                filters={'id': [f_ip['id'] for f_ip in floating_ips]}))
+        return [
+            current[f_ip['id']] for f_ip in floating_ips
+            if f_ip['id'] in current and not current[f_ip['id']]['port']]
+
+    def _attach_pooled_ip(self, pool, server, floating_ip, **kwargs):
+        """Attach an IP a warm pool handed out, or else the next one.
+
+        The IP can still be attached or deleted by someone else between the
+        pool checking it and attaching it. It is dropped then, and the next
+        IP the pool has ready is attached instead.
+
+        :returns: The updated server and the floating IP attached to it.
+        """
+        try:
+            return self._attach_ip_to_server(
+                server=server, floating_ip=floating_ip, **kwargs), floating_ip
+        except exc.OpenStackCloudTimeout:
+            raise
+        except exc.OpenStackCloudException:
+            spare = pool.take_many(1)
+            if not spare:
+                raise
+            self.log.debug(
+                "Attaching pooled floating IP %(fip)s to %(server)s failed,"
+                " trying %(next)s", {
+                    'fip': floating_ip['id'], 'server': server['id'],
+                    'next': spare[0]['id']}, exc_info=True)
+        return self._attach_ip_to_server(
+            server=server, floating_ip=spare[0], **kwargs), spare[0]
+
+    def stop_floating_ip_pools(self, release=False):
+        """Stop allocating floating IPs for the warm pools.
+
+        :param bool release: Whether to delete the unattached floating IPs
+                             the pools held, rather than leave them to the
+                             next process to pick up.
+        """
+        with self._floating_ip_pools_lock:
+            pools = list(self._floating_ip_pools.values())
+            self._floating_ip_pools.clear()
+        for pool in pools:
+            for f_ip in pool.stop():
+                if release:
+                    self.delete_floating_ip(f_ip['id'], retry=0)
+
+    def _make_disk_cache(self, cloud_config, disk_cache_config):
+        """Apply the shade.disk_cache settings from clouds.yaml.
+
+        ``discovery: true`` keeps version discovery documents on disk, for
+        ``discovery_max_age`` seconds (default a day), and ``auth: true``
+        keeps the token and service catalog until the token expires. Files
+        go to ``path``, by default a ``shade`` directory in the
+        os-client-config cache path.
+        """
+        discovery = disk_cache_config.get('discovery', False)
+        auth = disk_cache_config.get('auth', False)
+        if not discovery and not auth:
+            return None
+        path = disk_cache_config.get('path')
+        if not path:
+            path = os.path.join(
+                cloud_config._openstack_config.get_cache_path(), 'shade')
+        return _disk_cache.DiskCache(
+            path, discovery=discovery, auth=auth,
+            discovery_max_age=float(disk_cache_config.get(
+                'discovery_max_age',
+                _disk_cache.DEFAULT_DISCOVERY_MAX_AGE)))
+
+    def _configure_metrics(self, metrics_config):
+        """Apply the shade.metrics settings from clouds.yaml.
+
+        ``registry: true`` keeps metrics in an in-process registry, available
+        as ``metrics_registry``. ``statsd`` is a dict of ``host``, ``port``
+        and ``prefix`` for sending metrics to statsd.
+        """
+        self._metrics = metrics.MultiEmitter()
+        self.metrics_registry = None
+        if metrics_config.get('registry'):
+            self.metrics_registry = metrics.MetricsRegistry()
+            self.add_metrics_emitter(self.metrics_registry)
+        if metrics_config.get('statsd'):
+            self.add_metrics_emitter(
+                metrics.StatsdEmitter(**metrics_config['statsd']))
+
+    def add_metrics_emitter(self, emitter):
+        """Send per-request metrics to an emitter.
+
+        Every REST call made through this cloud's TaskManager is reported
+        with its cloud, region, service, method and resource name, latency,
+        HTTP status class, retries and bytes transferred.
+
+        :param emitter: A ``shade.metrics.MetricsEmitter``.
+        """
+        self._metrics.add(emitter)
+        self._attach_metrics()
+
+    def _metrics_attached(self):
+        """Whether REST calls are reported to this cloud's emitters.
+
+        Only a shade TaskManager sends metrics, and only to its metrics
+        attribute.
+        """
+        if not isinstance(self.manager, task_manager.TaskManager):
+            return False
+        current = getattr(self.manager, 'metrics', None)
+        return current is self._metrics or (
+            isinstance(current, metrics.MultiEmitter)
+            and self._metrics in current.emitters)
+
+    def _attach_metrics(self):
+        """Make sure the TaskManager reports to this cloud's emitters.
+
+        A TaskManager passed in by the caller may already report somewhere,
+        in which case both get the metrics.
+        """
+        current = getattr(self.manager, 'metrics', None)
+        if current is None:
+            self.manager.metrics = self._metrics
+        elif not self._metrics_attached():
+            self.manager.metrics = metrics.MultiEmitter(
+                [current, self._metrics])
+
+    @contextlib.contextmanager
+    def call_tracker(self, budget=None, max_repeats=None):
+        """Record the REST calls made inside a with block.
+
+        .. code-block:: python
+
+          with cloud.call_tracker(budget=3) as tracker:
+              cloud.get_server('my-server')
+          print(tracker.report())
+
+        Every request sent through this cloud's adapters is recorded with
+        its name, url, duration, the shade method it was made from and the
+        code that called that method. Requests answered by the cache, or by
+        an identical request already in flight, are not recorded, since no
+        call was made.
+
+        :param int budget: If given, raise at the end of the block when more
+                           than this many calls were made.
+        :param int max_repeats: If given, raise at the end of the block when
+                                more than this many calls were made with the
+                                same name, such as ``compute.GET.servers``.
+
+        :returns: A ``CallTracker`` with the recorded calls.
+        :raises: ``OpenStackCloudCallBudgetExceeded`` if a budget was given
+                 and exceeded.
+        :raises: ``OpenStackCloudException`` if this cloud's TaskManager
+                 does not report metrics, so calls could not be tracked.
+        """
+        tracker = _call_tracker.CallTracker(
+            budget=budget, max_repeats=max_repeats)
+        self.add_metrics_emitter(tracker)
+        if not self._metrics_attached():
+            self._metrics.remove(tracker)
+            raise exc.OpenStackCloudException(
+                "Cannot track calls: TaskManager {manager} does not report"
+                " metrics to this cloud".format(manager=self.manager))
+        tracker.start()
+        try:
+            yield tracker
+        finally:
+            tracker.stop()
+            self._metrics.remove(tracker)
+        tracker.check()
+
+    def _cache_upsert(self, resource, record):
+        """Write a created or updated record through to cached lists.
+
+        :param string resource: The list call the record belongs to, without
+                                the ``list_`` prefix, such as ``networks``.
+        :param record: The record, in the form the list call returns it.
+        """
+        if not record or record.get('id') is None:
+            self._cache_invalidate(resource)
+            return
+        # The caller gets record back and may change it, which mustn't
+        # change what later list calls return
+        self._cache_patch(
+            resource,
+            functools.partial(
+                _list_cache.upsert_record, record=copy.deepcopy(record)))
+
+    def _cache_evict(self, resource, resource_id):
+        """Remove a deleted record from cached lists.
+
+        :param string resource: The list call the record belongs to, without
+                                the ``list_`` prefix, such as ``networks``.
+        :param resource_id: The id of the deleted record.
+        """
+        if resource == 'servers' and self._server_table is not None:
+            self._server_table.evict(resource_id)
+        self._cache_patch(
+            resource,
+            functools.partial(
+                _list_cache.remove_record, record_id=resource_id))
+
+    def _cache_evict_all(self, resource, resource_ids):
+        """Remove many deleted records from cached lists at once.
+
+        :param string resource: The list call the records belong to, without
+                                the ``list_`` prefix, such as ``networks``.
+        :param resource_ids: The ids of the deleted records.
+        """
+        resource_ids = frozenset(resource_ids)
+        if not resource_ids:
+            return
+        if resource == 'servers' and self._server_table is not None:
+            for resource_id in resource_ids:
+                self._server_table.evict(resource_id)
+        self._cache_patch(
+            resource,
+            functools.partial(
+                _list_cache.remove_records, record_ids=resource_ids))
+
+    def _cache_invalidate(self, resource):
+        """Expire cached lists of a resource we can't patch precisely."""
+        cache = self._list_caches.get(resource)
+        if cache is not None:
+            cache.invalidate()
+        method = getattr(type(self), 'list_{0}'.format(resource), None)
+        if self.cache_enabled and hasattr(method, 'invalidate'):
+            method.invalidate(self)
+
+    def _cache_patch(self, resource, patch):
+        cache = self._list_caches.get(resource)
+        if cache is not None:
+            cache.patch(patch)
+
+        # Also patch the argument-less entry of a dogpile cached list call.
+        # That is the same entry list_*.invalidate would otherwise drop.
+        method = getattr(type(self), 'list_{0}'.format(resource), None)
+        if not self.cache_enabled or not hasattr(method, 'invalidate'):
+            return
+        region = self._get_cache(method.resource)
+        key = region.function_key_generator(None, method.func)()
+        records = region.get(key)
+        if records is dogpile.cache.api.NO_VALUE:
+            return
+        records = patch(records)
+        if method.should_cache_fn and not method.should_cache_fn(records):
+            # The write left the list in a state we don't cache, such as
+            # an image that is still uploading.
+            region.delete(key)
+        else:
+            region.set(key, records)
+
     def connect_as(self, **kwargs):
         """Make a new OpenStackCloud object with new auth context.
 
@@ -417,28 +897,37 @@ class OpenStackCloud(
             expiration_time=expiration_time,
             arguments=arguments)
 
+    @property
+    def _auth_project(self):
+        """The project the cloud is configured to scope to, if any."""
+        auth = self.cloud_config.config.get('auth') or {}
+        return (
+            auth.get('project_id') or auth.get('project_name')
+            or auth.get('tenant_id') or auth.get('tenant_name'))
+
     def _make_cache_key(self, namespace, fn):
-        fname = fn.__name__
-        if namespace is None:
-            name_key = self.name
-        else:
-            name_key = '%s:%s' % (self.name, namespace)
+        parts = [self.name, self.region_name, self._auth_project]
+        if namespace is not None:
+            parts.append(namespace)
+        prefix = ':'.join(_utils.cache_key_part(part) for part in parts)
 
         def generate_key(*args, **kwargs):
-            arg_key = ','.join(args)
-            kw_keys = sorted(kwargs.keys())
-            kwargs_key = ','.join(
-                ['%s:%s' % (k, kwargs[k]) for k in kw_keys if k != 'cache'])
-            ans = "_".join(
-                [str(name_key), fname, arg_key, kwargs_key])
-            return ans
+            return _utils.make_cache_key(prefix, fn, args, kwargs)
         return generate_key
 
     def _get_cache(self, resource_name):
-        if resource_name and resource_name in self._resource_caches:
-            return self._resource_caches[resource_name]
-        else:
+        if (not resource_name
+                or resource_name not in self._resource_cache_expirations):
             return self._cache
+        with self._resource_caches_lock:
+            region = self._resource_caches.get(resource_name)
+            if region is None:
+                region = self._make_cache(
+                    self._cache_class,
+                    self._resource_cache_expirations[resource_name],
+                    self._cache_arguments)
+                self._resource_caches[resource_name] = region
+        return region
 
     def _get_client(
             self, service_key, client_class=None, interface_key=None,
@@ -506,7 +995,8 @@ class OpenStackCloud(
                 region_name=self.cloud_config.region,
                 min_version=request_min_version,
                 max_version=request_max_version,
-                shade_logger=self.log)
+                shade_logger=self.log,
+                coalescer=self._request_coalescer)
             if adapter.get_endpoint():
                 return adapter
 
@@ -520,7 +1010,8 @@ class OpenStackCloud(
             region_name=self.cloud_config.region,
             min_version=min_version,
             max_version=max_version,
-            shade_logger=self.log)
+            shade_logger=self.log,
+            coalescer=self._request_coalescer)
 
         # data.api_version can be None if no version was detected, such
         # as with neutron
@@ -557,7 +1048,8 @@ class OpenStackCloud(
             endpoint_override=self.cloud_config.get_endpoint(
                 service_type) or endpoint_override,
             region_name=self.cloud_config.region,
-            shade_logger=self.log)
+            shade_logger=self.log,
+            coalescer=self._request_coalescer)
 
     def _is_client_version(self, client, version):
         client_name = '_{client}_client'.format(client=client)
@@ -694,6 +1186,11 @@ class OpenStackCloud(
                 if hasattr(self._keystone_session, 'additional_user_agent'):
                     self._keystone_session.additional_user_agent.append(
                         ('shade', shade.__version__))
+                if self._disk_cache is not None:
+                    auth = self.cloud_config.config.get('auth') or {}
+                    self._disk_cache.attach(
+                        self._keystone_session, auth.get('auth_url'),
+                        self._auth_project)
             except Exception as e:
                 raise exc.OpenStackCloudException(
                     "Error authenticating to keystone: %s " % str(e))
@@ -979,7 +1476,7 @@ class OpenStackCloud(
                     '/tenants/' + proj['id'], json={'tenant': kwargs})
                 project = self._get_and_munchify('tenant', data)
             project = self._normalize_project(project)
-        self.list_projects.invalidate(self)
+        self._cache_upsert('projects', project)
         return project
 
     def create_project(
@@ -999,7 +1496,7 @@ class OpenStackCloud(
                 json={key: project_ref})
             project = self._normalize_project(
                 self._get_and_munchify(key, data))
-        self.list_projects.invalidate(self)
+        self._cache_upsert('projects', project)
         return project
 
     def delete_project(self, name_or_id, domain_id=None):
@@ -1029,6 +1526,7 @@ class OpenStackCloud(
             else:
                 self._identity_client.delete('/tenants/' + project['id'])
 
+        self._cache_evict('projects', project['id'])
         return True
 
     @_utils.valid_kwargs('domain_id')
@@ -1106,7 +1604,6 @@ class OpenStackCloud(
     @_utils.valid_kwargs('name', 'email', 'enabled', 'domain_id', 'password',
                          'description', 'default_project')
     def update_user(self, name_or_id, **kwargs):
-        self.list_users.invalidate(self)
         user_kwargs = {}
         if 'domain_id' in kwargs and kwargs['domain_id']:
             user_kwargs['domain_id'] = kwargs['domain_id']
@@ -1145,9 +1642,10 @@ class OpenStackCloud(
                 '/users/{user}'.format(user=user['id']), json={'user': kwargs},
                 error_message="Error in updating user {}".format(name_or_id))
 
-        user = self._get_and_munchify('user', data)
-        self.list_users.invalidate(self)
-        return _utils.normalize_users([user])[0]
+        user = _utils.normalize_users(
+            [self._get_and_munchify('user', data)])[0]
+        self._cache_upsert('users', user)
+        return user
 
     def create_user(
             self, name, password=None, email=None, default_project=None,
@@ -1165,10 +1663,10 @@ class OpenStackCloud(
         error_msg = "Error in creating user {user}".format(user=name)
         data = self._identity_client.post('/users', json={'user': params},
                                           error_message=error_msg)
-        user = self._get_and_munchify('user', data)
-
-        self.list_users.invalidate(self)
-        return _utils.normalize_users([user])[0]
+        user = _utils.normalize_users(
+            [self._get_and_munchify('user', data)])[0]
+        self._cache_upsert('users', user)
+        return user
 
     @_utils.valid_kwargs('domain_id')
     def delete_user(self, name_or_id, **kwargs):
@@ -1188,7 +1686,7 @@ class OpenStackCloud(
             error_message="Error in deleting user {user}".format(
                 user=name_or_id))
 
-        self.list_users.invalidate(self)
+        self._cache_evict('users', user['id'])
         return True
 
     def _get_user_and_group(self, user_name_or_id, group_name_or_id):
@@ -1263,6 +1761,9 @@ class OpenStackCloud(
     def get_template_contents(
             self, template_file=None, template_url=None,
             template_object=None, files=None):
+        # The heat template machinery is imported on first use, since most
+        # users never touch orchestration and it slows down import shade
+        from shade._heat import template_utils
         try:
             return template_utils.get_template_contents(
                 template_file=template_file, template_url=template_url,
@@ -1304,6 +1805,9 @@ class OpenStackCloud(
         :raises: ``OpenStackCloudException`` if something goes wrong during
             the OpenStack API call
         """
+        from shade._heat import event_utils
+        from shade._heat import template_utils
+
         if timeout:
             timeout = timeout // 60
 
@@ -1362,6 +1866,9 @@ class OpenStackCloud(
         :raises: ``OpenStackCloudException`` if something goes wrong during
             the OpenStack API calls
         """
+        from shade._heat import event_utils
+        from shade._heat import template_utils
+
         if timeout:
             timeout = timeout // 60
 
@@ -1406,6 +1913,8 @@ class OpenStackCloud(
         :raises: ``OpenStackCloudException`` if something goes wrong during
             the OpenStack API call
         """
+        from shade._heat import event_utils
+
         stack = self.get_stack(name_or_id, resolve_outputs=False)
         if stack is None:
             self.log.debug("Stack %s not found for deleting", name_or_id)
@@ -1536,35 +2045,70 @@ class OpenStackCloud(
     def _has_neutron_extension(self, extension_alias):
         return extension_alias in self._neutron_extensions()
 
-    def search_networks(self, name_or_id=None, filters=None):
+    def _search_pushdown(
+            self, obj_name, list_func, name_or_id, filters, cached=False,
+            version=None, fields=None):
+        """Search a resource with the filters its server can apply.
+
+        The filters the server supports for the resource are sent as query
+        parameters and only the rest are applied locally, so looking for
+        one network by name doesn't list every network of the cloud. A
+        name_or_id is looked up by name, then by id.
+
+        :param string obj_name: The resource, e.g. 'network'.
+        :param callable list_func: Lists the resource, taking a dict of
+                                   query parameters or None.
+        :param bool cached: Whether a shade cache holds the full listing,
+                            in which case it is filtered locally instead.
+        :param int version: The major API version of the service.
+        :param list fields: (optional) The attributes to return, where the
+                            service supports it.
+        """
+        if cached:
+            return _utils._filter_list(list_func(None), name_or_id, filters)
+        params, alternatives, filters = _normalize._plan_search(
+            obj_name, name_or_id, filters, version=version, fields=fields)
+        for alternative in alternatives:
+            query = dict(params)
+            query.update(alternative)
+            found = list_func(query or None)
+            if found:
+                break
+        return _utils._filter_list(found, name_or_id, filters)
+
+    def search_networks(self, name_or_id=None, filters=None, fields=None):
         """Search networks
 
         :param name_or_id: Name or ID of the desired network.
         :param filters: a dict containing additional filters to use. e.g.
                         {'router:external': True}
+        :param fields: (optional) list of the attributes to return.
 
         :returns: a list of ``munch.Munch`` containing the network description.
 
         :raises: ``OpenStackCloudException`` if something goes wrong during the
             OpenStack API call.
         """
-        networks = self.list_networks(filters)
-        return _utils._filter_list(networks, name_or_id, filters)
+        return self._search_pushdown(
+            'network', self.list_networks, name_or_id, filters,
+            cached='networks' in self._list_caches, fields=fields)
 
-    def search_routers(self, name_or_id=None, filters=None):
+    def search_routers(self, name_or_id=None, filters=None, fields=None):
         """Search routers
 
         :param name_or_id: Name or ID of the desired router.
         :param filters: a dict containing additional filters to use. e.g.
                         {'admin_state_up': True}
+        :param fields: (optional) list of the attributes to return.
 
         :returns: a list of ``munch.Munch`` containing the router description.
 
         :raises: ``OpenStackCloudException`` if something goes wrong during the
             OpenStack API call.
         """
-        routers = self.list_routers(filters)
-        return _utils._filter_list(routers, name_or_id, filters)
+        return self._search_pushdown(
+            'router', self.list_routers, name_or_id, filters,
+            cached='routers' in self._list_caches, fields=fields)
 
     def search_firewall_rules(self, name_or_id=None, filters=None):
         """Search OpenStack firewall rules
@@ -1611,27 +2155,30 @@ class OpenStackCloud(
         firewalls = self.list_firewalls(filters)
         return _utils._filter_list(firewalls, name_or_id, filters)
 
-    def search_subnets(self, name_or_id=None, filters=None):
+    def search_subnets(self, name_or_id=None, filters=None, fields=None):
         """Search subnets
 
         :param name_or_id: Name or ID of the desired subnet.
         :param filters: a dict containing additional filters to use. e.g.
                         {'enable_dhcp': True}
+        :param fields: (optional) list of the attributes to return.
 
         :returns: a list of ``munch.Munch`` containing the subnet description.
 
         :raises: ``OpenStackCloudException`` if something goes wrong during the
             OpenStack API call.
         """
-        subnets = self.list_subnets(filters)
-        return _utils._filter_list(subnets, name_or_id, filters)
+        return self._search_pushdown(
+            'subnet', self.list_subnets, name_or_id, filters,
+            cached='subnets' in self._list_caches, fields=fields)
 
-    def search_ports(self, name_or_id=None, filters=None):
+    def search_ports(self, name_or_id=None, filters=None, fields=None):
         """Search ports
 
         :param name_or_id: Name or ID of the desired port.
         :param filters: a dict containing additional filters to use. e.g.
                         {'device_id': '2711c67a-b4a7-43dd-ace7-6187b791c3f0'}
+        :param fields: (optional) list of the attributes to return.
 
         :returns: a list of ``munch.Munch`` containing the port description.
 
@@ -1641,12 +2188,33 @@ class OpenStackCloud(
         # If port caching is enabled, do not push the filter down to
         # neutron; get all the ports (potentially from the cache) and
         # filter locally.
-        if self._PORT_AGE:
-            pushdown_filters = None
-        else:
-            pushdown_filters = filters
-        ports = self.list_ports(pushdown_filters)
-        return _utils._filter_list(ports, name_or_id, filters)
+        return self._search_pushdown(
+            'port', self.list_ports, name_or_id, filters,
+            cached=bool(self._PORT_AGE), fields=fields)
+
+    def _get_device_ports(self, device_id, fields=None):
+        """Return the ports of a device, e.g. a server.
+
+        With port caching, the cached port listing is indexed by device in
+        the network topology instead of being scanned for every device.
+
+        :param list fields: (optional) The attributes needed, when the ports
+                            are not cached.
+        """
+        if not self._PORT_AGE:
+            return self.search_ports(
+                filters={'device_id': device_id}, fields=fields)
+        return self._network_topology.ports_on_device(
+            self.list_ports(), device_id)
+
+    def _list_device_ports(self, device_ids):
+        """List the ports of device_ids, filtered by neutron."""
+        ports = []
+        # Keep the query strings of large batches to a sane length
+        for i in range(0, len(device_ids), DEVICE_PORTS_CHUNK):
+            ports.extend(self._list_ports(
+                {'device_id': device_ids[i:i + DEVICE_PORTS_CHUNK]}))
+        return ports
 
     def search_qos_policies(self, name_or_id=None, filters=None):
         """Search QoS policies
@@ -1664,9 +2232,15 @@ class OpenStackCloud(
         return _utils._filter_list(policies, name_or_id, filters)
 
     def search_volumes(self, name_or_id=None, filters=None):
-        volumes = self.list_volumes()
-        return _utils._filter_list(
-            volumes, name_or_id, filters)
+        if self._is_client_version('volume', 2):
+            version = 2
+        else:
+            version = 1
+        return self._search_pushdown(
+            'volume',
+            lambda params: self._list_volumes(params) if params
+            else self.list_volumes(),
+            name_or_id, filters, cached=self.cache_enabled, version=version)
 
     def search_volume_snapshots(self, name_or_id=None, filters=None):
         volumesnapshots = self.list_volume_snapshots()
@@ -1687,12 +2261,15 @@ class OpenStackCloud(
         flavors = self.list_flavors(get_extra=get_extra)
         return _utils._filter_list(flavors, name_or_id, filters)
 
-    def search_security_groups(self, name_or_id=None, filters=None):
-        # `filters` could be a dict or a jmespath (str)
-        groups = self.list_security_groups(
-            filters=filters if isinstance(filters, dict) else None
-        )
-        return _utils._filter_list(groups, name_or_id, filters)
+    def search_security_groups(
+            self, name_or_id=None, filters=None, fields=None):
+        # Nova doesn't filter security groups
+        return self._search_pushdown(
+            'security_group', self.list_security_groups, name_or_id,
+            filters,
+            cached=('security_groups' in self._list_caches
+                    or not self._use_neutron_secgroups()),
+            fields=fields)
 
     def search_servers(
             self, name_or_id=None, filters=None, detailed=False,
@@ -1716,8 +2293,15 @@ class OpenStackCloud(
         return _utils._filter_list(server_groups, name_or_id, filters)
 
     def search_images(self, name_or_id=None, filters=None):
-        images = self.list_images()
-        return _utils._filter_list(images, name_or_id, filters)
+        if self._is_client_version('image', 2):
+            version = 2
+        else:
+            version = 1
+        return self._search_pushdown(
+            'image',
+            lambda params: self._list_images(filters=params) if params
+            else self.list_images(),
+            name_or_id, filters, cached=self.cache_enabled, version=version)
 
     def search_floating_ip_pools(self, name=None, filters=None):
         pools = self.list_floating_ip_pools()
@@ -1727,23 +2311,13 @@ class OpenStackCloud(
     # not possible (e.g. nested attributes or list of objects) so we also need
     # to use the client-side filtering
     # The same goes for all neutron-related search/get methods!
-    def search_floating_ips(self, id=None, filters=None):
-        # `filters` could be a jmespath expression which Neutron server doesn't
-        # understand, obviously.
-        if self._use_neutron_floating() and isinstance(filters, dict):
-            filter_keys = ['router_id', 'status', 'tenant_id', 'project_id',
-                           'revision_number', 'description',
-                           'floating_network_id', 'fixed_ip_address',
-                           'floating_ip_address', 'port_id', 'sort_dir',
-                           'sort_key', 'tags', 'tags-any', 'not-tags',
-                           'not-tags-any', 'fields']
-            neutron_filters = {k: v for k, v in filters.items()
-                               if k in filter_keys}
-            kwargs = {'filters': neutron_filters}
-        else:
-            kwargs = {}
-        floating_ips = self.list_floating_ips(**kwargs)
-        return _utils._filter_list(floating_ips, id, filters)
+    def search_floating_ips(self, id=None, filters=None, fields=None):
+        # Nova-network doesn't filter floating IPs
+        return self._search_pushdown(
+            'floating_ip', self.list_floating_ips, id, filters,
+            cached=bool(
+                self._FLOAT_AGE) or not self._use_neutron_floating(),
+            fields=fields)
 
     def search_stacks(self, name_or_id=None, filters=None):
         """Search stacks.
@@ -1757,8 +2331,11 @@ class OpenStackCloud(
         :raises: ``OpenStackCloudException`` if something goes wrong during the
             OpenStack API call.
         """
-        stacks = self.list_stacks()
-        return _utils._filter_list(stacks, name_or_id, filters)
+        return self._search_pushdown(
+            'stack',
+            lambda params: self._list_stacks(params) if params
+            else self.list_stacks(),
+            name_or_id, filters, cached=self.cache_enabled)
 
     def list_keypairs(self):
         """List all available keypairs.
@@ -1772,13 +2349,16 @@ class OpenStackCloud(
         return self._normalize_keypairs([
             k['keypair'] for k in self._get_and_munchify('keypairs', data)])
 
-    def list_networks(self, filters=None):
+    def list_networks(self, filters=None, fields=None):
         """List all available networks.
 
         :param filters: (optional) dict of filter conditions to push down
+        :param fields: (optional) list of the attributes to return. The id
+                       is always returned.
         :returns: A list of ``munch.Munch`` containing network info.
 
         """
+        filters = _normalize._with_fields(filters, fields)
         # Translate None from search interface to empty {} for kwargs below
         if not filters:
             filters = {}
@@ -1858,37 +2438,23 @@ class OpenStackCloud(
         data = self._network_client.get("/subnets.json", params=filters)
         return self._get_and_munchify('subnets', data)
 
-    def list_ports(self, filters=None):
+    def list_ports(self, filters=None, fields=None):
         """List all available ports.
 
         :param filters: (optional) dict of filter conditions to push down
+        :param fields: (optional) list of the attributes to return. The id
+                       is always returned. Cached ports have all of them.
         :returns: A list of port ``munch.Munch``.
 
         """
+        filters = _normalize._with_fields(filters, fields)
         # If pushdown filters are specified and we do not have batched caching
         # enabled, bypass local caching and push down the filters.
         if filters and self._PORT_AGE == 0:
             return self._list_ports(filters)
 
-        # Translate None from search interface to empty {} for kwargs below
-        filters = {}
-        if (time.time() - self._ports_time) >= self._PORT_AGE:
-            # Since we're using cached data anyway, we don't need to
-            # have more than one thread actually submit the list
-            # ports task.  Let the first one submit it while holding
-            # a lock, and the non-blocking acquire method will cause
-            # subsequent threads to just skip this and use the old
-            # data until it succeeds.
-            # Initially when we never got data, block to retrieve some data.
-            first_run = self._ports is None
-            if self._ports_lock.acquire(first_run):
-                try:
-                    if not (first_run and self._ports is not None):
-                        self._ports = self._list_ports(filters)
-                        self._ports_time = time.time()
-                finally:
-                    self._ports_lock.release()
-        return self._ports
+        return self._list_caches['ports'].get(
+            functools.partial(self._list_ports, {}))
 
     def _list_ports(self, filters):
         data = self._network_client.get(
@@ -1964,6 +2530,12 @@ class OpenStackCloud(
         :returns: A list of volume ``munch.Munch``.
 
         """
+        if not cache:
+            warnings.warn('cache argument to list_volumes is deprecated. Use '
+                          'invalidate instead.')
+        return self._list_volumes()
+
+    def _list_volumes(self, filters=None):
         def _list(data):
             volumes.extend(data.get('volumes', []))
             endpoint = None
@@ -1982,17 +2554,13 @@ class OpenStackCloud(
                         " {link}.".format(link=data))
                     raise
 
-        if not cache:
-            warnings.warn('cache argument to list_volumes is deprecated. Use '
-                          'invalidate instead.')
-
         # Fetching paginated volumes can fails for several reasons, if
         # something goes wrong we'll have to start fetching volumes from
         # scratch
         attempts = 5
         for _ in range(attempts):
             volumes = []
-            data = self._volume_client.get('/volumes/detail')
+            data = self._volume_client.get('/volumes/detail', params=filters)
             if 'volumes_links' not in data:
                 # no pagination needed
                 volumes.extend(data.get('volumes', []))
@@ -2097,8 +2665,12 @@ class OpenStackCloud(
         :raises: ``OpenStackCloudException`` if something goes wrong during the
             OpenStack API call.
         """
+        return self._list_stacks()
+
+    def _list_stacks(self, filters=None):
         data = self._orchestration_client.get(
-            '/stacks', error_message="Error fetching stack list")
+            '/stacks', params=filters,
+            error_message="Error fetching stack list")
         return self._normalize_stacks(
             self._get_and_munchify('stacks', data))
 
@@ -2266,7 +2838,7 @@ class OpenStackCloud(
             yield servers
 
     def list_servers(self, detailed=False, all_projects=False, bare=False,
-                     filters=None):
+                     filters=None, fields=None):
         """List all available servers.
 
         :param detailed: Whether or not to add detailed additional information.
@@ -2278,64 +2850,103 @@ class OpenStackCloud(
                      dict will be populated as needed from neutron. Setting
                      to True implies detailed = False.
         :param filters: Additional query parameters passed to the API server.
+        :param fields: (optional) list of the attributes needed. Nova can
+                       only leave out the details of servers, so when only
+                       the id and name are needed the servers are listed
+                       without details, uncached and unexpanded. Otherwise
+                       every attribute is returned.
 
         :returns: A list of server ``munch.Munch``.
 
         """
-        if (time.time() - self._servers_time) >= self._SERVER_AGE:
-            # Since we're using cached data anyway, we don't need to
-            # have more than one thread actually submit the list
-            # servers task.  Let the first one submit it while holding
-            # a lock, and the non-blocking acquire method will cause
-            # subsequent threads to just skip this and use the old
-            # data until it succeeds.
-            # Initially when we never got data, block to retrieve some data.
-            first_run = self._servers is None
-            if self._servers_lock.acquire(first_run):
-                try:
-                    if not (first_run and self._servers is not None):
-                        servers = []
-                        for chunk in self._iter_servers(
-                                detailed=detailed, all_projects=all_projects,
-                                bare=bare, filters=filters):
-                            servers.extend(chunk)
-                        self._servers = servers
-                        self._servers_time = time.time()
-                finally:
-                    self._servers_lock.release()
-        return self._servers
+        if fields and SERVER_SUMMARY_FIELDS.issuperset(fields):
+            servers = []
+            for data in self._iter_raw_servers(
+                    all_projects=all_projects, filters=filters,
+                    detail=False):
+                servers.extend(self._normalize_servers(data))
+            return servers
+
+        if self._server_table is not None:
+            return self._list_caches['servers'].get(functools.partial(
+                self._sync_servers, detailed, all_projects, bare, filters))
+
+        def _list_servers():
+            servers = []
+            for chunk in self._iter_servers(
+                    detailed=detailed, all_projects=all_projects,
+                    bare=bare, filters=filters):
+                servers.extend(chunk)
+            return servers
+        return self._list_caches['servers'].get(_list_servers)
 
     def _iter_servers(self, detailed=False,
                       all_projects=False, bare=False,
                       filters=None):
+        for data in self._iter_raw_servers(
+                all_projects=all_projects, filters=filters):
+            servers = self._normalize_servers(data)
+            yield [
+                self._expand_server(server, detailed, bare)
+                for server in servers
+            ]
+
+    def _iter_raw_servers(self, all_projects=False, filters=None,
+                          detail=True):
+        url = '/servers/detail' if detail else '/servers'
         error_msg = "Error fetching server list on {cloud}:{region}:".format(
             cloud=self.name,
             region=self.region_name)
-        params = filters or {}
+        params = dict(filters or {})
         if all_projects:
             params['all_tenants'] = True
         data = self._compute_client.get(
-            '/servers/detail', params=params, error_message=error_msg)
+            url, params=params, error_message=error_msg)
         while 'servers_links' in data:
-            servers = self._normalize_servers(
-                self._get_and_munchify('servers', data))
-            yield [
-                self._expand_server(server, detailed, bare)
-                for server in servers
-            ]
+            yield self._get_and_munchify('servers', data)
             parse_result = urllib.parse.urlparse(
                 data['servers_links'][0]['href'])
             pagination_params = dict(
                 urllib.parse.parse_qsl(parse_result.query))
             params.update(pagination_params)
             data = self._compute_client.get(
-                '/servers/detail', params=params, error_message=error_msg)
-        servers = self._normalize_servers(
-            self._get_and_munchify('servers', data))
-        yield [
-            self._expand_server(server, detailed, bare)
-            for server in servers
-        ]
+                url, params=params, error_message=error_msg)
+        yield self._get_and_munchify('servers', data)
+
+    def _sync_servers(self, detailed, all_projects, bare, filters):
+        """Refresh the keyed server table with changes-since.
+
+        Only servers that changed since the last sync are normalized and
+        expanded. Deleted servers come back from nova with a DELETED status
+        when changes-since is given, which is how they get evicted.
+        """
+        def _full():
+            servers = []
+            for chunk in self._iter_servers(
+                    detailed=detailed, all_projects=all_projects,
+                    bare=bare, filters=filters):
+                servers.extend(chunk)
+            return servers
+
+        def _changes(since):
+            changes_filters = dict(filters or {})
+            changes_filters['changes-since'] = _utils.format_timestamp(since)
+            for chunk in self._iter_raw_servers(
+                    all_projects=all_projects, filters=changes_filters):
+                for server in chunk:
+                    yield server
+
+        def _process(server):
+            return self._expand_server(
+                self._normalize_server(server), detailed, bare)
+
+        context = (
+            detailed, all_projects, bare,
+            sorted((filters or {}).items()))
+        return self._server_table.sync(
+            context, _full, _changes,
+            is_deleted=lambda server: server.get('status') == 'DELETED',
+            process=_process)
 
     def list_server_groups(self):
         """List all available server groups.
@@ -2385,11 +2996,15 @@ class OpenStackCloud(
             value of filter_deleted to False.
         :returns: A list of glance images.
         """
+        return self._list_images(
+            filter_deleted=filter_deleted, show_all=show_all)
+
+    def _list_images(self, filter_deleted=True, show_all=False, filters=None):
         if show_all:
             filter_deleted = False
         # First, try to actually get images from glance, it's more efficient
         images = []
-        params = {}
+        params = dict(filters or {})
         image_list = []
         try:
             if self._is_client_version('image', 2):
@@ -2404,7 +3019,8 @@ class OpenStackCloud(
         except keystoneauth1.exceptions.catalog.EndpointNotFound:
             # We didn't have glance, let's try nova
             # If this doesn't work - we just let the exception propagate
-            response = self._compute_client.get('/images/detail')
+            response = self._compute_client.get(
+                '/images/detail', params=filters)
         while 'next' in response:
             image_list.extend(meta.obj_list_to_munch(response['images']))
             endpoint = response['next']
@@ -2497,35 +3113,25 @@ class OpenStackCloud(
         floating_ips = self._nova_list_floating_ips()
         return self._normalize_floating_ips(floating_ips)
 
-    def list_floating_ips(self, filters=None):
+    def list_floating_ips(self, filters=None, fields=None):
         """List all available floating IPs.
 
         :param filters: (optional) dict of filter conditions to push down
+        :param fields: (optional) list of the attributes to return, with
+                       neutron. The id is always returned. Cached floating
+                       IPs have all of them.
         :returns: A list of floating IP ``munch.Munch``.
 
         """
+        if fields and self._use_neutron_floating():
+            filters = _normalize._with_fields(filters, fields)
         # If pushdown filters are specified and we do not have batched caching
         # enabled, bypass local caching and push down the filters.
         if filters and self._FLOAT_AGE == 0:
             return self._list_floating_ips(filters)
 
-        if (time.time() - self._floating_ips_time) >= self._FLOAT_AGE:
-            # Since we're using cached data anyway, we don't need to
-            # have more than one thread actually submit the list
-            # floating ips task.  Let the first one submit it while holding
-            # a lock, and the non-blocking acquire method will cause
-            # subsequent threads to just skip this and use the old
-            # data until it succeeds.
-            # Initially when we never got data, block to retrieve some data.
-            first_run = self._floating_ips is None
-            if self._floating_ips_lock.acquire(first_run):
-                try:
-                    if not (first_run and self._floating_ips is not None):
-                        self._floating_ips = self._list_floating_ips()
-                        self._floating_ips_time = time.time()
-                finally:
-                    self._floating_ips_lock.release()
-        return self._floating_ips
+        return self._list_caches['floating_ips'].get(
+            self._list_floating_ips)
 
     def _neutron_list_floating_ips(self, filters=None):
         if not filters:
@@ -2547,17 +3153,11 @@ class OpenStackCloud(
         return self._use_internal_network
 
     def _reset_network_caches(self):
-        # Variables to prevent us from going through the network finding
-        # logic again if we've done it once. This is different from just
-        # the cached value, since "None" is a valid value to find.
+        # The network finding logic runs once per topology. This is
+        # different from just the cached value, since "None" is a valid
+        # value to find.
         with self._networks_lock:
-            self._external_ipv4_networks = []
-            self._external_ipv4_floating_networks = []
-            self._internal_ipv4_networks = []
-            self._external_ipv6_networks = []
-            self._internal_ipv6_networks = []
-            self._nat_destination_network = None
-            self._default_network_network = None
+            self._network_topology = _topology.NetworkTopology()
             self._network_list_stamp = False
 
     def _set_interesting_networks(self):
@@ -2569,7 +3169,11 @@ class OpenStackCloud(
         nat_destination = None
         default_network = None
 
-        all_subnets = None
+        # The configured names are looked up once per network
+        external_ipv4_names = set(self._external_ipv4_names)
+        internal_ipv4_names = set(self._internal_ipv4_names)
+        external_ipv6_names = set(self._external_ipv6_names)
+        internal_ipv6_names = set(self._internal_ipv6_names)
 
         # Filter locally because we have an or condition
         try:
@@ -2584,18 +3188,18 @@ class OpenStackCloud(
         except exc.OpenStackCloudException:
             self._network_list_stamp = True
             return
+        topology = _topology.NetworkTopology(all_networks)
 
         for network in all_networks:
+            names = set((network['name'], network['id']))
 
             # External IPv4 networks
-            if (network['name'] in self._external_ipv4_names
-                    or network['id'] in self._external_ipv4_names):
+            if names & external_ipv4_names:
                 external_ipv4_networks.append(network)
             elif ((('router:external' in network
                     and network['router:external']) or
                     network.get('provider:physical_network')) and
-                    network['name'] not in self._internal_ipv4_names and
-                    network['id'] not in self._internal_ipv4_names):
+                    not names & internal_ipv4_names):
                 external_ipv4_networks.append(network)
 
             # External Floating IPv4 networks
@@ -2603,109 +3207,91 @@ class OpenStackCloud(
                 external_ipv4_floating_networks.append(network)
 
             # Internal networks
-            if (network['name'] in self._internal_ipv4_names
-                    or network['id'] in self._internal_ipv4_names):
+            if names & internal_ipv4_names:
                 internal_ipv4_networks.append(network)
             elif (not network.get('router:external', False) and
                     not network.get('provider:physical_network') and
-                    network['name'] not in self._external_ipv4_names and
-                    network['id'] not in self._external_ipv4_names):
+                    not names & external_ipv4_names):
                 internal_ipv4_networks.append(network)
 
             # External networks
-            if (network['name'] in self._external_ipv6_names
-                    or network['id'] in self._external_ipv6_names):
+            if names & external_ipv6_names:
                 external_ipv6_networks.append(network)
             elif (network.get('router:external') and
-                    network['name'] not in self._internal_ipv6_names and
-                    network['id'] not in self._internal_ipv6_names):
+                    not names & internal_ipv6_names):
                 external_ipv6_networks.append(network)
 
             # Internal networks
-            if (network['name'] in self._internal_ipv6_names
-                    or network['id'] in self._internal_ipv6_names):
+            if names & internal_ipv6_names:
                 internal_ipv6_networks.append(network)
             elif (not network.get('router:external', False) and
-                    network['name'] not in self._external_ipv6_names and
-                    network['id'] not in self._external_ipv6_names):
+                    not names & external_ipv6_names):
                 internal_ipv6_networks.append(network)
 
-            # NAT Destination
-            if self._nat_destination in (
-                    network['name'], network['id']):
-                if nat_destination:
-                    raise exc.OpenStackCloudException(
-                        'Multiple networks were found matching'
-                        ' {nat_net} which is the network configured'
-                        ' to be the NAT destination. Please check your'
-                        ' cloud resources. It is probably a good idea'
-                        ' to configure this network by ID rather than'
-                        ' by name.'.format(
-                            nat_net=self._nat_destination))
-                nat_destination = network
-            elif self._nat_destination is None:
-                # TODO(mordred) need a config value for floating
-                # ips for this cloud so that we can skip this
-                # No configured nat destination, we have to figured
-                # it out.
-                if all_subnets is None:
-                    try:
-                        all_subnets = self.list_subnets()
-                    except exc.OpenStackCloudException:
-                        # Thanks Rackspace broken neutron
-                        all_subnets = []
-
-                for subnet in all_subnets:
-                    # TODO(mordred) trap for detecting more than
-                    # one network with a gateway_ip without a config
-                    if ('gateway_ip' in subnet and subnet['gateway_ip']
-                            and network['id'] == subnet['network_id']):
-                        nat_destination = network
-                        break
-
-            # Default network
-            if self._default_network in (
-                    network['name'], network['id']):
-                if default_network:
-                    raise exc.OpenStackCloudException(
-                        'Multiple networks were found matching'
-                        ' {default_net} which is the network'
-                        ' configured to be the default interface'
-                        ' network. Please check your cloud resources.'
-                        ' It is probably a good idea'
-                        ' to configure this network by ID rather than'
-                        ' by name.'.format(
-                            default_net=self._default_network))
-                default_network = network
-
-        # Validate config vs. reality
-        for net_name in self._external_ipv4_names:
-            if net_name not in [net['name'] for net in external_ipv4_networks]:
-                raise exc.OpenStackCloudException(
-                    "Networks: {network} was provided for external IPv4"
-                    " access and those networks could not be found".format(
-                        network=net_name))
-
-        for net_name in self._internal_ipv4_names:
-            if net_name not in [net['name'] for net in internal_ipv4_networks]:
+        # NAT Destination
+        if self._nat_destination is not None:
+            found = topology.find(self._nat_destination)
+            if len(found) > 1:
                 raise exc.OpenStackCloudException(
-                    "Networks: {network} was provided for internal IPv4"
-                    " access and those networks could not be found".format(
-                        network=net_name))
+                    'Multiple networks were found matching'
+                    ' {nat_net} which is the network configured'
+                    ' to be the NAT destination. Please check your'
+                    ' cloud resources. It is probably a good idea'
+                    ' to configure this network by ID rather than'
+                    ' by name.'.format(
+                        nat_net=self._nat_destination))
+            if found:
+                nat_destination = found[0]
+        elif all_networks:
+            # TODO(mordred) need a config value for floating
+            # ips for this cloud so that we can skip this
+            # No configured nat destination, we have to figured
+            # it out.
+            try:
+                topology.set_subnets(self.list_subnets())
+            except exc.OpenStackCloudException:
+                # Thanks Rackspace broken neutron
+                topology.set_subnets([])
+            # TODO(mordred) trap for detecting more than
+            # one network with a gateway_ip without a config
+            for network in reversed(all_networks):
+                if topology.has_gateway(network['id']):
+                    nat_destination = network
+                    break
 
-        for net_name in self._external_ipv6_names:
-            if net_name not in [net['name'] for net in external_ipv6_networks]:
+        # Default network
+        if self._default_network is not None:
+            found = topology.find(self._default_network)
+            if len(found) > 1:
                 raise exc.OpenStackCloudException(
-                    "Networks: {network} was provided for external IPv6"
-                    " access and those networks could not be found".format(
-                        network=net_name))
+                    'Multiple networks were found matching'
+                    ' {default_net} which is the network'
+                    ' configured to be the default interface'
+                    ' network. Please check your cloud resources.'
+                    ' It is probably a good idea'
+                    ' to configure this network by ID rather than'
+                    ' by name.'.format(
+                        default_net=self._default_network))
+            if found:
+                default_network = found[0]
 
-        for net_name in self._internal_ipv6_names:
-            if net_name not in [net['name'] for net in internal_ipv6_networks]:
-                raise exc.OpenStackCloudException(
-                    "Networks: {network} was provided for internal IPv6"
-                    " access and those networks could not be found".format(
-                        network=net_name))
+        # Validate config vs. reality
+        for configured, networks, access in (
+                (self._external_ipv4_names, external_ipv4_networks,
+                 'external IPv4'),
+                (self._internal_ipv4_names, internal_ipv4_networks,
+                 'internal IPv4'),
+                (self._external_ipv6_names, external_ipv6_networks,
+                 'external IPv6'),
+                (self._internal_ipv6_names, internal_ipv6_networks,
+                 'internal IPv6')):
+            found_names = set(net['name'] for net in networks)
+            for net_name in configured:
+                if net_name not in found_names:
+                    raise exc.OpenStackCloudException(
+                        "Networks: {network} was provided for {access}"
+                        " access and those networks could not be"
+                        " found".format(network=net_name, access=access))
 
         if self._nat_destination and not nat_destination:
             raise exc.OpenStackCloudException(
@@ -2721,13 +3307,15 @@ class OpenStackCloud(
                 ' found'.format(
                     network=self._default_network))
 
-        self._external_ipv4_networks = external_ipv4_networks
-        self._external_ipv4_floating_networks = external_ipv4_floating_networks
-        self._internal_ipv4_networks = internal_ipv4_networks
-        self._external_ipv6_networks = external_ipv6_networks
-        self._internal_ipv6_networks = internal_ipv6_networks
-        self._nat_destination_network = nat_destination
-        self._default_network_network = default_network
+        topology.select('external_ipv4', external_ipv4_networks)
+        topology.select(
+            'external_ipv4_floating', external_ipv4_floating_networks)
+        topology.select('internal_ipv4', internal_ipv4_networks)
+        topology.select('external_ipv6', external_ipv6_networks)
+        topology.select('internal_ipv6', internal_ipv6_networks)
+        topology.nat_destination = nat_destination
+        topology.default_network = default_network
+        self._network_topology = topology
 
     def _find_interesting_networks(self):
         if self._networks_lock.acquire():
@@ -2745,13 +3333,32 @@ class OpenStackCloud(
             finally:
                 self._networks_lock.release()
 
+    def _get_server_networks(self, server, kind):
+        """Return the interesting networks of kind the server is on.
+
+        This is what the server IP finding code uses instead of going
+        through every interesting network for every server.
+
+        :param server: Server dict.
+        :param string kind: One of 'external_ipv4', 'internal_ipv4',
+                            'external_ipv6' or 'internal_ipv6'.
+        """
+        self._find_interesting_networks()
+        return self._network_topology.on_server(kind, server['addresses'])
+
+    def _find_floating_networks(self, name_or_id):
+        """Return the external IPv4 floating networks with name_or_id."""
+        self._find_interesting_networks()
+        return self._network_topology.find(
+            name_or_id, kind='external_ipv4_floating')
+
     def get_nat_destination(self):
         """Return the network that is configured to be the NAT destination.
 
         :returns: A network dict if one is found
         """
         self._find_interesting_networks()
-        return self._nat_destination_network
+        return self._network_topology.nat_destination
 
     def get_default_network(self):
         """Return the network that is configured to be the default interface.
@@ -2759,7 +3366,7 @@ class OpenStackCloud(
         :returns: A network dict if one is found
         """
         self._find_interesting_networks()
-        return self._default_network_network
+        return self._network_topology.default_network
 
     def get_external_networks(self):
         """Return the networks that are configured to route northbound.
@@ -2771,8 +3378,8 @@ class OpenStackCloud(
         """
         self._find_interesting_networks()
         return list(
-            set(self._external_ipv4_networks) |
-            set(self._external_ipv6_networks))
+            set(self._network_topology.get('external_ipv4')) |
+            set(self._network_topology.get('external_ipv6')))
 
     def get_internal_networks(self):
         """Return the networks that are configured to not route northbound.
@@ -2784,8 +3391,8 @@ class OpenStackCloud(
         """
         self._find_interesting_networks()
         return list(
-            set(self._internal_ipv4_networks) |
-            set(self._internal_ipv6_networks))
+            set(self._network_topology.get('internal_ipv4')) |
+            set(self._network_topology.get('internal_ipv6')))
 
     def get_external_ipv4_networks(self):
         """Return the networks that are configured to route northbound.
@@ -2793,7 +3400,7 @@ class OpenStackCloud(
         :returns: A list of network ``munch.Munch`` if one is found
         """
         self._find_interesting_networks()
-        return self._external_ipv4_networks
+        return self._network_topology.get('external_ipv4')
 
     def get_external_ipv4_floating_networks(self):
         """Return the networks that are configured to route northbound.
@@ -2801,7 +3408,7 @@ class OpenStackCloud(
         :returns: A list of network ``munch.Munch`` if one is found
         """
         self._find_interesting_networks()
-        return self._external_ipv4_floating_networks
+        return self._network_topology.get('external_ipv4_floating')
 
     def get_internal_ipv4_networks(self):
         """Return the networks that are configured to not route northbound.
@@ -2809,7 +3416,7 @@ class OpenStackCloud(
         :returns: A list of network ``munch.Munch`` if one is found
         """
         self._find_interesting_networks()
-        return self._internal_ipv4_networks
+        return self._network_topology.get('internal_ipv4')
 
     def get_external_ipv6_networks(self):
         """Return the networks that are configured to route northbound.
@@ -2817,7 +3424,7 @@ class OpenStackCloud(
         :returns: A list of network ``munch.Munch`` if one is found
         """
         self._find_interesting_networks()
-        return self._external_ipv6_networks
+        return self._network_topology.get('external_ipv6')
 
     def get_internal_ipv6_networks(self):
         """Return the networks that are configured to not route northbound.
@@ -2825,7 +3432,7 @@ class OpenStackCloud(
         :returns: A list of network ``munch.Munch`` if one is found
         """
         self._find_interesting_networks()
-        return self._internal_ipv6_networks
+        return self._network_topology.get('internal_ipv6')
 
     def _has_floating_ips(self):
         if not self._floating_ip_source:
@@ -3623,8 +4230,13 @@ class OpenStackCloud(
             '/os-keypairs',
             json={'keypair': keypair},
             error_message="Unable to create keypair {name}".format(name=name))
-        return self._normalize_keypair(
+        keypair = self._normalize_keypair(
             self._get_and_munchify('keypair', data))
+        # Listed keypairs never carry the private key
+        cached = keypair.copy()
+        cached.pop('private_key', None)
+        self._cache_upsert('keypairs', cached)
+        return keypair
 
     def delete_keypair(self, name):
         """Delete a keypair.
@@ -3641,8 +4253,95 @@ class OpenStackCloud(
         except exc.OpenStackCloudURINotFound:
             self.log.debug("Keypair %s not found for deleting", name)
             return False
+        self._cache_evict('keypairs', name)
         return True
 
+    def _neutron_bulk_create(
+            self, path, resource, bodies, batch_size=None, concurrency=10):
+        """Create many neutron resources with one request per batch.
+
+        Neutron creates every resource of a list body with a single request,
+        but can be configured not to. Batches it rejects are created with
+        concurrent single requests instead, and once neutron said it
+        doesn't do bulk creation, every later batch is too.
+
+        :param string path: The collection to post to, e.g. /ports.json.
+        :param string resource: The resource, e.g. port.
+        :param bodies: A list of the bodies of the resources.
+        :param batch_size: How many resources to create with one request.
+        :param concurrency: How many requests to make at once.
+
+        :returns: A list of the created resources, in the order of bodies.
+        :raises: OpenStackCloudException on operation error. If only some of
+                 the resources could be created, the ids of the ones that
+                 were are in the ``<resource>_ids`` item of its extra_data.
+        """
+        batch_size = batch_size or DEFAULT_BULK_BATCH_SIZE
+        collection = resource + 's'
+        error_message = "Error creating {0}".format(
+            collection.replace('_', ' '))
+
+        def _create_one(body):
+            data = self._network_client.post(
+                path, json={resource: body}, error_message=error_message)
+            return [self._get_and_munchify(resource, data)]
+
+        def _create_batch(batch):
+            if len(batch) > 1 and path not in self._neutron_no_bulk:
+                try:
+                    data = self._network_client.post(
+                        path, json={collection: batch},
+                        error_message=error_message)
+                    return [(self._get_and_munchify(collection, data), None)]
+                except exc.OpenStackCloudBadRequest as e:
+                    # If it wasn't bulk creation neutron rejected, one of
+                    # the bodies is bad and its single request says which
+                    if 'bulk' in str(e).lower():
+                        self.log.debug(
+                            "Neutron does not do bulk creation of %s,"
+                            " creating them one at a time", collection)
+                        self._neutron_no_bulk.add(path)
+            return _utils._map_concurrently(
+                _create_one, [(body,) for body in batch], concurrency)
+
+        batches = [
+            (bodies[i:i + batch_size],)
+            for i in range(0, len(bodies), batch_size)]
+        results = []
+        for batch_results, exc_info in _utils._map_concurrently(
+                _create_batch, batches, concurrency):
+            results.extend(batch_results or [(None, exc_info)])
+        return self._collect_created(results, resource, error_message)
+
+    def _collect_created(self, results, resource, error_message):
+        """Return what concurrent creates made, or raise if one failed.
+
+        :param results: A list of (created list, exc_info) tuples, as
+                        returned by ``_utils._map_concurrently``.
+        :param string resource: The resource, e.g. port.
+        :param string error_message: What to say if some creates failed.
+
+        :raises: What the creates raised if nothing was created, otherwise
+                 OpenStackCloudException with the ids of what was created in
+                 the ``<resource>_ids`` item of its extra_data.
+        """
+        created = []
+        for result, exc_info in results:
+            created.extend(result or [])
+        for record in created:
+            self._cache_upsert(resource + 's', record)
+        for result, exc_info in results:
+            if exc_info is None:
+                continue
+            if not created:
+                six.reraise(*exc_info)
+            raise exc.OpenStackCloudException(
+                "{message}: {error}".format(
+                    message=error_message, error=exc_info[1]),
+                extra_data={
+                    '{0}_ids'.format(resource): [r['id'] for r in created]})
+        return created
+
     def create_network(self, name, shared=False, admin_state_up=True,
                        external=False, provider=None, project_id=None,
                        availability_zone_hints=None,
@@ -3667,6 +4366,57 @@ class OpenStackCloud(
         :returns: The network object.
         :raises: OpenStackCloudException on operation error.
         """
+        network = self._make_network_body(
+            name, shared=shared, admin_state_up=admin_state_up,
+            external=external, provider=provider, project_id=project_id,
+            availability_zone_hints=availability_zone_hints,
+            port_security_enabled=port_security_enabled, mtu_size=mtu_size)
+
+        data = self._network_client.post("/networks.json",
+                                         json={'network': network})
+
+        # Reset cache so the new network is picked up
+        self._reset_network_caches()
+        network = self._get_and_munchify('network', data)
+        self._cache_upsert('networks', network)
+        return network
+
+    def create_networks(self, networks, batch_size=None, concurrency=10):
+        """Create many networks at once.
+
+        The networks are created with one request per batch of them, see
+        ``create_ports``.
+
+        :param networks: A list of dicts, each holding the arguments of
+                         ``create_network`` for one network.
+        :param batch_size: (optional) How many networks to create with one
+                           request. (defaults to 100)
+        :param concurrency: How many requests to make at once.
+                            (defaults to 10)
+
+        :returns: A list of the network objects, in the order of networks.
+        :raises: OpenStackCloudException on operation error. If only some of
+                 the networks could be created, the ids of the ones that
+                 were are in the ``network_ids`` item of its extra_data.
+        """
+        bodies = [self._make_network_body(**spec) for spec in networks]
+        try:
+            return self._neutron_bulk_create(
+                '/networks.json', 'network', bodies,
+                batch_size=batch_size, concurrency=concurrency)
+        finally:
+            # Reset cache so the new networks are picked up
+            self._reset_network_caches()
+
+    def _make_network_body(self, name, shared=False, admin_state_up=True,
+                           external=False, provider=None, project_id=None,
+                           availability_zone_hints=None,
+                           port_security_enabled=None,
+                           mtu_size=None):
+        """Return the body to create a network with.
+
+        Takes the arguments of ``create_network``.
+        """
         network = {
             'name': name,
             'admin_state_up': admin_state_up,
@@ -3720,13 +4470,7 @@ class OpenStackCloud(
                     "Parameter 'mtu_size' must be greater than 67.")
 
             network['mtu'] = mtu_size
-
-        data = self._network_client.post("/networks.json",
-                                         json={'network': network})
-
-        # Reset cache so the new network is picked up
-        self._reset_network_caches()
-        return self._get_and_munchify('network', data)
+        return network
 
     def delete_network(self, name_or_id):
         """Delete a network.
@@ -3747,7 +4491,7 @@ class OpenStackCloud(
 
         # Reset cache so the deleted network is removed
         self._reset_network_caches()
-
+        self._cache_evict('networks', network['id'])
         return True
 
     @_utils.valid_kwargs("name", "description", "shared", "default",
@@ -4586,7 +5330,9 @@ class OpenStackCloud(
         data = self._network_client.post(
             "/routers.json", json={"router": router},
             error_message="Error creating router {0}".format(name))
-        return self._get_and_munchify('router', data)
+        router = self._get_and_munchify('router', data)
+        self._cache_upsert('routers', router)
+        return router
 
     def update_router(self, name_or_id, name=None, admin_state_up=None,
                       ext_gateway_net_id=None, enable_snat=None,
@@ -4653,7 +5399,9 @@ class OpenStackCloud(
             "/routers/{router_id}.json".format(router_id=curr_router['id']),
             json={"router": router},
             error_message="Error updating router {0}".format(name_or_id))
-        return self._get_and_munchify('router', data)
+        router = self._get_and_munchify('router', data)
+        self._cache_upsert('routers', router)
+        return router
 
     def delete_router(self, name_or_id):
         """Delete a logical router.
@@ -4677,6 +5425,7 @@ class OpenStackCloud(
             "/routers/{router_id}.json".format(router_id=router['id']),
             error_message="Error deleting router {0}".format(name_or_id))
 
+        self._cache_evict('routers', router['id'])
         return True
 
     def get_image_exclude(self, name_or_id, exclude):
@@ -4764,10 +5513,9 @@ class OpenStackCloud(
 
     def wait_for_image(self, image, timeout=3600):
         image_id = image['id']
-        for count in _utils._iterate_timeout(
+        for images in self._pollers['images'].iterate(
                 timeout, "Timeout waiting for image to snapshot"):
-            self.list_images.invalidate(self)
-            image = self.get_image(image_id)
+            image = images.get(image_id)
             if not image:
                 continue
             if image['status'] == 'active':
@@ -4795,7 +5543,7 @@ class OpenStackCloud(
         self._image_client.delete(
             '/images/{id}'.format(id=image.id),
             error_message="Error in deleting image")
-        self.list_images.invalidate(self)
+        self._cache_evict('images', image.id)
 
         # Task API means an image was uploaded to swift
         if self.image_api_use_tasks and IMAGE_OBJECT_KEY in image:
@@ -4806,7 +5554,7 @@ class OpenStackCloud(
             for count in _utils._iterate_timeout(
                     timeout,
                     "Timeout waiting for the image to be deleted."):
-                self._get_cache(None).invalidate()
+                self.list_images.invalidate(self)
                 if self.get_image(image.id) is None:
                     break
         return True
@@ -5033,10 +5781,10 @@ class OpenStackCloud(
         if not wait:
             return self.get_image(response['image_id'])
         try:
-            for count in _utils._iterate_timeout(
+            for images in self._pollers['images'].iterate(
                     timeout,
                     "Timeout waiting for the image to finish."):
-                image_obj = self.get_image(response['image_id'])
+                image_obj = images.get(response['image_id'])
                 if image_obj and image_obj.status not in ('queued', 'saving'):
                     return image_obj
         except exc.OpenStackCloudTimeout:
@@ -5123,14 +5871,14 @@ class OpenStackCloud(
         else:
             image = self._upload_image_put_v1(
                 name, image_data, meta, **image_kwargs)
-        self._get_cache(None).invalidate()
+        self._cache_upsert('images', image)
         if not wait:
             return image
         try:
-            for count in _utils._iterate_timeout(
+            for images in self._pollers['images'].iterate(
                     timeout,
                     "Timeout waiting for the image to finish."):
-                image_obj = self.get_image(image.id)
+                image_obj = images.get(image.id)
                 if image_obj and image_obj.status not in ('queued', 'saving'):
                     return image_obj
         except exc.OpenStackCloudTimeout:
@@ -5246,6 +5994,8 @@ class OpenStackCloud(
             return self._update_image_properties_v1(image, meta, img_props)
 
     def _update_image_properties_v2(self, image, meta, properties):
+        import jsonpatch
+
         img_props = image.properties.copy()
         for k, v in iter(self._make_v2_image_params(meta, properties).items()):
             if image.get(k, None) != v:
@@ -5323,17 +6073,17 @@ class OpenStackCloud(
             json=dict(payload),
             error_message='Error in creating volume')
         volume = self._get_and_munchify('volume', data)
-        self.list_volumes.invalidate(self)
+        self._cache_upsert('volumes', self._normalize_volume(volume))
 
         if volume['status'] == 'error':
             raise exc.OpenStackCloudException("Error in creating volume")
 
         if wait:
             vol_id = volume['id']
-            for count in _utils._iterate_timeout(
+            for volumes in self._pollers['volumes'].iterate(
                     timeout,
                     "Timeout waiting for the volume to be available."):
-                volume = self.get_volume(vol_id)
+                volume = volumes.get(vol_id)
 
                 if not volume:
                     continue
@@ -5417,11 +6167,11 @@ class OpenStackCloud(
 
         self.list_volumes.invalidate(self)
         if wait:
-            for count in _utils._iterate_timeout(
+            for volumes in self._pollers['volumes'].iterate(
                     timeout,
                     "Timeout waiting for the volume to be deleted."):
 
-                if not self.get_volume(volume['id']):
+                if not volumes.get(volume['id']):
                     break
 
         return True
@@ -5505,11 +6255,11 @@ class OpenStackCloud(
                     volume=volume['id'], server=server['id'])))
 
         if wait:
-            for count in _utils._iterate_timeout(
+            for volumes in self._pollers['volumes'].iterate(
                     timeout,
                     "Timeout waiting for volume %s to detach." % volume['id']):
                 try:
-                    vol = self.get_volume(volume['id'])
+                    vol = volumes.get(volume['id'])
                 except Exception:
                     self.log.debug(
                         "Error getting volume info %s", volume['id'],
@@ -5573,12 +6323,11 @@ class OpenStackCloud(
                                                server_id=server['id']))
 
         if wait:
-            for count in _utils._iterate_timeout(
+            for volumes in self._pollers['volumes'].iterate(
                     timeout,
                     "Timeout waiting for volume %s to attach." % volume['id']):
                 try:
-                    self.list_volumes.invalidate(self)
-                    vol = self.get_volume(volume['id'])
+                    vol = volumes.get(volume['id'])
                 except Exception:
                     self.log.debug(
                         "Error getting volume info %s", volume['id'],
@@ -5903,10 +6652,12 @@ class OpenStackCloud(
     def _find_floating_network_by_router(self):
         """Find the network providing floating ips by looking at routers."""
 
-        if self._floating_network_by_router_lock.acquire(
-                not self._floating_network_by_router_run):
+        # Kept apart from the network topology, as creating or deleting a
+        # network doesn't change which network the routers are gatewayed to
+        if self._floating_network_by_router_run:
+            return self._floating_network_by_router
+        with self._floating_network_by_router_lock:
             if self._floating_network_by_router_run:
-                self._floating_network_by_router_lock.release()
                 return self._floating_network_by_router
             try:
                 for router in self.list_routers():
@@ -5917,7 +6668,6 @@ class OpenStackCloud(
                             self._floating_network_by_router = network_id
             finally:
                 self._floating_network_by_router_run = True
-                self._floating_network_by_router_lock.release()
         return self._floating_network_by_router
 
     def available_floating_ip(self, network=None, server=None):
@@ -5931,22 +6681,32 @@ class OpenStackCloud(
         :returns: a (normalized) structure with a floating IP address
                   description.
         """
+        return self._available_floating_ips(network=network, server=server)[0]
+
+    def _available_floating_ips(self, network=None, server=None):
+        """Get every available floating IP from a network or a pool.
+
+        Allocate a new one if there are none.
+
+        :param network: Name or ID of the network.
+        :param server: Server the IPs are for if known
+
+        :returns: a list of (normalized) floating IP address descriptions.
+        """
         if self._use_neutron_floating():
             try:
-                f_ips = self._normalize_floating_ips(
+                return self._normalize_floating_ips(
                     self._neutron_available_floating_ips(
                         network=network, server=server))
-                return f_ips[0]
             except exc.OpenStackCloudURINotFound as e:
                 self.log.debug(
                     "Something went wrong talking to neutron API: "
                     "'%(msg)s'. Trying with Nova.", {'msg': str(e)})
                 # Fall-through, trying with Nova
 
-        f_ips = self._normalize_floating_ips(
+        return self._normalize_floating_ips(
             self._nova_available_floating_ips(pool=network)
         )
-        return f_ips[0]
 
     def _get_floating_network_id(self):
         # Get first existing external IPv4 network
@@ -5989,11 +6749,9 @@ class OpenStackCloud(
             # Use given list to get first matching external network
             floating_network_id = None
             for net in network:
-                for ext_net in self.get_external_ipv4_floating_networks():
-                    if net in (ext_net['name'], ext_net['id']):
-                        floating_network_id = ext_net['id']
-                        break
-                if floating_network_id:
+                ext_nets = self._find_floating_networks(net)
+                if ext_nets:
+                    floating_network_id = ext_nets[0]['id']
                     break
 
             if floating_network_id is None:
@@ -6004,15 +6762,16 @@ class OpenStackCloud(
         else:
             floating_network_id = self._get_floating_network_id()
 
-        filters = {
-            'port': None,
-            'network': floating_network_id,
-            'location': {'project': {'id': project_id}},
-        }
+        pool = None
+        if project_id == self.current_project_id:
+            pool = self._get_floating_ip_pool(floating_network_id)
+        if pool is not None:
+            # The pool hands every IP out once, so concurrent callers don't
+            # end up with the same one
+            return [pool.take()]
 
-        floating_ips = self._list_floating_ips()
-        available_ips = _utils._filter_list(
-            floating_ips, name_or_id=None, filters=filters)
+        available_ips = self._unattached_floating_ips(
+            floating_network_id, project_id)
         if available_ips:
             return available_ips
 
@@ -6095,12 +6854,14 @@ class OpenStackCloud(
         """
         if self._use_neutron_floating():
             try:
-                return self._neutron_create_floating_ip(
+                f_ip = self._neutron_create_floating_ip(
                     network_name_or_id=network, server=server,
                     fixed_address=fixed_address,
                     nat_destination=nat_destination,
                     port=port,
                     wait=wait, timeout=timeout)
+                self._cache_upsert('floating_ips', f_ip)
+                return f_ip
             except exc.OpenStackCloudURINotFound as e:
                 self.log.debug(
                     "Something went wrong talking to neutron API: "
@@ -6117,6 +6878,7 @@ class OpenStackCloud(
         # Else, we are using Nova network
         f_ips = self._normalize_floating_ips(
             [self._nova_create_floating_ip(pool=network)])
+        self._cache_upsert('floating_ips', f_ips[0])
         return f_ips[0]
 
     def _submit_create_fip(self, kwargs):
@@ -6237,6 +6999,8 @@ class OpenStackCloud(
             result = self._delete_floating_ip(floating_ip_id)
 
             if (retry == 0) or not result:
+                if result:
+                    self._cache_evict('floating_ips', floating_ip_id)
                 return result
 
             # Wait for the cached floating ip list to be regenerated
@@ -6249,6 +7013,7 @@ class OpenStackCloud(
             # deleting the IP immediately. This is, of course, a bit absurd.
             f_ip = self.get_floating_ip(id=floating_ip_id)
             if not f_ip or f_ip['status'] == 'DOWN':
+                self._cache_evict('floating_ips', floating_ip_id)
                 return True
 
         raise exc.OpenStackCloudException(
@@ -6316,8 +7081,12 @@ class OpenStackCloud(
         """
         processed = []
         if self._use_neutron_floating():
+            # The IPs of the warm pools are unattached on purpose
+            pooled = set()
+            for pool in list(self._floating_ip_pools.values()):
+                pooled.update(pool.ids())
             for ip in self.list_floating_ips():
-                if not ip['attached']:
+                if not ip['attached'] and ip['id'] not in pooled:
                     processed.append(self.delete_floating_ip(
                         floating_ip_id=ip['id'], retry=retry))
         return all(processed) if processed else False
@@ -6397,23 +7166,18 @@ class OpenStackCloud(
         :param fixed_address: Fixed ip address of the port
         :param nat_destination: Name or ID of the network of the port.
         """
-        # If we are caching port lists, we may not find the port for
-        # our server if the list is old.  Try for at least 2 cache
-        # periods if that is the case.
-        if self._PORT_AGE:
-            timeout = self._PORT_AGE * 2
-        else:
-            timeout = None
-        for count in _utils._iterate_timeout(
-                timeout,
-                "Timeout waiting for port to show up in list",
-                wait=self._PORT_AGE):
+        ports = self._get_device_ports(server['id'])
+        if not ports and self._PORT_AGE:
+            # If we are caching port lists, we may not find the port for
+            # our server if the list is old. Ask neutron for it directly
+            # for at least 2 cache periods if that is the case.
             try:
-                port_filter = {'device_id': server['id']}
-                ports = self.search_ports(filters=port_filter)
-                break
+                ports = self._port_watcher.wait(
+                    server['id'], timeout=self._PORT_AGE * 2)
             except exc.OpenStackCloudTimeout:
                 ports = None
+            for port in ports or []:
+                self._cache_upsert('ports', port)
         if not ports:
             return (None, None)
         port = None
@@ -6615,7 +7379,9 @@ class OpenStackCloud(
 
         :returns: the updated server ``munch.Munch``
         """
+        pool = None
         if reuse:
+            pool = self._find_floating_ip_pool(network)
             f_ip = self.available_floating_ip(network=network)
         else:
             start_time = time.time()
@@ -6629,6 +7395,12 @@ class OpenStackCloud(
             time.sleep(self._SERVER_AGE)
             server = self.get_server(server.id)
 
+        if pool is not None:
+            server, f_ip = self._attach_pooled_ip(
+                pool, server, f_ip, fixed_address=fixed_address,
+                wait=wait, timeout=timeout, nat_destination=nat_destination)
+            return server
+
         # We run attach as a second call rather than in the create call
         # because there are code flows where we will not have an attached
         # FIP yet. However, even if it was attached in the create, we run
@@ -6695,7 +7467,9 @@ class OpenStackCloud(
     def _add_auto_ip(self, server, wait=False, timeout=60, reuse=True):
         skip_attach = False
         created = False
+        pool = None
         if reuse:
+            pool = self._find_floating_ip_pool()
             f_ip = self.available_floating_ip()
         else:
             start_time = time.time()
@@ -6714,6 +7488,10 @@ class OpenStackCloud(
             # FIP yet. However, even if it was attached in the create, we run
             # the attach function below to get back the server dict refreshed
             # with the FIP information.
+            if pool is not None:
+                server, f_ip = self._attach_pooled_ip(
+                    pool, server, f_ip, wait=wait, timeout=timeout)
+                return server
             return self._attach_ip_to_server(
                 server=server, floating_ip=f_ip, wait=wait, timeout=timeout,
                 skip_attach=skip_attach)
@@ -6758,6 +7536,121 @@ class OpenStackCloud(
                     server, wait=wait, timeout=timeout, reuse=reuse)
         return server
 
+    def _add_ips_to_servers(
+            self, servers, ip_pool=None, reuse=True, nat_destination=None,
+            wait=False, timeout=60, concurrency=10):
+        """Add a floating IP to each of many servers at once.
+
+        The available floating IPs are listed once and each is given to a
+        different server, and IPs are created for the servers left over.
+        With wait, the servers are then waited on by a single polling loop.
+
+        :param servers: The ACTIVE servers to add floating IPs to.
+        :param ip_pool: Name of the network or floating IP pool to get the
+                        addresses from. Without one, IPs are only added to
+                        the servers that need one, as with auto_ip.
+        :param reuse: Try to reuse existing ips. Defaults to True.
+        :param nat_destination: (optional) the name of the network of the
+                                ports to associate the floating ips with.
+        :param wait: (optional) Wait for the addresses to appear as assigned
+                     to the servers. Defaults to False.
+        :param timeout: (optional) Seconds to wait, defaults to 60.
+        :param concurrency: How many requests to make at once.
+
+        :returns: The servers, updated with their floating IPs.
+        """
+        if ip_pool:
+            needy = list(servers)
+        else:
+            needy = [
+                server for server in servers
+                if self._needs_floating_ip(server, nat_destination)]
+        if not needy:
+            return servers
+        spare = []
+        pool = None
+        if reuse:
+            pool = self._find_floating_ip_pool(ip_pool)
+            if pool is not None:
+                spare = pool.take_many(len(needy))
+            else:
+                spare = self._available_floating_ips(network=ip_pool)
+        created = {}
+
+        def _assign(server, f_ip):
+            if f_ip is None:
+                f_ip = self.create_floating_ip(
+                    network=ip_pool, server=server,
+                    nat_destination=nat_destination)
+                created[server['id']] = f_ip
+                # This only means anything for neutron, which attached the
+                # IP when creating it
+                server = self._attach_ip_to_server(
+                    server=server, floating_ip=f_ip, skip_attach=True,
+                    nat_destination=nat_destination)
+            elif pool is not None:
+                server, f_ip = self._attach_pooled_ip(
+                    pool, server, f_ip, nat_destination=nat_destination)
+            else:
+                server = self._attach_ip_to_server(
+                    server=server, floating_ip=f_ip, skip_attach=False,
+                    nat_destination=nat_destination)
+            return server, f_ip['floating_ip_address']
+
+        results = _utils._map_concurrently(
+            _assign, list(six.moves.zip_longest(needy, spare[:len(needy)])),
+            concurrency)
+        for result, exc_info in results:
+            if exc_info is not None:
+                six.reraise(*exc_info)
+        updated = dict((server['id'], server) for server, _ in (
+            result for result, _ in results))
+        if wait:
+            expected = dict(
+                (server['id'], address) for server, address in (
+                    result for result, _ in results))
+            try:
+                for poll in self._pollers['servers'].iterate(
+                        timeout,
+                        "Timeout waiting for the floating IPs to be"
+                        " attached.",
+                        wait=self._SERVER_AGE or 2):
+                    for server_id in list(expected):
+                        try:
+                            server = poll.get(server_id)
+                        except Exception:
+                            break
+                        if not server:
+                            continue
+                        server = self._expand_server(
+                            server, detailed=False, bare=False)
+                        ext_ip = meta.get_server_ip(
+                            server, ext_tag='floating', public=True)
+                        if ext_ip == expected[server_id]:
+                            updated[server_id] = server
+                            del expected[server_id]
+                    if not expected:
+                        break
+            except exc.OpenStackCloudTimeout:
+                if self._use_neutron_floating():
+                    # Don't leak the IPs created for servers they never
+                    # became active on
+                    for server_id in expected:
+                        if server_id not in created:
+                            continue
+                        f_ip = created[server_id]
+                        self.log.error(
+                            "Timeout waiting for floating IP to become"
+                            " active. Floating IP %(ip)s:%(id)s was created"
+                            " for server %(server)s but is being deleted due"
+                            " to activation failure.", {
+                                'ip': f_ip['floating_ip_address'],
+                                'id': f_ip['id'],
+                                'server': server_id})
+                        self.delete_floating_ip(f_ip['id'])
+                raise
+        return [updated.get(server['id'], server) for server in servers]
+
     def _needs_floating_ip(self, server, nat_destination):
         """Figure out if auto_ip should add a floating ip to this server.
 
@@ -7014,6 +7907,213 @@ class OpenStackCloud(
         :returns: A ``munch.Munch`` representing the created server.
         :raises: OpenStackCloudException on operation error.
         """
+        endpoint, server_json = self._make_server_request(
+            name, image=image, flavor=flavor, root_volume=root_volume,
+            terminate_volume=terminate_volume, network=network,
+            boot_from_volume=boot_from_volume, volume_size=volume_size,
+            boot_volume=boot_volume, volumes=volumes, group=group, **kwargs)
+        with _utils.shade_exceptions("Error in creating instance"):
+            data = self._compute_client.post(
+                endpoint, json=server_json)
+            server = self._get_and_munchify('server', data)
+            admin_pass = server.get('adminPass') or kwargs.get('admin_pass')
+            # The create response is not in list form, so just expire the
+            # cached server list rather than patching it.
+            self._cache_invalidate('servers')
+            if not wait:
+                # This is a direct get call to skip the list_servers
+                # cache which has absolutely no chance of containing the
+                # new server.
+                # Only do this if we're not going to wait for the server
+                # to complete booting, because the only reason we do it
+                # is to get a server record that is the return value from
+                # get/list rather than the return value of create. If we're
+                # going to do the wait loop below, this is a waste of a call
+                server = self.get_server_by_id(server.id)
+                if server.status == 'ERROR':
+                    raise exc.OpenStackCloudCreateException(
+                        resource='server', resource_id=server.id)
+
+        if wait:
+            server = self.wait_for_server(
+                server,
+                auto_ip=auto_ip, ips=ips, ip_pool=ip_pool,
+                reuse=reuse_ips, timeout=timeout,
+                nat_destination=nat_destination,
+            )
+
+        server.adminPass = admin_pass
+        return server
+
+    def create_servers(
+            self, specs, concurrency=10, wait=False, timeout=180,
+            auto_ip=True, ip_pool=None, reuse_ips=True,
+            nat_destination=None):
+        """Create many servers at once.
+
+        The images, flavors, networks and server groups the servers are
+        booted with are looked up once for all of them rather than once per
+        server, and the servers are booted with concurrent requests. With
+        wait, all of the servers are waited on by one polling loop, and
+        floating IPs are then added to them together.
+
+        :param specs: A list of dicts, each holding the arguments of
+                      ``create_server`` for one server, such as name, image,
+                      flavor, network or key_name. Waiting and floating IPs
+                      are set for all of the servers by the arguments below
+                      instead. A spec may also have a count, to boot that
+                      many servers with a single request using nova's
+                      min_count and max_count. Nova names each of those
+                      servers after the name in the spec and an index.
+        :param concurrency: How many requests to make at once.
+                            (defaults to 10)
+        :param wait: (optional) Wait for the servers to become ACTIVE and
+                     add floating IPs to them. Defaults to False.
+        :param timeout: (optional) Seconds to wait for all of the servers,
+                        defaults to 180. See the ``wait`` parameter.
+        :param auto_ip: Whether to take actions to find a routable IP for
+                        the servers. (defaults to True)
+        :param ip_pool: Name of the network or floating IP pool to get
+                        addresses from. (defaults to None)
+        :param reuse_ips: (optional) Whether to attempt to reuse pre-existing
+                                     floating ips should a floating IP be
+                                     needed (defaults to True)
+        :param nat_destination: Which network should created floating IPs
+                                be attached to, if it's not possible to
+                                infer from the cloud's configuration.
+                                (Optional, defaults to None)
+        :returns: A list of ``munch.Munch`` representing the created servers,
+                  in the order of specs.
+        :raises: OpenStackCloudException on operation error. If only some of
+                 the servers could be booted, the ids of the ones that were
+                 are in the ``server_ids`` item of its extra_data.
+        """
+        start_time = time.time()
+        resources = {}
+
+        def _resolve(kind, value, lookup):
+            if not value or isinstance(value, dict):
+                return value
+            if (kind, value) not in resources:
+                resource = lookup(value)
+                if not resource:
+                    raise exc.OpenStackCloudException(
+                        '{kind} {value} is not a valid {kind} in'
+                        ' {cloud}:{region}'.format(
+                            kind=kind, value=value,
+                            cloud=self.name, region=self.region_name))
+                resources[(kind, value)] = resource
+            return resources[(kind, value)]
+
+        get_flavor = functools.partial(self.get_flavor, get_extra=False)
+        requests = []
+        for spec in specs:
+            spec = dict(spec)
+            count = spec.pop('count', 1)
+            spec['image'] = _resolve(
+                'image', spec.get('image'), self.get_image)
+            spec['flavor'] = _resolve(
+                'flavor', spec.get('flavor'), get_flavor)
+            spec['group'] = _resolve(
+                'group', spec.get('group'), self.get_server_group)
+            network = spec.get('network')
+            if isinstance(network, list):
+                spec['network'] = [
+                    _resolve('network', net, self.get_network)
+                    for net in network]
+            else:
+                spec['network'] = _resolve(
+                    'network', network, self.get_network)
+            if count > 1:
+                spec['min_count'] = spec['max_count'] = count
+            endpoint, server_json = self._make_server_request(**spec)
+            if count > 1:
+                # Nova answers with just the reservation the servers are in
+                server_json['server']['return_reservation_id'] = True
+            requests.append((endpoint, server_json, spec.get('admin_pass')))
+
+        def _boot(endpoint, server_json, admin_pass):
+            with _utils.shade_exceptions("Error in creating instance"):
+                data = self._compute_client.post(endpoint, json=server_json)
+            if 'reservation_id' in data and 'server' not in data:
+                servers = []
+                for chunk in self._iter_servers(
+                        bare=True,
+                        filters={'reservation_id': data['reservation_id']}):
+                    servers.extend(chunk)
+            else:
+                servers = [self._get_and_munchify('server', data)]
+            for server in servers:
+                server['adminPass'] = server.get('adminPass') or admin_pass
+            return servers
+
+        results = _utils._map_concurrently(_boot, requests, concurrency)
+        # The create responses are not in list form, so just expire the
+        # cached server list rather than patching it.
+        self._cache_invalidate('servers')
+        servers = []
+        for booted, exc_info in results:
+            servers.extend(booted or [])
+        for booted, exc_info in results:
+            if exc_info is None:
+                continue
+            if not servers:
+                six.reraise(*exc_info)
+            raise exc.OpenStackCloudException(
+                "Error in creating instances: {error}".format(
+                    error=exc_info[1]),
+                extra_data=dict(
+                    server_ids=[server['id'] for server in servers]))
+
+        admin_passes = [server['adminPass'] for server in servers]
+        if wait:
+            servers = self._wait_for_servers(servers, timeout)
+            if auto_ip or ip_pool:
+                servers = self._add_ips_to_servers(
+                    servers, ip_pool=ip_pool, reuse=reuse_ips,
+                    nat_destination=nat_destination, wait=True,
+                    timeout=timeout - (time.time() - start_time),
+                    concurrency=concurrency)
+        else:
+            # One listing, rather than a get per server, to return the
+            # servers as get/list would
+            listed = self._poll_servers()
+            for index, server in enumerate(servers):
+                server_id = server['id']
+                server = listed.get(server_id)
+                if server is None:
+                    # The listing can be a snapshot from before the boot
+                    server = self.get_server_by_id(server_id, bare=True)
+                if server is None:
+                    raise exc.OpenStackCloudCreateException(
+                        resource='server', resource_id=server_id)
+                if server['status'] == 'ERROR':
+                    raise exc.OpenStackCloudCreateException(
+                        resource='server', resource_id=server['id'])
+                servers[index] = self._expand_server(
+                    server, detailed=False, bare=False)
+
+        for server, admin_pass in zip(servers, admin_passes):
+            server['adminPass'] = admin_pass
+        return servers
+
+    @_utils.valid_kwargs(
+        'meta', 'files', 'userdata',
+        'reservation_id', 'return_raw', 'min_count',
+        'max_count', 'security_groups', 'key_name',
+        'availability_zone', 'block_device_mapping',
+        'block_device_mapping_v2', 'nics', 'scheduler_hints',
+        'config_drive', 'admin_pass', 'disk_config')
+    def _make_server_request(
+            self, name, image=None, flavor=None,
+            root_volume=None, terminate_volume=False,
+            network=None, boot_from_volume=False, volume_size='50',
+            boot_volume=None, volumes=None, group=None,
+            **kwargs):
+        """Return the endpoint and body to boot a server with.
+
+        Takes the arguments of ``create_server`` that describe the server.
+        """
         # TODO(shade) Image is optional but flavor is not - yet flavor comes
         # after image in the argument list. Doh.
         if not flavor:
@@ -7046,7 +8146,10 @@ class OpenStackCloud(
 
         hints = kwargs.pop('scheduler_hints', {})
         if group:
-            group_obj = self.get_server_group(group)
+            if isinstance(group, dict):
+                group_obj = group
+            else:
+                group_obj = self.get_server_group(group)
             if not group_obj:
                 raise exc.OpenStackCloudException(
                     "Server Group {group} was requested but was not found"
@@ -7063,6 +8166,9 @@ class OpenStackCloud(
                 raise exc.OpenStackCloudException(
                     'nics parameter to create_server takes a list of dicts.'
                     ' Got: {nics}'.format(nics=kwargs['nics']))
+        if 'nics' in kwargs:
+            # The nics are consumed below, leave the caller's alone
+            kwargs['nics'] = [dict(nic) for nic in kwargs['nics']]
 
         if network and ('nics' not in kwargs or not kwargs['nics']):
             nics = []
@@ -7152,38 +8258,22 @@ class OpenStackCloud(
         # to add unit tests for this too.
         if 'block_device_mapping_v2' in kwargs:
             endpoint = '/os-volumes_boot'
-        with _utils.shade_exceptions("Error in creating instance"):
-            server_json = {'server': kwargs}
-            if hints:
-                server_json['os:scheduler_hints'] = hints
-            data = self._compute_client.post(
-                endpoint, json=server_json)
-            server = self._get_and_munchify('server', data)
-            admin_pass = server.get('adminPass') or kwargs.get('admin_pass')
-            if not wait:
-                # This is a direct get call to skip the list_servers
-                # cache which has absolutely no chance of containing the
-                # new server.
-                # Only do this if we're not going to wait for the server
-                # to complete booting, because the only reason we do it
-                # is to get a server record that is the return value from
-                # get/list rather than the return value of create. If we're
-                # going to do the wait loop below, this is a waste of a call
-                server = self.get_server_by_id(server.id)
-                if server.status == 'ERROR':
-                    raise exc.OpenStackCloudCreateException(
-                        resource='server', resource_id=server.id)
+        server_json = {'server': kwargs}
+        if hints:
+            server_json['os:scheduler_hints'] = hints
+        return endpoint, server_json
 
-        if wait:
-            server = self.wait_for_server(
-                server,
-                auto_ip=auto_ip, ips=ips, ip_pool=ip_pool,
-                reuse=reuse_ips, timeout=timeout,
-                nat_destination=nat_destination,
-            )
+    def _poll_servers(self):
+        return dict(
+            (server['id'], server) for server in self.list_servers(bare=True))
 
-        server.adminPass = admin_pass
-        return server
+    def _poll_images(self):
+        self.list_images.invalidate(self)
+        return dict((image['id'], image) for image in self.list_images())
+
+    def _poll_volumes(self):
+        self.list_volumes.invalidate(self)
+        return dict((volume['id'], volume) for volume in self.list_volumes())
 
     def wait_for_server(
             self, server, auto_ip=True, ips=None, ip_pool=None,
@@ -7196,20 +8286,30 @@ class OpenStackCloud(
         start_time = time.time()
 
         # There is no point in iterating faster than the list_servers cache
-        for count in _utils._iterate_timeout(
-                timeout,
-                timeout_message,
-                # if _SERVER_AGE is 0 we still want to wait a bit
-                # to be friendly with the server.
-                wait=self._SERVER_AGE or 2):
+        # if _SERVER_AGE is 0 we still want to wait a bit
+        # to be friendly with the server.
+        wait = self._SERVER_AGE or 2
+        if self.use_direct_get:
+            # Getting the one server is cheaper than listing all of them
+            rounds = _utils._iterate_timeout(
+                timeout, timeout_message, wait=wait)
+
+            def _get(count):
+                return self.get_server_by_id(server_id, bare=True)
+        else:
+            rounds = self._pollers['servers'].iterate(
+                timeout, timeout_message, wait=wait)
+
+            def _get(servers):
+                return servers.get(server_id)
+        for poll in rounds:
             try:
-                # Use the get_server call so that the list_servers
-                # cache can be leveraged
-                server = self.get_server(server_id)
+                server = _get(poll)
             except Exception:
                 continue
             if not server:
                 continue
+            server = self._expand_server(server, detailed=False, bare=False)
 
             # We have more work to do, but the details of that are
             # hidden from the user. So, calculate remaining timeout
@@ -7227,6 +8327,59 @@ class OpenStackCloud(
             if server is not None and server['status'] == 'ACTIVE':
                 return server
 
+    def _wait_for_servers(self, servers, timeout=180):
+        """Wait for many servers to reach ACTIVE status at once.
+
+        All of the servers are polled together by a single loop. A server
+        that fails doesn't stop the others from being waited on.
+
+        :returns: The ACTIVE servers, in the order of servers.
+        :raises: OpenStackCloudException if any of the servers failed, once
+                 the others are ACTIVE. The ids of the ACTIVE servers are in
+                 the ``server_ids`` item of its extra_data.
+        """
+        start_time = time.time()
+        pending = set(server['id'] for server in servers)
+        active = {}
+        failed = {}
+        for poll in self._pollers['servers'].iterate(
+                timeout,
+                "Timeout waiting for the servers to come up.",
+                wait=self._SERVER_AGE or 2):
+            for server_id in list(pending):
+                try:
+                    server = poll.get(server_id)
+                except Exception:
+                    break
+                if not server:
+                    continue
+                try:
+                    server = self.get_active_server(
+                        self._expand_server(
+                            server, detailed=False, bare=False),
+                        auto_ip=False, wait=True,
+                        timeout=timeout - int(time.time() - start_time))
+                except exc.OpenStackCloudException as e:
+                    failed[server_id] = e
+                    pending.discard(server_id)
+                    continue
+                if server is not None:
+                    active[server_id] = server
+                    pending.discard(server_id)
+            if not pending:
+                break
+        if failed:
+            raise exc.OpenStackCloudException(
+                "Error in creating servers: {errors}".format(
+                    errors='; '.join(
+                        '{id}: {error}'.format(
+                            id=server_id, error=error.orig_message)
+                        for server_id, error in sorted(failed.items()))),
+                extra_data=dict(server_ids=[
+                    server['id'] for server in servers
+                    if server['id'] in active]))
+        return [active[server['id']] for server in servers]
+
     def get_active_server(
             self, server, auto_ip=True, ips=None, ip_pool=None,
             reuse=True, wait=False, timeout=180, nat_destination=None):
@@ -7384,6 +8537,182 @@ class OpenStackCloud(
             server, wait=wait, timeout=timeout, delete_ips=delete_ips,
             delete_ip_retry=delete_ip_retry)
 
+    def delete_servers(
+            self, names_or_ids, wait=True, timeout=180, delete_ips=True,
+            delete_ip_retry=1, concurrency=10):
+        """Delete many server instances at once.
+
+        The servers and their floating IPs are found with one listing of
+        each rather than with lookups per server, the deletes are made
+        concurrently, and all of the servers are waited on by a single
+        polling loop.
+
+        :param names_or_ids: A list of names or IDs of servers to delete.
+        :param bool wait: If true, waits for the servers to be deleted.
+        :param int timeout: Seconds to wait for all of the servers to be
+            deleted.
+        :param bool delete_ips: If true, deletes any floating IPs
+            associated with the instances.
+        :param int delete_ip_retry: Number of times to retry deleting
+            any floating ips, should the first try be unsuccessful.
+        :param int concurrency: How many requests to make at once.
+
+        :returns: A list holding, in the order of names_or_ids, True for
+            each server that was deleted and False for each one that does
+            not exist.
+
+        :raises: OpenStackCloudException on operation error. Servers whose
+            floating IPs could not be deleted are left alone, but the other
+            servers are still deleted. The ids of the servers that were not
+            deleted are in the ``server_ids`` item of its extra_data.
+        """
+        by_id = {}
+        by_name = {}
+        for server in self.list_servers(bare=True):
+            by_id[server['id']] = server
+            by_name.setdefault(server['name'], []).append(server)
+        targets = []
+        for name_or_id in names_or_ids:
+            server = by_id.get(name_or_id)
+            if server is None:
+                matches = by_name.get(name_or_id, [])
+                if len(matches) > 1:
+                    raise exc.OpenStackCloudException(
+                        "Multiple matches found for %s" % name_or_id)
+                server = matches[0] if matches else None
+            targets.append(server)
+        servers = collections.OrderedDict(
+            (server['id'], server) for server in targets if server)
+
+        errors = {}
+        if delete_ips and servers and self._has_floating_ips():
+            errors.update(self._delete_servers_floating_ips(
+                list(servers.values()), delete_ip_retry, concurrency))
+
+        def _delete(server_id):
+            try:
+                self._compute_client.delete(
+                    '/servers/{id}'.format(id=server_id),
+                    error_message="Error in deleting server")
+            except exc.OpenStackCloudURINotFound:
+                return False
+            return True
+
+        server_ids = [
+            server_id for server_id in servers if server_id not in errors]
+        results = _utils._map_concurrently(
+            _delete, [(server_id,) for server_id in server_ids], concurrency)
+        deleted = set()
+        for server_id, (result, exc_info) in zip(server_ids, results):
+            if exc_info is not None:
+                errors[server_id] = exc_info[1]
+            elif result:
+                deleted.add(server_id)
+
+        if wait and deleted:
+            pending = set(deleted)
+            for servers_round in self._pollers['servers'].iterate(
+                    timeout,
+                    "Timed out waiting for servers to get deleted.",
+                    # if _SERVER_AGE is 0 we still want to wait a bit
+                    # to be friendly with the server.
+                    wait=self._SERVER_AGE or 2):
+                with _utils.shade_exceptions("Error in deleting servers"):
+                    pending = set(
+                        server_id for server_id in pending
+                        if servers_round.get(server_id))
+                if not pending:
+                    break
+            # Deleting servers changes the state of volumes attached to
+            # them or booted from
+            if self.cache_enabled and self.has_service('volume'):
+                self.list_volumes.invalidate(self)
+            # The servers are gone, so drop them from the cached server list
+            self._cache_evict_all('servers', deleted)
+
+        if errors:
+            raise exc.OpenStackCloudException(
+                "Error deleting {count} of the servers: {error}".format(
+                    count=len(errors), error=list(errors.values())[0]),
+                extra_data=dict(server_ids=list(errors)))
+        return [
+            bool(server) and server['id'] in deleted for server in targets]
+
+    def _delete_servers_floating_ips(
+            self, servers, delete_ip_retry, concurrency):
+        """Delete the floating IPs of many servers at once.
+
+        The floating IPs are found with one listing, deleted concurrently,
+        and checked for with one listing before each retry.
+
+        :returns: A dict of the ids of the servers whose floating IPs could
+                  not be deleted, to the error.
+        """
+        addresses = {}
+        for server in servers:
+            for fip in meta.find_nova_interfaces(
+                    server['addresses'], ext_tag='floating'):
+                addresses[fip['addr']] = server['id']
+        if not addresses:
+            return {}
+        try:
+            floating_ips = dict(
+                (ip['id'], ip) for ip in self._list_floating_ips()
+                if ip['floating_ip_address'] in addresses)
+        except exc.OpenStackCloudURINotFound:
+            # We're deleting. If they don't exist - awesome
+            # NOTE(mordred) If the cloud is a nova FIP cloud but
+            #               floating_ip_source is set to neutron, this
+            #               can lead to a FIP leak.
+            return {}
+
+        errors = {}
+        deleted = []
+        pending = list(floating_ips)
+        for count in range(0, max(0, delete_ip_retry) + 1):
+            results = _utils._map_concurrently(
+                self._delete_floating_ip,
+                [(floating_ip_id,) for floating_ip_id in pending],
+                concurrency)
+            attempted = []
+            for floating_ip_id, (result, exc_info) in zip(pending, results):
+                if exc_info is not None:
+                    ip = floating_ips[floating_ip_id]
+                    errors[addresses[ip['floating_ip_address']]] = (
+                        exc_info[1])
+                elif result:
+                    attempted.append(floating_ip_id)
+            if delete_ip_retry == 0 or not attempted:
+                deleted.extend(attempted)
+                pending = []
+                break
+            # neutron sometimes returns success when deleting a floating
+            # ip. That's awesome. SO - verify that the deletes actually
+            # worked. Some clouds will set the status to DOWN rather than
+            # deleting the IP immediately.
+            remaining = dict(
+                (ip['id'], ip) for ip in self._list_floating_ips())
+            pending = []
+            for floating_ip_id in attempted:
+                ip = remaining.get(floating_ip_id)
+                if ip and ip['status'] != 'DOWN':
+                    pending.append(floating_ip_id)
+                else:
+                    deleted.append(floating_ip_id)
+            if not pending:
+                break
+
+        for floating_ip_id in pending:
+            ip = floating_ips[floating_ip_id]
+            server_id = addresses[ip['floating_ip_address']]
+            errors[server_id] = exc.OpenStackCloudException(
+                "Tried to delete floating ip {floating_ip}"
+                " associated with server {id} but there was"
+                " an error deleting it. Not deleting server.".format(
+                    floating_ip=ip['floating_ip_address'], id=server_id))
+        self._cache_evict_all('floating_ips', deleted)
+        return errors
+
     def _delete_server_floating_ips(self, server, delete_ip_retry):
         # Does the server have floating ips in its
         # addresses dict? If not, skip this.
@@ -7432,6 +8761,7 @@ class OpenStackCloud(
         if not wait:
             return True
 
+        server_id = server['id']
         # If the server has volume attachments, or if it has booted
         # from volume, deleting it will change volume state so we will
         # need to invalidate the cache. Avoid the extra API call if
@@ -7442,23 +8772,21 @@ class OpenStackCloud(
                 and self.get_volumes(server)):
             reset_volume_cache = True
 
-        for count in _utils._iterate_timeout(
+        for servers in self._pollers['servers'].iterate(
                 timeout,
                 "Timed out waiting for server to get deleted.",
                 # if _SERVER_AGE is 0 we still want to wait a bit
                 # to be friendly with the server.
                 wait=self._SERVER_AGE or 2):
             with _utils.shade_exceptions("Error in deleting server"):
-                server = self.get_server(server['id'], bare=True)
-                if not server:
+                if not servers.get(server_id):
                     break
 
         if reset_volume_cache:
             self.list_volumes.invalidate(self)
 
-        # Reset the list servers cache time so that the next list server
-        # call gets a new list
-        self._servers_time = self._servers_time - self._SERVER_AGE
+        # The server is gone, so drop it from the cached server list
+        self._cache_evict('servers', server_id)
         return True
 
     @_utils.valid_kwargs(
@@ -7491,6 +8819,7 @@ class OpenStackCloud(
             json={'server': kwargs})
         server = self._normalize_server(
             self._get_and_munchify('server', data))
+        self._cache_invalidate('servers')
         return self._expand_server(server, bare=bare, detailed=detailed)
 
     def create_server_group(self, name, policies):
@@ -8191,6 +9520,74 @@ class OpenStackCloud(
             raise exc.OpenStackCloudException(
                 "Network %s not found." % network_name_or_id)
 
+        subnet = self._make_subnet_body(
+            network['id'], cidr=cidr, ip_version=ip_version,
+            enable_dhcp=enable_dhcp, subnet_name=subnet_name,
+            tenant_id=tenant_id, allocation_pools=allocation_pools,
+            gateway_ip=gateway_ip, disable_gateway_ip=disable_gateway_ip,
+            dns_nameservers=dns_nameservers, host_routes=host_routes,
+            ipv6_ra_mode=ipv6_ra_mode, ipv6_address_mode=ipv6_address_mode,
+            use_default_subnetpool=use_default_subnetpool)
+
+        data = self._network_client.post("/subnets.json",
+                                         json={"subnet": subnet})
+
+        subnet = self._get_and_munchify('subnet', data)
+        self._cache_upsert('subnets', subnet)
+        return subnet
+
+    def create_subnets(self, subnets, batch_size=None, concurrency=10):
+        """Create many subnets at once.
+
+        The networks of the subnets are looked up once for all of them, and
+        the subnets are created with one request per batch of them, see
+        ``create_ports``.
+
+        :param subnets: A list of dicts, each holding the arguments of
+                        ``create_subnet`` for one subnet, such as
+                        network_name_or_id and cidr.
+        :param batch_size: (optional) How many subnets to create with one
+                           request. (defaults to 100)
+        :param concurrency: How many requests to make at once.
+                            (defaults to 10)
+
+        :returns: A list of the new subnet objects, in the order of subnets.
+        :raises: OpenStackCloudException on operation error. If only some of
+                 the subnets could be created, the ids of the ones that were
+                 are in the ``subnet_ids`` item of its extra_data.
+        """
+        networks = {}
+        bodies = []
+        for spec in subnets:
+            spec = dict(spec)
+            network_name_or_id = spec.pop('network_name_or_id')
+            tenant_id = spec.get('tenant_id')
+            key = (network_name_or_id, tenant_id)
+            if key not in networks:
+                if tenant_id is not None:
+                    filters = {'tenant_id': tenant_id}
+                else:
+                    filters = None
+                networks[key] = self.get_network(network_name_or_id, filters)
+            if not networks[key]:
+                raise exc.OpenStackCloudException(
+                    "Network %s not found." % network_name_or_id)
+            bodies.append(self._make_subnet_body(networks[key]['id'], **spec))
+        return self._neutron_bulk_create(
+            '/subnets.json', 'subnet', bodies,
+            batch_size=batch_size, concurrency=concurrency)
+
+    def _make_subnet_body(self, network_id, cidr=None, ip_version=4,
+                          enable_dhcp=False, subnet_name=None, tenant_id=None,
+                          allocation_pools=None,
+                          gateway_ip=None, disable_gateway_ip=False,
+                          dns_nameservers=None, host_routes=None,
+                          ipv6_ra_mode=None, ipv6_address_mode=None,
+                          use_default_subnetpool=False):
+        """Return the body to create a subnet on network_id with.
+
+        Takes the arguments of ``create_subnet``.
+        """
         if disable_gateway_ip and gateway_ip:
             raise exc.OpenStackCloudException(
                 'arg:disable_gateway_ip is not allowed with arg:gateway_ip')
@@ -8215,7 +9612,7 @@ class OpenStackCloud(
         # The body of the neutron message for the subnet we wish to create.
         # This includes attributes that are required or have defaults.
         subnet = {
-            'network_id': network['id'],
+            'network_id': network_id,
             'ip_version': ip_version,
             'enable_dhcp': enable_dhcp
         }
@@ -8243,11 +9640,7 @@ class OpenStackCloud(
             subnet['ipv6_address_mode'] = ipv6_address_mode
         if use_default_subnetpool:
             subnet['use_default_subnetpool'] = True
-
-        data = self._network_client.post("/subnets.json",
-                                         json={"subnet": subnet})
-
-        return self._get_and_munchify('subnet', data)
+        return subnet
 
     def delete_firewall_rule(self, name_or_id):
         """Delete a firewall rule.
@@ -8291,6 +9684,7 @@ class OpenStackCloud(
 
         self._network_client.delete(
             "/subnets/{subnet_id}.json".format(subnet_id=subnet['id']))
+        self._cache_evict('subnets', subnet['id'])
         return True
 
     def update_subnet(self, name_or_id, subnet_name=None, enable_dhcp=None,
@@ -8378,7 +9772,9 @@ class OpenStackCloud(
         data = self._network_client.put(
             "/subnets/{subnet_id}.json".format(subnet_id=curr_subnet['id']),
             json={"subnet": subnet})
-        return self._get_and_munchify('subnet', data)
+        subnet = self._get_and_munchify('subnet', data)
+        self._cache_upsert('subnets', subnet)
+        return subnet
 
     @_utils.valid_kwargs('name', 'admin_state_up', 'mac_address', 'fixed_ips',
                          'subnet_id', 'ip_address', 'security_groups',
@@ -8437,13 +9833,52 @@ class OpenStackCloud(
 
         :raises: ``OpenStackCloudException`` on operation error.
         """
-        kwargs['network_id'] = network_id
+        port = self._make_port_body(network_id, **kwargs)
 
         data = self._network_client.post(
-            "/ports.json", json={'port': kwargs},
+            "/ports.json", json={'port': port},
             error_message="Error creating port for network {0}".format(
                 network_id))
-        return self._get_and_munchify('port', data)
+        port = self._get_and_munchify('port', data)
+        self._cache_upsert('ports', port)
+        return port
+
+    def create_ports(self, ports, batch_size=None, concurrency=10):
+        """Create many ports at once.
+
+        Neutron creates every port of a batch with a single request, rather
+        than one request per port. If the cloud doesn't allow that, the
+        ports are created with concurrent requests instead.
+
+        :param ports: A list of dicts, each holding the arguments of
+                      ``create_port`` for one port, including network_id.
+        :param batch_size: (optional) How many ports to create with one
+                           request. (defaults to 100)
+        :param concurrency: How many requests to make at once.
+                            (defaults to 10)
+
+        :returns: A list of ``munch.Munch`` describing the created ports, in
+                  the order of ports.
+        :raises: OpenStackCloudException on operation error. If only some of
+                 the ports could be created, the ids of the ones that were
+                 are in the ``port_ids`` item of its extra_data.
+        """
+        bodies = [self._make_port_body(**port) for port in ports]
+        return self._neutron_bulk_create(
+            '/ports.json', 'port', bodies,
+            batch_size=batch_size, concurrency=concurrency)
+
+    @_utils.valid_kwargs('name', 'admin_state_up', 'mac_address', 'fixed_ips',
+                         'subnet_id', 'ip_address', 'security_groups',
+                         'allowed_address_pairs', 'extra_dhcp_opts',
+                         'device_owner', 'device_id')
+    def _make_port_body(self, network_id, **kwargs):
+        """Return the body to create a port with.
+
+        Takes the arguments of ``create_port``.
+        """
+        kwargs['network_id'] = network_id
+        return kwargs
 
     @_utils.valid_kwargs('name', 'admin_state_up', 'fixed_ips',
                          'security_groups', 'allowed_address_pairs',
@@ -8507,7 +9942,9 @@ class OpenStackCloud(
             "/ports/{port_id}.json".format(port_id=port['id']),
             json={"port": kwargs},
             error_message="Error updating port {0}".format(name_or_id))
-        return self._get_and_munchify('port', data)
+        port = self._get_and_munchify('port', data)
+        self._cache_upsert('ports', port)
+        return port
 
     def delete_port(self, name_or_id):
         """Delete a port
@@ -8526,6 +9963,7 @@ class OpenStackCloud(
         self._network_client.delete(
             "/ports/{port_id}.json".format(port_id=port['id']),
             error_message="Error deleting port {0}".format(name_or_id))
+        self._cache_evict('ports', port['id'])
         return True
 
     def create_security_group(self, name, description, project_id=None):
@@ -8565,8 +10003,10 @@ class OpenStackCloud(
         else:
             data = self._compute_client.post(
                 '/os-security-groups', json=security_group_json)
-        return self._normalize_secgroup(
+        secgroup = self._normalize_secgroup(
             self._get_and_munchify('security_group', data))
+        self._cache_upsert('security_groups', secgroup)
+        return secgroup
 
     def delete_security_group(self, name_or_id):
         """Delete a security group
@@ -8599,12 +10039,11 @@ class OpenStackCloud(
                 error_message="Error deleting security group {0}".format(
                     name_or_id)
             )
-            return True
-
         else:
             self._compute_client.delete(
                 '/os-security-groups/{id}'.format(id=secgroup['id']))
-            return True
+        self._cache_evict('security_groups', secgroup['id'])
+        return True
 
     @_utils.valid_kwargs('name', 'description')
     def update_security_group(self, name_or_id, **kwargs):
@@ -8642,8 +10081,10 @@ class OpenStackCloud(
             data = self._compute_client.put(
                 '/os-security-groups/{id}'.format(id=group['id']),
                 json={'security-group': kwargs})
-        return self._normalize_secgroup(
+        secgroup = self._normalize_secgroup(
             self._get_and_munchify('security_group', data))
+        self._cache_upsert('security_groups', secgroup)
+        return secgroup
 
     def create_security_group_rule(self,
                                    secgroup_name_or_id,
@@ -8711,11 +10152,112 @@ class OpenStackCloud(
             raise exc.OpenStackCloudException(
                 "Security group %s not found." % secgroup_name_or_id)
 
+        rule = self._make_security_group_rule_body(
+            secgroup['id'], port_range_min=port_range_min,
+            port_range_max=port_range_max, protocol=protocol,
+            remote_ip_prefix=remote_ip_prefix,
+            remote_group_id=remote_group_id, direction=direction,
+            ethertype=ethertype, project_id=project_id)
+        if self._use_neutron_secgroups():
+            data = self._network_client.post(
+                '/security-group-rules.json',
+                json={'security_group_rule': rule},
+                error_message="Error creating security group rule")
+        else:
+            data = self._compute_client.post(
+                '/os-security-group-rules',
+                json={'security_group_rule': rule})
+        # Rules are part of the cached group records, which we can't patch
+        # without refetching the group.
+        self._cache_invalidate('security_groups')
+        return self._normalize_secgroup_rule(
+            self._get_and_munchify('security_group_rule', data))
+
+    def create_security_group_rules(
+            self, secgroup_name_or_id, rules, batch_size=None,
+            concurrency=10):
+        """Create many rules in a security group at once.
+
+        The security group is looked up once for all of the rules. With
+        neutron, the rules are created with one request per batch of them,
+        see ``create_ports``. Nova rules are created with concurrent
+        requests.
+
+        :param string secgroup_name_or_id:
+            The security group name or ID to add the rules to. If a
+            non-unique group name is given, an exception is raised.
+        :param rules: A list of dicts, each holding the arguments of
+                      ``create_security_group_rule`` for one rule, such as
+                      protocol, port_range_min and port_range_max.
+        :param batch_size: (optional) How many rules to create with one
+                           neutron request. (defaults to 100)
+        :param concurrency: How many requests to make at once.
+                            (defaults to 10)
+
+        :returns: A list of ``munch.Munch`` representing the new security
+                  group rules, in the order of rules.
+        :raises: OpenStackCloudException on operation error. If only some of
+                 the rules could be created, the ids of the ones that were
+                 are in the ``security_group_rule_ids`` item of its
+                 extra_data.
+        """
+        # Security groups not supported
+        if not self._has_secgroups():
+            raise exc.OpenStackCloudUnavailableFeature(
+                "Unavailable feature: security groups"
+            )
+
+        secgroup = self.get_security_group(secgroup_name_or_id)
+        if not secgroup:
+            raise exc.OpenStackCloudException(
+                "Security group %s not found." % secgroup_name_or_id)
+        return self._create_security_group_rules(
+            secgroup, rules, batch_size=batch_size, concurrency=concurrency)
+
+    def _create_security_group_rules(
+            self, secgroup, rules, batch_size=None, concurrency=10):
+        bodies = [
+            self._make_security_group_rule_body(secgroup['id'], **rule)
+            for rule in rules]
+        try:
+            if self._use_neutron_secgroups():
+                created = self._neutron_bulk_create(
+                    '/security-group-rules.json', 'security_group_rule',
+                    bodies, batch_size=batch_size, concurrency=concurrency)
+            else:
+                def _create(body):
+                    data = self._compute_client.post(
+                        '/os-security-group-rules',
+                        json={'security_group_rule': body})
+                    return [self._get_and_munchify(
+                        'security_group_rule', data)]
+
+                created = self._collect_created(
+                    _utils._map_concurrently(
+                        _create, [(body,) for body in bodies], concurrency),
+                    'security_group_rule',
+                    "Error creating security group rules")
+        finally:
+            # Rules are part of the cached group records, which we can't
+            # patch without refetching the group.
+            self._cache_invalidate('security_groups')
+        return self._normalize_secgroup_rules(created)
+
+    def _make_security_group_rule_body(
+            self, secgroup_id, port_range_min=None, port_range_max=None,
+            protocol=None, remote_ip_prefix=None, remote_group_id=None,
+            direction='ingress', ethertype='IPv4', project_id=None):
+        """Return the body to create a security group rule with.
+
+        Takes the arguments of ``create_security_group_rule``, and returns
+        the body neutron or nova wants, depending on which of them the cloud
+        uses for security groups.
+        """
         if self._use_neutron_secgroups():
             # NOTE: Nova accepts -1 port numbers, but Neutron accepts None
             # as the equivalent value.
             rule_def = {
-                'security_group_id': secgroup['id'],
+                'security_group_id': secgroup_id,
                 'port_range_min':
                     None if port_range_min == -1 else port_range_min,
                 'port_range_max':
@@ -8728,57 +10270,48 @@ class OpenStackCloud(
             }
             if project_id is not None:
                 rule_def['tenant_id'] = project_id
+            return rule_def
 
-            data = self._network_client.post(
-                '/security-group-rules.json',
-                json={'security_group_rule': rule_def},
-                error_message="Error creating security group rule")
-        else:
-            # NOTE: Neutron accepts None for protocol. Nova does not.
-            if protocol is None:
-                raise exc.OpenStackCloudException('Protocol must be specified')
+        # NOTE: Neutron accepts None for protocol. Nova does not.
+        if protocol is None:
+            raise exc.OpenStackCloudException('Protocol must be specified')
 
-            if direction == 'egress':
-                self.log.debug(
-                    'Rule creation failed: Nova does not support egress rules'
-                )
-                raise exc.OpenStackCloudException(
-                    'No support for egress rules')
-
-            # NOTE: Neutron accepts None for ports, but Nova requires -1
-            # as the equivalent value for ICMP.
-            #
-            # For TCP/UDP, if both are None, Neutron allows this and Nova
-            # represents this as all ports (1-65535). Nova does not accept
-            # None values, so to hide this difference, we will automatically
-            # convert to the full port range. If only a single port value is
-            # specified, it will error as normal.
-            if protocol == 'icmp':
-                if port_range_min is None:
-                    port_range_min = -1
-                if port_range_max is None:
-                    port_range_max = -1
-            elif protocol in ['tcp', 'udp']:
-                if port_range_min is None and port_range_max is None:
-                    port_range_min = 1
-                    port_range_max = 65535
-
-            security_group_rule_dict = dict(security_group_rule=dict(
-                parent_group_id=secgroup['id'],
-                ip_protocol=protocol,
-                from_port=port_range_min,
-                to_port=port_range_max,
-                cidr=remote_ip_prefix,
-                group_id=remote_group_id
-            ))
-            if project_id is not None:
-                security_group_rule_dict[
-                    'security_group_rule']['tenant_id'] = project_id
-            data = self._compute_client.post(
-                '/os-security-group-rules', json=security_group_rule_dict
+        if direction == 'egress':
+            self.log.debug(
+                'Rule creation failed: Nova does not support egress rules'
             )
-        return self._normalize_secgroup_rule(
-            self._get_and_munchify('security_group_rule', data))
+            raise exc.OpenStackCloudException(
+                'No support for egress rules')
+
+        # NOTE: Neutron accepts None for ports, but Nova requires -1
+        # as the equivalent value for ICMP.
+        #
+        # For TCP/UDP, if both are None, Neutron allows this and Nova
+        # represents this as all ports (1-65535). Nova does not accept
+        # None values, so to hide this difference, we will automatically
+        # convert to the full port range. If only a single port value is
+        # specified, it will error as normal.
+        if protocol == 'icmp':
+            if port_range_min is None:
+                port_range_min = -1
+            if port_range_max is None:
+                port_range_max = -1
+        elif protocol in ['tcp', 'udp']:
+            if port_range_min is None and port_range_max is None:
+                port_range_min = 1
+                port_range_max = 65535
+
+        rule_def = dict(
+            parent_group_id=secgroup_id,
+            ip_protocol=protocol,
+            from_port=port_range_min,
+            to_port=port_range_max,
+            cidr=remote_ip_prefix,
+            group_id=remote_group_id
+        )
+        if project_id is not None:
+            rule_def['tenant_id'] = project_id
+        return rule_def
 
     def delete_security_group_rule(self, rule_id):
         """Delete a security group rule
@@ -8805,12 +10338,134 @@ class OpenStackCloud(
                                   "{0}".format(rule_id))
             except exc.OpenStackCloudResourceNotFound:
                 return False
-            return True
-
         else:
             self._compute_client.delete(
                 '/os-security-group-rules/{id}'.format(id=rule_id))
-            return True
+        self._cache_invalidate('security_groups')
+        return True
+
+    def ensure_security_group(
+            self, name, rules, description='', project_id=None,
+            concurrency=10):
+        """Make a security group have exactly the rules given.
+
+        The security group is created if it doesn't exist. Its current rules
+        are read with the group, compared with the rules given, and only the
+        differences are applied: the missing rules are created, in batches
+        with neutron, and then the rules that weren't given are deleted,
+        concurrently. Running it again with the same rules changes nothing.
+
+        Rules are compared on direction, ethertype, protocol, ports, remote
+        IP prefix and remote group. Nova doesn't return the id of the remote
+        group of a rule, so with nova, rules only differing by their remote
+        group are the same rule.
+
+        :param string name: The name of the security group.
+        :param rules: A list of dicts, each holding the arguments of
+                      ``create_security_group_rule`` for one rule.
+        :param string description: Describes the security group, if it has
+                                   to be created.
+        :param string project_id: (optional) The project the security group
+                                  is in (admin-only).
+        :param concurrency: How many requests to make at once.
+                            (defaults to 10)
+
+        :returns: A ``munch.Munch`` representing the security group, with
+                  the rules it now has.
+
+        :raises: OpenStackCloudException on operation error.
+        :raises: OpenStackCloudUnavailableFeature if security groups are
+                 not supported on this cloud.
+        """
+        # Security groups not supported
+        if not self._has_secgroups():
+            raise exc.OpenStackCloudUnavailableFeature(
+                "Unavailable feature: security groups"
+            )
+
+        filters = None
+        if project_id is not None and self._use_neutron_secgroups():
+            filters = {'tenant_id': project_id}
+        secgroup = self.get_security_group(name, filters=filters)
+        if not secgroup:
+            secgroup = self.create_security_group(
+                name, description, project_id=project_id)
+
+        current = self._normalize_secgroup_rules(
+            secgroup.get('security_group_rules', secgroup.get('rules', [])))
+        current_keys = {}
+        extra = []
+        for rule in current:
+            key = self._secgroup_rule_key(rule)
+            if key in current_keys:
+                # A duplicate of a rule we keep or delete anyway
+                extra.append(rule)
+            else:
+                current_keys[key] = rule
+
+        missing = []
+        wanted = set()
+        for rule in rules:
+            if project_id is not None:
+                rule = dict(rule, project_id=project_id)
+            key = self._secgroup_rule_key(self._normalize_secgroup_rule(
+                self._make_secgroup_rule_record(
+                    self._make_security_group_rule_body(
+                        secgroup['id'], **rule))))
+            if key in wanted:
+                continue
+            wanted.add(key)
+            if key not in current_keys:
+                missing.append(rule)
+        unwanted = extra + [
+            rule for key, rule in current_keys.items() if key not in wanted]
+
+        created = []
+        if missing:
+            created = self._create_security_group_rules(
+                secgroup, missing, concurrency=concurrency)
+        if unwanted:
+            results = _utils._map_concurrently(
+                self.delete_security_group_rule,
+                [(rule['id'],) for rule in unwanted], concurrency)
+            for result, exc_info in results:
+                if exc_info is not None:
+                    raise exc.OpenStackCloudException(
+                        "Error deleting rules of security group {name}:"
+                        " {error}".format(name=name, error=exc_info[1]))
+
+        unwanted_ids = set(rule['id'] for rule in unwanted)
+        # The group may be a cached record, which isn't ours to change
+        secgroup = secgroup.copy()
+        secgroup['security_group_rules'] = [
+            rule for rule in current
+            if rule['id'] not in unwanted_ids] + created
+        return secgroup
+
+    def _make_secgroup_rule_record(self, body):
+        """Return the rule a body would create, as the cloud lists it."""
+        if self._use_neutron_secgroups():
+            return dict(body, id=None)
+        # Nova lists the cidr of a rule as its ip_range
+        record = dict(body, id=None)
+        record['ip_range'] = {}
+        cidr = record.pop('cidr', None)
+        if cidr:
+            record['ip_range']['cidr'] = cidr
+        record.pop('group_id', None)
+        return record
+
+    def _secgroup_rule_key(self, rule):
+        """Return what a normalized rule is compared on."""
+        ports = []
+        for port in (rule['port_range_min'], rule['port_range_max']):
+            ports.append(None if port is None else int(port))
+        protocol = rule['protocol']
+        return (
+            rule['direction'], rule['ethertype'],
+            protocol.lower() if protocol else protocol,
+            ports[0], ports[1], rule['remote_ip_prefix'],
+            rule['remote_group_id'])
 
     def list_zones(self):
         """List all available zones.
@@ -8886,7 +10541,9 @@ class OpenStackCloud(
         data = self._dns_client.post(
             "/zones", json=zone,
             error_message="Unable to create zone {name}".format(name=name))
-        return self._get_and_munchify(key=None, data=data)
+        zone = self._get_and_munchify(key=None, data=data)
+        self._cache_upsert('zones', zone)
+        return zone
 
     @_utils.valid_kwargs('email', 'description', 'ttl', 'masters')
     def update_zone(self, name_or_id, **kwargs):
@@ -8912,7 +10569,9 @@ class OpenStackCloud(
         data = self._dns_client.patch(
             "/zones/{zone_id}".format(zone_id=zone['id']), json=kwargs,
             error_message="Error updating zone {0}".format(name_or_id))
-        return self._get_and_munchify(key=None, data=data)
+        zone = self._get_and_munchify(key=None, data=data)
+        self._cache_upsert('zones', zone)
+        return zone
 
     def delete_zone(self, name_or_id):
         """Delete a zone.
@@ -8929,10 +10588,10 @@ class OpenStackCloud(
             self.log.debug("Zone %s not found for deleting", name_or_id)
             return False
 
-        return self._dns_client.delete(
+        self._dns_client.delete(
             "/zones/{zone_id}".format(zone_id=zone['id']),
             error_message="Error deleting zone {0}".format(name_or_id))
-
+        self._cache_evict('zones', zone['id'])
         return True
 
     def list_recordsets(self, zone):
@@ -9777,6 +11436,7 @@ class OpenStackCloud(
                 "Potential API issue."
                 % (name_or_id, e.args[0]))
 
+        import jsonpatch
         try:
             patch = jsonpatch.JsonPatch.from_diff(machine_config, new_config)
         except Exception as e:
@@ -10699,9 +12359,10 @@ class OpenStackCloud(
         error_msg = "Error creating group {group}".format(group=name)
         data = self._identity_client.post(
             '/groups', json={'group': group_ref}, error_message=error_msg)
-        group = self._get_and_munchify('group', data)
-        self.list_groups.invalidate(self)
-        return _utils.normalize_groups([group])[0]
+        group = _utils.normalize_groups(
+            [self._get_and_munchify('group', data)])[0]
+        self._cache_upsert('groups', group)
+        return group
 
     @_utils.valid_kwargs('domain_id')
     def update_group(self, name_or_id, name=None, description=None,
@@ -10734,9 +12395,10 @@ class OpenStackCloud(
         data = self._identity_client.patch(
             '/groups/{id}'.format(id=group['id']),
             json={'group': group_ref}, error_message=error_msg)
-        group = self._get_and_munchify('group', data)
-        self.list_groups.invalidate(self)
-        return _utils.normalize_groups([group])[0]
+        group = _utils.normalize_groups(
+            [self._get_and_munchify('group', data)])[0]
+        self._cache_upsert('groups', group)
+        return group
 
     @_utils.valid_kwargs('domain_id')
     def delete_group(self, name_or_id, **kwargs):
@@ -10760,7 +12422,7 @@ class OpenStackCloud(
         self._identity_client.delete('/groups/{id}'.format(id=group['id']),
                                      error_message=error_msg)
 
-        self.list_groups.invalidate(self)
+        self._cache_evict('groups', group['id'])
         return True
 
     @_utils.valid_kwargs('domain_id')
@@ -10970,8 +12632,10 @@ class OpenStackCloud(
                 '/flavors',
                 json=dict(flavor=payload))
 
-        return self._normalize_flavor(
+        flavor = self._normalize_flavor(
             self._get_and_munchify('flavor', data))
+        self._cache_upsert('flavors', flavor)
+        return flavor
 
     def delete_flavor(self, name_or_id):
         """Delete a flavor
@@ -10992,7 +12656,7 @@ class OpenStackCloud(
                 name=name_or_id)):
             self._compute_client.delete(
                 '/flavors/{id}'.format(id=flavor['id']))
-
+        self._cache_evict('flavors', flavor['id'])
         return True
 
     def set_flavor_specs(self, flavor_id, extra_specs):
@@ -11012,6 +12676,7 @@ class OpenStackCloud(
             raise exc.OpenStackCloudException(
                 "Unable to set flavor specs: {0}".format(str(e))
             )
+        self._cache_invalidate('flavors')
 
     def unset_flavor_specs(self, flavor_id, keys):
         """Delete extra specs from a flavor
@@ -11031,6 +12696,7 @@ class OpenStackCloud(
                 raise exc.OpenStackCloudException(
                     "Unable to delete flavor spec {0}: {1}".format(
                         key, str(e)))
+        self._cache_invalidate('flavors')
 
     def _mod_flavor_access(self, action, flavor_id, project_id):
         """Common method for adding and removing flavor access
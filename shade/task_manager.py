@@ -24,9 +24,11 @@ import types
 import keystoneauth1.exceptions
 import six
 
+from shade import _call_tracker
 from shade import _log
 from shade import exc
 from shade import meta
+from shade import metrics
 
 
 def _is_listlike(obj):
@@ -74,6 +76,7 @@ class BaseTask(object):
         self._response = None
         self._finished = threading.Event()
         self.run_async = False
+        self.retries = 0
         self.args = kw
         self.name = type(self).__name__
 
@@ -124,6 +127,7 @@ class BaseTask(object):
                         "Connection failure on %(cloud)s for %(name)s after"
                         " %(secs)s seconds, retrying",
                         {'cloud': client.name, 'name': self.name, 'secs': dt})
+                self.retries += 1
                 self.done(self.main(client))
             except Exception:
                 raise
@@ -231,6 +235,8 @@ class TaskManager(object):
             self, client, name, result_filter_cb=None, workers=5, **kwargs):
         self.name = name
         self._client = client
+        # A shade.metrics.MetricsEmitter to send per-request metrics to
+        self.metrics = None
         self._executor = concurrent.futures.ThreadPoolExecutor(
             max_workers=workers)
         if not result_filter_cb:
@@ -261,6 +267,9 @@ class TaskManager(object):
     def _run_task_async(self, task, raw=False):
         self.log.debug(
             "Manager %s submitting task %s", self.name, task.name)
+        if self.metrics and _call_tracker.tracking():
+            # The executor thread's stack only leads back to the executor
+            task.origin = _call_tracker._find_caller()
         return self._executor.submit(self._run_task, task, raw=raw)
 
     def run_task(self, task, raw=False):
@@ -284,7 +293,12 @@ class TaskManager(object):
         return task.wait(raw)
 
     def post_run_task(self, elasped_time, task):
-        pass
+        if not self.metrics:
+            return
+        request_metrics = metrics.task_metrics(
+            self._client, elasped_time, task)
+        if request_metrics is not None:
+            self.metrics.record(request_metrics)
 
     # Backwards compatibility
     submitTask = submit_task
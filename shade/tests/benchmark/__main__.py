@@ -0,0 +1,95 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Run the benchmarks and print the results as JSON.
+
+    python -m shade.tests.benchmark --servers 2000 --output new.json
+    python -m shade.tests.benchmark --compare old.json
+"""
+
+import argparse
+import json
+import sys
+
+from shade.tests.benchmark import fixture
+from shade.tests.benchmark import suite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m shade.tests.benchmark',
+        description='Benchmark shade against a synthetic cloud.')
+    for resource, count in fixture.SIZES.items():
+        parser.add_argument(
+            '--' + resource.replace('_', '-'), type=int, default=count,
+            dest=resource,
+            help='Number of {0} (default {1})'.format(
+                resource.replace('_', ' '), count))
+    parser.add_argument(
+        '--page-size', type=int, default=None,
+        help='Page size of the synthetic listings (default: no paging)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--segments', type=int, default=64,
+        help='Segments of the large Swift object (default 64)')
+    parser.add_argument(
+        '--transport', choices=('mock', 'http'), default='mock',
+        help='Answer calls in process with requests_mock, or over real'
+             ' sockets with a local fake cloud server (default mock)')
+    parser.add_argument(
+        '--latency', type=float, default=0,
+        help='Seconds the http transport waits before answering each call')
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help='Timed runs of each benchmark (default 5)')
+    parser.add_argument(
+        '--only', action='append', dest='names', metavar='NAME',
+        help='Run only this benchmark. May be given more than once.')
+    parser.add_argument(
+        '--no-memory', action='store_false', dest='memory',
+        help='Do not measure peak memory')
+    parser.add_argument(
+        '--compare', metavar='FILE',
+        help='Results of an earlier run to compare against')
+    parser.add_argument(
+        '--output', metavar='FILE',
+        help='Write the results to FILE instead of stdout')
+    parser.add_argument(
+        '--list', action='store_true', help='List the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in suite.BENCHMARKS:
+            print(name)
+        return 0
+
+    sizes = dict((resource, getattr(args, resource))
+                 for resource in fixture.SIZES)
+    results = suite.run(
+        names=args.names, repeat=args.repeat, memory=args.memory,
+        page_size=args.page_size, seed=args.seed, segments=args.segments,
+        transport=args.transport, latency=args.latency, **sizes)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            results['comparison'] = suite.compare(json.load(f), results)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,522 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+fixture
+-------
+
+A synthetic large cloud behind the same mocked catalog the unit tests use.
+
+Every resource is generated from a seeded random number generator, so two
+runs with the same sizes and seed see exactly the same cloud. That is what
+makes benchmark results comparable across commits.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import uuid
+
+import os_client_config as occ
+import requests_mock
+from six.moves import urllib
+
+import shade
+from shade.tests import fakes
+
+FIXTURES_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'unit', 'fixtures')
+CLOUDS_YAML = os.path.join(FIXTURES_DIRECTORY, 'clouds', 'clouds.yaml')
+CLOUD_NAME = '_test_cloud_'
+
+# Default number of each resource in the synthetic cloud
+SIZES = dict(
+    servers=500,
+    ports=600,
+    floating_ips=250,
+    flavors=50,
+    images=200,
+    volumes=300,
+    projects=50,
+)
+
+# Query parameters that are not attribute filters
+_RESERVED_PARAMS = (
+    'all_tenants', 'changes-since', 'fields', 'is_public', 'limit',
+    'marker', 'member_status', 'sort_dir', 'sort_key')
+
+_PROJECT_ID = fakes.PROJECT_ID
+_PRIVATE_NETWORK = 'private'
+_PUBLIC_NETWORK = 'public'
+
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURES_DIRECTORY, name), 'r') as f:
+        return f.read()
+
+
+def _filter(records, params):
+    filters = dict(
+        (k, v) for k, v in params.items() if k not in _RESERVED_PARAMS)
+    if not filters:
+        return records
+    return [
+        record for record in records
+        if all(str(record.get(k)) == v for k, v in filters.items())]
+
+
+def _paginate(records, params, page_size):
+    limit = params.get('limit')
+    limit = int(limit) if limit else page_size
+    start = 0
+    marker = params.get('marker')
+    if marker:
+        for idx, record in enumerate(records):
+            if record['id'] == marker:
+                start = idx + 1
+                break
+    if not limit:
+        return records[start:], None
+    page = records[start:start + limit]
+    if start + limit >= len(records):
+        return page, None
+    return page, page[-1]['id']
+
+
+def _project(records, fields):
+    if not fields:
+        return records
+    return [dict((k, r[k]) for k in fields if k in r) for r in records]
+
+
+class SyntheticCloud(object):
+    """Generate a large cloud and answer REST calls about it.
+
+    :param int page_size: Page size used by the compute, image and volume
+                          listings when the caller does not ask for one.
+                          Defaults to returning everything in one page.
+    :param int seed: Seed of the generator.
+
+    All other keyword arguments are resource counts, see ``SIZES``.
+    """
+
+    def __init__(self, page_size=None, seed=0, **sizes):
+        unknown = set(sizes) - set(SIZES)
+        if unknown:
+            raise ValueError(
+                "Unknown resource types: {0}".format(
+                    ', '.join(sorted(unknown))))
+        self.sizes = dict(SIZES)
+        self.sizes.update(sizes)
+        self.page_size = page_size
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self.objects = {}
+        self.created_servers = {}
+        self._generate()
+        self._routes = self._make_routes()
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self._rng.getrandbits(128)))
+
+    def _mac(self):
+        return 'fa:16:3e:' + ':'.join(
+            '{0:02x}'.format(self._rng.randint(0, 255)) for _ in range(3))
+
+    def _generate(self):
+        sizes = self.sizes
+        self.projects = [dict(
+            id=uuid.UUID(int=self._rng.getrandbits(128)).hex,
+            name='project-{0:05d}'.format(idx),
+            description='',
+            domain_id='default',
+            parent_id='default',
+            enabled=True,
+            is_domain=False,
+            links={}) for idx in range(sizes['projects'])]
+        project_ids = [p['id'] for p in self.projects] or [_PROJECT_ID]
+
+        self.flavors = [
+            fakes.make_fake_flavor(
+                self._uuid(), 'flavor-{0:05d}'.format(idx),
+                ram=512 * (1 + idx % 16), disk=10 * (1 + idx % 8),
+                vcpus=1 + idx % 8)
+            for idx in range(sizes['flavors'])]
+
+        self.images = []
+        for idx in range(sizes['images']):
+            image = fakes.make_fake_image(self._uuid())
+            image['name'] = 'image-{0:05d}'.format(idx)
+            self.images.append(image)
+
+        self.networks = []
+        self.subnets = []
+        for name, external, cidr in (
+                (_PRIVATE_NETWORK, False, '10.0.0.0/16'),
+                (_PUBLIC_NETWORK, True, '172.24.0.0/16')):
+            network_id = self._uuid()
+            subnet_id = self._uuid()
+            self.networks.append({
+                'id': network_id,
+                'name': name,
+                'status': 'ACTIVE',
+                'admin_state_up': True,
+                'shared': False,
+                'router:external': external,
+                'subnets': [subnet_id],
+                'tenant_id': _PROJECT_ID,
+                'project_id': _PROJECT_ID,
+                'mtu': 1450,
+            })
+            self.subnets.append({
+                'id': subnet_id,
+                'name': name + '-subnet',
+                'network_id': network_id,
+                'cidr': cidr,
+                'ip_version': 4,
+                'enable_dhcp': True,
+                'gateway_ip': cidr.replace('0/16', '1'),
+                'allocation_pools': [],
+                'dns_nameservers': [],
+                'host_routes': [],
+                'tenant_id': _PROJECT_ID,
+                'project_id': _PROJECT_ID,
+            })
+        private_net, public_net = self.networks
+        private_subnet = self.subnets[0]
+        router_id = self._uuid()
+
+        self.security_groups = [{
+            'id': self._uuid(),
+            'name': 'default',
+            'description': 'Default security group',
+            'tenant_id': _PROJECT_ID,
+            'project_id': _PROJECT_ID,
+            'security_group_rules': [],
+        }]
+
+        self.servers = []
+        self.ports = []
+        for idx in range(sizes['ports']):
+            address = '10.0.{0}.{1}'.format(idx // 250, idx % 250 + 2)
+            port = {
+                'id': self._uuid(),
+                'name': '',
+                'network_id': private_net['id'],
+                'mac_address': self._mac(),
+                'fixed_ips': [{
+                    'subnet_id': private_subnet['id'],
+                    'ip_address': address}],
+                'device_id': '',
+                'device_owner': '',
+                'status': 'DOWN',
+                'admin_state_up': True,
+                'security_groups': [self.security_groups[0]['id']],
+                'tenant_id': _PROJECT_ID,
+                'project_id': _PROJECT_ID,
+            }
+            self.ports.append(port)
+
+        for idx in range(sizes['servers']):
+            server_id = self._uuid()
+            addresses = {}
+            if idx < len(self.ports):
+                port = self.ports[idx]
+                port['device_id'] = server_id
+                port['device_owner'] = 'compute:nova'
+                port['status'] = 'ACTIVE'
+                addresses[_PRIVATE_NETWORK] = [{
+                    'OS-EXT-IPS-MAC:mac_addr': port['mac_address'],
+                    'version': 4,
+                    'addr': port['fixed_ips'][0]['ip_address'],
+                    'OS-EXT-IPS:type': 'fixed'}]
+            image = self.images[idx % len(self.images)] if self.images else {}
+            flavor = (
+                self.flavors[idx % len(self.flavors)] if self.flavors else {})
+            server = fakes.make_fake_server(
+                server_id, 'server-{0:05d}'.format(idx),
+                addresses=addresses,
+                image={'id': image.get('id', ''), 'links': []},
+                flavor={'id': flavor.get('id', ''), 'links': []})
+            server['tenant_id'] = project_ids[idx % len(project_ids)]
+            server['metadata'] = {'group': 'group-{0}'.format(idx % 10)}
+            self.servers.append(server)
+
+        self.floating_ips = []
+        for idx in range(sizes['floating_ips']):
+            port = self.ports[idx] if idx < len(self.ports) else None
+            attached = port is not None and port['device_id']
+            self.floating_ips.append({
+                'id': self._uuid(),
+                'floating_ip_address': '172.24.{0}.{1}'.format(
+                    idx // 250, idx % 250 + 2),
+                'floating_network_id': public_net['id'],
+                'fixed_ip_address': (
+                    port['fixed_ips'][0]['ip_address'] if attached else None),
+                'port_id': port['id'] if attached else None,
+                'router_id': router_id if attached else None,
+                'status': 'ACTIVE' if attached else 'DOWN',
+                'tenant_id': _PROJECT_ID,
+                'project_id': _PROJECT_ID,
+            })
+
+        self.volumes = []
+        for idx in range(sizes['volumes']):
+            volume_id = self._uuid()
+            attachments = []
+            # Attach every other volume to a server
+            if idx % 2 == 0 and self.servers:
+                server = self.servers[(idx // 2) % len(self.servers)]
+                attachments.append({
+                    'id': volume_id,
+                    'volume_id': volume_id,
+                    'server_id': server['id'],
+                    'device': '/dev/vdb',
+                    'attachment_id': self._uuid(),
+                    'host_name': None})
+            self.volumes.append({
+                'id': volume_id,
+                'name': 'volume-{0:05d}'.format(idx),
+                'description': '',
+                'size': 1 + idx % 100,
+                'status': 'in-use' if attachments else 'available',
+                'attachments': attachments,
+                'availability_zone': 'nova',
+                'bootable': 'false',
+                'encrypted': False,
+                'metadata': {},
+                'volume_type': None,
+                'snapshot_id': None,
+                'source_volid': None,
+                'created_at': '2017-03-23T23:57:12.000000',
+                'os-vol-tenant-attr:tenant_id': _PROJECT_ID,
+                'links': [],
+            })
+
+        self._servers_by_id = dict((s['id'], s) for s in self.servers)
+
+    def _make_routes(self):
+        project = _PROJECT_ID
+        routes = [
+            ('GET', 'identity', r'/$', self._identity_discovery),
+            ('POST', 'identity', r'/v3/auth/tokens$', self._token),
+            ('GET', 'identity', r'/v3/projects$',
+             self._lister('projects', self.projects)),
+            ('GET', 'compute', r'/v2.1/servers/detail$', self._list_servers),
+            ('POST', 'compute', r'/v2.1/servers$', self._create_server),
+            ('GET', 'compute', r'/v2.1/servers/(?P<id>[^/]+)$',
+             self._get_server),
+            ('GET', 'compute',
+             r'/v2.1/servers/(?P<id>[^/]+)/os-security-groups$',
+             self._server_security_groups),
+            ('GET', 'compute', r'/v2.1/flavors/detail$',
+             self._lister('flavors', self.flavors)),
+            ('GET', 'compute', r'/v2.1/flavors/(?P<id>[^/]+)/os-extra_specs$',
+             lambda match, params, body: (200, {}, {'extra_specs': {}})),
+            ('GET', 'image', r'/$', self._image_discovery),
+            ('GET', 'image', r'/v2/images$',
+             self._lister('images', self.images, next_link='/v2/images')),
+            ('GET', 'volume',
+             r'/v2/{0}/volumes/detail$'.format(project),
+             self._lister(
+                 'volumes', self.volumes,
+                 next_link='https://volume.example.com/v2/{0}/volumes/detail'
+                 .format(project), links_key='volumes_links')),
+            ('GET', 'network', r'/v2.0/extensions.json$',
+             lambda match, params, body: (200, {}, {'extensions': []})),
+            ('GET', 'object-store', r'/info$', self._swift_info),
+            ('HEAD', 'object-store',
+             r'/v1/{0}/(?P<container>[^/]+)$'.format(project),
+             self._head_container),
+            ('PUT', 'object-store',
+             r'/v1/{0}/(?P<container>[^/]+)$'.format(project),
+             lambda match, params, body: (201, {}, None)),
+            ('HEAD', 'object-store',
+             r'/v1/{0}/(?P<name>[^/]+/.+)$'.format(project),
+             self._head_object),
+            ('PUT', 'object-store',
+             r'/v1/{0}/(?P<name>[^/]+/.+)$'.format(project),
+             self._put_object),
+        ]
+        for resource, records in (
+                ('networks', self.networks),
+                ('subnets', self.subnets),
+                ('ports', self.ports),
+                ('floatingips', self.floating_ips),
+                ('security-groups', self.security_groups),
+                ('routers', [])):
+            key = resource.replace('-', '_')
+            routes.append((
+                'GET', 'network', r'/v2.0/{0}.json$'.format(resource),
+                self._lister(key, records)))
+        return [
+            (method, service, re.compile(pattern), handler)
+            for method, service, pattern, handler in routes]
+
+    def _lister(self, key, records, next_link=None, links_key=None):
+        def handler(match, params, body):
+            found = _filter(records, params)
+            page, marker = _paginate(found, params, self.page_size)
+            data = {key: _project(page, params.get('fields'))}
+            if marker:
+                link = '{0}?marker={1}'.format(next_link, marker)
+                if links_key:
+                    data[links_key] = [{'rel': 'next', 'href': link}]
+                else:
+                    data['next'] = link
+            return 200, {}, data
+        return handler
+
+    def _identity_discovery(self, match, params, body):
+        return 200, {}, json.loads(_read_fixture('discovery.json'))
+
+    def _token(self, match, params, body):
+        return (
+            201, {'X-Subject-Token': 'synthetic-token'},
+            json.loads(_read_fixture('catalog-v3.json')))
+
+    def _image_discovery(self, match, params, body):
+        return 300, {}, json.loads(_read_fixture('image-version.json'))
+
+    def _list_servers(self, match, params, body):
+        found = _filter(self.servers, params)
+        page, marker = _paginate(found, params, self.page_size)
+        data = {'servers': page}
+        if marker:
+            data['servers_links'] = [{
+                'rel': 'next',
+                'href': '{0}/servers/detail?marker={1}'.format(
+                    fakes.COMPUTE_ENDPOINT, marker)}]
+        return 200, {}, data
+
+    def _get_server(self, match, params, body):
+        server_id = match.group('id')
+        server = (
+            self._servers_by_id.get(server_id)
+            or self.created_servers.get(server_id))
+        if server is None:
+            return 404, {}, {'itemNotFound': {'code': 404}}
+        return 200, {}, {'server': server}
+
+    def _create_server(self, match, params, body):
+        # Created servers can be fetched by id but are not added to the
+        # listings, so that repeated runs see the same cloud.
+        request = body['server']
+        server = fakes.make_fake_server(
+            self._uuid(), request['name'],
+            image={'id': request.get('imageRef', ''), 'links': []},
+            flavor={'id': request.get('flavorRef', ''), 'links': []})
+        self.created_servers[server['id']] = server
+        return 202, {}, {'server': {
+            'id': server['id'], 'links': [], 'adminPass': 'password'}}
+
+    def _server_security_groups(self, match, params, body):
+        return 200, {}, {'security_groups': [
+            dict(id=sg['id'], name=sg['name'],
+                 description=sg['description'], tenant_id=sg['tenant_id'],
+                 rules=[])
+            for sg in self.security_groups]}
+
+    def _swift_info(self, match, params, body):
+        return 200, {}, {
+            'swift': {'max_file_size': 5 * 1024 * 1024 * 1024},
+            'slo': {'min_segment_size': 1}}
+
+    def _head_container(self, match, params, body):
+        return 204, {
+            'x-container-object-count': '0',
+            'x-container-bytes-used': '0',
+            'x-container-read': ''}, None
+
+    def _head_object(self, match, params, body):
+        headers = self.objects.get(match.group('name'))
+        if headers is None:
+            return 404, {}, None
+        return 200, headers, None
+
+    def _put_object(self, match, params, body):
+        etag = hashlib.md5(match.group('name').encode('utf-8')).hexdigest()
+        self.objects[match.group('name')] = {'Etag': etag}
+        return 201, {'Etag': etag}, None
+
+    def dispatch(self, method, url, body=None):
+        """Answer one REST call made to the mocked catalog.
+
+        :param string method: HTTP method.
+        :param string url: Full URL, including the query string.
+        :param body: Decoded JSON request body, if there is one.
+        :returns: A tuple of (status code, headers, JSON body or None).
+        """
+        parsed = urllib.parse.urlparse(url)
+        return self.dispatch_service(
+            method, parsed.hostname.split('.', 1)[0], parsed.path,
+            parsed.query, body)
+
+    def dispatch_service(self, method, service, path, query='', body=None):
+        """Answer one REST call made to a service.
+
+        :param string method: HTTP method.
+        :param string service: Service type, such as ``compute``.
+        :param string path: Path of the call, relative to the service.
+        :param string query: Query string of the call.
+        :param body: Decoded JSON request body, if there is one.
+        :returns: A tuple of (status code, headers, JSON body or None).
+        """
+        path = path or '/'
+        params = dict(urllib.parse.parse_qsl(query))
+        if 'fields' in params:
+            params['fields'] = urllib.parse.parse_qs(query)['fields']
+        for route_method, route_service, pattern, handler in self._routes:
+            if route_method != method or route_service != service:
+                continue
+            match = pattern.match(path)
+            if match:
+                return handler(match, params, body)
+        return 404, {}, {'error': {
+            'message': 'No synthetic route for {0} {1} {2}'.format(
+                method, service, path)}}
+
+    def _callback(self, request, context):
+        body = None
+        if request.body and request.method in ('POST', 'PUT', 'PATCH'):
+            try:
+                body = json.loads(request.body)
+            except (TypeError, ValueError):
+                body = None
+        status, headers, data = self.dispatch(
+            request.method, request.url, body)
+        context.status_code = status
+        context.headers.update(headers)
+        if data is None:
+            return b''
+        context.headers['Content-Type'] = 'application/json'
+        return json.dumps(data).encode('utf-8')
+
+    def install(self, mocker):
+        """Answer every request made through a requests_mock Mocker."""
+        mocker.register_uri(
+            requests_mock.ANY, requests_mock.ANY, content=self._callback)
+
+    def make_cloud(self, **kwargs):
+        """Make an OpenStackCloud pointed at the mocked catalog.
+
+        ``install`` must have been called before the cloud is used.
+        """
+        config = occ.OpenStackConfig(
+            config_files=[CLOUDS_YAML], vendor_files=[],
+            secure_files=['non-existant'])
+        cloud_config = config.get_one_cloud(
+            cloud=CLOUD_NAME, validate=True, **kwargs)
+        return shade.OpenStackCloud(cloud_config=cloud_config)
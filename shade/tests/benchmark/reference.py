@@ -0,0 +1,385 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+reference
+---------
+
+The normalizers for flavors, images, servers and volumes as they were
+before they became table driven, and ``meta.obj_to_munch`` as it was before
+it learned to skip introspecting plain dicts. They are kept here, unchanged,
+as the reference the new versions are checked against, by the unit tests
+and by the ``*_reference`` benchmarks.
+"""
+
+import munch
+
+from shade._normalize import _IMAGE_FIELDS
+from shade._normalize import _SERVER_FIELDS
+from shade._normalize import _pop_float
+from shade._normalize import _pop_int
+from shade._normalize import _pop_or_get
+from shade._normalize import _to_bool
+from shade.meta import NON_CALLABLES
+
+
+def obj_to_munch(obj):
+    """ Turn an object with attributes into a dict suitable for serializing.
+
+    Some of the things that are returned in OpenStack are objects with
+    attributes. That's awesome - except when you want to expose them as JSON
+    structures. We use this as the basis of get_hostvars_from_server above so
+    that we can just have a plain dict of all of the values that exist in the
+    nova metadata for a server.
+    """
+    if obj is None:
+        return None
+    elif isinstance(obj, munch.Munch) or hasattr(obj, 'mock_add_spec'):
+        # If we obj_to_munch twice, don't fail, just return the munch
+        # Also, don't try to modify Mock objects - that way lies madness
+        return obj
+    elif isinstance(obj, dict):
+        # The new request-id tracking spec:
+        # https://specs.openstack.org/openstack/nova-specs/specs/juno/approved/log-request-id-mappings.html
+        # adds a request-ids attribute to returned objects. It does this even
+        # with dicts, which now become dict subclasses. So we want to convert
+        # the dict we get, but we also want it to fall through to object
+        # attribute processing so that we can also get the request_ids
+        # data into our resulting object.
+        instance = munch.Munch(obj)
+    else:
+        instance = munch.Munch()
+
+    for key in dir(obj):
+        try:
+            value = getattr(obj, key)
+        # some attributes can be defined as a @propierty, so we can't assure
+        # to have a valid value
+        # e.g. id in python-novaclient/tree/novaclient/v2/quotas.py
+        except AttributeError:
+            continue
+        if isinstance(value, NON_CALLABLES) and not key.startswith('_'):
+            instance[key] = value
+    return instance
+
+
+def obj_list_to_munch(obj_list):
+    return [obj_to_munch(obj) for obj in obj_list]
+
+
+class ReferenceNormalizer(object):
+    """The reference normalizers, normalizing for cloud.
+
+    Everything but the normalizers themselves comes from cloud, so that
+    its strict mode, name and region are used.
+    """
+
+    def __init__(self, cloud):
+        self._cloud = cloud
+
+    def __getattr__(self, name):
+        return getattr(self._cloud, name)
+
+    def _normalize_flavors(self, flavors):
+        return [self._normalize_flavor(flavor) for flavor in flavors]
+
+    def _normalize_images(self, images):
+        return [self._normalize_image(image) for image in images]
+
+    def _normalize_servers(self, servers):
+        return [self._normalize_server(server) for server in servers]
+
+    def _normalize_volumes(self, volumes):
+        return [self._normalize_volume(volume) for volume in volumes]
+
+    def _normalize_flavor(self, flavor):
+        """ Normalize a flavor object """
+        new_flavor = munch.Munch()
+
+        # Copy incoming group because of shared dicts in unittests
+        flavor = flavor.copy()
+
+        # Discard noise
+        self._remove_novaclient_artifacts(flavor)
+        flavor.pop('links', None)
+
+        ephemeral = int(_pop_or_get(
+            flavor, 'OS-FLV-EXT-DATA:ephemeral', 0, self.strict_mode))
+        ephemeral = flavor.pop('ephemeral', ephemeral)
+        is_public = _to_bool(_pop_or_get(
+            flavor, 'os-flavor-access:is_public', True, self.strict_mode))
+        is_public = _to_bool(flavor.pop('is_public', is_public))
+        is_disabled = _to_bool(_pop_or_get(
+            flavor, 'OS-FLV-DISABLED:disabled', False, self.strict_mode))
+        extra_specs = _pop_or_get(
+            flavor, 'OS-FLV-WITH-EXT-SPECS:extra_specs', {}, self.strict_mode)
+        extra_specs = flavor.pop('extra_specs', extra_specs)
+        extra_specs = munch.Munch(extra_specs)
+
+        new_flavor['location'] = self.current_location
+        new_flavor['id'] = flavor.pop('id')
+        new_flavor['name'] = flavor.pop('name')
+        new_flavor['is_public'] = is_public
+        new_flavor['is_disabled'] = is_disabled
+        new_flavor['ram'] = _pop_int(flavor, 'ram')
+        new_flavor['vcpus'] = _pop_int(flavor, 'vcpus')
+        new_flavor['disk'] = _pop_int(flavor, 'disk')
+        new_flavor['ephemeral'] = ephemeral
+        new_flavor['swap'] = _pop_int(flavor, 'swap')
+        new_flavor['rxtx_factor'] = _pop_float(flavor, 'rxtx_factor')
+
+        new_flavor['properties'] = flavor.copy()
+        new_flavor['extra_specs'] = extra_specs
+
+        # Backwards compat with nova - passthrough values
+        if not self.strict_mode:
+            for (k, v) in new_flavor['properties'].items():
+                new_flavor.setdefault(k, v)
+
+        return new_flavor
+
+    def _normalize_image(self, image):
+        new_image = munch.Munch(
+            location=self._get_current_location(project_id=image.get('owner')))
+
+        # This copy is to keep things from getting epically weird in tests
+        image = image.copy()
+
+        # Discard noise
+        self._remove_novaclient_artifacts(image)
+
+        # If someone made a property called "properties" that contains a
+        # string (this has happened at least one time in the wild), the
+        # the rest of the normalization here goes belly up.
+        properties = image.pop('properties', {})
+        if not isinstance(properties, dict):
+            properties = {'properties': properties}
+
+        visibility = image.pop('visibility', None)
+        protected = _to_bool(image.pop('protected', False))
+
+        if visibility:
+            is_public = (visibility == 'public')
+        else:
+            is_public = image.pop('is_public', False)
+            visibility = 'public' if is_public else 'private'
+
+        new_image['size'] = image.pop('OS-EXT-IMG-SIZE:size', 0)
+        new_image['size'] = image.pop('size', new_image['size'])
+
+        new_image['min_ram'] = image.pop('minRam', 0)
+        new_image['min_ram'] = image.pop('min_ram', new_image['min_ram'])
+
+        new_image['min_disk'] = image.pop('minDisk', 0)
+        new_image['min_disk'] = image.pop('min_disk', new_image['min_disk'])
+
+        new_image['created_at'] = image.pop('created', '')
+        new_image['created_at'] = image.pop(
+            'created_at', new_image['created_at'])
+
+        new_image['updated_at'] = image.pop('updated', '')
+        new_image['updated_at'] = image.pop(
+            'updated_at', new_image['updated_at'])
+
+        for field in _IMAGE_FIELDS:
+            new_image[field] = image.pop(field, None)
+
+        new_image['tags'] = image.pop('tags', [])
+        new_image['status'] = image.pop('status').lower()
+        for field in ('min_ram', 'min_disk', 'size', 'virtual_size'):
+            new_image[field] = _pop_int(new_image, field)
+        new_image['is_protected'] = protected
+        new_image['locations'] = image.pop('locations', [])
+
+        metadata = image.pop('metadata', {})
+        for key, val in metadata.items():
+            properties.setdefault(key, val)
+
+        for key, val in image.items():
+            properties.setdefault(key, val)
+        new_image['properties'] = properties
+        new_image['is_public'] = is_public
+        new_image['visibility'] = visibility
+
+        # Backwards compat with glance
+        if not self.strict_mode:
+            for key, val in properties.items():
+                if key != 'properties':
+                    new_image[key] = val
+            new_image['protected'] = protected
+            new_image['metadata'] = properties
+            new_image['created'] = new_image['created_at']
+            new_image['updated'] = new_image['updated_at']
+            new_image['minDisk'] = new_image['min_disk']
+            new_image['minRam'] = new_image['min_ram']
+        return new_image
+
+    def _normalize_server(self, server):
+        ret = munch.Munch()
+        # Copy incoming server because of shared dicts in unittests
+        server = server.copy()
+
+        self._remove_novaclient_artifacts(server)
+
+        ret['id'] = server.pop('id')
+        ret['name'] = server.pop('name')
+
+        server['flavor'].pop('links', None)
+        ret['flavor'] = server.pop('flavor')
+
+        # OpenStack can return image as a string when you've booted
+        # from volume
+        if str(server['image']) != server['image']:
+            server['image'].pop('links', None)
+        ret['image'] = server.pop('image')
+
+        project_id = server.pop('tenant_id', '')
+        project_id = server.pop('project_id', project_id)
+
+        az = _pop_or_get(
+            server, 'OS-EXT-AZ:availability_zone', None, self.strict_mode)
+        ret['location'] = self._get_current_location(
+            project_id=project_id, zone=az)
+
+        # Ensure volumes is always in the server dict, even if empty
+        ret['volumes'] = _pop_or_get(
+            server, 'os-extended-volumes:volumes_attached',
+            [], self.strict_mode)
+
+        config_drive = server.pop('config_drive', False)
+        ret['has_config_drive'] = _to_bool(config_drive)
+
+        host_id = server.pop('hostId', None)
+        ret['host_id'] = host_id
+
+        ret['progress'] = _pop_int(server, 'progress')
+
+        # Leave these in so that the general properties handling works
+        ret['disk_config'] = _pop_or_get(
+            server, 'OS-DCF:diskConfig', None, self.strict_mode)
+        for key in (
+                'OS-EXT-STS:power_state',
+                'OS-EXT-STS:task_state',
+                'OS-EXT-STS:vm_state',
+                'OS-SRV-USG:launched_at',
+                'OS-SRV-USG:terminated_at'):
+            short_key = key.split(':')[1]
+            ret[short_key] = _pop_or_get(server, key, None, self.strict_mode)
+
+        # Protect against security_groups being None
+        ret['security_groups'] = server.pop('security_groups', None) or []
+
+        # NOTE(mnaser): The Nova API returns the creation date in `created`
+        #               however the Shade contract returns `created_at` for
+        #               all resources.
+        ret['created_at'] = server.get('created')
+
+        for field in _SERVER_FIELDS:
+            ret[field] = server.pop(field, None)
+        if not ret['networks']:
+            ret['networks'] = {}
+
+        ret['interface_ip'] = ''
+
+        ret['properties'] = server.copy()
+
+        # Backwards compat
+        if not self.strict_mode:
+            ret['hostId'] = host_id
+            ret['config_drive'] = config_drive
+            ret['project_id'] = project_id
+            ret['tenant_id'] = project_id
+            ret['region'] = self.region_name
+            ret['cloud'] = self.name
+            ret['az'] = az
+            for key, val in ret['properties'].items():
+                ret.setdefault(key, val)
+        return ret
+
+    def _normalize_volume(self, volume):
+
+        volume = volume.copy()
+
+        # Discard noise
+        self._remove_novaclient_artifacts(volume)
+
+        volume_id = volume.pop('id')
+
+        name = volume.pop('display_name', None)
+        name = volume.pop('name', name)
+
+        description = volume.pop('display_description', None)
+        description = volume.pop('description', description)
+
+        is_bootable = _to_bool(volume.pop('bootable', True))
+        is_encrypted = _to_bool(volume.pop('encrypted', False))
+        can_multiattach = _to_bool(volume.pop('multiattach', False))
+
+        project_id = _pop_or_get(
+            volume, 'os-vol-tenant-attr:tenant_id', None, self.strict_mode)
+        az = volume.pop('availability_zone', None)
+
+        location = self._get_current_location(project_id=project_id, zone=az)
+
+        host = _pop_or_get(
+            volume, 'os-vol-host-attr:host', None, self.strict_mode)
+        replication_extended_status = _pop_or_get(
+            volume, 'os-volume-replication:extended_status',
+            None, self.strict_mode)
+
+        migration_status = _pop_or_get(
+            volume, 'os-vol-mig-status-attr:migstat', None, self.strict_mode)
+        migration_status = volume.pop('migration_status', migration_status)
+        _pop_or_get(volume, 'user_id', None, self.strict_mode)
+        source_volume_id = _pop_or_get(
+            volume, 'source_volid', None, self.strict_mode)
+        replication_driver = _pop_or_get(
+            volume, 'os-volume-replication:driver_data',
+            None, self.strict_mode)
+
+        ret = munch.Munch(
+            location=location,
+            id=volume_id,
+            name=name,
+            description=description,
+            size=_pop_int(volume, 'size'),
+            attachments=volume.pop('attachments', []),
+            status=volume.pop('status'),
+            migration_status=migration_status,
+            host=host,
+            replication_driver=replication_driver,
+            replication_status=volume.pop('replication_status', None),
+            replication_extended_status=replication_extended_status,
+            snapshot_id=volume.pop('snapshot_id', None),
+            created_at=volume.pop('created_at'),
+            updated_at=volume.pop('updated_at', None),
+            source_volume_id=source_volume_id,
+            consistencygroup_id=volume.pop('consistencygroup_id', None),
+            volume_type=volume.pop('volume_type', None),
+            metadata=volume.pop('metadata', {}),
+            is_bootable=is_bootable,
+            is_encrypted=is_encrypted,
+            can_multiattach=can_multiattach,
+            properties=volume.copy(),
+        )
+
+        # Backwards compat
+        if not self.strict_mode:
+            ret['display_name'] = name
+            ret['display_description'] = description
+            ret['bootable'] = is_bootable
+            ret['encrypted'] = is_encrypted
+            ret['multiattach'] = can_multiattach
+            ret['availability_zone'] = az
+            for key, val in ret['properties'].items():
+                ret.setdefault(key, val)
+        return ret
@@ -0,0 +1,302 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+server
+------
+
+A fake cloud served over real sockets on localhost.
+
+requests_mock answers in process, so it hides connection pooling, latency
+and concurrency problems. FakeCloudServer serves a SyntheticCloud over HTTP
+instead, with Keystone, Nova, Neutron, Glance, Cinder and Swift mounted
+under one port as ``http://127.0.0.1:<port>/<service type>``. Latency and
+errors can be injected, and the synthetic cloud pages its listings when it
+is given a page size.
+
+It can be used from tests::
+
+    with server.FakeCloudServer(latency=0.05) as fake:
+        cloud = fake.make_cloud()
+
+or started on its own, after which any shade or functional test run can use
+the ``clouds.yaml`` it prints::
+
+    python -m shade.tests.benchmark.server --port 8080 --error-rate 0.01
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import os_client_config as occ
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+import shade
+from shade.tests.benchmark import fixture
+
+_EXAMPLE_URL = re.compile(r'https?://([a-z-]+)\.example\.com')
+
+_CLOUDS_YAML = """clouds:
+  {name}:
+    auth:
+      auth_url: {url}/identity
+      username: admin
+      password: password
+      project_name: admin
+      user_domain_name: default
+      project_domain_name: default
+    identity_api_version: '3'
+    region_name: RegionOne
+"""
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    # Keep connections alive, so client connection pools get exercised
+    protocol_version = 'HTTP/1.1'
+    # Send each response in one write, or Nagle's algorithm and delayed
+    # ACKs add tens of milliseconds to every call
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if not size:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b''.join(chunks)
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _handle(self):
+        self.server.fake._handle(self)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class FakeCloudServer(object):
+    """Serve a SyntheticCloud over HTTP on localhost.
+
+    :param synthetic: The SyntheticCloud to serve. Defaults to one with the
+                      default sizes.
+    :param string host: Address to listen on.
+    :param int port: Port to listen on. Defaults to any free port.
+    :param latency: Seconds to wait before answering each call, or a tuple
+                    of (min, max) seconds to pick from at random.
+    :param float error_rate: Fraction of calls to fail, between 0 and 1.
+                             Keystone calls never fail, so that clients can
+                             always authenticate.
+    :param error_codes: HTTP status codes to fail calls with, picked at
+                        random.
+    :param int seed: Seed of the latency and error generator.
+    """
+
+    def __init__(
+            self, synthetic=None, host='127.0.0.1', port=0, latency=0,
+            error_rate=0.0, error_codes=(503,), seed=0):
+        self.synthetic = synthetic or fixture.SyntheticCloud()
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.requests = []
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.clouds_yaml = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._tempdir = None
+
+    @property
+    def url(self):
+        return 'http://{host}:{port}'.format(host=self.host, port=self.port)
+
+    def start(self):
+        """Start serving in a background thread.
+
+        Also writes a ``clouds.yaml`` for the server, with a cloud named
+        ``fixture.CLOUD_NAME``, to ``clouds_yaml``.
+        """
+        self._server = _HTTPServer((self.host, self.port), _Handler)
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        self._tempdir = tempfile.mkdtemp(prefix='shade-fake-cloud-')
+        self.clouds_yaml = os.path.join(self._tempdir, 'clouds.yaml')
+        with open(self.clouds_yaml, 'w') as f:
+            f.write(_CLOUDS_YAML.format(name=fixture.CLOUD_NAME, url=self.url))
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+        if self._tempdir is not None:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self._tempdir = None
+            self.clouds_yaml = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def make_cloud(self, **kwargs):
+        """Make an OpenStackCloud pointed at the server."""
+        config = occ.OpenStackConfig(
+            config_files=[self.clouds_yaml], vendor_files=[],
+            secure_files=['non-existant'])
+        cloud_config = config.get_one_cloud(
+            cloud=fixture.CLOUD_NAME, validate=True, **kwargs)
+        return shade.OpenStackCloud(cloud_config=cloud_config)
+
+    def _pick(self, service):
+        with self._lock:
+            if isinstance(self.latency, (tuple, list)):
+                delay = self._rng.uniform(*self.latency)
+            else:
+                delay = self.latency
+            error = None
+            if (service != 'identity' and self.error_rate
+                    and self._rng.random() < self.error_rate):
+                error = self._rng.choice(self.error_codes)
+        return delay, error
+
+    def _handle(self, handler):
+        path, _, query = handler.path.partition('?')
+        service, _, path = path.lstrip('/').partition('/')
+        path = '/' + path
+        if service == 'info':
+            # Clients find the Swift capabilities at the root of the host
+            service, path = 'object-store', '/info'
+        raw_body = handler._read_body()
+        body = None
+        if raw_body and handler.command in ('POST', 'PUT', 'PATCH'):
+            try:
+                body = json.loads(raw_body.decode('utf-8'))
+            except ValueError:
+                body = None
+
+        with self._lock:
+            self.requests.append((handler.command, service, path))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay, error = self._pick(service)
+            if delay:
+                time.sleep(delay)
+            if error:
+                with self._lock:
+                    self.errors += 1
+                status, headers, data = error, {}, {'error': {
+                    'code': error, 'message': 'Injected error'}}
+            else:
+                with self._lock:
+                    status, headers, data = self.synthetic.dispatch_service(
+                        handler.command, service, path, query, body)
+            self._respond(handler, status, headers, data)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _respond(self, handler, status, headers, data):
+        if data is None:
+            content = b''
+        else:
+            content = _EXAMPLE_URL.sub(
+                lambda match: '{url}/{service}'.format(
+                    url=self.url, service=match.group(1)),
+                json.dumps(data)).encode('utf-8')
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        if data is not None:
+            handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(content)))
+        handler.end_headers()
+        if handler.command != 'HEAD':
+            handler.wfile.write(content)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m shade.tests.benchmark.server',
+        description='Serve a synthetic cloud on localhost.')
+    for resource, count in fixture.SIZES.items():
+        parser.add_argument(
+            '--' + resource.replace('_', '-'), type=int, default=count,
+            dest=resource)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--page-size', type=int, default=None)
+    parser.add_argument(
+        '--latency', type=float, default=0,
+        help='Seconds to wait before answering each call')
+    parser.add_argument(
+        '--error-rate', type=float, default=0.0,
+        help='Fraction of calls to fail with a 503')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    synthetic = fixture.SyntheticCloud(
+        page_size=args.page_size, seed=args.seed,
+        **dict((resource, getattr(args, resource))
+               for resource in fixture.SIZES))
+    fake = FakeCloudServer(
+        synthetic, host=args.host, port=args.port, latency=args.latency,
+        error_rate=args.error_rate, seed=args.seed)
+    with fake:
+        print('Serving {url}, use OS_CLIENT_CONFIG_FILE={path} and'
+              ' OS_CLOUD={name}'.format(
+                  url=fake.url, path=fake.clouds_yaml,
+                  name=fixture.CLOUD_NAME))
+        sys.stdout.flush()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,447 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+suite
+-----
+
+Benchmarks of shade's hot paths against a SyntheticCloud.
+
+Every benchmark is a setup function that takes an ``Environment`` and
+returns the callable to be timed. Setup is called before every run and is
+not timed. The first run of every benchmark is a warm up, which is also
+where peak memory is measured, so that tracing allocations does not skew
+the timings.
+"""
+
+import collections
+import copy
+import datetime
+import functools
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests_mock
+from six.moves import urllib
+
+import shade
+from shade import _utils
+from shade import inventory
+from shade import meta
+from shade.tests.benchmark import fixture
+from shade.tests.benchmark import reference
+from shade.tests.benchmark import server
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Version of the output format
+FORMAT_VERSION = 1
+
+BENCHMARKS = collections.OrderedDict()
+
+_timer = getattr(time, 'perf_counter', time.time)
+_ID_IN_PATH = re.compile(
+    r'/(?:[0-9a-f]{32}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-'
+    r'[0-9a-f]{12}|[a-z]*-?\d{6})(?=/|$)')
+
+
+def benchmark(name):
+    """Register a benchmark setup function under name."""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+class _MockTransport(object):
+    """Answer calls in process with requests_mock."""
+
+    def __init__(self, synthetic):
+        self.synthetic = synthetic
+        self.clouds_yaml = fixture.CLOUDS_YAML
+        self._mocker = requests_mock.Mocker()
+
+    def start(self):
+        self._mocker.start()
+        self.synthetic.install(self._mocker)
+
+    def stop(self):
+        self._mocker.stop()
+
+    def make_cloud(self):
+        return self.synthetic.make_cloud()
+
+    def request_count(self):
+        return len(self._mocker.request_history)
+
+    def requests_since(self, start):
+        calls = []
+        for request in self._mocker.request_history[start:]:
+            parsed = urllib.parse.urlparse(request.url)
+            calls.append((
+                request.method, parsed.hostname.split('.', 1)[0],
+                parsed.path))
+        return calls
+
+
+class _HTTPTransport(object):
+    """Answer calls over real sockets with a FakeCloudServer."""
+
+    def __init__(self, synthetic, latency):
+        self.server = server.FakeCloudServer(synthetic, latency=latency)
+
+    @property
+    def clouds_yaml(self):
+        return self.server.clouds_yaml
+
+    def start(self):
+        self.server.start()
+
+    def stop(self):
+        self.server.stop()
+
+    def make_cloud(self):
+        return self.server.make_cloud()
+
+    def request_count(self):
+        return len(self.server.requests)
+
+    def requests_since(self, start):
+        return self.server.requests[start:]
+
+
+class Environment(object):
+    """Everything a benchmark needs, shared by all of the benchmarks."""
+
+    def __init__(self, synthetic, transport, segments):
+        self.synthetic = synthetic
+        self.transport = transport
+        self.segments = segments
+        self.cloud = transport.make_cloud()
+        self._inventory = None
+        self._tempdir = None
+        self._counter = 0
+
+    def unique_name(self, prefix):
+        self._counter += 1
+        return '{0}-{1:06d}'.format(prefix, self._counter)
+
+    @property
+    def inventory(self):
+        if self._inventory is None:
+            self._inventory = inventory.OpenStackInventory(
+                config_files=[self.transport.clouds_yaml],
+                cloud=fixture.CLOUD_NAME)
+        return self._inventory
+
+    def large_file(self, size):
+        if self._tempdir is None:
+            self._tempdir = tempfile.mkdtemp(prefix='shade-benchmark-')
+        filename = os.path.join(self._tempdir, 'object-{0}'.format(size))
+        if not os.path.exists(filename):
+            # A sparse file, so that big objects cost no disk
+            with open(filename, 'wb') as f:
+                f.seek(size - 1)
+                f.write(b'\0')
+        return filename
+
+    def cleanup(self):
+        if self._tempdir is not None:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self._tempdir = None
+
+
+def _raw(records):
+    return meta.obj_list_to_munch(copy.deepcopy(records))
+
+
+@benchmark('import_shade')
+def _import_shade(env):
+    # Cold start in a fresh interpreter, which is what every run of
+    # shade-inventory pays
+    return functools.partial(
+        subprocess.check_call, [sys.executable, '-c', 'import shade'])
+
+
+@benchmark('list_servers_detailed')
+def _list_servers_detailed(env):
+    return functools.partial(env.cloud.list_servers, detailed=True)
+
+
+@benchmark('inventory_list_hosts')
+def _inventory_list_hosts(env):
+    return env.inventory.list_hosts
+
+
+@benchmark('create_server_name_resolution')
+def _create_server(env):
+    # Use the last image and flavor, so lookups scan the whole listing
+    synthetic = env.synthetic
+    image = synthetic.images[-1]['name'] if synthetic.images else None
+    flavor = synthetic.flavors[-1]['name'] if synthetic.flavors else None
+    return functools.partial(
+        env.cloud.create_server, env.unique_name('benchmark'),
+        image=image, flavor=flavor, network=fixture._PRIVATE_NETWORK,
+        auto_ip=False, wait=False)
+
+
+def _normalize(method, attr):
+    def setup(env):
+        return functools.partial(
+            getattr(env.cloud, method), _raw(getattr(env.synthetic, attr)))
+    return setup
+
+
+for _resource, _attr in (
+        ('servers', 'servers'),
+        ('flavors', 'flavors'),
+        ('images', 'images'),
+        ('volumes', 'volumes'),
+        ('floating_ips', 'floating_ips'),
+        ('projects', 'projects')):
+    benchmark('normalize_' + _resource)(
+        _normalize('_normalize_' + _resource, _attr))
+
+
+def _normalize_reference(method, attr):
+    # The normalizers as they were before they became table driven, to
+    # compare against within a single run
+    def setup(env):
+        normalizer = reference.ReferenceNormalizer(env.cloud)
+        return functools.partial(
+            getattr(normalizer, method), _raw(getattr(env.synthetic, attr)))
+    return setup
+
+
+for _resource in ('servers', 'flavors', 'images', 'volumes'):
+    benchmark('normalize_{0}_reference'.format(_resource))(
+        _normalize_reference('_normalize_' + _resource, _resource))
+
+
+def _munchify(to_munch):
+    def setup(env):
+        return functools.partial(
+            to_munch, copy.deepcopy(env.synthetic.servers))
+    return setup
+
+
+benchmark('obj_list_to_munch')(_munchify(meta.obj_list_to_munch))
+benchmark('obj_list_to_munch_reference')(
+    _munchify(reference.obj_list_to_munch))
+
+
+def _normalize_strict(compact):
+    # Peak memory is where these differ
+    def setup(env):
+        cloud = shade.OpenStackCloud(
+            cloud_config=env.cloud.cloud_config, strict=True)
+        cloud._compact_records = compact
+        return functools.partial(
+            cloud._normalize_servers, _raw(env.synthetic.servers))
+    return setup
+
+
+benchmark('normalize_servers_strict')(_normalize_strict(False))
+benchmark('normalize_servers_compact')(_normalize_strict(True))
+
+
+def _filter_list(name_or_id=None, filters=None):
+    def setup(env):
+        servers = env.cloud._normalize_servers(_raw(env.synthetic.servers))
+        if name_or_id == 'last':
+            name = servers[-1]['name'] if servers else None
+        else:
+            name = name_or_id
+        return functools.partial(_utils._filter_list, servers, name, filters)
+    return setup
+
+
+benchmark('filter_list_name')(_filter_list(name_or_id='last'))
+benchmark('filter_list_glob')(_filter_list(name_or_id='server-0001*'))
+benchmark('filter_list_dict')(_filter_list(
+    filters={'status': 'ACTIVE', 'metadata': {'group': 'group-3'}}))
+benchmark('filter_list_jmespath')(_filter_list(
+    filters="[?metadata.group=='group-3']"))
+
+
+_SEGMENT_SIZE = 64 * 1024
+
+
+@benchmark('swift_file_segments')
+def _swift_file_segments(env):
+    size = _SEGMENT_SIZE * env.segments
+    return functools.partial(
+        env.cloud._get_file_segments, 'container/object',
+        env.large_file(size), size, _SEGMENT_SIZE)
+
+
+@benchmark('swift_create_large_object')
+def _swift_create_large_object(env):
+    filename = env.large_file(_SEGMENT_SIZE * env.segments)
+    return functools.partial(
+        env.cloud.create_object, 'benchmark', env.unique_name('object'),
+        filename=filename, segment_size=_SEGMENT_SIZE)
+
+
+def _endpoint_key(call):
+    method, service, path = call
+    return '{method} {service}{path}'.format(
+        method=method, service=service, path=_ID_IN_PATH.sub('/{id}', path))
+
+
+def _summarize(times):
+    ordered = sorted(times)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        median = ordered[middle]
+    else:
+        median = (ordered[middle - 1] + ordered[middle]) / 2.0
+    return dict(
+        runs=len(ordered),
+        min=ordered[0],
+        max=ordered[-1],
+        mean=sum(ordered) / len(ordered),
+        median=median)
+
+
+def _run_one(env, setup, repeat, memory):
+    transport = env.transport
+
+    # Warm up, and measure memory while we're at it
+    func = setup(env)
+    if memory and tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    else:
+        func()
+        peak = None
+
+    times = []
+    calls = collections.Counter()
+    for _ in range(repeat):
+        func = setup(env)
+        start_calls = transport.request_count()
+        start = _timer()
+        func()
+        times.append(_timer() - start)
+        calls = collections.Counter(
+            _endpoint_key(call)
+            for call in transport.requests_since(start_calls))
+    return dict(
+        wall=_summarize(times),
+        calls=sum(calls.values()),
+        calls_by_endpoint=dict(calls),
+        peak_memory=peak)
+
+
+def run(names=None, repeat=5, memory=True, page_size=None, seed=0,
+        segments=64, transport='mock', latency=0, **sizes):
+    """Run benchmarks against a SyntheticCloud.
+
+    :param list names: Benchmarks to run. Defaults to all of them.
+    :param int repeat: Timed runs of each benchmark.
+    :param bool memory: Whether to measure peak memory. Needs tracemalloc.
+    :param int page_size: Page size of the synthetic listings.
+    :param int seed: Seed of the synthetic cloud.
+    :param int segments: Number of segments of the large Swift object.
+    :param string transport: ``mock`` to answer calls in process with
+                             requests_mock, or ``http`` to serve the cloud
+                             over real sockets with a FakeCloudServer.
+    :param float latency: Seconds the ``http`` transport waits before
+                          answering each call.
+
+    All other keyword arguments are resource counts of the synthetic cloud.
+
+    :returns: A dict that can be serialized to JSON and handed to
+              ``compare`` later.
+    """
+    names = list(names or BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(
+            "Unknown benchmarks: {0}".format(', '.join(unknown)))
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+    synthetic = fixture.SyntheticCloud(page_size=page_size, seed=seed, **sizes)
+    if transport == 'mock':
+        if latency:
+            raise ValueError("latency needs the http transport")
+        calls = _MockTransport(synthetic)
+    elif transport == 'http':
+        calls = _HTTPTransport(synthetic, latency)
+    else:
+        raise ValueError("Unknown transport: {0}".format(transport))
+    results = collections.OrderedDict()
+    calls.start()
+    try:
+        env = Environment(synthetic, calls, segments)
+        try:
+            for name in names:
+                results[name] = _run_one(
+                    env, BENCHMARKS[name], repeat, memory)
+        finally:
+            env.cleanup()
+    finally:
+        calls.stop()
+    return dict(
+        format_version=FORMAT_VERSION,
+        created=datetime.datetime.utcnow().isoformat(),
+        python=platform.python_version(),
+        shade=shade.__version__,
+        sizes=synthetic.sizes,
+        page_size=page_size,
+        seed=seed,
+        segments=segments,
+        transport=transport,
+        latency=latency,
+        repeat=repeat,
+        results=results)
+
+
+def _ratio(new, old):
+    if not old or new is None:
+        return None
+    return new / float(old)
+
+
+def compare(baseline, current):
+    """Compare two results of ``run``.
+
+    Ratios are current divided by baseline, so anything above 1 got worse.
+
+    :returns: A dict of benchmark name to a dict of ``wall_ratio`` (of the
+              medians), ``calls_delta`` and ``memory_ratio``.
+    """
+    comparison = collections.OrderedDict()
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        comparison[name] = dict(
+            wall_ratio=_ratio(
+                result['wall']['median'], old['wall']['median']),
+            calls_delta=result['calls'] - old['calls'],
+            memory_ratio=_ratio(result['peak_memory'], old['peak_memory']))
+    return comparison
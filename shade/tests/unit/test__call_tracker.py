@@ -0,0 +1,145 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from shade import _call_tracker
+from shade import exc
+from shade import metrics
+from shade.tests.unit import base
+
+
+class TestCallTracker(base.RequestsMockTestCase):
+
+    def _register_networks(self, count):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []})
+            for _ in range(count)])
+
+    def test_records_calls(self):
+        network = {'id': 'net-id', 'name': 'mynet'}
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 complete_qs=True,
+                 json={'networks': [network]}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=mynet']),
+                 json={'networks': [network]}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 complete_qs=True,
+                 json={'networks': [network]}),
+        ])
+        with self.cloud.call_tracker() as tracker:
+            self.cloud.list_networks()
+            self.cloud.get_network('mynet')
+            self.cloud.list_networks()
+        self.assertEqual(3, len(tracker))
+        call = tracker.calls[0]
+        self.assertEqual('network.GET.networks', call.name)
+        self.assertEqual('GET', call.method)
+        self.assertEqual('list_networks', call.operation)
+        self.assertIn('test__call_tracker.py', call.caller)
+        self.assertEqual('get_network', tracker.calls[1].operation)
+        self.assertEqual(
+            [('network.GET.networks', 3)], tracker.repeated_calls())
+        # The lookup by name is a different query
+        self.assertEqual(1, len(tracker.identical_calls()))
+        self.assertEqual(2, tracker.identical_calls()[0][3])
+        self.assertIn('3 x network.GET.networks', tracker.report())
+        self.assert_calls()
+
+    def test_stops_recording_after_block(self):
+        self._register_networks(2)
+        with self.cloud.call_tracker() as tracker:
+            self.cloud.list_networks()
+        self.cloud.list_networks()
+        self.assertEqual(1, len(tracker))
+        self.assertEqual(0, len(self.cloud._metrics))
+
+    def test_budget_exceeded(self):
+        self._register_networks(2)
+
+        def run():
+            with self.cloud.call_tracker(budget=1):
+                self.cloud.list_networks()
+                self.cloud.list_networks()
+        self.assertRaises(exc.OpenStackCloudCallBudgetExceeded, run)
+
+    def test_max_repeats_exceeded(self):
+        self._register_networks(3)
+
+        def run():
+            with self.cloud.call_tracker(budget=5, max_repeats=2):
+                for _ in range(3):
+                    self.cloud.list_networks()
+        self.assertRaises(exc.OpenStackCloudCallBudgetExceeded, run)
+
+    def test_within_budget(self):
+        self._register_networks(1)
+        with self.cloud.call_tracker(budget=1, max_repeats=1) as tracker:
+            self.cloud.list_networks()
+        self.assertEqual(1, len(tracker))
+
+    def test_manager_with_own_emitter(self):
+        self._register_networks(2)
+        self.cloud.manager.metrics = metrics.MetricsRegistry()
+
+        def run():
+            with self.cloud.call_tracker(budget=1):
+                self.cloud.list_networks()
+                self.cloud.list_networks()
+        self.assertRaises(exc.OpenStackCloudCallBudgetExceeded, run)
+
+    def test_manager_without_metrics_fails(self):
+        # Something that runs tasks, but knows nothing about metrics
+        self.cloud.manager = type('Manager', (object,), {})()
+
+        def run():
+            with self.cloud.call_tracker(budget=1):
+                pass
+        self.assertRaises(exc.OpenStackCloudException, run)
+        self.assertEqual(0, len(self.cloud._metrics))
+
+    def test_async_call_caller(self):
+        self._register_networks(1)
+        with self.cloud.call_tracker() as tracker:
+            self.cloud._network_client.get(
+                '/networks.json', run_async=True).result()
+        self.assertEqual(1, len(tracker))
+        # Found from the submitting thread, not the executor's
+        self.assertEqual('request', tracker.calls[0].operation)
+        self.assertNotIn('concurrent', tracker.calls[0].caller)
+
+    def test_async_caller_only_found_while_tracking(self):
+        self._register_networks(2)
+        emitter = mock.Mock(spec=metrics.MetricsEmitter)
+        self.cloud.add_metrics_emitter(emitter)
+        with mock.patch.object(
+                _call_tracker, '_find_caller',
+                wraps=_call_tracker._find_caller) as find_caller:
+            self.cloud._network_client.get(
+                '/networks.json', run_async=True).result()
+            self.assertEqual(0, find_caller.call_count)
+            with self.cloud.call_tracker():
+                self.cloud._network_client.get(
+                    '/networks.json', run_async=True).result()
+            self.assertEqual(1, find_caller.call_count)
+        self.assertFalse(_call_tracker.tracking())
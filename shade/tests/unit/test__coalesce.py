@@ -0,0 +1,182 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import concurrent.futures
+import threading
+import time
+
+import mock
+
+from shade import _adapter
+from shade import _coalesce
+from shade import exc
+from shade.tests.unit import base
+
+
+class TestRequestCoalescer(base.TestCase):
+
+    def setUp(self):
+        super(TestRequestCoalescer, self).setUp()
+        self.coalescer = _coalesce.RequestCoalescer()
+
+    def _wait_for_waiters(self, key, count):
+        for _ in range(1000):
+            call = self.coalescer._calls.get(key)
+            if call and call.waiters >= count:
+                return
+            time.sleep(0.001)
+        self.fail("Waiters never showed up")
+
+    def test_concurrent_calls_share_result(self):
+        release = threading.Event()
+        func = mock.Mock()
+
+        def slow():
+            func()
+            release.wait()
+            return {'networks': [{'id': '1'}]}
+
+        with concurrent.futures.ThreadPoolExecutor(5) as pool:
+            futures = [
+                pool.submit(self.coalescer.do, 'key', slow)
+                for _ in range(5)]
+            self._wait_for_waiters('key', 4)
+            release.set()
+            results = [f.result() for f in futures]
+
+        func.assert_called_once_with()
+        for result in results:
+            self.assertEqual({'networks': [{'id': '1'}]}, result)
+        # Every caller must get its own copy to mutate
+        self.assertEqual(5, len(set(id(r) for r in results)))
+        self.assertEqual(0, self.coalescer.in_flight())
+
+    def test_leader_mutation_not_seen_by_waiters(self):
+        release = threading.Event()
+        mutated = threading.Event()
+
+        def slow():
+            release.wait()
+            return {'server': {'flavor': {'id': '1', 'links': []}}}
+
+        def leader():
+            result = self.coalescer.do('key', slow)
+            # What _normalize_server does to the flavor of a server
+            result['server']['flavor'].pop('links')
+            mutated.set()
+            return result
+
+        def waiter():
+            result = self.coalescer.do('key', slow)
+            # Let the leader's mutation land before looking at the result
+            mutated.wait(5)
+            return result
+
+        with concurrent.futures.ThreadPoolExecutor(4) as pool:
+            first = pool.submit(leader)
+            self._wait_for_waiters('key', 0)
+            waiters = [pool.submit(waiter) for _ in range(3)]
+            self._wait_for_waiters('key', 3)
+            release.set()
+            self.assertEqual(
+                {'server': {'flavor': {'id': '1'}}}, first.result())
+            for future in waiters:
+                self.assertEqual(
+                    {'server': {'flavor': {'id': '1', 'links': []}}},
+                    future.result())
+
+    def test_different_keys_not_shared(self):
+        func = mock.Mock(return_value='ok')
+        self.coalescer.do('one', func)
+        self.coalescer.do('two', func)
+        self.assertEqual(2, func.call_count)
+
+    def test_sequential_calls_not_shared(self):
+        func = mock.Mock(return_value='ok')
+        self.coalescer.do('key', func)
+        self.coalescer.do('key', func)
+        self.assertEqual(2, func.call_count)
+
+    def test_exception_reraised_to_waiters(self):
+        release = threading.Event()
+
+        def fail():
+            release.wait()
+            raise exc.OpenStackCloudException("boom")
+
+        with concurrent.futures.ThreadPoolExecutor(3) as pool:
+            futures = [
+                pool.submit(self.coalescer.do, 'key', fail)
+                for _ in range(3)]
+            self._wait_for_waiters('key', 2)
+            release.set()
+            for future in futures:
+                self.assertRaises(
+                    exc.OpenStackCloudException, future.result)
+        self.assertEqual(0, self.coalescer.in_flight())
+
+    def test_make_request_key(self):
+        key1 = _coalesce.make_request_key(
+            'network', 'get', '/networks.json', params={'a': 1, 'b': 2})
+        key2 = _coalesce.make_request_key(
+            'network', 'GET', '/networks.json', params={'b': 2, 'a': 1})
+        key3 = _coalesce.make_request_key(
+            'network', 'GET', '/networks.json', params={'a': 2})
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+
+
+class TestAdapterCoalescing(base.RequestsMockTestCase):
+
+    def test_get_goes_through_coalescer(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+        ])
+        with mock.patch.object(
+                self.cloud._request_coalescer, 'do',
+                wraps=self.cloud._request_coalescer.do) as do:
+            self.assertEqual([], self.cloud.list_networks())
+        self.assertEqual(1, do.call_count)
+        self.assert_calls()
+
+    def test_post_not_coalesced(self):
+        self.register_uris([
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'network': {'id': '1', 'name': 'netname'}}),
+        ])
+        with mock.patch.object(
+                self.cloud._request_coalescer, 'do') as do:
+            self.cloud.create_network('netname')
+        do.assert_not_called()
+        self.assert_calls()
+
+    def test_positional_args_not_coalesced(self):
+        adapter = self.cloud._network_client
+        with mock.patch.object(
+                self.cloud._request_coalescer, 'do') as do, \
+                mock.patch.object(adapter, '_shade_request') as request:
+            adapter.request('/networks.json', 'GET', False, None, 'extra')
+        do.assert_not_called()
+        request.assert_called_once_with(
+            '/networks.json', 'GET', False, None, 'extra')
+
+    def test_coalescer_is_keyword_only(self):
+        adapter = _adapter.ShadeAdapter(
+            self.cloud.log, self.cloud.manager,
+            session=self.cloud.keystone_session, service_type='network')
+        self.assertIsNone(adapter.coalescer)
+        self.assertEqual('network', adapter.service_type)
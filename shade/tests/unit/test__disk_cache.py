@@ -0,0 +1,126 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+import stat
+
+import fixtures
+from keystoneauth1 import session as ks_session
+
+import shade
+from shade import _disk_cache
+from shade.tests.unit import base
+
+
+class TestDiskCache(base.RequestsMockTestCase):
+
+    def setUp(self):
+        super(TestDiskCache, self).setUp()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'cache')
+        self.images_url = 'https://image.example.com/v2/images'
+
+    def _make_cloud(self, **settings):
+        # A new cloud config, so that each cloud gets a new session, as it
+        # would in a new process
+        cloud_config = self.config.get_one_cloud(
+            cloud='_test_cloud_', validate=True, identity_api_version='3')
+        cloud = shade.OpenStackCloud(cloud_config=cloud_config)
+        settings['path'] = self.path
+        cloud._disk_cache = cloud._make_disk_cache(cloud_config, settings)
+        return cloud
+
+    def _token_mock(self):
+        return dict(
+            method='POST', uri='https://identity.example.com/v3/auth/tokens',
+            headers={'X-Subject-Token': self.getUniqueString('Token')},
+            text=open(os.path.join(
+                self.fixtures_directory, 'catalog-v3.json'), 'r').read())
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.cloud._disk_cache)
+        self.assertIsNone(self.cloud._make_disk_cache(
+            self.cloud_config, {'path': self.path}))
+
+    def test_discovery_and_token_reused(self):
+        self.register_uris([
+            self.get_glance_discovery_mock_dict(),
+            dict(method='GET', uri=self.images_url, json={'images': []}),
+            # Discovery documents come from disk, the token doesn't
+            self._token_mock(),
+            dict(method='GET', uri=self.images_url, json={'images': []}),
+            # Now the token was kept as well
+            dict(method='GET', uri=self.images_url, json={'images': []}),
+        ])
+        self._make_cloud(discovery=True).list_images()
+        self._make_cloud(discovery=True, auth=True).list_images()
+        self._make_cloud(discovery=True, auth=True).list_images()
+        self.assert_calls()
+
+        self.assertEqual(
+            stat.S_IRWXU, stat.S_IMODE(os.stat(self.path).st_mode))
+        files = os.listdir(self.path)
+        self.assertEqual(2, len(files))
+        for name in files:
+            self.assertEqual(
+                stat.S_IRUSR | stat.S_IWUSR,
+                stat.S_IMODE(os.stat(os.path.join(self.path, name)).st_mode))
+
+    def test_expired_token_not_used(self):
+        self.register_uris([
+            self.get_glance_discovery_mock_dict(),
+            dict(method='GET', uri=self.images_url, json={'images': []}),
+            self._token_mock(),
+            dict(method='GET', uri=self.images_url, json={'images': []}),
+        ])
+        self._make_cloud(discovery=True, auth=True).list_images()
+        [name] = [
+            name for name in os.listdir(self.path)
+            if name.startswith('auth-')]
+        with open(os.path.join(self.path, name), 'r') as f:
+            state = json.load(f)
+        state['expires_at'] = 0
+        with open(os.path.join(self.path, name), 'w') as f:
+            json.dump(state, f)
+        self._make_cloud(discovery=True, auth=True).list_images()
+        self.assert_calls()
+
+    def test_shared_directory_refused(self):
+        os.mkdir(self.path)
+        os.chmod(self.path, 0o777)
+        cache = _disk_cache.DiskCache(self.path)
+        cache.write('discovery', 'key', {'a': 1})
+        self.assertIsNone(cache.read('discovery', 'key'))
+        self.assertEqual([], os.listdir(self.path))
+
+    def test_update_merges(self):
+        cache = _disk_cache.DiskCache(self.path)
+        cache.update('discovery', 'key', {'a': 1})
+        cache.update('discovery', 'key', {'b': 2})
+        self.assertEqual({'a': 1, 'b': 2}, cache.read('discovery', 'key'))
+        self.assertIsNone(cache.read('discovery', 'other'))
+
+    def test_keystoneauth_internals(self):
+        # The discovery cache depends on these keystoneauth internals. If
+        # this fails, keystoneauth changed and the disk cache needs updating.
+        self.assertTrue(
+            _disk_cache._discovery_cache_supported(ks_session.Session()))
+
+    def test_discovery_skipped_without_internals(self):
+        class Session(object):
+            auth = None
+
+        session = Session()
+        _disk_cache.DiskCache(self.path).attach(
+            session, 'https://identity.example.com', 'project')
+        self.assertFalse(hasattr(session, '_discovery_cache'))
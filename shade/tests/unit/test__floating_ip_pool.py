@@ -0,0 +1,203 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import concurrent.futures
+import itertools
+import threading
+import time
+
+import fixtures
+import mock
+
+import shade
+from shade import _floating_ip_pool
+from shade import exc
+from shade.tests.unit import base
+
+
+class TestFloatingIPPool(base.TestCase):
+
+    def setUp(self):
+        super(TestFloatingIPPool, self).setUp()
+        self._ids = itertools.count()
+        self._ids_lock = threading.Lock()
+        self.create = mock.Mock(side_effect=self._create)
+
+    def _create(self):
+        with self._ids_lock:
+            return {'id': 'fip-{0}'.format(next(self._ids))}
+
+    def _make_pool(self, size, available=None, check=None):
+        pool = _floating_ip_pool.FloatingIPPool(
+            'net-id', size, self.create, available=available, check=check)
+        self.addCleanup(pool.stop)
+        return pool
+
+    def _wait_for_size(self, pool, size):
+        for _ in range(1000):
+            if len(pool) >= size:
+                return
+            time.sleep(0.001)
+        self.fail("The pool never filled up")
+
+    def test_adopts_and_fills(self):
+        pool = self._make_pool(3, available=lambda: [{'id': 'old'}])
+        pool.start()
+        self._wait_for_size(pool, 3)
+        self.assertEqual(2, self.create.call_count)
+        self.assertIn('old', pool.ids())
+        # Handing IPs out wakes the pool up to replace them
+        self.assertEqual('old', pool.take()['id'])
+        self._wait_for_size(pool, 3)
+        self.assertEqual(3, self.create.call_count)
+        self.assertEqual(3, len(pool.stop()))
+        self.assertEqual(0, len(pool))
+
+    def test_take_is_unique(self):
+        pool = self._make_pool(5)
+        pool.start()
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            ips = list(executor.map(lambda _: pool.take(), range(40)))
+        self.assertEqual(40, len(set(ip['id'] for ip in ips)))
+
+    def test_take_when_empty(self):
+        pool = self._make_pool(0)
+        pool.start()
+        self.assertEqual([], pool.take_many(2))
+        self.assertEqual('fip-0', pool.take()['id'])
+        self.create.assert_called_once_with()
+
+    def test_failed_allocations_retried(self):
+        self.useFixture(fixtures.MockPatchObject(
+            _floating_ip_pool, 'RETRY_DELAY', 0.01))
+        self.create.side_effect = [
+            exc.OpenStackCloudException('quota'), {'id': 'fip'}]
+        pool = self._make_pool(1)
+        pool.start()
+        self._wait_for_size(pool, 1)
+        self.assertEqual(['fip'], [ip['id'] for ip in pool.take_many(5)])
+
+    def test_take_skips_unusable(self):
+        pool = self._make_pool(
+            0, available=lambda: [{'id': 'gone'}, {'id': 'a'}, {'id': 'b'}],
+            check=lambda ips: [ip for ip in ips if ip['id'] != 'gone'])
+        pool.start()
+        self.assertEqual(
+            ['a', 'b'], [ip['id'] for ip in pool.take_many(2)])
+        self.assertEqual(0, len(pool))
+
+    def test_failed_check_keeps_ips(self):
+        check = mock.Mock(side_effect=exc.OpenStackCloudException('down'))
+        pool = self._make_pool(
+            0, available=lambda: [{'id': 'a'}, {'id': 'b'}], check=check)
+        pool.start()
+        self.assertRaises(exc.OpenStackCloudException, pool.take_many, 1)
+        self.assertEqual(['a', 'b'], [ip['id'] for ip in pool.stop()])
+
+
+class TestCloudFloatingIPPool(base.TestCase):
+
+    def setUp(self):
+        super(TestCloudFloatingIPPool, self).setUp()
+        with mock.patch.object(
+                self.cloud_config._openstack_config, 'get_extra_config',
+                side_effect=lambda key, defaults: dict(
+                    defaults, floating_ip_pool={'size': 2})):
+            self.cloud = shade.OpenStackCloud(cloud_config=self.cloud_config)
+        self.addCleanup(self.cloud.stop_floating_ip_pools)
+        self._ids = itertools.count()
+        for name, kwargs in (
+                ('_use_neutron_floating', dict(return_value=True)),
+                ('_get_floating_network_id', dict(return_value='net-id')),
+                ('_unattached_floating_ips', dict(return_value=[])),
+                ('_check_pooled_floating_ips', dict(
+                    side_effect=lambda ips: ips)),
+                ('_neutron_create_floating_ip', dict(
+                    side_effect=lambda **kw: {
+                        'id': 'fip-{0}'.format(next(self._ids))})),
+                ('delete_floating_ip', dict())):
+            patcher = mock.patch.object(self.cloud, name, **kwargs)
+            setattr(self, name.lstrip('_'), patcher.start())
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(
+            shade.OpenStackCloud, 'current_project_id',
+            new_callable=mock.PropertyMock, return_value='project-id')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.strict_cloud._get_floating_ip_pool('net-id'))
+
+    def test_available_floating_ip_uses_pool(self):
+        ips = [self.cloud.available_floating_ip() for _ in range(3)]
+        self.assertEqual(3, len(set(ip['id'] for ip in ips)))
+        self.unattached_floating_ips.assert_called_once_with('net-id')
+        pool = self.cloud._floating_ip_pools['net-id']
+        self.assertEqual(2, pool.size)
+
+        self.cloud.stop_floating_ip_pools(release=True)
+        self.assertEqual({}, self.cloud._floating_ip_pools)
+        # Only the IPs nobody was given are released
+        handed_out = set(ip['id'] for ip in ips)
+        for call in self.delete_floating_ip.call_args_list:
+            self.assertNotIn(call[0][0], handed_out)
+            self.assertEqual({'retry': 0}, call[1])
+
+    def test_networks_limited(self):
+        self.cloud._floating_ip_pool_networks = ['other']
+        with mock.patch.object(
+                self.cloud, 'get_external_ipv4_floating_networks',
+                return_value=[{'id': 'net-id', 'name': 'public'}]):
+            self.assertIsNone(self.cloud._get_floating_ip_pool('net-id'))
+            self.cloud._floating_ip_pool_networks = ['public']
+            self.assertIsNotNone(
+                self.cloud._get_floating_ip_pool('net-id'))
+
+    def test_attach_falls_back_to_next_ip(self):
+        pool = self.cloud._get_floating_ip_pool('net-id')
+        for _ in range(1000):
+            if len(pool) >= 2:
+                break
+            time.sleep(0.001)
+        server = {'id': 'server-id'}
+        taken = {'id': 'taken'}
+        with mock.patch.object(
+                self.cloud, '_attach_ip_to_server',
+                side_effect=[exc.OpenStackCloudException('conflict'),
+                             server]) as attach:
+            result, f_ip = self.cloud._attach_pooled_ip(
+                pool, server, taken, wait=False)
+        self.assertIs(server, result)
+        self.assertNotEqual('taken', f_ip['id'])
+        attach.assert_called_with(server=server, floating_ip=f_ip, wait=False)
+
+
+class TestCheckPooledFloatingIPs(base.RequestsMockTestCase):
+
+    def test_check_pooled_floating_ips(self):
+        ip = {
+            'id': 'fip-a', 'floating_ip_address': '172.24.4.1',
+            'floating_network_id': 'net-id', 'port_id': None,
+            'fixed_ip_address': None, 'router_id': None, 'status': 'DOWN',
+            'tenant_id': 'project-id'}
+        attached = dict(ip, id='fip-b', port_id='port-id')
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id=fip-a', 'id=fip-b', 'id=fip-c']),
+                 json={'floatingips': [attached, ip]}),
+        ])
+        usable = self.cloud._check_pooled_floating_ips(
+            [{'id': 'fip-a'}, {'id': 'fip-b'}, {'id': 'fip-c'}])
+        self.assertEqual(['fip-a'], [f_ip['id'] for f_ip in usable])
+        self.assert_calls()
@@ -0,0 +1,366 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+import mock
+
+from shade import _list_cache
+from shade import exc
+from shade.tests import fakes
+from shade.tests.unit import base
+
+
+class TestListCache(base.TestCase):
+
+    def test_serves_snapshot_until_expired(self):
+        fetch = mock.Mock(side_effect=[['a'], ['a', 'b']])
+        cache = _list_cache.ListCache('things', 60, fetch=fetch)
+        self.assertEqual(['a'], cache.get())
+        self.assertEqual(['a'], cache.get())
+        self.assertEqual(1, fetch.call_count)
+        cache.invalidate()
+        self.assertEqual(['a', 'b'], cache.get())
+        self.assertEqual(2, fetch.call_count)
+
+    def test_zero_age_always_fetches(self):
+        fetch = mock.Mock(return_value=['a'])
+        cache = _list_cache.ListCache('things', 0, fetch=fetch)
+        cache.get()
+        cache.get()
+        self.assertEqual(2, fetch.call_count)
+
+    def test_fetch_override_becomes_default(self):
+        fetch = mock.Mock(return_value=['b'])
+        cache = _list_cache.ListCache('things', 0)
+        self.assertEqual(['b'], cache.get(fetch))
+        self.assertEqual(['b'], cache.get())
+        self.assertEqual(2, fetch.call_count)
+
+    def test_refresh_error_counted(self):
+        fetch = mock.Mock(
+            side_effect=exc.OpenStackCloudException("broken"))
+        cache = _list_cache.ListCache('things', 60, fetch=fetch)
+        self.assertRaises(exc.OpenStackCloudException, cache.get)
+        stats = cache.stats()
+        self.assertEqual(1, stats.refresh_errors)
+        self.assertEqual('broken', stats.last_error)
+        self.assertIsNone(stats.age)
+        self.assertEqual(0, stats.refresh_count)
+
+    def test_stats(self):
+        cache = _list_cache.ListCache(
+            'things', 60, fetch=lambda: ['a', 'b'])
+        cache.get()
+        stats = cache.stats()
+        self.assertEqual('things', stats.name)
+        self.assertEqual(2, stats.size)
+        self.assertEqual(1, stats.refresh_count)
+        self.assertLess(stats.age, 60)
+        self.assertIsNotNone(stats.last_refresh_duration)
+
+    def test_background_refresh(self):
+        results = [['a'], ['a', 'b']]
+
+        def fetch():
+            return results[min(fetch.calls, 1)]
+        fetch.calls = 0
+
+        def counting_fetch():
+            value = fetch()
+            fetch.calls += 1
+            return value
+
+        cache = _list_cache.ListCache(
+            'things', 0.05, fetch=counting_fetch, background=True)
+        self.addCleanup(cache.stop)
+        # The first read blocks for data
+        self.assertEqual(['a'], cache.get())
+        for _ in range(1000):
+            if cache.stats().refresh_count > 1:
+                break
+            time.sleep(0.001)
+        self.assertEqual(['a', 'b'], cache.get())
+
+    def test_background_keeps_last_good_snapshot(self):
+        fetch = mock.Mock(
+            side_effect=[['a']] + [exc.OpenStackCloudException("x")] * 100)
+        cache = _list_cache.ListCache(
+            'things', 0.01, fetch=fetch, background=True)
+        self.addCleanup(cache.stop)
+        self.assertEqual(['a'], cache.get())
+        for _ in range(1000):
+            if cache.stats().refresh_errors:
+                break
+            time.sleep(0.001)
+        self.assertEqual(['a'], cache.get())
+        self.assertEqual(1, cache.stats().refresh_count)
+
+    def test_background_invalidate_refreshes_on_next_get(self):
+        fetch = mock.Mock(side_effect=[[0], [1]])
+        cache = _list_cache.ListCache(
+            'things', 30, fetch=fetch, background=True)
+        self.addCleanup(cache.stop)
+        self.assertEqual([0], cache.get())
+        self.assertEqual([0], cache.get())
+        cache.invalidate()
+        self.assertEqual([1], cache.get())
+        self.assertEqual([1], cache.get())
+        self.assertEqual(2, fetch.call_count)
+
+    def test_patch_keeps_age(self):
+        cache = _list_cache.ListCache('things', 60, fetch=lambda: ['a'])
+        cache.patch(lambda data: data + ['b'])
+        self.assertIsNone(cache.data)
+        cache.get()
+        age = cache.age
+        cache.patch(lambda data: data + ['b'])
+        self.assertEqual(['a', 'b'], cache.get())
+        self.assertGreaterEqual(cache.age, age)
+        self.assertEqual(1, cache.stats().refresh_count)
+
+    def test_upsert_record(self):
+        records = [{'id': '1', 'v': 1}, {'id': '2', 'v': 1}]
+        self.assertEqual(
+            [{'id': '1', 'v': 2}, {'id': '2', 'v': 1}],
+            _list_cache.upsert_record(records, {'id': '1', 'v': 2}))
+        self.assertEqual(
+            [{'id': '1', 'v': 1}, {'id': '2', 'v': 1}, {'id': '3'}],
+            _list_cache.upsert_record(records, {'id': '3'}))
+        # The original list is left alone for callers holding on to it
+        self.assertEqual(2, len(records))
+
+    def test_remove_record(self):
+        records = [{'id': '1'}, {'id': '2'}]
+        self.assertEqual(
+            [{'id': '2'}], _list_cache.remove_record(records, '1'))
+        self.assertEqual(records, _list_cache.remove_record(records, '3'))
+
+    def test_remove_records(self):
+        records = [{'id': '1'}, {'id': '2'}, {'id': '3'}]
+        self.assertEqual(
+            [{'id': '2'}],
+            _list_cache.remove_records(records, frozenset(['1', '3', '4'])))
+
+    def test_cached_list_call(self):
+        method = mock.Mock(return_value=['a'])
+        cache = _list_cache.ListCache('things', 60, fetch=method)
+        call = _list_cache.cached_list_call(cache, method)
+        call()
+        call()
+        call(filters=None)
+        call(None)
+        self.assertEqual(1, method.call_count)
+        # Filtered calls skip the snapshot
+        call(filters={'name': 'a'})
+        self.assertEqual(2, method.call_count)
+        call.invalidate()
+        call()
+        self.assertEqual(3, method.call_count)
+
+
+class TestDeltaSyncTable(base.TestCase):
+
+    def _sync(self, table, context='ctx', full=None, changes=None):
+        return table.sync(
+            context,
+            fetch_all=lambda: full or [],
+            fetch_changes=lambda since: changes or [],
+            is_deleted=lambda r: r.get('status') == 'DELETED',
+            process=lambda r: dict(r, processed=True))
+
+    def test_full_then_delta(self):
+        table = _list_cache.DeltaSyncTable('things')
+        result = self._sync(table, full=[{'id': '1'}, {'id': '2'}])
+        self.assertEqual([{'id': '1'}, {'id': '2'}], result)
+        result = self._sync(table, changes=[
+            {'id': '2', 'status': 'DELETED'},
+            {'id': '3'},
+            {'id': '1', 'name': 'renamed'}])
+        self.assertEqual(
+            [{'id': '1', 'name': 'renamed', 'processed': True},
+             {'id': '3', 'processed': True}],
+            result)
+        self.assertEqual(1, table.full_syncs)
+        self.assertEqual(1, table.delta_syncs)
+        self.assertEqual(3, table.last_delta_size)
+
+    def test_context_change_forces_full(self):
+        table = _list_cache.DeltaSyncTable('things')
+        self._sync(table, full=[{'id': '1'}])
+        result = self._sync(table, context='other', full=[{'id': '2'}])
+        self.assertEqual([{'id': '2'}], result)
+        self.assertEqual(2, table.full_syncs)
+
+    def test_full_sync_interval(self):
+        table = _list_cache.DeltaSyncTable('things', full_sync_interval=0)
+        self._sync(table, full=[{'id': '1'}])
+        self._sync(table, full=[{'id': '1'}])
+        self.assertEqual(2, table.full_syncs)
+        self.assertEqual(0, table.delta_syncs)
+
+    def test_upsert_and_evict(self):
+        table = _list_cache.DeltaSyncTable('things')
+        self._sync(table, full=[{'id': '1'}, {'id': '2'}])
+        table.upsert({'id': '3'})
+        table.evict('1')
+        self.assertEqual([{'id': '2'}, {'id': '3'}], self._sync(table))
+
+    def test_reset(self):
+        table = _list_cache.DeltaSyncTable('things')
+        self._sync(table, full=[{'id': '1'}])
+        table.reset()
+        self._sync(table, full=[{'id': '1'}])
+        self.assertEqual(2, table.full_syncs)
+
+
+class TestCloudListCaches(base.RequestsMockTestCase):
+
+    def test_configure_generic_list_cache(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': [{'id': 'net1', 'name': 'net1'}]}),
+        ])
+        self.cloud._configure_list_caches(
+            self.cloud_config, {'networks': {'max_age': 60}})
+        self.assertEqual('net1', self.cloud.list_networks()[0]['id'])
+        self.assertEqual('net1', self.cloud.list_networks()[0]['id'])
+        stats = self.cloud.get_list_cache_stats()
+        self.assertEqual(60, stats['networks'].max_age)
+        self.assertEqual(1, stats['networks'].refresh_count)
+        self.assert_calls()
+
+    def test_search_uses_generic_list_cache(self):
+        group = {'id': 'sg1', 'name': 'web', 'security_group_rules': []}
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json']),
+                 complete_qs=True,
+                 json={'security_groups': [group]}),
+        ])
+        self.cloud._configure_list_caches(
+            self.cloud_config, {'security_groups': {'max_age': 60}})
+        # Both lookups are served by the one cached listing
+        self.assertEqual('sg1', self.cloud.get_security_group('web')['id'])
+        self.assertEqual('sg1', self.cloud.get_security_group('sg1')['id'])
+        self.assert_calls()
+
+    def test_configure_unknown_list_cache_ignored(self):
+        self.cloud._configure_list_caches(
+            self.cloud_config, {'unicorns': {'max_age': 60}})
+        self.assertNotIn('unicorns', self.cloud.get_list_cache_stats())
+
+    def test_age_properties(self):
+        self.cloud._SERVER_AGE = 7
+        self.assertEqual(
+            7, self.cloud.get_list_cache_stats()['servers'].max_age)
+
+    def test_list_servers_delta_sync(self):
+        server1 = fakes.make_fake_server('1', 'one')
+        server2 = fakes.make_fake_server('2', 'two')
+        deleted = fakes.make_fake_server('1', 'one', status='DELETED')
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', 'detail']),
+                 json={'servers': [server1]}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', 'detail']),
+                 json={'servers': [deleted, server2]}),
+        ])
+        self.cloud._configure_list_caches(
+            self.cloud_config, {'servers': {'delta_sync': True}})
+        self.assertEqual(
+            ['1'], [s['id'] for s in self.cloud.list_servers(bare=True)])
+        self.assertEqual(
+            ['2'], [s['id'] for s in self.cloud.list_servers(bare=True)])
+        self.assertNotIn(
+            'changes-since', self.adapter.request_history[-2].qs)
+        self.assertIn(
+            'changes-since', self.adapter.request_history[-1].qs)
+        # The changes-since timestamp can't be known up front
+        self.assert_calls(stop_after=2)
+
+    def test_write_through_generic_cache(self):
+        network = {'id': 'net2', 'name': 'net2'}
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': [{'id': 'net1', 'name': 'net1'}]}),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'network': network}),
+            dict(method='DELETE',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'networks', 'net1.json']),
+                 json={}),
+        ])
+        self.cloud._configure_list_caches(
+            self.cloud_config, {'networks': {'max_age': 60}})
+        self.assertEqual(
+            ['net1'], [n['id'] for n in self.cloud.list_networks()])
+        self.cloud.create_network('net2')
+        self.assertEqual(
+            ['net1', 'net2'], [n['id'] for n in self.cloud.list_networks()])
+        # get_network finds net1 in the snapshot, then deletes it
+        self.assertTrue(self.cloud.delete_network('net1'))
+        self.assertEqual(
+            ['net2'], [n['id'] for n in self.cloud.list_networks()])
+        self.assert_calls()
+
+    def test_write_through_stores_copy(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'network': {'id': 'net1', 'name': 'net1'}}),
+        ])
+        self.cloud._configure_list_caches(
+            self.cloud_config, {'networks': {'max_age': 60}})
+        self.cloud.list_networks()
+        network = self.cloud.create_network('net1')
+        network['name'] = 'changed'
+        self.assertEqual(
+            ['net1'], [n['name'] for n in self.cloud.list_networks()])
+        self.assert_calls()
+
+    def test_delete_port_evicts(self):
+        port = {'id': 'port1', 'name': 'port1', 'network_id': 'net1'}
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 json={'ports': [port]}),
+            dict(method='DELETE',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'ports', 'port1.json']),
+                 json={}),
+        ])
+        self.cloud._PORT_AGE = 60
+        self.assertEqual(
+            ['port1'], [p['id'] for p in self.cloud.list_ports()])
+        self.assertTrue(self.cloud.delete_port('port1'))
+        self.assertEqual([], self.cloud.list_ports())
+        self.assert_calls()
@@ -0,0 +1,92 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import concurrent.futures
+import threading
+import time
+
+import mock
+import testtools
+
+from shade import _poller
+from shade import exc
+from shade.tests.unit import base
+
+
+class TestStatusPoller(base.TestCase):
+
+    def _wait_for_waiters(self, poller, count):
+        for _ in range(1000):
+            if poller._waiters >= count:
+                return
+            time.sleep(0.001)
+        self.fail("Waiters never showed up")
+
+    def _wait_until_active(self, poller, resource_id):
+        for poll in poller.iterate(10, "Timeout waiting", wait=0):
+            resource = poll.get(resource_id)
+            if resource['status'] == 'ACTIVE':
+                return poll.number
+
+    def test_concurrent_waiters_share_rounds(self):
+        release = threading.Event()
+        func = mock.Mock()
+
+        def fetch():
+            func()
+            release.wait()
+            status = 'ACTIVE' if func.call_count > 1 else 'BUILD'
+            return dict(
+                (str(i), {'id': str(i), 'status': status}) for i in range(5))
+
+        poller = _poller.StatusPoller('servers', fetch)
+        with concurrent.futures.ThreadPoolExecutor(5) as pool:
+            futures = [
+                pool.submit(self._wait_until_active, poller, str(i))
+                for i in range(5)]
+            self._wait_for_waiters(poller, 5)
+            release.set()
+            numbers = [f.result() for f in futures]
+
+        # One call a round, however many waiters there are
+        self.assertEqual(2, func.call_count)
+        self.assertEqual([2] * 5, numbers)
+        self.assertEqual(0, poller._waiters)
+        self.assertIsNone(poller._round)
+
+    def test_only_fresh_rounds(self):
+        fetch = mock.Mock(return_value={})
+        poller = _poller.StatusPoller('servers', fetch)
+        first = poller.iterate(10, "Timeout waiting", wait=0)
+        self.assertEqual(1, next(first).number)
+        # A new waiter doesn't get the round it arrived after
+        second = poller.iterate(10, "Timeout waiting", wait=0)
+        self.assertEqual(2, next(second).number)
+        self.assertEqual(2, next(first).number)
+        self.assertEqual(2, fetch.call_count)
+        first.close()
+        second.close()
+        self.assertEqual(0, poller._waiters)
+
+    def test_timeout(self):
+        poller = _poller.StatusPoller('servers', lambda: {})
+        with testtools.ExpectedException(exc.OpenStackCloudTimeout, 'Gone'):
+            for poll in poller.iterate(0.01, 'Gone', wait=0.001):
+                self.assertIsNone(poll.get('1'))
+
+    def test_errors_raised_to_every_waiter(self):
+        fetch = mock.Mock(side_effect=exc.OpenStackCloudException('boom'))
+        poller = _poller.StatusPoller('servers', fetch)
+        poll = next(poller.iterate(10, "Timeout waiting", wait=0))
+        self.assertRaises(exc.OpenStackCloudException, poll.get, '1')
+        self.assertRaises(exc.OpenStackCloudException, poll.get, '1')
+        self.assertEqual(1, fetch.call_count)
@@ -0,0 +1,120 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import concurrent.futures
+import threading
+import time
+
+import mock
+import testtools
+
+from shade import _port_watcher
+from shade import exc
+from shade.tests.unit import base
+
+
+class TestPortWatcher(base.TestCase):
+
+    def _wait_for_waiters(self, watcher, count):
+        for _ in range(1000):
+            if sum(watcher._wanted.values()) >= count:
+                return
+            time.sleep(0.001)
+        self.fail("Waiters never showed up")
+
+    def test_concurrent_waiters_share_queries(self):
+        release = threading.Event()
+        calls = []
+
+        def fetch(device_ids):
+            calls.append(device_ids)
+            release.wait()
+            if len(calls) < 2:
+                return []
+            return [{'id': 'port-' + d, 'device_id': d} for d in device_ids]
+
+        watcher = _port_watcher.PortWatcher(
+            fetch, initial_wait=0, max_wait=0)
+        devices = [str(i) for i in range(5)]
+        with concurrent.futures.ThreadPoolExecutor(5) as pool:
+            futures = [
+                pool.submit(watcher.wait, device, 10) for device in devices]
+            self._wait_for_waiters(watcher, 5)
+            release.set()
+            ports = [f.result() for f in futures]
+
+        self.assertEqual(
+            [[{'id': 'port-' + d, 'device_id': d}] for d in devices], ports)
+        # The devices that showed up while the first query ran are asked
+        # for together in the next one
+        self.assertEqual(2, len(calls))
+        self.assertEqual(devices, calls[1])
+        self.assertEqual({}, watcher._wanted)
+
+    def test_backoff(self):
+        fetch = mock.Mock(side_effect=[
+            [], [], [], [{'id': 'port', 'device_id': 'server'}]])
+        watcher = _port_watcher.PortWatcher(
+            fetch, initial_wait=1, max_wait=3)
+        with mock.patch.object(time, 'sleep') as sleep:
+            # Ports showing up without any real time passing
+            self.assertEqual(
+                [{'id': 'port', 'device_id': 'server'}],
+                watcher.wait('server', 60))
+        self.assertEqual(4, fetch.call_count)
+        fetch.assert_called_with(['server'])
+        delays = [round(call[0][0]) for call in sleep.call_args_list]
+        self.assertEqual([1, 2, 3], delays)
+
+    def test_timeout(self):
+        watcher = _port_watcher.PortWatcher(
+            lambda device_ids: [], initial_wait=0.001, max_wait=0.001)
+        with testtools.ExpectedException(
+                exc.OpenStackCloudTimeout,
+                'Timeout waiting for the ports of server'):
+            watcher.wait('server', 0.01)
+
+    def test_errors_raised(self):
+        fetch = mock.Mock(side_effect=exc.OpenStackCloudException('boom'))
+        watcher = _port_watcher.PortWatcher(fetch)
+        self.assertRaises(
+            exc.OpenStackCloudException, watcher.wait, 'server', 10)
+        self.assertEqual(1, fetch.call_count)
+
+
+class TestNatDestinationPortWatch(base.RequestsMockTestCase):
+
+    def test_stale_port_cache(self):
+        self.cloud._PORT_AGE = 60
+        port = {
+            'id': 'port-id', 'device_id': 'server-id',
+            'network_id': 'net-id',
+            'fixed_ips': [{'ip_address': '10.0.0.4', 'subnet_id': 'sub'}]}
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 json={'ports': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['device_id=server-id']),
+                 json={'ports': [port]}),
+        ])
+        found, fixed_address = self.cloud._nat_destination_port(
+            {'id': 'server-id'})
+        self.assertEqual('port-id', found['id'])
+        self.assertEqual('10.0.0.4', fixed_address)
+        # The port is written through to the cached listing
+        self.assertEqual(
+            ['port-id'], [p['id'] for p in self.cloud.list_ports()])
+        self.assert_calls()
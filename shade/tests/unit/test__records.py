@@ -0,0 +1,148 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import copy
+import json
+import pickle
+
+import mock
+import munch
+
+import shade
+from shade import _records
+from shade import _utils
+from shade import meta
+from shade.tests.benchmark import fixture
+from shade.tests.unit import base
+from shade.tests.unit import test_normalize
+
+
+class TestRecord(base.TestCase):
+
+    def _make_flavor(self):
+        return _records.Flavor(
+            id='1', name='small', ram=512, location=munch.Munch(zone=None),
+            properties={'a': 1})
+
+    def test_access(self):
+        flavor = self._make_flavor()
+        self.assertEqual('small', flavor.name)
+        self.assertEqual('small', flavor['name'])
+        self.assertEqual(1, flavor.properties['a'])
+        self.assertIsNone(flavor.location.zone)
+        self.assertIsNone(flavor.get('vcpus'))
+        self.assertNotIn('vcpus', flavor)
+        self.assertRaises(KeyError, lambda: flavor['vcpus'])
+        self.assertRaises(AttributeError, lambda: flavor.vcpus)
+        self.assertEqual(
+            set(['id', 'name', 'ram', 'location', 'properties']),
+            set(flavor))
+        self.assertEqual(5, len(flavor))
+        self.assertFalse(hasattr(flavor, '__dict__'))
+
+    def test_extra_keys(self):
+        flavor = self._make_flavor()
+        flavor['extra'] = 1
+        flavor.other = 2
+        flavor.ram = 1024
+        self.assertEqual(1, flavor.extra)
+        self.assertEqual(2, flavor['other'])
+        self.assertEqual(1024, flavor['ram'])
+        self.assertEqual(7, len(flavor))
+        del flavor.extra
+        del flavor['ram']
+        self.assertNotIn('extra', flavor)
+        self.assertNotIn('ram', flavor)
+        self.assertRaises(KeyError, flavor.__delitem__, 'ram')
+
+    def test_equality_and_copies(self):
+        flavor = self._make_flavor()
+        flavor['extra'] = [1]
+        as_dict = dict(flavor.items())
+        self.assertEqual(as_dict, flavor)
+        self.assertEqual(flavor, munch.Munch(as_dict))
+        self.assertNotEqual(flavor, dict(as_dict, name='large'))
+        for other in (
+                flavor.copy(), copy.deepcopy(flavor),
+                pickle.loads(pickle.dumps(flavor)),
+                pickle.loads(pickle.dumps(flavor, 2))):
+            self.assertIsInstance(other, _records.Flavor)
+            self.assertEqual(flavor, other)
+        deep = copy.deepcopy(flavor)
+        deep['extra'].append(2)
+        self.assertEqual([1], flavor['extra'])
+
+    def test_to_dict(self):
+        flavor = self._make_flavor()
+        flavor['extra'] = _records.Flavor(id='2')
+        as_dict = flavor.toDict()
+        self.assertIs(dict, type(as_dict['location']))
+        self.assertEqual({'id': '2'}, as_dict['extra'])
+        self.assertEqual(as_dict, json.loads(json.dumps(as_dict)))
+
+    def test_filter_list(self):
+        flavors = [self._make_flavor(), _records.Flavor(id='2', name='big')]
+        self.assertEqual(
+            [flavors[1]], _utils._filter_list(flavors, 'big', None))
+        self.assertEqual(
+            [flavors[0]], _utils._filter_list(flavors, None, {'ram': 512}))
+        self.assertEqual(
+            [flavors[0]],
+            _utils._filter_list(flavors, None, {'location': {'zone': None}}))
+        self.assertIs(flavors[0], meta.obj_to_munch(flavors[0]))
+
+
+class TestCompactRecords(base.TestCase):
+
+    def _make_cloud(self, strict):
+        with mock.patch.object(
+                self.cloud_config._openstack_config, 'get_extra_config',
+                side_effect=lambda key, defaults: dict(
+                    defaults, compact_records=True)):
+            return shade.OpenStackCloud(
+                cloud_config=self.cloud_config, strict=strict)
+
+    def test_off_by_default(self):
+        self.assertFalse(self.strict_cloud._compact_records)
+        self.assertIsInstance(
+            self.strict_cloud._normalize_flavor(
+                test_normalize.RAW_FLAVOR_DICT),
+            munch.Munch)
+
+    def test_enabled(self):
+        self.assertTrue(self._make_cloud(strict=True)._compact_records)
+        # Non-strict resources have their properties at the top level too,
+        # which records have no slots for
+        self.assertFalse(self._make_cloud(strict=False)._compact_records)
+
+    def test_strict_records(self):
+        synthetic = fixture.SyntheticCloud(
+            servers=3, flavors=3, images=3, volumes=3)
+        compact = self._make_cloud(strict=True)
+        plain = test_normalize.reference.ReferenceNormalizer(compact)
+        for resource, record_type in (
+                ('servers', _records.Server),
+                ('flavors', _records.Flavor),
+                ('images', _records.Image),
+                ('volumes', _records.Volume)):
+            records = test_normalize.EDGE_RECORDS[resource] + getattr(
+                synthetic, resource)
+            method = '_normalize_' + resource
+            expected = getattr(plain, method)(
+                meta.obj_list_to_munch(copy.deepcopy(records)))
+            actual = getattr(compact, method)(
+                meta.obj_list_to_munch(copy.deepcopy(records)))
+            self.assertEqual(expected, actual)
+            for record in actual:
+                self.assertIsInstance(record, record_type)
+                # Everything the data model has a field for is in a slot
+                self.assertIsNone(record._extra)
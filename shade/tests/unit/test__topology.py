@@ -0,0 +1,156 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+import testtools
+
+from shade import _topology
+from shade import exc
+from shade.tests.unit import base
+
+
+NETWORKS = [
+    {'id': 'ext-id', 'name': 'public', 'router:external': True},
+    {'id': 'net-1', 'name': 'private'},
+    {'id': 'net-2', 'name': 'other'},
+    {'id': 'net-3', 'name': 'private'},
+]
+
+
+class TestNetworkTopology(base.TestCase):
+
+    def setUp(self):
+        super(TestNetworkTopology, self).setUp()
+        self.topology = _topology.NetworkTopology(NETWORKS)
+
+    def test_find(self):
+        self.assertEqual(
+            ['net-1', 'net-3'],
+            [net['id'] for net in self.topology.find('private')])
+        self.assertEqual(
+            ['net-2'], [net['id'] for net in self.topology.find('net-2')])
+        self.assertEqual([], self.topology.find('missing'))
+        self.topology.select('internal_ipv4', NETWORKS[2:])
+        self.assertEqual(
+            ['net-3'],
+            [net['id'] for net in self.topology.find(
+                'private', kind='internal_ipv4')])
+
+    def test_has_gateway(self):
+        self.topology.set_subnets([
+            {'network_id': 'net-1', 'gateway_ip': None},
+            {'network_id': 'net-2', 'gateway_ip': '10.0.0.1'}])
+        self.assertFalse(self.topology.has_gateway('net-1'))
+        self.assertTrue(self.topology.has_gateway('net-2'))
+        self.assertFalse(self.topology.has_gateway('net-3'))
+
+    def test_on_server(self):
+        self.topology.select('internal_ipv4', NETWORKS[1:])
+        addresses = {'other': [], 'private': [], 'unknown': []}
+        self.assertEqual(
+            ['net-1', 'net-2'],
+            [net['id'] for net in self.topology.on_server(
+                'internal_ipv4', addresses)])
+        self.assertEqual([], self.topology.on_server('external_ipv4', {}))
+
+    def test_ports_on_device(self):
+        ports = [
+            {'id': 'port-1', 'device_id': 'server-1'},
+            {'id': 'port-2', 'device_id': 'server-2'},
+            {'id': 'port-3', 'device_id': 'server-1'}]
+        self.assertEqual(
+            ['port-1', 'port-3'],
+            [p['id'] for p in self.topology.ports_on_device(
+                ports, 'server-1')])
+        # A new listing gets a new index
+        self.assertEqual(
+            [], self.topology.ports_on_device(ports[:1], 'server-2'))
+
+
+class TestCloudNetworkTopology(base.TestCase):
+
+    def setUp(self):
+        super(TestCloudNetworkTopology, self).setUp()
+        self.cloud._external_ipv4_names = []
+        self.cloud._internal_ipv4_names = []
+        self.cloud._external_ipv6_names = []
+        self.cloud._internal_ipv6_names = []
+        for name, kwargs in (
+                ('has_service', dict(return_value=True)),
+                ('list_networks', dict(return_value=NETWORKS)),
+                ('list_subnets', dict(return_value=[
+                    {'network_id': 'net-1', 'gateway_ip': '10.0.0.1'},
+                    {'network_id': 'net-2', 'gateway_ip': '10.0.1.1'},
+                    {'network_id': 'net-3', 'gateway_ip': None}])),
+                ('list_routers', dict(return_value=[
+                    {'admin_state_up': True,
+                     'external_gateway_info': {'network_id': 'ext-id'}}]))):
+            patcher = mock.patch.object(self.cloud, name, **kwargs)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_selection(self):
+        self.assertEqual(
+            ['ext-id'],
+            [net['id'] for net in self.cloud.get_external_ipv4_networks()])
+        self.assertEqual(
+            ['net-1', 'net-2', 'net-3'],
+            [net['id'] for net in self.cloud.get_internal_ipv4_networks()])
+        # The last network with a gateway
+        self.assertEqual('net-2', self.cloud.get_nat_destination()['id'])
+        server = {'addresses': {'other': [], 'private': []}}
+        self.assertEqual(
+            ['net-1', 'net-2'],
+            [net['id'] for net in self.cloud._get_server_networks(
+                server, 'internal_ipv4')])
+        self.list_networks.assert_called_once_with()
+        self.list_subnets.assert_called_once_with()
+
+    def test_configured_nat_destination(self):
+        self.cloud._nat_destination = 'other'
+        self.assertEqual('net-2', self.cloud.get_nat_destination()['id'])
+        self.assertFalse(self.list_subnets.called)
+
+    def test_ambiguous_nat_destination(self):
+        self.cloud._nat_destination = 'private'
+        with testtools.ExpectedException(
+                exc.OpenStackCloudException, 'Multiple networks'):
+            self.cloud.get_nat_destination()
+
+    def test_missing_configured_network(self):
+        self.cloud._internal_ipv4_names = ['private', 'missing']
+        with testtools.ExpectedException(
+                exc.OpenStackCloudException,
+                'Networks: missing was provided for internal IPv4'):
+            self.cloud.get_internal_ipv4_networks()
+
+    def test_refreshed_as_a_unit(self):
+        self.assertEqual(
+            'ext-id', self.cloud._find_floating_network_by_router())
+        self.assertEqual(
+            'ext-id', self.cloud._find_floating_network_by_router())
+        self.cloud.get_internal_ipv4_networks()
+        self.assertEqual(1, self.list_routers.call_count)
+        self.assertEqual(1, self.list_networks.call_count)
+
+        self.cloud._reset_network_caches()
+        self.cloud.get_internal_ipv4_networks()
+        self.assertEqual(2, self.list_networks.call_count)
+
+    def test_router_gateway_outlives_refresh(self):
+        self.assertEqual(
+            'ext-id', self.cloud._find_floating_network_by_router())
+        # Creating or deleting networks doesn't move the router gateway
+        self.cloud._reset_network_caches()
+        self.assertEqual(
+            'ext-id', self.cloud._find_floating_network_by_router())
+        self.assertEqual(1, self.list_routers.call_count)
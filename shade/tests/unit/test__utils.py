@@ -37,6 +37,28 @@ RANGE_DATA = [
 
 class TestUtils(base.TestCase):
 
+    def test_host_probe_runs_once(self):
+        probe = mock.Mock(return_value=True)
+        probe.__name__ = 'probe'
+        memoized = _utils.host_probe(probe)
+        self.assertTrue(memoized())
+        self.assertTrue(memoized())
+        self.assertEqual(1, probe.call_count)
+        memoized.reset()
+        self.assertTrue(memoized())
+        self.assertEqual(2, probe.call_count)
+
+    def test_cache_key_part(self):
+        self.assertEqual('RegionOne', _utils.cache_key_part('RegionOne'))
+        self.assertEqual('None', _utils.cache_key_part(None))
+        part = _utils.cache_key_part('my project')
+        self.assertTrue(part.startswith('my_project-'))
+        self.assertNotEqual(part, _utils.cache_key_part('my_project'))
+        self.assertNotIn(':', _utils.cache_key_part('a:b'))
+        self.assertEqual(
+            _utils.CACHE_KEY_PART_LENGTH,
+            len(_utils.cache_key_part(u'\u00e9' * 100)))
+
     def test__filter_list_name_or_id(self):
         el1 = dict(id=100, name='donald')
         el2 = dict(id=200, name='pluto')
@@ -298,6 +320,22 @@ class TestUtils(base.TestCase):
         ):
             _utils.range_filter(RANGE_DATA, "key1", "<>100")
 
+    def test_map_concurrently(self):
+        def _half(value):
+            if value % 2:
+                raise ValueError(value)
+            return value // 2
+
+        results = _utils._map_concurrently(
+            _half, [(value,) for value in range(6)], concurrency=3)
+        self.assertEqual(
+            [0, None, 1, None, 2, None], [result for result, _ in results])
+        for value, (_, exc_info) in enumerate(results):
+            if value % 2:
+                self.assertIsInstance(exc_info[1], ValueError)
+            else:
+                self.assertIsNone(exc_info)
+
     def test_file_segment(self):
         file_size = 4200
         content = ''.join(random.SystemRandom().choice(
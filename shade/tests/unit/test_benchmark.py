@@ -0,0 +1,125 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import time
+
+from shade import exc
+from shade.tests import base
+from shade.tests.benchmark import fixture
+from shade.tests.benchmark import server
+from shade.tests.benchmark import suite
+
+SIZES = dict(
+    servers=4, ports=5, floating_ips=2, flavors=3, images=3, volumes=4,
+    projects=2)
+
+
+class TestSyntheticCloud(base.TestCase):
+
+    def test_deterministic(self):
+        first = fixture.SyntheticCloud(**SIZES)
+        second = fixture.SyntheticCloud(**SIZES)
+        self.assertEqual(first.servers, second.servers)
+        self.assertEqual(4, len(first.servers))
+        self.assertEqual(
+            2, len([v for v in first.volumes if v['attachments']]))
+
+    def test_unknown_size(self):
+        self.assertRaises(ValueError, fixture.SyntheticCloud, routers=1)
+
+    def test_dispatch_filters_and_pages(self):
+        synthetic = fixture.SyntheticCloud(page_size=3, **SIZES)
+        server_id = synthetic.servers[0]['id']
+        status, headers, data = synthetic.dispatch(
+            'GET', 'https://network.example.com/v2.0/ports.json'
+                   '?device_id={0}'.format(server_id))
+        self.assertEqual(200, status)
+        self.assertEqual(1, len(data['ports']))
+        status, headers, data = synthetic.dispatch(
+            'GET', 'https://compute.example.com/v2.1/servers/detail')
+        self.assertEqual(3, len(data['servers']))
+        self.assertIn('servers_links', data)
+        status, headers, data = synthetic.dispatch(
+            'GET', 'https://compute.example.com/v2.1/servers/missing')
+        self.assertEqual(404, status)
+
+
+class TestBenchmarkSuite(base.TestCase):
+
+    def test_run(self):
+        results = suite.run(
+            names=['list_servers_detailed', 'create_server_name_resolution',
+                   'normalize_servers', 'normalize_servers_reference',
+                   'filter_list_name',
+                   'swift_create_large_object'],
+            repeat=1, segments=2, **SIZES)
+        # Results must survive a round trip through JSON
+        results = json.loads(json.dumps(results))
+        listing = results['results']['list_servers_detailed']
+        self.assertEqual(1, listing['wall']['runs'])
+        self.assertEqual(
+            1, listing['calls_by_endpoint']['GET compute/v2.1/servers/detail'])
+        self.assertEqual(0, results['results']['normalize_servers']['calls'])
+        self.assertEqual(
+            2, results['results']['swift_create_large_object'][
+                'calls_by_endpoint'][
+                    'PUT object-store/v1/{id}/benchmark/{id}/{id}'])
+        comparison = suite.compare(results, results)
+        self.assertEqual(0, comparison['list_servers_detailed']['calls_delta'])
+        self.assertEqual(
+            1.0, comparison['list_servers_detailed']['wall_ratio'])
+
+    def test_unknown_benchmark(self):
+        self.assertRaises(ValueError, suite.run, names=['nope'])
+
+
+class TestFakeCloudServer(base.TestCase):
+
+    def _start(self, **kwargs):
+        fake = server.FakeCloudServer(
+            fixture.SyntheticCloud(page_size=3, **SIZES), **kwargs)
+        fake.start()
+        self.addCleanup(fake.stop)
+        return fake, fake.make_cloud()
+
+    def test_serves_cloud(self):
+        fake, cloud = self._start()
+        self.assertEqual(4, len(cloud.list_servers(bare=True)))
+        self.assertEqual(
+            2, fake.requests.count(('GET', 'compute', '/v2.1/servers/detail')))
+        self.assertEqual(
+            ['private', 'public'],
+            sorted(n['name'] for n in cloud.list_networks()))
+        self.assertEqual(0, fake.errors)
+        self.assertEqual(1, fake.max_in_flight)
+
+    def test_injected_errors(self):
+        fake, cloud = self._start(error_rate=1.0)
+        self.assertRaises(exc.OpenStackCloudHTTPError, cloud.list_networks)
+        self.assertEqual(1, fake.errors)
+
+    def test_injected_latency(self):
+        fake, cloud = self._start(latency=0.05)
+        # Authenticate first, so only the listing is timed
+        cloud.list_flavors()
+        start = time.time()
+        cloud.list_networks()
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_suite_over_http(self):
+        results = suite.run(
+            names=['list_servers_detailed'], repeat=1, memory=False,
+            transport='http', **SIZES)
+        listing = results['results']['list_servers_detailed']
+        self.assertEqual(
+            1, listing['calls_by_endpoint']['GET compute/v2.1/servers/detail'])
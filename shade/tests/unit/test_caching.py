@@ -10,8 +10,11 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 import concurrent
+import re
 import time
 
+import mock
+import munch
 import testtools
 from testscenarios import load_tests_apply_scenarios as load_tests  # noqa
 
@@ -332,7 +335,7 @@ class TestMemoryCache(base.RequestsMockTestCase):
         self.assertEqual(user_data.email, users[0]['email'])
         self.assert_calls()
 
-    def test_modify_user_invalidates_cache(self):
+    def test_modify_user_writes_through_cache(self):
         self.use_keystone_v2()
 
         user_data = self._get_user_data(email='test@example.com')
@@ -351,7 +354,6 @@ class TestMemoryCache(base.RequestsMockTestCase):
             append=[user_data.user_id])
 
         empty_user_list_resp = {'users': []}
-        users_list_resp = {'users': [user_data.json_response['user']]}
         updated_users_list_resp = {'users': [new_resp['user']]}
 
         # Password is None in the original create below
@@ -361,36 +363,20 @@ class TestMemoryCache(base.RequestsMockTestCase):
             # Inital User List is Empty
             dict(method='GET', uri=mock_users_url, status_code=200,
                  json=empty_user_list_resp),
-            # POST to create the user
-            # GET to get the user data after POST
+            # POST to create the user, which is written to the cached list
             dict(method='POST', uri=mock_users_url, status_code=200,
                  json=user_data.json_response,
                  validate=dict(json=user_data.json_request)),
-            # List Users Call
-            dict(method='GET', uri=mock_users_url, status_code=200,
-                 json=users_list_resp),
-            # List users to get ID for update
-            # Get user using user_id from list
-            # Update user
-            # Get updated user
-            dict(method='GET', uri=mock_users_url, status_code=200,
-                 json=users_list_resp),
+            # Update the user found in the cached list, and write it through
             dict(method='PUT', uri=mock_user_resource_url, status_code=200,
                  json=new_resp, validate=dict(json=new_req)),
-            # List Users Call
-            dict(method='GET', uri=mock_users_url, status_code=200,
-                 json=updated_users_list_resp),
-            # List User to get ID for delete
-            # Get user using user_id from list
-            # delete user
+            # delete_user still refreshes the list before looking the
+            # user up, then gets the user and deletes it
             dict(method='GET', uri=mock_users_url, status_code=200,
                  json=updated_users_list_resp),
             dict(method='GET', uri=mock_user_resource_url, status_code=200,
                  json=new_resp),
             dict(method='DELETE', uri=mock_user_resource_url, status_code=204),
-            # List Users Call (empty post delete)
-            dict(method='GET', uri=mock_users_url, status_code=200,
-                 json=empty_user_list_resp)
         ]
 
         self.register_uris(uris_to_mock)
@@ -404,7 +390,7 @@ class TestMemoryCache(base.RequestsMockTestCase):
         self.assertEqual(user_data.user_id, created['id'])
         self.assertEqual(user_data.name, created['name'])
         self.assertEqual(user_data.email, created['email'])
-        # Cache should have been invalidated
+        # The new user was written to the cached list
         users = self.cloud.list_users()
         self.assertEqual(user_data.user_id, users[0]['id'])
         self.assertEqual(user_data.name, users[0]['name'])
@@ -539,6 +525,70 @@ class TestMemoryCache(base.RequestsMockTestCase):
             ],
             self.cloud.list_images())
 
+    def test_cache_key_arguments(self):
+        generate_key = self.cloud._make_cache_key(
+            None, self.cloud.list_projects.func)
+        self.assertEqual(generate_key(), generate_key(None, None, None))
+        self.assertEqual(
+            generate_key(filters={'a': 1, 'b': [1]}),
+            generate_key(None, None, munch.Munch(b=[1], a=1)))
+        self.assertNotEqual(generate_key(), generate_key(filters={'a': 1}))
+        key = generate_key(filters={'name': 'x' * 1000})
+        self.assertLess(len(key), 250)
+        self.assertTrue(key.startswith('{cloud}:{region}:'.format(
+            cloud=self.cloud.name, region=self.cloud.region_name)))
+
+    def test_cache_key_namespaced_by_region(self):
+        key = self.cloud._make_cache_key(
+            None, self.cloud.list_flavors.func)()
+        self.cloud.region_name = 'other-region'
+        self.assertNotEqual(
+            key,
+            self.cloud._make_cache_key(None, self.cloud.list_flavors.func)())
+
+    def test_cache_key_prefix_is_safe(self):
+        self.cloud.name = 'x' * 300
+        self.cloud.cloud_config.config['auth']['project_name'] = (
+            'my project\n' + 'y' * 300)
+        key = self.cloud._make_cache_key(
+            None, self.cloud.list_flavors.func)()
+        self.assertLess(len(key.encode('utf-8')), 250)
+        self.assertIsNone(re.search(r'\s', key))
+        self.cloud.cloud_config.config['auth']['project_name'] = (
+            'my_project\n' + 'y' * 300)
+        self.assertNotEqual(
+            key,
+            self.cloud._make_cache_key(None, self.cloud.list_flavors.func)())
+
+    def test_resource_cache_regions_are_lazy(self):
+        with mock.patch.object(
+                self.cloud_config, 'get_cache_expiration',
+                return_value={'images': 5, 'bogus': 1}):
+            cloud = shade.OpenStackCloud(cloud_config=self.cloud_config)
+        self.assertEqual({}, cloud._resource_caches)
+        region = cloud._get_cache('images')
+        self.assertEqual(5, region.expiration_time)
+        self.assertIs(region, cloud._get_cache('images'))
+        self.assertIs(cloud._cache, cloud._get_cache('bogus'))
+        self.assertEqual(['images'], list(cloud._resource_caches))
+
+    def test_create_flavor_updates_cache(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri='{endpoint}/flavors/detail?is_public=None'.format(
+                     endpoint=fakes.COMPUTE_ENDPOINT),
+                 json={'flavors': []}),
+            dict(method='POST',
+                 uri='{endpoint}/flavors'.format(
+                     endpoint=fakes.COMPUTE_ENDPOINT),
+                 json={'flavor': fakes.FAKE_FLAVOR}),
+        ])
+        self.assertEqual([], self.cloud.list_flavors())
+        flavor = self.cloud.create_flavor(
+            'vanilla', ram=65536, disk=1600, vcpus=24)
+        self.assertEqual([flavor], self.cloud.list_flavors())
+        self.assert_calls()
+
 
 class TestCacheIgnoresQueuedStatus(base.RequestsMockTestCase):
 
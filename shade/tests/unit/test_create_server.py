@@ -412,8 +412,11 @@ class TestCreateServer(base.RequestsMockTestCase):
         self.assert_calls()
 
     @mock.patch.object(shade.OpenStackCloud, "get_active_server")
-    @mock.patch.object(shade.OpenStackCloud, "get_server")
-    def test_wait_for_server(self, mock_get_server, mock_get_active_server):
+    @mock.patch.object(shade.OpenStackCloud, "_expand_server")
+    @mock.patch.object(shade.OpenStackCloud, "list_servers")
+    def test_wait_for_server(
+            self, mock_list_servers, mock_expand_server,
+            mock_get_active_server):
         """
         Test that waiting for a server returns the server instance when
         its status changes to "ACTIVE".
@@ -422,16 +425,18 @@ class TestCreateServer(base.RequestsMockTestCase):
         building_server = {'id': 'fake_server_id', 'status': 'BUILDING'}
         active_server = {'id': 'fake_server_id', 'status': 'ACTIVE'}
 
-        mock_get_server.side_effect = iter([building_server, active_server])
+        mock_list_servers.side_effect = iter([
+            [building_server], [active_server]])
+        mock_expand_server.side_effect = lambda server, **kwargs: server
         mock_get_active_server.side_effect = iter([
             building_server, active_server])
 
         server = self.cloud.wait_for_server(building_server)
 
-        self.assertEqual(2, mock_get_server.call_count)
-        mock_get_server.assert_has_calls([
-            mock.call(building_server['id']),
-            mock.call(active_server['id']),
+        self.assertEqual(2, mock_list_servers.call_count)
+        mock_list_servers.assert_has_calls([
+            mock.call(bare=True),
+            mock.call(bare=True),
         ])
 
         self.assertEqual(2, mock_get_active_server.call_count)
@@ -446,6 +451,37 @@ class TestCreateServer(base.RequestsMockTestCase):
 
         self.assertEqual('ACTIVE', server['status'])
 
+    @mock.patch('time.sleep')
+    @mock.patch.object(shade.OpenStackCloud, "get_active_server")
+    @mock.patch.object(shade.OpenStackCloud, "_expand_server")
+    @mock.patch.object(shade.OpenStackCloud, "get_server_by_id")
+    @mock.patch.object(shade.OpenStackCloud, "list_servers")
+    def test_wait_for_server_direct_get(
+            self, mock_list_servers, mock_get_server_by_id,
+            mock_expand_server, mock_get_active_server, mock_sleep):
+        """
+        Test that waiting for a server gets just that server when
+        use_direct_get is set, rather than listing every server.
+        """
+        self.cloud.use_direct_get = True
+        building_server = {'id': 'fake_server_id', 'status': 'BUILDING'}
+        active_server = {'id': 'fake_server_id', 'status': 'ACTIVE'}
+
+        mock_get_server_by_id.side_effect = iter([
+            building_server, active_server])
+        mock_expand_server.side_effect = lambda server, **kwargs: server
+        mock_get_active_server.side_effect = iter([
+            None, active_server])
+
+        server = self.cloud.wait_for_server(building_server)
+
+        mock_get_server_by_id.assert_has_calls([
+            mock.call('fake_server_id', bare=True),
+            mock.call('fake_server_id', bare=True),
+        ])
+        self.assertFalse(mock_list_servers.called)
+        self.assertEqual('ACTIVE', server['status'])
+
     @mock.patch.object(shade.OpenStackCloud, 'wait_for_server')
     def test_create_server_wait(self, mock_wait):
         """
@@ -521,7 +557,8 @@ class TestCreateServer(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public', append=['v2.0', 'ports.json'],
-                     qs_elements=['device_id=1234']),
+                     qs_elements=['device_id=1234', 'fields=device_id',
+                                  'fields=id', 'fields=mac_address']),
                  json={'ports': []}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -554,7 +591,8 @@ class TestCreateServer(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=network-name']),
                  json={'networks': [network]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -575,6 +613,7 @@ class TestCreateServer(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public', append=['v2.0', 'networks.json']),
+                 complete_qs=True,
                  json={'networks': [network]}),
             dict(method='GET',
                  uri=self.get_mock_url(
@@ -599,7 +638,8 @@ class TestCreateServer(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=network-name']),
                  json={'networks': [network]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -620,6 +660,7 @@ class TestCreateServer(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public', append=['v2.0', 'networks.json']),
+                 complete_qs=True,
                  json={'networks': [network]}),
             dict(method='GET',
                  uri=self.get_mock_url(
@@ -788,7 +829,8 @@ class TestCreateServer(base.RequestsMockTestCase):
 
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=image_id),
                  json=fake_image_search_return),
             dict(method='GET',
                  uri=self.get_mock_url(
@@ -958,3 +1000,254 @@ class TestCreateServer(base.RequestsMockTestCase):
             wait=False)
 
         self.assert_calls()
+
+
+class TestCreateServers(base.RequestsMockTestCase):
+
+    def _server_post(self, server, name, **expected):
+        expected.update({
+            u'flavorRef': fakes.FLAVOR_ID,
+            u'imageRef': self.image_id,
+            u'name': name,
+        })
+        expected.setdefault(u'max_count', 1)
+        expected.setdefault(u'min_count', 1)
+        return dict(
+            method='POST',
+            uri=self.get_mock_url('compute', 'public', append=['servers']),
+            json=server,
+            validate=dict(json={'server': expected}))
+
+    def _servers_get(self, servers, qs_elements=None):
+        return dict(
+            method='GET',
+            uri=self.get_mock_url(
+                'compute', 'public', append=['servers', 'detail'],
+                qs_elements=qs_elements),
+            json={'servers': servers})
+
+    def setUp(self):
+        super(TestCreateServers, self).setUp()
+        self.image_id = str(uuid.uuid4())
+
+    def test_create_servers_resolves_once(self):
+        self.use_glance()
+        build_servers = [
+            fakes.make_fake_server(str(i), 'server-%d' % i, 'BUILD')
+            for i in range(2)]
+
+        self.register_uris([
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_id),
+                 json={'images': [
+                     fakes.make_fake_image(image_id=self.image_id)]}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['flavors', 'detail'],
+                     qs_elements=['is_public=None']),
+                 json={'flavors': fakes.FAKE_FLAVOR_LIST}),
+            self._server_post(
+                {'server': build_servers[0]}, 'server-0',
+                networks=[{u'uuid': u'some-network'}]),
+            self._server_post(
+                {'server': build_servers[1]}, 'server-1',
+                networks=[{u'uuid': u'some-network'}]),
+            # One listing returns both servers as get/list would
+            self._servers_get(build_servers),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+        ])
+
+        nics = [{'net-id': 'some-network'}]
+        servers = self.cloud.create_servers([
+            dict(name='server-%d' % i, image=self.image_id, flavor='vanilla',
+                 nics=nics)
+            for i in range(2)], concurrency=1)
+
+        self.assertEqual(['0', '1'], [server['id'] for server in servers])
+        self.assertEqual('BUILD', servers[0]['status'])
+        # The nics given were left alone
+        self.assertEqual([{'net-id': 'some-network'}], nics)
+        self.assert_calls()
+
+    def test_create_servers_missing_from_listing(self):
+        build_servers = [
+            fakes.make_fake_server(str(i), 'server-%d' % i, 'BUILD')
+            for i in range(2)]
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+            self._server_post(
+                {'server': build_servers[0]}, 'server-0'),
+            self._server_post(
+                {'server': build_servers[1]}, 'server-1'),
+            # A listing from before the second server was booted
+            self._servers_get(build_servers[:1]),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', '1']),
+                 json={'server': build_servers[1]}),
+        ])
+
+        servers = self.cloud.create_servers([
+            dict(name='server-%d' % i, image=dict(id=self.image_id),
+                 flavor=dict(id=fakes.FLAVOR_ID))
+            for i in range(2)], concurrency=1)
+
+        self.assertEqual(['0', '1'], [server['id'] for server in servers])
+        self.assertEqual(
+            ['BUILD', 'BUILD'], [server['status'] for server in servers])
+        self.assert_calls()
+
+    def test_create_servers_count(self):
+        servers = [
+            fakes.make_fake_server(str(i), 'node-%d' % i, 'BUILD')
+            for i in range(1, 4)]
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+            self._server_post(
+                {'reservation_id': 'r-1'}, 'node',
+                min_count=3, max_count=3, return_reservation_id=True),
+            self._servers_get(servers, qs_elements=['reservation_id=r-1']),
+            self._servers_get(servers),
+        ])
+
+        created = self.cloud.create_servers([
+            dict(name='node', image=dict(id=self.image_id),
+                 flavor=dict(id=fakes.FLAVOR_ID), count=3)])
+
+        self.assertEqual(
+            ['1', '2', '3'], [server['id'] for server in created])
+        self.assert_calls()
+
+    def test_create_servers_wait(self):
+        build_servers = [
+            fakes.make_fake_server(str(i), 'server-%d' % i, 'BUILD')
+            for i in range(2)]
+        active_servers = [
+            fakes.make_fake_server(str(i), 'server-%d' % i, 'ACTIVE')
+            for i in range(2)]
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+            self._server_post(
+                {'server': build_servers[0]}, 'server-0'),
+            self._server_post(
+                {'server': build_servers[1]}, 'server-1'),
+            # Both servers are polled with a single call a round
+            self._servers_get(build_servers),
+            self._servers_get([active_servers[0], build_servers[1]]),
+            self._servers_get(active_servers),
+        ])
+
+        servers = self.cloud.create_servers([
+            dict(name='server-%d' % i, image=dict(id=self.image_id),
+                 flavor=dict(id=fakes.FLAVOR_ID))
+            for i in range(2)], concurrency=1, wait=True, auto_ip=False)
+
+        self.assertEqual(
+            ['ACTIVE', 'ACTIVE'], [server['status'] for server in servers])
+        self.assert_calls()
+
+    def test_create_servers_wait_one_fails(self):
+        build_servers = [
+            fakes.make_fake_server(str(i), 'server-%d' % i, 'BUILD')
+            for i in range(2)]
+        error_server = fakes.make_fake_server('0', 'server-0', 'ERROR')
+        active_server = fakes.make_fake_server('1', 'server-1', 'ACTIVE')
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+            self._server_post(
+                {'server': build_servers[0]}, 'server-0'),
+            self._server_post(
+                {'server': build_servers[1]}, 'server-1'),
+            # The second server is still waited on after the first failed
+            self._servers_get([error_server, build_servers[1]]),
+            self._servers_get([error_server, active_server]),
+        ])
+
+        e = self.assertRaises(
+            exc.OpenStackCloudException, self.cloud.create_servers, [
+                dict(name='server-%d' % i, image=dict(id=self.image_id),
+                     flavor=dict(id=fakes.FLAVOR_ID))
+                for i in range(2)], concurrency=1, wait=True, auto_ip=False)
+
+        self.assertIn('0: Error in creating the server', str(e))
+        self.assertEqual(['1'], e.extra_data['server_ids'])
+        self.assert_calls()
+
+    def test_create_servers_partial_failure(self):
+        build_server = fakes.make_fake_server('0', 'server-0', 'BUILD')
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+            self._server_post({'server': build_server}, 'server-0'),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers']),
+                 status_code=500),
+        ])
+
+        e = self.assertRaises(
+            exc.OpenStackCloudException, self.cloud.create_servers, [
+                dict(name='server-%d' % i, image=dict(id=self.image_id),
+                     flavor=dict(id=fakes.FLAVOR_ID))
+                for i in range(2)], concurrency=1)
+        self.assertEqual(['0'], e.extra_data['server_ids'])
+        self.assert_calls()
+
+    def test_add_ips_to_servers(self):
+        servers = [
+            fakes.make_fake_server(str(i), 'server-%d' % i, 'ACTIVE')
+            for i in range(3)]
+        spare = {'id': 'spare', 'floating_ip_address': '203.0.113.1'}
+        created = {'id': 'created', 'floating_ip_address': '203.0.113.2'}
+
+        with mock.patch.object(
+                self.cloud, '_needs_floating_ip',
+                side_effect=lambda server, nat: server['id'] != '2'), \
+                mock.patch.object(
+                    self.cloud, '_available_floating_ips',
+                    return_value=[spare]), \
+                mock.patch.object(
+                    self.cloud, 'create_floating_ip',
+                    return_value=created) as mock_create, \
+                mock.patch.object(
+                    self.cloud, '_attach_ip_to_server',
+                    side_effect=lambda server, **kw: server) as mock_attach:
+            result = self.cloud._add_ips_to_servers(servers, concurrency=1)
+
+        self.assertEqual(servers, result)
+        # The spare IP only went to one server, and the server that needs
+        # no IP got none
+        mock_create.assert_called_once_with(
+            network=None, server=servers[1], nat_destination=None)
+        mock_attach.assert_has_calls([
+            mock.call(
+                server=servers[0], floating_ip=spare, skip_attach=False,
+                nat_destination=None),
+            mock.call(
+                server=servers[1], floating_ip=created, skip_attach=True,
+                nat_destination=None),
+        ])
+        self.assertEqual(2, mock_attach.call_count)
@@ -175,7 +175,8 @@ class TestDeleteServer(base.RequestsMockTestCase):
                              '{fip_id}.json'.format(fip_id=fip_id)])),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  complete_qs=True,
                  json={'floatingips': []}),
             dict(method='DELETE',
@@ -263,3 +264,156 @@ class TestDeleteServer(base.RequestsMockTestCase):
             'porky', wait=True, delete_ips=True))
 
         self.assert_calls()
+
+
+class TestDeleteServers(base.RequestsMockTestCase):
+
+    def _make_server(self, server_id, name, floating_ip=None):
+        addresses = {'private': [{
+            'OS-EXT-IPS-MAC:mac_addr': 'fa:16:3e:df:b0:8d',
+            'version': 4,
+            'addr': '10.1.0.%s' % server_id,
+            'OS-EXT-IPS:type': 'fixed'}]}
+        if floating_ip:
+            addresses['private'].append({
+                'OS-EXT-IPS-MAC:mac_addr': 'fa:16:3e:df:b0:8d',
+                'version': 4,
+                'addr': floating_ip,
+                'OS-EXT-IPS:type': 'floating'})
+        return fakes.make_fake_server(
+            server_id, name, 'ACTIVE', addresses=addresses)
+
+    def _make_fip(self, fip_id, address):
+        return {
+            'router_id': 'd23abc8d-2991-4a55-ba98-2aaea84cc72f',
+            'tenant_id': '4969c491a3c74ee4af974e6d800c62de',
+            'floating_network_id': '376da547-b977-4cfe-9cba7',
+            'fixed_ip_address': '10.0.0.4',
+            'floating_ip_address': address,
+            'port_id': 'ce705c24-c1ef-408a-bda3-7bbd946164ac',
+            'id': fip_id,
+            'status': 'ACTIVE'}
+
+    def _servers_get(self, servers):
+        return dict(
+            method='GET',
+            uri=self.get_mock_url(
+                'compute', 'public', append=['servers', 'detail']),
+            json={'servers': servers})
+
+    def _server_delete(self, server_id):
+        return dict(
+            method='DELETE',
+            uri=self.get_mock_url(
+                'compute', 'public', append=['servers', server_id]))
+
+    def _fips_get(self, fips):
+        return dict(
+            method='GET',
+            uri=self.get_mock_url(
+                'network', 'public', append=['v2.0', 'floatingips.json']),
+            complete_qs=True,
+            json={'floatingips': fips})
+
+    def _fip_delete(self, fip_id):
+        return dict(
+            method='DELETE',
+            uri=self.get_mock_url(
+                'network', 'public',
+                append=['v2.0', 'floatingips', '{0}.json'.format(fip_id)]))
+
+    def test_delete_servers_wait(self):
+        servers = [self._make_server('1', 'daffy'),
+                   self._make_server('2', 'porky')]
+        self.register_uris([
+            self._servers_get(servers),
+            self._server_delete('1'),
+            self._server_delete('2'),
+            # Both servers are polled with a single call a round
+            self._servers_get(servers[1:]),
+            self._servers_get([]),
+        ])
+
+        self.assertEqual(
+            [True, True, False],
+            self.cloud.delete_servers(
+                ['daffy', '2', 'tweety'], delete_ips=False, concurrency=1))
+        self.assert_calls()
+
+    def test_delete_servers_delete_ips(self):
+        servers = [self._make_server('1', 'daffy', '172.24.5.1'),
+                   self._make_server('2', 'porky', '172.24.5.2')]
+        fips = [self._make_fip('fip1', '172.24.5.1'),
+                self._make_fip('fip2', '172.24.5.2'),
+                self._make_fip('fip3', '172.24.5.3')]
+        self.register_uris([
+            self._servers_get(servers),
+            # One listing finds the floating IPs of every server
+            self._fips_get(fips),
+            self._fip_delete('fip1'),
+            self._fip_delete('fip2'),
+            # And one listing checks they are all gone
+            self._fips_get(fips[2:]),
+            self._server_delete('1'),
+            self._server_delete('2'),
+        ])
+
+        self.assertEqual(
+            [True, True],
+            self.cloud.delete_servers(
+                ['daffy', 'porky'], wait=False, concurrency=1))
+        self.assert_calls()
+
+    def test_delete_servers_delete_ips_stale_cache(self):
+        self.cloud._FLOAT_AGE = 60
+        servers = [self._make_server('1', 'daffy', '172.24.5.1')]
+        fips = [self._make_fip('fip1', '172.24.5.1')]
+        self.register_uris([
+            # Cached before the floating IP was attached
+            self._fips_get([]),
+            self._servers_get(servers),
+            self._fips_get(fips),
+            self._fip_delete('fip1'),
+            self._fips_get([]),
+            self._server_delete('1'),
+        ])
+
+        self.cloud.list_floating_ips()
+        self.assertEqual(
+            [True],
+            self.cloud.delete_servers(['daffy'], wait=False, concurrency=1))
+        self.assert_calls()
+
+    def test_delete_servers_delete_ips_fail(self):
+        servers = [self._make_server('1', 'daffy', '172.24.5.1'),
+                   self._make_server('2', 'porky')]
+        fips = [self._make_fip('fip1', '172.24.5.1')]
+        self.register_uris([
+            self._servers_get(servers),
+            self._fips_get(fips),
+            self._fip_delete('fip1'),
+            self._fips_get(fips),
+            self._fip_delete('fip1'),
+            self._fips_get(fips),
+            # The server whose floating IP is stuck is left alone
+            self._server_delete('2'),
+        ])
+
+        e = self.assertRaises(
+            shade_exc.OpenStackCloudException,
+            self.cloud.delete_servers, ['daffy', 'porky'], wait=False,
+            concurrency=1)
+        self.assertEqual(['1'], e.extra_data['server_ids'])
+        self.assert_calls()
+
+    def test_delete_servers_ambiguous(self):
+        self.register_uris([
+            self._servers_get([
+                self._make_server('1', 'daffy'),
+                self._make_server('2', 'daffy')]),
+        ])
+
+        self.assertRaises(
+            shade_exc.OpenStackCloudException,
+            self.cloud.delete_servers, ['daffy'])
+        self.assert_calls()
@@ -187,6 +187,25 @@ class TestFloatingIP(base.RequestsMockTestCase):
 
         self.assert_calls()
 
+    def test_list_floating_ips_fields(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=('https://network.example.com/v2.0/floatingips.json?'
+                      'fields=floating_ip_address&fields=id'),
+                 json={'floatingips': [{
+                     'id': 'fip-id',
+                     'floating_ip_address': '203.0.113.29'}]})])
+
+        floating_ips = self.cloud.list_floating_ips(
+            fields=['floating_ip_address'])
+
+        self.assertEqual(1, len(floating_ips))
+        self.assertEqual('fip-id', floating_ips[0]['id'])
+        self.assertEqual(
+            '203.0.113.29', floating_ips[0]['floating_ip_address'])
+        self.assertFalse(floating_ips[0]['attached'])
+        self.assert_calls()
+
     def test_search_floating_ips(self):
         self.register_uris([
             dict(method='GET',
@@ -204,8 +223,10 @@ class TestFloatingIP(base.RequestsMockTestCase):
     def test_get_floating_ip(self):
         self.register_uris([
             dict(method='GET',
-                 uri='https://network.example.com/v2.0/floatingips.json',
-                 json=self.mock_floating_ip_list_rep)])
+                 uri='https://network.example.com/v2.0/floatingips.json'
+                     '?id=2f245a7b-796b-4f26-9cf9-9e82d248fda7',
+                 json={'floatingips': [
+                     self.mock_floating_ip_list_rep['floatingips'][0]]})])
 
         floating_ip = self.cloud.get_floating_ip(
             id='2f245a7b-796b-4f26-9cf9-9e82d248fda7')
@@ -226,8 +247,9 @@ class TestFloatingIP(base.RequestsMockTestCase):
     def test_get_floating_ip_not_found(self):
         self.register_uris([
             dict(method='GET',
-                 uri='https://network.example.com/v2.0/floatingips.json',
-                 json=self.mock_floating_ip_list_rep)])
+                 uri='https://network.example.com/v2.0/floatingips.json'
+                     '?id=non-existent',
+                 json={'floatingips': []})])
 
         floating_ip = self.cloud.get_floating_ip(id='non-existent')
 
@@ -260,7 +282,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
     def test_create_floating_ip(self):
         self.register_uris([
             dict(method='GET',
-                 uri='https://network.example.com/v2.0/networks.json',
+                 uri='https://network.example.com/v2.0/networks.json'
+                     '?name=my-network',
                  json={'networks': [self.mock_get_network_rep]}),
             dict(method='POST',
                  uri='https://network.example.com/v2.0/floatingips.json',
@@ -279,7 +302,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
     def test_create_floating_ip_port_bad_response(self):
         self.register_uris([
             dict(method='GET',
-                 uri='https://network.example.com/v2.0/networks.json',
+                 uri='https://network.example.com/v2.0/networks.json'
+                     '?name=my-network',
                  json={'networks': [self.mock_get_network_rep]}),
             dict(method='POST',
                  uri='https://network.example.com/v2.0/floatingips.json',
@@ -300,7 +324,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
     def test_create_floating_ip_port(self):
         self.register_uris([
             dict(method='GET',
-                 uri='https://network.example.com/v2.0/networks.json',
+                 uri='https://network.example.com/v2.0/networks.json'
+                     '?name=my-network',
                  json={'networks': [self.mock_get_network_rep]}),
             dict(method='POST',
                  uri='https://network.example.com/v2.0/floatingips.json',
@@ -395,7 +420,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
         # payloads taken from citycloud
         self.register_uris([
             dict(method='GET',
-                 uri='https://network.example.com/v2.0/networks.json',
+                 uri='https://network.example.com/v2.0/networks.json'
+                     '?name=ext-net',
                  json={"networks": [{
                      "status": "ACTIVE",
                      "subnets": [
@@ -525,6 +551,7 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  }]}),
             dict(method='GET',
                  uri='https://network.example.com/v2.0/networks.json',
+                 complete_qs=True,
                  json={"networks": [{
                      "status": "ACTIVE",
                      "subnets": [
@@ -649,7 +676,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  json={'floatingips': [fake_fip]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -658,7 +686,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  json={'floatingips': [fake_fip]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -667,7 +696,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  json={'floatingips': []}),
         ])
 
@@ -695,7 +725,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  json={'floatingips': [fake_fip]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -704,7 +735,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  json={'floatingips': [down_fip]}),
         ])
 
@@ -727,7 +759,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  json={'floatingips': [fake_fip]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -736,7 +769,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  json={'floatingips': [fake_fip]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -745,7 +779,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip_id)]),
                  json={'floatingips': [fake_fip]}),
         ])
         self.assertRaises(
@@ -823,7 +858,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                          'port_id': self.mock_search_ports_rep[0]['id']}})),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(self.floating_ip['id'])]),
                  json={'floatingips': [self.floating_ip]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -833,7 +869,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(self.floating_ip['id'])]),
                  json={'floatingips': []}),
         ])
 
@@ -852,7 +889,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id={0}'.format(fip['id'])]),
                  json={'floatingips': [attached_fip]}),
             dict(method='PUT',
                  uri=self.get_mock_url(
@@ -951,7 +989,8 @@ class TestFloatingIP(base.RequestsMockTestCase):
                  json={}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=['id=this-is-a-floating-ip-id']),
                  json={'floatingips': [floating_ips[1]]}),
         ])
         self.cloud.delete_unattached_floating_ips()
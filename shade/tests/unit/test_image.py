@@ -86,7 +86,10 @@ class TestImage(BaseTestImage):
     def test_download_image_no_images_found(self):
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name=fake_image',
+                 json=dict(images=[])),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id=fake_image',
                  json=dict(images=[]))])
         self.assertRaises(exc.OpenStackCloudResourceNotFound,
                           self.cloud.download_image, 'fake_image',
@@ -96,7 +99,7 @@ class TestImage(BaseTestImage):
     def _register_image_mocks(self):
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name=fake_image',
                  json=self.fake_search_return),
             dict(method='GET',
                  uri='https://image.example.com/v2/images/{id}/file'.format(
@@ -229,7 +232,13 @@ class TestImage(BaseTestImage):
         self.cloud.image_api_use_tasks = False
 
         self.register_uris([
-            dict(method='GET', uri='https://image.example.com/v2/images',
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?name={name}'.format(
+                     name='fake_image'),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id='fake_image'),
                  json={'images': []}),
             dict(method='POST', uri='https://image.example.com/v2/images',
                  json=self.fake_image_dict,
@@ -246,7 +255,9 @@ class TestImage(BaseTestImage):
                  uri='https://image.example.com/v2/images/{id}/file'.format(
                      id=self.image_id),
                  request_headers={'Content-Type': 'application/octet-stream'}),
-            dict(method='GET', uri='https://image.example.com/v2/images',
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images',
+                 complete_qs=True,
                  json=self.fake_search_return)
         ])
 
@@ -255,7 +266,7 @@ class TestImage(BaseTestImage):
             is_public=False)
 
         self.assert_calls()
-        self.assertEqual(self.adapter.request_history[5].text.read(), b'\x00')
+        self.assertEqual(self.adapter.request_history[6].text.read(), b'\x00')
 
     def test_create_image_task(self):
         self.cloud.image_api_use_tasks = True
@@ -277,7 +288,13 @@ class TestImage(BaseTestImage):
         del(image_no_checksums['owner_specified.shade.object'])
 
         self.register_uris([
-            dict(method='GET', uri='https://image.example.com/v2/images',
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?name={name}'.format(
+                     name=self.image_name),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_name),
                  json={'images': []}),
             dict(method='GET', uri='https://object-store.example.com/info',
                  json=dict(
@@ -320,7 +337,13 @@ class TestImage(BaseTestImage):
                      headers={'x-object-meta-x-shade-md5': fakes.NO_MD5,
                               'x-object-meta-x-shade-sha256': fakes.NO_SHA256})
                  ),
-            dict(method='GET', uri='https://image.example.com/v2/images',
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?name={name}'.format(
+                     name=self.image_name),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_name),
                  json={'images': []}),
             dict(method='POST', uri='https://image.example.com/v2/tasks',
                  json=args,
@@ -340,7 +363,9 @@ class TestImage(BaseTestImage):
                  uri='https://image.example.com/v2/tasks/{id}'.format(
                      id=task_id),
                  json=args),
-            dict(method='GET', uri='https://image.example.com/v2/images',
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_id),
                  json={'images': [image_no_checksums]}),
             dict(method='PATCH',
                  uri='https://image.example.com/v2/images/{id}'.format(
@@ -379,7 +404,9 @@ class TestImage(BaseTestImage):
                  uri='{endpoint}/{container}/{object}'.format(
                      endpoint=endpoint, container=self.container_name,
                      object=self.image_name)),
-            dict(method='GET', uri='https://image.example.com/v2/images',
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_id),
                  json=self.fake_search_return)
         ])
 
@@ -538,8 +565,13 @@ class TestImage(BaseTestImage):
         ret['status'] = 'success'
 
         self.register_uris([
+            dict(method='GET',
+                 uri='https://image.example.com/v1/images/detail'
+                     '?name={name}'.format(name=self.image_name),
+                 json={'images': []}),
             dict(method='GET',
                  uri='https://image.example.com/v1/images/detail',
+                 complete_qs=True,
                  json={'images': []}),
             dict(method='POST',
                  uri='https://image.example.com/v1/images',
@@ -605,7 +637,12 @@ class TestImage(BaseTestImage):
 
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name={name}'.format(
+                     name=self.image_name),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_name),
                  json={'images': []}),
             dict(method='POST',
                  uri='https://image.example.com/v2/images',
@@ -637,7 +674,12 @@ class TestImage(BaseTestImage):
 
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name={name}'.format(
+                     name=self.image_name),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_name),
                  json={'images': []}),
         ])
 
@@ -667,7 +709,12 @@ class TestImage(BaseTestImage):
 
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name={name}'.format(
+                     name=self.image_name),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_name),
                  json={'images': []}),
             dict(method='POST',
                  uri='https://image.example.com/v2/images',
@@ -683,6 +730,7 @@ class TestImage(BaseTestImage):
                  )),
             dict(method='GET',
                  uri='https://image.example.com/v2/images',
+                 complete_qs=True,
                  json={'images': [ret]}),
         ])
 
@@ -710,7 +758,12 @@ class TestImage(BaseTestImage):
 
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name={name}'.format(
+                     name=self.image_name),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_name),
                  json={'images': []}),
             dict(method='POST',
                  uri='https://image.example.com/v2/images',
@@ -726,6 +779,7 @@ class TestImage(BaseTestImage):
                  )),
             dict(method='GET',
                  uri='https://image.example.com/v2/images',
+                 complete_qs=True,
                  json={'images': [ret]}),
         ])
 
@@ -754,7 +808,12 @@ class TestImage(BaseTestImage):
 
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name={name}'.format(
+                     name=self.image_name),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=self.image_name),
                  json={'images': []}),
             dict(method='POST',
                  uri='https://image.example.com/v2/images',
@@ -770,6 +829,7 @@ class TestImage(BaseTestImage):
                  )),
             dict(method='GET',
                  uri='https://image.example.com/v2/images',
+                 complete_qs=True,
                  json={'images': [ret]}),
         ])
 
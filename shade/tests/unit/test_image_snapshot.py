@@ -49,9 +49,15 @@ class TestImageSnapshot(base.RequestsMockTestCase):
                             "metadata": {},
                         }})),
             self.get_glance_discovery_mock_dict(),
+            dict(
+                method='GET',
+                uri='https://image.example.com/v2/images?id={id}'.format(
+                    id=self.image_id),
+                json=dict(images=[fake_image])),
             dict(
                 method='GET',
                 uri='https://image.example.com/v2/images',
+                complete_qs=True,
                 json=dict(images=[fake_image])),
         ])
 
@@ -88,11 +94,13 @@ class TestImageSnapshot(base.RequestsMockTestCase):
             self.get_glance_discovery_mock_dict(),
             dict(
                 method='GET',
-                uri='https://image.example.com/v2/images',
+                uri='https://image.example.com/v2/images?id={id}'.format(
+                    id=self.image_id),
                 json=dict(images=[pending_image])),
             dict(
                 method='GET',
                 uri='https://image.example.com/v2/images',
+                complete_qs=True,
                 json=dict(images=[fake_image])),
         ])
         image = self.cloud.create_image_snapshot(
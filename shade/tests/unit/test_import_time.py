@@ -0,0 +1,65 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import subprocess
+import sys
+
+from shade.tests import base
+
+# Modules that must not be imported by import shade. They are slow to
+# import and only needed by a few calls, so they are imported on first use.
+LAZY_MODULES = (
+    'jmespath',
+    'jsonpatch',
+    'netifaces',
+    'os_client_config.constructors',
+    'shade._heat.event_utils',
+    'shade._heat.template_utils',
+)
+
+# What shade itself needs, imported before shade so that modules imported by
+# shade's dependencies are not blamed on shade.
+_SCRIPT = """
+import json
+import sys
+
+import dogpile.cache
+import keystoneauth1.session
+import munch
+import os_client_config
+import pbr.version
+import requestsexceptions
+
+before = set(sys.modules)
+import {module}
+print(json.dumps(sorted(set(sys.modules) - before)))
+"""
+
+
+class TestImportTime(base.TestCase):
+
+    def _imported_by(self, module):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _SCRIPT.format(module=module)])
+        return set(json.loads(output.decode('utf-8')))
+
+    def test_import_shade_is_lazy(self):
+        imported = self._imported_by('shade')
+        self.assertIn('shade.openstackcloud', imported)
+        self.assertEqual(
+            [], sorted(imported.intersection(LAZY_MODULES)))
+
+    def test_import_inventory_is_lazy(self):
+        imported = self._imported_by('shade.cmd.inventory')
+        self.assertEqual(
+            [], sorted(imported.intersection(LAZY_MODULES)))
@@ -13,9 +13,11 @@
 # limitations under the License.
 
 import mock
+import munch
 
 import shade
 from shade import meta
+from shade.tests.benchmark import reference
 from shade.tests import fakes
 from shade.tests.unit import base
 
@@ -63,6 +65,9 @@ class FakeCloud(object):
     def get_external_ipv4_networks(self):
         return []
 
+    def _get_server_networks(self, server, kind):
+        return []
+
     def get_internal_ipv6_networks(self):
         return []
 
@@ -365,7 +370,8 @@ class TestMeta(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=('https://network.example.com/v2.0/ports.json?'
-                      'device_id=test-id'),
+                      'device_id=test-id&fields=device_id&fields=id'
+                      '&fields=mac_address'),
                  json={'ports': [{
                      'id': 'test_port_id',
                      'mac_address': 'fa:16:3e:ae:7d:42',
@@ -373,7 +379,9 @@ class TestMeta(base.RequestsMockTestCase):
                  ),
             dict(method='GET',
                  uri=('https://network.example.com/v2.0/'
-                      'floatingips.json?port_id=test_port_id'),
+                      'floatingips.json?port_id=test_port_id'
+                      '&fields=fixed_ip_address&fields=floating_ip_address'
+                      '&fields=id&fields=port_id'),
                  json={'floatingips': []}),
 
             dict(method='GET',
@@ -527,7 +535,8 @@ class TestMeta(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=('https://network.example.com/v2.0/ports.json?'
-                      'device_id=test-id'),
+                      'device_id=test-id&fields=device_id&fields=id'
+                      '&fields=mac_address'),
                  json={'ports': [{
                      'id': 'test_port_id',
                      'mac_address': 'fa:16:3e:ae:7d:42',
@@ -535,7 +544,9 @@ class TestMeta(base.RequestsMockTestCase):
                  ),
             dict(method='GET',
                  uri=('https://network.example.com/v2.0/floatingips.json'
-                      '?port_id=test_port_id'),
+                      '?port_id=test_port_id&fields=fixed_ip_address'
+                      '&fields=floating_ip_address&fields=id'
+                      '&fields=port_id'),
                  json={'floatingips': [{
                      'id': 'floating-ip-id',
                      'port_id': 'test_port_id',
@@ -1058,6 +1069,17 @@ class TestMeta(base.RequestsMockTestCase):
         self.assertTrue(hasattr(cloud_dict, 'name'))
         self.assertEqual(cloud_dict.name, cloud_dict['name'])
 
+    def test_obj_to_munch_json(self):
+        data = {'id': '1', 'nested': {'a': [1]}, 'values': 2}
+        obj = meta.obj_to_munch(data)
+        self.assertIs(munch.Munch, type(obj))
+        self.assertEqual(data, obj)
+        self.assertEqual(2, obj['values'])
+        # Shallow, like munch.Munch(data)
+        self.assertIs(data['nested'], obj.nested)
+        self.assertEqual(
+            [reference.obj_to_munch(data)], meta.obj_list_to_munch([data]))
+
     def test_obj_to_munch_subclass(self):
         class FakeObjDict(dict):
             additional = 1
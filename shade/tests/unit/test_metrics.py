@@ -0,0 +1,138 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from shade import exc
+from shade import metrics
+from shade.tests.unit import base
+
+LABELS = dict(
+    cloud='mycloud', region='RegionOne', service='network', method='GET',
+    resource='networks')
+
+
+class TestMetrics(base.TestCase):
+
+    def test_statsd_format(self):
+        emitter = metrics.StatsdEmitter(prefix='shade')
+        lines = emitter.format(metrics.RequestMetrics(
+            LABELS, 0.25, '2xx', retries=1, bytes_received=10))
+        name = 'shade.mycloud.RegionOne.network.GET.networks'
+        self.assertEqual([
+            name + '.count:1|c',
+            name + '.time:250.000|ms',
+            name + '.status.2xx:1|c',
+            name + '.retries:1|c',
+            name + '.bytes_received:10|c',
+        ], lines)
+
+    def test_statsd_sends_one_packet(self):
+        emitter = metrics.StatsdEmitter(host='statsd.example.com', port=9125)
+        with mock.patch.object(emitter, '_socket') as sock:
+            emitter.record(metrics.RequestMetrics(LABELS, 0.1, '2xx'))
+        payload, address = sock.sendto.call_args[0]
+        self.assertEqual(('statsd.example.com', 9125), address)
+        self.assertEqual(3, len(payload.splitlines()))
+
+    def test_registry(self):
+        registry = metrics.MetricsRegistry(buckets=(0.1, 1.0))
+        registry.record(metrics.RequestMetrics(LABELS, 0.05, '2xx'))
+        registry.record(metrics.RequestMetrics(LABELS, 0.5, '4xx'))
+        self.assertEqual(2, registry.get_request_count(service='network'))
+        self.assertEqual(1, registry.get_request_count(status='4xx'))
+        self.assertEqual(0, registry.get_request_count(service='compute'))
+        self.assertEqual((2, 0.55), registry.get_latency(resource='networks'))
+        rendered = registry.render()
+        self.assertIn(
+            'shade_request_duration_seconds_bucket{cloud="mycloud",'
+            'region="RegionOne",service="network",method="GET",'
+            'resource="networks",le="0.1"} 1', rendered)
+        self.assertIn(
+            'shade_request_duration_seconds_bucket{cloud="mycloud",'
+            'region="RegionOne",service="network",method="GET",'
+            'resource="networks",le="+Inf"} 2', rendered)
+        self.assertIn('status="4xx"} 1', rendered)
+
+    def test_multi_emitter_ignores_failures(self):
+        broken = mock.Mock()
+        broken.record.side_effect = exc.OpenStackCloudException('broken')
+        registry = metrics.MetricsRegistry()
+        emitter = metrics.MultiEmitter([broken, registry])
+        emitter.record(metrics.RequestMetrics(LABELS, 0.1, '2xx'))
+        self.assertEqual(1, registry.get_request_count())
+
+
+class TestCloudMetrics(base.RequestsMockTestCase):
+
+    def setUp(self):
+        super(TestCloudMetrics, self).setUp()
+        self.registry = metrics.MetricsRegistry()
+        self.cloud.add_metrics_emitter(self.registry)
+
+    def test_requests_recorded(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'networks', 'missing.json']),
+                 status_code=404),
+        ])
+        self.cloud.list_networks()
+        self.assertRaises(
+            exc.OpenStackCloudURINotFound,
+            self.cloud._network_client.get, '/networks/missing.json')
+        self.assertEqual(1, self.registry.get_request_count(
+            cloud=self.cloud.name, service='network', method='GET',
+            resource='networks', status='2xx'))
+        self.assertEqual(1, self.registry.get_request_count(
+            service='network', status='4xx'))
+        count, total = self.registry.get_latency(service='network')
+        self.assertEqual(2, count)
+        self.assert_calls()
+
+    def test_no_emitters_no_metrics(self):
+        self.cloud.manager.metrics = None
+        with mock.patch.object(metrics, 'task_metrics') as task_metrics:
+            self.register_uris([
+                dict(method='GET',
+                     uri=self.get_mock_url(
+                         'network', 'public',
+                         append=['v2.0', 'networks.json']),
+                     json={'networks': []}),
+            ])
+            self.cloud.list_networks()
+        task_metrics.assert_not_called()
+
+    def test_manager_with_own_emitter(self):
+        own = metrics.MetricsRegistry()
+        self.cloud.manager.metrics = own
+        self.cloud.add_metrics_emitter(metrics.MetricsRegistry())
+        self.cloud.add_metrics_emitter(metrics.MetricsRegistry())
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+        ])
+        self.cloud.list_networks()
+        self.assertEqual(1, own.get_request_count(service='network'))
+        self.assertEqual(1, self.registry.get_request_count(
+            service='network'))
+        # Wrapped once, not once per emitter
+        self.assertEqual(
+            [own, self.cloud._metrics], self.cloud.manager.metrics.emitters)
+        self.assert_calls()
@@ -81,6 +81,46 @@ class TestNetwork(base.RequestsMockTestCase):
         self.cloud.list_networks(filters={'name': 'test'})
         self.assert_calls()
 
+    def test_list_networks_fields(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['fields=id', 'fields=name']),
+                 json={'networks': [{'id': '1', 'name': 'net1'}]})
+        ])
+        nets = self.cloud.list_networks(fields=['name'])
+        self.assertEqual([{'id': '1', 'name': 'net1'}], nets)
+        self.assert_calls()
+
+    def test_search_networks_pushdown(self):
+        net = {'id': '1', 'name': 'net1', 'router:external': True}
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=net1', 'router:external=True',
+                                  'fields=id', 'fields=name',
+                                  'fields=router:external']),
+                 json={'networks': [net]})
+        ])
+        nets = self.cloud.search_networks(
+            'net1', filters={'router:external': True}, fields=['id'])
+        self.assertEqual([net], nets)
+        self.assert_calls()
+
+    def test_search_networks_pattern_filtered_locally(self):
+        net1 = {'id': '1', 'name': 'net1'}
+        net2 = {'id': '2', 'name': 'other'}
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': [net1, net2]})
+        ])
+        self.assertEqual([net1], self.cloud.search_networks('net*'))
+        self.assert_calls()
+
     def test_create_network(self):
         self.register_uris([
             dict(method='POST',
@@ -96,6 +136,27 @@ class TestNetwork(base.RequestsMockTestCase):
         self.assertEqual(self.mock_new_network_rep, network)
         self.assert_calls()
 
+    def test_create_networks(self):
+        created = [
+            dict(self.mock_new_network_rep, id=str(i),
+                 name='net-{0}'.format(i))
+            for i in range(2)]
+        self.register_uris([
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': created},
+                 validate=dict(
+                     json={'networks': [
+                         {'admin_state_up': True, 'name': 'net-0'},
+                         {'admin_state_up': True, 'name': 'net-1',
+                          'shared': True}]}))
+        ])
+        networks = self.cloud.create_networks(
+            [dict(name='net-0'), dict(name='net-1', shared=True)])
+        self.assertEqual(created, networks)
+        self.assert_calls()
+
     def test_create_network_specific_tenant(self):
         project_id = "project_id_value"
         mock_new_network_rep = copy.copy(self.mock_new_network_rep)
@@ -292,7 +353,8 @@ class TestNetwork(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % network_name]),
                  json={'networks': [network]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -307,7 +369,13 @@ class TestNetwork(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=test-net']),
+                 json={'networks': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['id=test-net']),
                  json={'networks': []}),
         ])
         self.assertFalse(self.cloud.delete_network('test-net'))
@@ -320,7 +388,8 @@ class TestNetwork(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % network_name]),
                  json={'networks': [network]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -10,8 +10,15 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+
 import mock
+import munch
 
+from shade import _normalize
+from shade import meta
+from shade.tests.benchmark import fixture
+from shade.tests.benchmark import reference
 from shade.tests.unit import base
 
 RAW_SERVER_DICT = {
@@ -1061,3 +1068,178 @@ class TestUtils(base.RequestsMockTestCase):
         self.assertEqual(expected, retval)
 
         self.assert_calls()
+
+
+# Records that take the less travelled paths through the normalizers
+EDGE_RECORDS = dict(
+    flavors=[
+        {'id': 'f1', 'name': 'f1', 'OS-FLV-EXT-DATA:ephemeral': '5',
+         'os-flavor-access:is_public': 'false', 'swap': None,
+         'OS-FLV-DISABLED:disabled': 'True', 'extra_specs': {'a': 'b'}},
+        {'id': 'f2', 'name': 'f2', 'is_public': True, 'location': 'here'},
+    ],
+    images=[
+        {'id': 'i1', 'name': 'i1', 'status': 'ACTIVE',
+         'properties': 'not a dict', 'is_public': True,
+         'metadata': {'created_at': 'overridden', 'min_disk': '3'}},
+        {'id': 'i2', 'name': 'i2', 'status': 'queued', 'visibility': 'shared',
+         'is_public': False, 'owner': 'other', 'minRam': '64',
+         'properties': {'location': 'here', 'properties': {'a': 1}}},
+        {'id': 'i3', 'name': 'i3', 'status': 'active', 'created': 'then',
+         'OS-EXT-IMG-SIZE:size': 10, 'links': [], 'extra': {'b': [{}]}},
+    ],
+    servers=[
+        {'id': 's1', 'name': 's1', 'flavor': {'id': 'f1'}, 'image': '',
+         'tenant_id': 'other', 'security_groups': None, 'networks': None,
+         'OS-EXT-AZ:availability_zone': 'az1', 'progress': '50',
+         'config_drive': 'True', 'extra': {'nested': [{'a': 1}]}},
+        {'id': 's2', 'name': 's2', 'image': {'id': 'i1', 'links': []},
+         'flavor': {'id': 'f1', 'links': []}, 'project_id': 'other',
+         'tenant_id': 'ignored', 'OS-EXT-AZ:availability_zone': 'az2'},
+    ],
+    volumes=[
+        {'id': 'v1', 'display_name': 'v1', 'display_description': 'd',
+         'status': 'available', 'created_at': 'now', 'bootable': 'false',
+         'os-vol-mig-status-attr:migstat': 'migrating', 'user_id': 'u',
+         'os-vol-tenant-attr:tenant_id': 'other', 'size': None},
+        {'id': 'v2', 'name': 'v2', 'display_name': 'ignored',
+         'status': 'in-use', 'created_at': 'now', 'migration_status': None,
+         'encrypted': True, 'availability_zone': 'az1', 'extra': {}},
+    ],
+)
+
+
+def _types(value):
+    """The structure of value, with the container types it is made of."""
+    if isinstance(value, dict):
+        return type(value), dict((k, _types(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return type(value), [_types(v) for v in value]
+    return None
+
+
+class TestNormalizeParity(base.TestCase):
+    """The normalizers give what the reference normalizers gave."""
+
+    def _assert_parity(self, resource, records):
+        method = '_normalize_' + resource
+        for cloud in (self.cloud, self.strict_cloud):
+            normalizer = reference.ReferenceNormalizer(cloud)
+            for make_input in (meta.obj_list_to_munch, list):
+                expected = getattr(normalizer, method)(
+                    make_input(copy.deepcopy(records)))
+                raw = make_input(copy.deepcopy(records))
+                pristine = copy.deepcopy(raw)
+                actual = getattr(cloud, method)(raw)
+                self.assertEqual(expected, actual)
+                self.assertEqual(_types(expected), _types(actual))
+                # The records handed in are left as they were
+                self.assertEqual(pristine, raw)
+
+    def _assert_resource_parity(self, resource, fixtures):
+        synthetic = fixture.SyntheticCloud(**{resource: 5})
+        self._assert_parity(resource, getattr(synthetic, resource))
+        self._assert_parity(resource, EDGE_RECORDS[resource] + fixtures)
+
+    def test_flavors(self):
+        self._assert_resource_parity('flavors', [RAW_FLAVOR_DICT])
+
+    def test_images(self):
+        self._assert_resource_parity(
+            'images', [RAW_GLANCE_IMAGE_DICT, RAW_NOVA_IMAGE_DICT])
+
+    def test_servers(self):
+        self._assert_resource_parity('servers', [RAW_SERVER_DICT])
+
+    def test_volumes(self):
+        self._assert_resource_parity('volumes', [])
+
+    def test_single(self):
+        for resource in ('flavor', 'image', 'server', 'volume'):
+            record = EDGE_RECORDS[resource + 's'][0]
+            normalizer = reference.ReferenceNormalizer(self.cloud)
+            method = '_normalize_' + resource
+            self.assertEqual(
+                getattr(normalizer, method)(munch.Munch(record)),
+                getattr(self.cloud, method)(munch.Munch(record)))
+
+    def test_list_shares_locations(self):
+        servers = self.cloud._normalize_servers(
+            EDGE_RECORDS['servers'] + EDGE_RECORDS['servers'])
+        self.assertIs(servers[0]['location'], servers[2]['location'])
+        self.assertIs(servers[1]['location'], servers[3]['location'])
+        # Same project, but another zone
+        self.assertIsNot(servers[0]['location'], servers[1]['location'])
+        self.assertIsNot(
+            servers[0]['location'],
+            self.cloud._normalize_server(EDGE_RECORDS['servers'][0])[
+                'location'])
+
+
+class TestPlanSearch(base.TestCase):
+
+    def test_neutron(self):
+        params, alternatives, client = _normalize._plan_search(
+            'network', 'net1',
+            {'router:external': True, 'tags': ['a', 'b'], 'extra': {}})
+        self.assertEqual({'router:external': True, 'tags': ['a', 'b']},
+                         params)
+        self.assertEqual([{'name': 'net1'}, {'id': 'net1'}], alternatives)
+        self.assertEqual({'extra': {}}, client)
+
+    def test_uuid_tried_as_id_first(self):
+        net_id = '881d1bb7-a663-44c0-8f9f-ee2765b74486'
+        params, alternatives, client = _normalize._plan_search(
+            'port', net_id)
+        self.assertEqual([{'id': net_id}, {'name': net_id}], alternatives)
+
+    def test_id_only(self):
+        params, alternatives, client = _normalize._plan_search(
+            'floating_ip', 'fip-id', {'port_id': 'port'})
+        self.assertEqual({'port_id': 'port'}, params)
+        self.assertEqual([{'id': 'fip-id'}], alternatives)
+
+    def test_pattern_not_pushed(self):
+        params, alternatives, client = _normalize._plan_search(
+            'subnet', 'sub*', {'cidr': '10.0.0.0/24'})
+        self.assertEqual({'cidr': '10.0.0.0/24'}, params)
+        self.assertEqual([{}], alternatives)
+
+    def test_versioned_params(self):
+        params, alternatives, client = _normalize._plan_search(
+            'volume', 'vol', {'status': 'available', 'size': 1}, version=1)
+        self.assertEqual({'status': 'available'}, params)
+        # Volumes can't be filtered on id, so a miss lists them all
+        self.assertEqual([{'display_name': 'vol'}, {}], alternatives)
+        self.assertEqual({'size': 1}, client)
+
+    def test_fields(self):
+        params, alternatives, client = _normalize._plan_search(
+            'network', 'net1', {'extra': {}}, fields=['status'])
+        self.assertEqual(
+            ['extra', 'id', 'name', 'status'], params['fields'])
+        params, alternatives, client = _normalize._plan_search(
+            'network', filters="[?name=='net1']", fields=['status'])
+        self.assertEqual({}, params)
+        # Only neutron returns some of the attributes
+        params, alternatives, client = _normalize._plan_search(
+            'image', 'img', fields=['status'], version=2)
+        self.assertEqual({}, params)
+
+    def test_with_fields(self):
+        self.assertIsNone(_normalize._with_fields(None, None))
+        filters = {'status': 'ACTIVE'}
+        self.assertEqual(
+            {'status': 'ACTIVE', 'fields': ['id', 'name']},
+            _normalize._with_fields(filters, ['name']))
+        self.assertEqual({'status': 'ACTIVE'}, filters)
+
+    def test_split_filters(self):
+        self.assertEqual(
+            ({'admin_state_up': True}, {}),
+            _normalize._split_filters(
+                'network', filters={'admin_state_up': True}))
+        self.assertEqual(
+            ({'domain_id': 'd'}, {'name': 'p'}),
+            _normalize._split_filters(
+                'project', filters={'name': 'p'}, domain_id='d'))
@@ -157,6 +157,82 @@ class TestPort(base.RequestsMockTestCase):
         self.assertEqual(self.mock_neutron_port_create_rep['port'], port)
         self.assert_calls()
 
+    def test_create_ports(self):
+        created = [
+            dict(self.mock_neutron_port_create_rep['port'], id=str(i),
+                 name='port-{0}'.format(i))
+            for i in range(3)]
+        self.register_uris([
+            dict(method="POST",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 json={'ports': created[:2]},
+                 validate=dict(
+                     json={'ports': [
+                         {'network_id': 'test-net-id', 'name': 'port-0'},
+                         {'network_id': 'test-net-id', 'name': 'port-1'}]})),
+            dict(method="POST",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 json={'port': created[2]},
+                 validate=dict(
+                     json={'port': {
+                         'network_id': 'test-net-id', 'name': 'port-2'}})),
+        ])
+        ports = self.cloud.create_ports(
+            [dict(network_id='test-net-id', name='port-{0}'.format(i))
+             for i in range(3)],
+            batch_size=2, concurrency=1)
+        self.assertEqual(created, ports)
+        self.assert_calls()
+
+    def test_create_ports_bulk_not_supported(self):
+        created = [
+            dict(self.mock_neutron_port_create_rep['port'], id=str(i))
+            for i in range(2)]
+        self.register_uris([
+            dict(method="POST",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 status_code=400,
+                 json={'NeutronError': {
+                     'message': 'Bulk operation not supported'}}),
+            dict(method="POST",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 json={'port': created[0]},
+                 validate=dict(json={'port': {'network_id': 'net-0'}})),
+            dict(method="POST",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 json={'port': created[1]},
+                 validate=dict(json={'port': {'network_id': 'net-1'}})),
+            # Bulk creation isn't tried again
+            dict(method="POST",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 json={'port': created[0]},
+                 validate=dict(json={'port': {'network_id': 'net-0'}})),
+            dict(method="POST",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 status_code=409,
+                 validate=dict(json={'port': {'network_id': 'net-1'}})),
+        ])
+        specs = [dict(network_id='net-0'), dict(network_id='net-1')]
+        self.assertEqual(
+            created, self.cloud.create_ports(specs, concurrency=1))
+        e = self.assertRaises(
+            OpenStackCloudException,
+            self.cloud.create_ports, specs, concurrency=1)
+        self.assertEqual(['0'], e.extra_data['port_ids'])
+        self.assert_calls()
+
+    def test_create_ports_parameters(self):
+        self.assertRaises(
+            TypeError, self.cloud.create_ports,
+            [dict(network_id='test-net-id', nome='test-port-name')])
+
     def test_create_port_parameters(self):
         """Test that we detect invalid arguments passed to create_port"""
         self.assertRaises(
@@ -187,7 +263,8 @@ class TestPort(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'ports.json']),
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['id=%s' % port_id]),
                  json=self.mock_neutron_port_list_rep),
             dict(method='PUT',
                  uri=self.get_mock_url(
@@ -214,7 +291,8 @@ class TestPort(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'ports.json']),
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['id=%s' % port_id]),
                  json=self.mock_neutron_port_list_rep),
             dict(method='PUT',
                  uri=self.get_mock_url(
@@ -241,6 +319,22 @@ class TestPort(base.RequestsMockTestCase):
         self.assertItemsEqual(self.mock_neutron_port_list_rep['ports'], ports)
         self.assert_calls()
 
+    def test_list_ports_fields(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['device_id=server-id', 'fields=id',
+                                  'fields=mac_address']),
+                 json={'ports': [
+                     {'id': 'port-id', 'mac_address': 'fa:16:3e:bb:3c:e4'}]})
+        ])
+        ports = self.cloud.list_ports(
+            filters={'device_id': 'server-id'}, fields=['mac_address'])
+        self.assertEqual(
+            [{'id': 'port-id', 'mac_address': 'fa:16:3e:bb:3c:e4'}], ports)
+        self.assert_calls()
+
     def test_list_ports_exception(self):
         self.register_uris([
             dict(method='GET',
@@ -255,7 +349,8 @@ class TestPort(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'ports.json']),
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['id=%s' % port_id]),
                  json=self.mock_neutron_port_list_rep)
         ])
         ports = self.cloud.search_ports(name_or_id=port_id)
@@ -269,7 +364,8 @@ class TestPort(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'ports.json']),
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['name=%s' % port_name]),
                  json=self.mock_neutron_port_list_rep)
         ])
         ports = self.cloud.search_ports(name_or_id=port_name)
@@ -282,8 +378,14 @@ class TestPort(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'ports.json']),
-                 json=self.mock_neutron_port_list_rep)
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['name=non-existent']),
+                 json={'ports': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['id=non-existent']),
+                 json={'ports': []})
         ])
         ports = self.cloud.search_ports(name_or_id='non-existent')
         self.assertEqual(0, len(ports))
@@ -309,8 +411,14 @@ class TestPort(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'ports.json']),
-                 json=self.mock_neutron_port_list_rep)
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['name=non-existent']),
+                 json={'ports': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['id=non-existent']),
+                 json={'ports': []})
         ])
         self.assertFalse(self.cloud.delete_port(name_or_id='non-existent'))
         self.assert_calls()
@@ -322,7 +430,8 @@ class TestPort(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'ports.json']),
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['name=%s' % port_name]),
                  json={'ports': [port1, port2]})
         ])
         self.assertRaises(OpenStackCloudException,
@@ -332,12 +441,17 @@ class TestPort(base.RequestsMockTestCase):
     def test_delete_subnet_multiple_using_id(self):
         port_name = "port-name"
         port1 = dict(id='123', name=port_name)
-        port2 = dict(id='456', name=port_name)
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'ports.json']),
-                 json={'ports': [port1, port2]}),
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['name=123']),
+                 json={'ports': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['id=123']),
+                 json={'ports': [port1]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
                      'network', 'public',
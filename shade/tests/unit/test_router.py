@@ -67,7 +67,8 @@ class TestRouter(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'routers.json']),
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['name=%s' % self.router_name]),
                  json={'routers': [self.mock_router_rep]})
         ])
         r = self.cloud.get_router(self.router_name)
@@ -79,7 +80,13 @@ class TestRouter(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'routers.json']),
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['name=mickey']),
+                 json={'routers': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['id=mickey']),
                  json={'routers': []})
         ])
         r = self.cloud.get_router('mickey')
@@ -245,7 +252,8 @@ class TestRouter(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'routers.json']),
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['id=%s' % self.router_id]),
                  json={'routers': [self.mock_router_rep]}),
             dict(method='PUT',
                  uri=self.get_mock_url(
@@ -265,7 +273,8 @@ class TestRouter(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'routers.json']),
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['name=%s' % self.router_name]),
                  json={'routers': [self.mock_router_rep]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -280,7 +289,13 @@ class TestRouter(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'routers.json']),
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['name=%s' % self.router_name]),
+                 json={'routers': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['id=%s' % self.router_name]),
                  json={'routers': []}),
         ])
         self.assertFalse(self.cloud.delete_router(self.router_name))
@@ -292,7 +307,8 @@ class TestRouter(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'routers.json']),
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['name=mickey']),
                  json={'routers': [router1, router2]}),
         ])
         self.assertRaises(exc.OpenStackCloudException,
@@ -302,12 +318,17 @@ class TestRouter(base.RequestsMockTestCase):
 
     def test_delete_router_multiple_using_id(self):
         router1 = dict(id='123', name='mickey')
-        router2 = dict(id='456', name='mickey')
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'routers.json']),
-                 json={'routers': [router1, router2]}),
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['name=123']),
+                 json={'routers': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'routers.json'],
+                     qs_elements=['id=123']),
+                 json={'routers': [router1]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
                      'network', 'public',
@@ -93,7 +93,14 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=1']),
+                 json={'security_groups': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['id=1']),
                  json={'security_groups': [neutron_grp_dict]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -126,8 +133,15 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
-                 json={'security_groups': [neutron_grp_dict]})
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=10']),
+                 json={'security_groups': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['id=10']),
+                 json={'security_groups': []})
         ])
         self.assertFalse(self.cloud.delete_security_group('10'))
         self.assert_calls()
@@ -260,7 +274,14 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=1']),
+                 json={'security_groups': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['id=1']),
                  json={'security_groups': [neutron_grp_dict]}),
             dict(method='PUT',
                  uri=self.get_mock_url(
@@ -328,7 +349,14 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=1']),
+                 json={'security_groups': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['id=1']),
                  json={'security_groups': [neutron_grp_dict]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -373,7 +401,14 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=1']),
+                 json={'security_groups': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['id=1']),
                  json={'security_groups': [neutron_grp_dict]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -391,6 +426,72 @@ class TestSecurityGroups(base.RequestsMockTestCase):
         self.assertEqual(expected_new_rule, new_rule)
         self.assert_calls()
 
+    def test_create_security_group_rules_neutron(self):
+        self.cloud.secgroup_source = 'neutron'
+        ports = [22, 80, 443]
+        new_rules = [
+            dict(id=str(port), security_group_id=neutron_grp_dict['id'],
+                 port_range_min=port, port_range_max=port, protocol='tcp',
+                 remote_ip_prefix=None, remote_group_id=None,
+                 direction='ingress', ethertype='IPv4')
+            for port in ports]
+        self.register_uris([
+            # The group is looked up once for all of the rules
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=neutron-sec-group']),
+                 json={'security_groups': [neutron_grp_dict]}),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-group-rules.json']),
+                 json={'security_group_rules': new_rules},
+                 validate=dict(json={
+                     'security_group_rules': [
+                         dict((k, v) for k, v in rule.items() if k != 'id')
+                         for rule in new_rules]}))
+        ])
+        rules = self.cloud.create_security_group_rules(
+            neutron_grp_dict['name'],
+            [dict(port_range_min=port, port_range_max=port, protocol='tcp')
+             for port in ports])
+        self.assertEqual(['22', '80', '443'], [r['id'] for r in rules])
+        self.assertEqual([22, 80, 443], [r['port_range_min'] for r in rules])
+        self.assert_calls()
+
+    def test_create_security_group_rules_nova(self):
+        self.has_neutron = False
+        self.cloud.secgroup_source = 'nova'
+        uris = [
+            dict(method='GET',
+                 uri='{endpoint}/os-security-groups'.format(
+                     endpoint=fakes.COMPUTE_ENDPOINT),
+                 json={'security_groups': [nova_grp_dict]})]
+        for port in (22, 80):
+            uris.append(dict(
+                method='POST',
+                uri='{endpoint}/os-security-group-rules'.format(
+                    endpoint=fakes.COMPUTE_ENDPOINT),
+                json={'security_group_rule':
+                      fakes.make_fake_nova_security_group_rule(
+                          id=str(port), from_port=port, to_port=port,
+                          ip_protocol='tcp', cidr='0.0.0.0/0')},
+                validate=dict(json={
+                    'security_group_rule': {
+                        'from_port': port, 'to_port': port,
+                        'ip_protocol': 'tcp', 'parent_group_id': '2',
+                        'cidr': '0.0.0.0/0', 'group_id': None}})))
+        self.register_uris(uris)
+        rules = self.cloud.create_security_group_rules(
+            nova_grp_dict['name'],
+            [dict(port_range_min=port, port_range_max=port, protocol='tcp',
+                  remote_ip_prefix='0.0.0.0/0') for port in (22, 80)],
+            concurrency=1)
+        self.assertEqual(['22', '80'], [r['id'] for r in rules])
+        self.assert_calls()
+
     def test_create_security_group_rule_nova(self):
         self.has_neutron = False
         self.cloud.secgroup_source = 'nova'
@@ -469,6 +570,111 @@ class TestSecurityGroups(base.RequestsMockTestCase):
                           self.cloud.create_security_group_rule,
                           '')
 
+    def test_ensure_security_group_neutron(self):
+        self.cloud.secgroup_source = 'neutron'
+
+        def _rule(rule_id, port):
+            return dict(
+                id=rule_id, security_group_id='1', direction='ingress',
+                ethertype='IPv4', protocol='tcp', port_range_min=port,
+                port_range_max=port, remote_ip_prefix='0.0.0.0/0',
+                remote_group_id=None)
+
+        group = fakes.make_fake_neutron_security_group(
+            id='1', name='web', description='', rules=[
+                _rule('keep', 80), _rule('drop', 22)])
+        new_rule = _rule('new', 443)
+        expected = dict(new_rule)
+        expected.pop('id')
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=web']),
+                 json={'security_groups': [group]}),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-group-rules.json']),
+                 json={'security_group_rule': new_rule},
+                 validate=dict(json={'security_group_rule': expected})),
+            dict(method='DELETE',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-group-rules', 'drop.json']),
+                 json={}),
+        ])
+        secgroup = self.cloud.ensure_security_group('web', [
+            dict(protocol='tcp', port_range_min=port, port_range_max=port,
+                 remote_ip_prefix='0.0.0.0/0') for port in (80, 443)])
+        self.assertEqual(
+            ['keep', 'new'],
+            [rule['id'] for rule in secgroup['security_group_rules']])
+        self.assert_calls()
+
+    def test_ensure_security_group_unchanged(self):
+        self.cloud.secgroup_source = 'neutron'
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=neutron-sec-group']),
+                 json={'security_groups': [neutron_grp_dict]}),
+        ])
+        secgroup = self.cloud.ensure_security_group(
+            neutron_grp_dict['name'], [
+                dict(protocol='tcp', port_range_min=80, port_range_max=81,
+                     remote_ip_prefix='0.0.0.0/0')])
+        self.assertEqual(
+            ['1'], [rule['id'] for rule in secgroup['security_group_rules']])
+        self.assert_calls()
+
+    def test_ensure_security_group_nova_create(self):
+        self.has_neutron = False
+        self.cloud.secgroup_source = 'nova'
+        new_group = fakes.make_fake_nova_security_group(
+            id='2', name='web', description='Web', rules=[])
+        uris = [
+            dict(method='GET',
+                 uri='{endpoint}/os-security-groups'.format(
+                     endpoint=fakes.COMPUTE_ENDPOINT),
+                 json={'security_groups': []}),
+            dict(method='POST',
+                 uri='{endpoint}/os-security-groups'.format(
+                     endpoint=fakes.COMPUTE_ENDPOINT),
+                 json={'security_group': new_group},
+                 validate=dict(json={
+                     'security_group': {
+                         'name': 'web', 'description': 'Web'}})),
+        ]
+        for port in (80, 443):
+            uris.append(dict(
+                method='POST',
+                uri='{endpoint}/os-security-group-rules'.format(
+                    endpoint=fakes.COMPUTE_ENDPOINT),
+                json={'security_group_rule':
+                      fakes.make_fake_nova_security_group_rule(
+                          id=str(port), from_port=port, to_port=port,
+                          ip_protocol='tcp', cidr='0.0.0.0/0')},
+                validate=dict(json={
+                    'security_group_rule': {
+                        'from_port': port, 'to_port': port,
+                        'ip_protocol': 'tcp', 'parent_group_id': '2',
+                        'cidr': '0.0.0.0/0', 'group_id': None}})))
+        self.register_uris(uris)
+        secgroup = self.cloud.ensure_security_group(
+            'web', [
+                dict(protocol='tcp', port_range_min=port,
+                     port_range_max=port, remote_ip_prefix='0.0.0.0/0')
+                for port in (80, 443)],
+            description='Web', concurrency=1)
+        self.assertEqual(
+            ['80', '443'],
+            [rule['id'] for rule in secgroup['security_group_rules']])
+        self.assert_calls()
+
     def test_delete_security_group_rule_neutron(self):
         rule_id = "xyz"
         self.cloud.secgroup_source = 'neutron'
@@ -509,8 +715,15 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
-                 json={'security_groups': [neutron_grp_dict]})
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=doesNotExist']),
+                 json={'security_groups': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['id=doesNotExist']),
+                 json={'security_groups': []})
         ])
         self.assertFalse(self.cloud.delete_security_group(rule_id))
         self.assert_calls()
@@ -617,7 +830,8 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=neutron-sec-group']),
                  json={'security_groups': [neutron_grp_dict]}),
             dict(method='POST',
                  uri='%s/servers/%s/action' % (fakes.COMPUTE_ENDPOINT, '1234'),
@@ -672,7 +886,8 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=neutron-sec-group']),
                  json={'security_groups': [neutron_grp_dict]}),
             dict(method='POST',
                  uri='%s/servers/%s/action' % (fakes.COMPUTE_ENDPOINT, '1234'),
@@ -725,8 +940,15 @@ class TestSecurityGroups(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public',
-                     append=['v2.0', 'security-groups.json']),
-                 json={'security_groups': [neutron_grp_dict]})
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['name=unknown-sec-group']),
+                 json={'security_groups': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups.json'],
+                     qs_elements=['id=unknown-sec-group']),
+                 json={'security_groups': []})
         ])
         self.assertFalse(self.cloud.add_server_security_groups(
             'server-name', 'unknown-sec-group'))
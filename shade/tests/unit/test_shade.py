@@ -54,6 +54,23 @@ class TestShade(base.RequestsMockTestCase):
     def test_openstack_cloud(self):
         self.assertIsInstance(self.cloud, shade.OpenStackCloud)
 
+    @mock.patch.object(_utils, 'localhost_supports_ipv6')
+    def test_ipv6_probe_is_lazy(self, mock_probe):
+        mock_probe.return_value = True
+        cloud = shade.OpenStackCloud(cloud_config=self.cloud_config)
+        mock_probe.assert_not_called()
+        self.assertTrue(cloud._local_ipv6)
+        mock_probe.assert_called_once_with()
+        cloud._local_ipv6 = False
+        self.assertFalse(cloud._local_ipv6)
+
+    @mock.patch.object(_utils, 'localhost_supports_ipv6')
+    def test_ipv6_probe_skipped_with_force_ipv4(self, mock_probe):
+        cloud = shade.OpenStackCloud(cloud_config=self.cloud_config)
+        cloud.force_ipv4 = True
+        self.assertFalse(cloud._local_ipv6)
+        mock_probe.assert_not_called()
+
     @mock.patch.object(shade.OpenStackCloud, 'search_images')
     def test_get_images(self, mock_search):
         image1 = dict(id='123', name='mickey')
@@ -379,6 +396,25 @@ class TestShade(base.RequestsMockTestCase):
 
         self.assert_calls()
 
+    def test_list_servers_summary(self):
+        server_id = str(uuid.uuid4())
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers']),
+                 json={'servers': [{
+                     'id': server_id, 'name': 'server', 'links': []}]}),
+        ])
+
+        r = self.cloud.list_servers(fields=['id', 'name'])
+
+        self.assertEqual(1, len(r))
+        self.assertEqual(server_id, r[0]['id'])
+        self.assertEqual('server', r[0]['name'])
+        self.assertEqual({}, r[0]['flavor'])
+        self.assertIsNone(r[0]['status'])
+        self.assert_calls()
+
     def test_iterate_timeout_bad_wait(self):
         with testtools.ExpectedException(
                 exc.OpenStackCloudException,
@@ -41,10 +41,15 @@ class TestShadeOperator(base.RequestsMockTestCase):
 
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name={id}'.format(
+                     id=image_id),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=image_id),
                  json=list_return),
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name=fake_image',
                  json=list_return),
         ])
 
@@ -63,10 +68,15 @@ class TestShadeOperator(base.RequestsMockTestCase):
 
         self.register_uris([
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name={id}'.format(
+                     id=image_id),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri='https://image.example.com/v2/images?id={id}'.format(
+                     id=image_id),
                  json=list_return),
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
+                 uri='https://image.example.com/v2/images?name=fake_image',
                  json=list_return),
         ])
 
@@ -61,7 +61,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'subnets.json']),
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['name=%s' % self.subnet_name]),
                  json={'subnets': [self.mock_subnet_rep]})
         ])
         r = self.cloud.get_subnet(self.subnet_name)
@@ -94,7 +95,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % self.network_name]),
                  json={'networks': [self.mock_network_rep]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -117,12 +119,43 @@ class TestSubnet(base.RequestsMockTestCase):
         self.assertDictEqual(mock_subnet_rep, subnet)
         self.assert_calls()
 
+    def test_create_subnets(self):
+        cidrs = ['192.168.{0}.0/24'.format(i) for i in range(3)]
+        created = [
+            dict(self.mock_subnet_rep, id=str(i), cidr=cidr)
+            for i, cidr in enumerate(cidrs)]
+        self.register_uris([
+            # The network is looked up once for all of the subnets
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % self.network_name]),
+                 json={'networks': [self.mock_network_rep]}),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'subnets.json']),
+                 json={'subnets': created},
+                 validate=dict(
+                     json={'subnets': [{
+                         'cidr': cidr,
+                         'enable_dhcp': False,
+                         'ip_version': 4,
+                         'network_id': self.mock_network_rep['id']}
+                         for cidr in cidrs]}))
+        ])
+        subnets = self.cloud.create_subnets([
+            dict(network_name_or_id=self.network_name, cidr=cidr)
+            for cidr in cidrs])
+        self.assertEqual(created, subnets)
+        self.assert_calls()
+
     def test_create_subnet_string_ip_version(self):
         '''Allow ip_version as a string'''
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % self.network_name]),
                  json={'networks': [self.mock_network_rep]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -145,7 +178,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % self.network_name]),
                  json={'networks': [self.mock_network_rep]})
         ])
         with testtools.ExpectedException(
@@ -166,7 +200,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % self.network_name]),
                  json={'networks': [self.mock_network_rep]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -200,7 +235,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % self.network_name]),
                  json={'networks': [self.mock_network_rep]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -227,7 +263,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=kooky']),
                  json={'networks': [self.mock_network_rep]})
         ])
         gateway = '192.168.200.3'
@@ -241,7 +278,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=duck']),
                  json={'networks': [self.mock_network_rep]})
         ])
         self.assertRaises(exc.OpenStackCloudException,
@@ -255,7 +293,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'networks.json']),
+                     'network', 'public', append=['v2.0', 'networks.json'],
+                     qs_elements=['name=%s' % self.network_name]),
                  json={'networks': [net1, net2]})
         ])
         self.assertRaises(exc.OpenStackCloudException,
@@ -267,7 +306,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'subnets.json']),
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['name=%s' % self.subnet_name]),
                  json={'subnets': [self.mock_subnet_rep]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -282,7 +322,13 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'subnets.json']),
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['name=goofy']),
+                 json={'subnets': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['id=goofy']),
                  json={'subnets': []})
         ])
         self.assertFalse(self.cloud.delete_subnet('goofy'))
@@ -294,7 +340,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'subnets.json']),
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['name=%s' % self.subnet_name]),
                  json={'subnets': [subnet1, subnet2]})
         ])
         self.assertRaises(exc.OpenStackCloudException,
@@ -304,12 +351,17 @@ class TestSubnet(base.RequestsMockTestCase):
 
     def test_delete_subnet_multiple_using_id(self):
         subnet1 = dict(id='123', name=self.subnet_name)
-        subnet2 = dict(id='456', name=self.subnet_name)
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'subnets.json']),
-                 json={'subnets': [subnet1, subnet2]}),
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['name=123']),
+                 json={'subnets': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['id=123']),
+                 json={'subnets': [subnet1]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
                      'network', 'public',
@@ -325,7 +377,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'subnets.json']),
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['id=%s' % self.subnet_id]),
                  json={'subnets': [self.mock_subnet_rep]}),
             dict(method='PUT',
                  uri=self.get_mock_url(
@@ -346,7 +399,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'subnets.json']),
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['id=%s' % self.subnet_id]),
                  json={'subnets': [self.mock_subnet_rep]}),
             dict(method='PUT',
                  uri=self.get_mock_url(
@@ -366,7 +420,8 @@ class TestSubnet(base.RequestsMockTestCase):
         self.register_uris([
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'subnets.json']),
+                     'network', 'public', append=['v2.0', 'subnets.json'],
+                     qs_elements=['id=%s' % self.subnet_id]),
                  json={'subnets': [self.mock_subnet_rep]}),
             dict(method='PUT',
                  uri=self.get_mock_url(
@@ -249,9 +249,15 @@ class TestVolume(base.RequestsMockTestCase):
                'name': '', 'attachments': []}
         volume = meta.obj_to_munch(fakes.FakeVolume(**vol))
         self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', 'detail'],
+                     qs_elements=['name=%s' % volume.id]),
+                 json={'volumes': []}),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
+                 complete_qs=True,
                  json={'volumes': [volume]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -259,6 +265,7 @@ class TestVolume(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
+                 complete_qs=True,
                  json={'volumes': []})])
         self.assertTrue(self.cloud.delete_volume(volume['id']))
         self.assert_calls()
@@ -268,9 +275,15 @@ class TestVolume(base.RequestsMockTestCase):
                'name': '', 'attachments': []}
         volume = meta.obj_to_munch(fakes.FakeVolume(**vol))
         self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', 'detail'],
+                     qs_elements=['name=%s' % volume.id]),
+                 json={'volumes': []}),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
+                 complete_qs=True,
                  json={'volumes': [volume]}),
             dict(method='DELETE',
                  uri=self.get_mock_url(
@@ -284,9 +297,15 @@ class TestVolume(base.RequestsMockTestCase):
                'name': '', 'attachments': []}
         volume = meta.obj_to_munch(fakes.FakeVolume(**vol))
         self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', 'detail'],
+                     qs_elements=['name=%s' % volume.id]),
+                 json={'volumes': []}),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
+                 complete_qs=True,
                  json={'volumes': [volume]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -297,6 +316,7 @@ class TestVolume(base.RequestsMockTestCase):
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
+                 complete_qs=True,
                  json={'volumes': []})])
         self.assertTrue(self.cloud.delete_volume(volume['id'], force=True))
         self.assert_calls()
@@ -306,9 +326,15 @@ class TestVolume(base.RequestsMockTestCase):
                'name': '', 'attachments': []}
         volume = meta.obj_to_munch(fakes.FakeVolume(**vol))
         self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', 'detail'],
+                     qs_elements=['name=%s' % volume.id]),
+                 json={'volumes': []}),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
+                 complete_qs=True,
                  json={'volumes': [volume]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -324,9 +350,15 @@ class TestVolume(base.RequestsMockTestCase):
                'name': '', 'attachments': []}
         volume = meta.obj_to_munch(fakes.FakeVolume(**vol))
         self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', 'detail'],
+                     qs_elements=['name=%s' % volume.id]),
+                 json={'volumes': []}),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
+                 complete_qs=True,
                  json={'volumes': [volume]}),
             dict(method='POST',
                  uri=self.get_mock_url(